@@ -13,16 +13,22 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import collections
+import fnmatch
+import functools
 import logging
 import os
 import traceback
 from concurrent.futures import ThreadPoolExecutor
 
 from acts import asserts
+from acts import call_stats
 from acts import keys
 from acts import logger
+from acts import profiler
 from acts import records
 from acts import signals
+from acts import test_params
 from acts import tracelogger
 from acts import utils
 
@@ -67,6 +73,7 @@ class BaseTestClass(object):
             setattr(self, name, value)
         self.results = records.TestResult()
         self.current_test_name = None
+        self._generated_test_names = {}
         self.log = tracelogger.TraceLogger(self.log)
         self.size_limit_reached = False
         if 'android_devices' in self.__dict__:
@@ -344,13 +351,17 @@ class BaseTestClass(object):
         This will let signals.TestAbortAll through so abort_all works in all
         procedure functions.
 
+        The time spent is added to the phase of the record named after the
+        function, e.g. on_fail.
+
         Args:
             func: The procedure function to be executed.
             tr_record: The TestResultRecord object associated with the test
                        case executed.
         """
         try:
-            func(tr_record)
+            with tr_record.time_phase(func.__name__.lstrip('_')):
+                func(tr_record)
         except signals.TestAbortAll:
             raise
         except Exception as e:
@@ -363,7 +374,8 @@ class BaseTestClass(object):
 
         Executes one test case, create a records.TestResultRecord object with
         the execution information, and add the record to the test class's test
-        results.
+        results. The time spent in each phase of the test case, and the adb
+        commands and RPCs made, are added to the record.
 
         Args:
             test_name: Name of the test.
@@ -378,23 +390,33 @@ class BaseTestClass(object):
         self.log_begin_time = tr_record.log_begin_time
         self.test_name = tr_record.test_name
         self.log.info("%s %s", TEST_CASE_TOKEN, test_name)
+        calls_before = call_stats.get_totals()
+        profiler.set_label('%s.%s' % (self.TAG, test_name))
         verdict = None
         try:
             try:
                 if hasattr(self, 'android_devices'):
                     for ad in self.android_devices:
                         if not ad.is_adb_logcat_on:
-                            ad.start_adb_logcat(cont_logcat_file=True)
-                ret = self._setup_test(self.test_name)
+                            with tr_record.time_phase(
+                                    records.TestResultEnums.
+                                    PHASE_LOGCAT_RESTART):
+                                ad.start_adb_logcat(cont_logcat_file=True)
+                with tr_record.time_phase(
+                        records.TestResultEnums.PHASE_SETUP_TEST):
+                    ret = self._setup_test(self.test_name)
                 asserts.assert_true(ret is not False,
                                     "Setup for %s failed." % test_name)
-                if args or kwargs:
-                    verdict = test_func(*args, **kwargs)
-                else:
-                    verdict = test_func()
+                with tr_record.time_phase(records.TestResultEnums.PHASE_TEST):
+                    if args or kwargs:
+                        verdict = test_func(*args, **kwargs)
+                    else:
+                        verdict = test_func()
             finally:
                 try:
-                    self._teardown_test(self.test_name)
+                    with tr_record.time_phase(
+                            records.TestResultEnums.PHASE_TEARDOWN_TEST):
+                        self._teardown_test(self.test_name)
                 except signals.TestAbortAll:
                     raise
                 except Exception as e:
@@ -444,7 +466,9 @@ class BaseTestClass(object):
             tr_record.test_fail()
             self._exec_procedure_func(self._on_fail, tr_record)
         finally:
+            profiler.set_label(self.TAG)
             if not is_generate_trigger:
+                tr_record.calls = call_stats.get_calls_since(calls_before)
                 self.results.add_record(tr_record)
 
     def run_generated_testcases(self,
@@ -552,9 +576,124 @@ class BaseTestClass(object):
                 test_names.append(name)
         return test_names
 
+    def _get_param_space(self, template_name):
+        """Returns the ParamSpace of the cases of a template test method to
+        run, sharded if the test_shard config is set.
+        """
+        space = test_params.get_param_space(getattr(self, template_name))
+        shard = self.user_params.get(keys.Config.key_test_shard.value)
+        if shard:
+            space = space.shard(*shard)
+        return space
+
+    def _get_generated_test_funcs(self, template_name, pattern=None):
+        """Obtain the generated test cases of a template test method.
+
+        Args:
+            template_name: The name of the template test method.
+            pattern: A test name pattern the cases should match, or None for
+                all of them.
+
+        Returns:
+            A list of (string, function) tuples as _get_test_funcs, where the
+            function runs the template with the parameters of the case.
+        """
+        template = getattr(self, template_name)
+        test_names = set()
+        test_funcs = []
+        for params in self._get_param_space(template_name):
+            test_name = self._get_generated_test_name(template_name, params)
+            if test_name in test_names:
+                raise Error('Generated test case name %s is not unique.' %
+                            test_name)
+            test_names.add(test_name)
+            if pattern is None or fnmatch.fnmatchcase(test_name, pattern):
+                test_funcs.append((test_name,
+                                   functools.partial(template, **params)))
+        return test_funcs
+
+    def _get_generated_test_name(self, template_name, params):
+        """Returns the name of the generated test case of a template with a
+        parameter set, cut to the maximum file name length.
+        """
+        test_name = getattr(self, template_name).param_name_func(
+            template_name, params)
+        return test_name[:utils.MAX_FILENAME_LEN]
+
+    def _find_generated_test_cases(self, template_name, test_name):
+        """Finds the indices in the ParamSpace of a template of the cases
+        with a name.
+
+        Default names are parsed, so no other case is named. Names given by
+        a name_func or cut to the maximum file name length cannot be parsed,
+        so every case is named once and the names are kept for later.
+        """
+        space = self._get_param_space(template_name)
+        if (getattr(self, template_name).param_name_func is
+                test_params.get_test_name
+                and len(test_name) < utils.MAX_FILENAME_LEN):
+            return test_params.find_test_cases(space, template_name,
+                                               test_name)
+        if template_name not in self._generated_test_names:
+            names = collections.defaultdict(list)
+            for index, params in enumerate(space):
+                names[self._get_generated_test_name(template_name,
+                                                    params)].append(index)
+            self._generated_test_names[template_name] = names
+        return self._generated_test_names[template_name].get(test_name, [])
+
+    def _find_generated_test_funcs(self, pattern):
+        """Obtain the generated test cases of all the templates matching a
+        test name pattern.
+
+        Only the templates whose default case names can match are searched,
+        unless they name their cases with a name_func. A name without
+        wildcards is looked up without naming the other cases when possible.
+
+        Raises:
+            Error: Raised if several cases have the name.
+        """
+        prefix = pattern
+        is_exact_name = True
+        for index, char in enumerate(pattern):
+            if char in '*?[':
+                prefix = pattern[:index]
+                is_exact_name = False
+                break
+        test_funcs = []
+        for name in self._get_all_test_names():
+            if test_params.get_param_space(getattr(self, name)) is None:
+                continue
+            template_prefix = name + '_'
+            if (getattr(self, name).param_name_func is
+                    test_params.get_test_name
+                    and not prefix.startswith(template_prefix)
+                    and not template_prefix.startswith(prefix)):
+                continue
+            if not is_exact_name:
+                test_funcs.extend(
+                    self._get_generated_test_funcs(name, pattern))
+                continue
+            indices = self._find_generated_test_cases(name, pattern)
+            if len(indices) > 1:
+                raise Error('Generated test case name %s is not unique.' %
+                            pattern)
+            space = self._get_param_space(name)
+            test_funcs.extend(
+                (pattern, functools.partial(getattr(self, name),
+                                            **space.get(index)))
+                for index in indices)
+        if is_exact_name and len(test_funcs) > 1:
+            raise Error('Generated test case name %s is not unique.' % pattern)
+        return test_funcs
+
     def _get_test_funcs(self, test_names):
         """Obtain the actual functions of test cases based on test names.
 
+        The name of a template test method, see test_params.generated_tests,
+        gives all its generated test cases. Generated test cases can also be
+        selected by name, or by a pattern matching their names.
+
         Args:
             test_names: A list of strings, each string is a test case name.
 
@@ -569,6 +708,17 @@ class BaseTestClass(object):
         """
         test_funcs = []
         for test_name in test_names:
+            if hasattr(self, test_name):
+                if test_params.get_param_space(getattr(self, test_name)):
+                    test_funcs.extend(
+                        self._get_generated_test_funcs(test_name))
+                    continue
+            elif test_name.startswith("test_"):
+                generated_test_funcs = self._find_generated_test_funcs(
+                    test_name)
+                if generated_test_funcs:
+                    test_funcs.extend(generated_test_funcs)
+                    continue
             test_funcs.append(self._get_test_func(test_name))
 
         return test_funcs
@@ -646,8 +796,8 @@ class BaseTestClass(object):
             else:
                 # No test case specified by user, execute all in the test class
                 test_names = self._get_all_test_names()
-        self.results.requested = test_names
         tests = self._get_test_funcs(test_names)
+        self.results.requested = [test_name for test_name, _ in tests]
         # A TestResultRecord used for when setup_class fails.
         # Setup for the class.
         try:
@@ -677,6 +827,8 @@ class BaseTestClass(object):
             self._exec_func(self.teardown_class)
             self.log.info("Summary for test class %s: %s", self.TAG,
                           self.results.summary_str())
+            self.log.info("Phase timings for test class %s: %s", self.TAG,
+                          self.results.get_phase_timings().get(self.TAG, {}))
 
     def clean_up(self):
         """A function that is executed upon completion of all tests cases
@@ -229,6 +229,16 @@ def main(argv):
         nargs='?',
         type=int,
         help="Number of times to run every test case.")
+    parser.add_argument(
+        '-prof',
+        '--profile',
+        metavar="<INTERVAL_MS>",
+        nargs='?',
+        type=float,
+        const=10,
+        help=("If set, the stacks of the host are sampled every INTERVAL_MS "
+              "(10 by default) during the test run, and the profile of each "
+              "test case is written under the log path."))
 
     args = parser.parse_args(argv)
     test_list = None
@@ -238,7 +248,7 @@ def main(argv):
         test_list = args.testclass
     parsed_configs = config_parser.load_test_config_file(
         args.config[0], args.testbed, args.testpaths, args.logpath,
-        args.test_args, args.random, args.test_case_iterations)
+        args.test_args, args.random, args.test_case_iterations, args.profile)
     # Prepare args for test runs
     test_identifiers = config_parser.parse_test_list(test_list)
 
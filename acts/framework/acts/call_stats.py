@@ -0,0 +1,68 @@
+#!/usr/bin/env python3.4
+#
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Counts of the calls made to devices and of the time spent in them.
+
+AdbProxy and RpcClient add every adb command and SL4A RPC they run, from any
+thread, so that the calls made during a test case can be attached to its
+record. Adding a call only takes a lock, which is negligible next to the
+milliseconds an adb command or an RPC takes.
+"""
+
+import collections
+import threading
+
+ADB = 'adb'
+RPC = 'rpc'
+
+_lock = threading.Lock()
+_counts = collections.defaultdict(int)
+_times = collections.defaultdict(float)
+
+
+def add_call(kind, duration):
+    """Adds a call that took duration seconds.
+
+    Args:
+        kind: the kind of call, e.g. ADB or RPC.
+        duration: the duration of the call (s).
+    """
+    with _lock:
+        _counts[kind] += 1
+        _times[kind] += duration
+
+
+def get_totals():
+    """Returns a dict of kind => (count, total time) of all calls so far."""
+    with _lock:
+        return dict((kind, (_counts[kind], _times[kind])) for kind in _counts)
+
+
+def get_calls_since(totals):
+    """Returns the calls made since totals were taken with get_totals.
+
+    Returns:
+        A dict of kind => {'count': count, 'time': total time (s)}, with only
+        the kinds of calls made since.
+    """
+    calls = {}
+    for kind, (count, total_time) in get_totals().items():
+        previous_count, previous_time = totals.get(kind, (0, 0))
+        if count > previous_count:
+            calls[kind] = {
+                'count': count - previous_count,
+                'time': total_time - previous_time
+            }
+    return calls
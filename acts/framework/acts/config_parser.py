@@ -216,7 +216,8 @@ def load_test_config_file(test_config_path,
                           override_log_path=None,
                           override_test_args=None,
                           override_random=None,
-                          override_test_case_iterations=None):
+                          override_test_case_iterations=None,
+                          override_profile_interval_ms=None):
     """Processes the test configuration file provided by the user.
 
     Loads the configuration file into a json object, unpacks each testbed
@@ -233,6 +234,8 @@ def load_test_config_file(test_config_path,
         override_random: If not None, override the config file value.
         override_test_case_iterations: If not None, override the config file
                                        value.
+        override_profile_interval_ms: If not None, override the config file
+                                      value.
 
     Returns:
         A list of test configuration json objects to be passed to
@@ -250,6 +253,9 @@ def load_test_config_file(test_config_path,
     if override_test_case_iterations:
         configs[keys.Config.key_test_case_iterations.value] = \
             override_test_case_iterations
+    if override_profile_interval_ms:
+        configs[keys.Config.key_profile_interval_ms.value] = \
+            override_profile_interval_ms
 
     testbeds = configs[keys.Config.key_testbed.value]
     if type(testbeds) is list:
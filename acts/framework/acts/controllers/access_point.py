@@ -28,6 +28,7 @@ from acts.controllers.ap_lib import dhcp_server
 from acts.controllers.ap_lib import hostapd
 from acts.controllers.ap_lib import hostapd_config
 from acts.controllers.ap_lib import hostapd_constants
+from acts.controllers.utils_lib.commands import batch
 from acts.controllers.utils_lib.commands import ip
 from acts.controllers.utils_lib.commands import route
 from acts.controllers.utils_lib.commands import shell
@@ -100,6 +101,20 @@ _AP_5GHZ_SUBNET_STR_DEFAULT = '192.168.9.0/24'
 BRIDGE_IP_LAST = '100'
 
 
+def _check_route_removed(result):
+    """Checks the result of removing a route in a batch.
+
+    Args:
+        result: The job.Result of an ip route del command.
+
+    Raises:
+        job.Error: Raised when the command failed, unless the route did not
+                   exist.
+    """
+    if result.exit_status and 'No such process' not in result.stderr:
+        raise job.Error(result)
+
+
 class AccessPoint(object):
     """An access point controller.
 
@@ -237,8 +252,15 @@ class AccessPoint(object):
 
         # Turn off the DHCP server, we're going to change its settings.
         self._dhcp.stop()
+
+        # The changes below are collected and sent to the ap as one script,
+        # instead of running one command at a time over ssh.
+        setup = batch.CommandBatch(self.ssh)
+        setup_ip_cmd = ip.LinuxIpCommand(setup)
+
         # Clear all routes to prevent old routes from interfering.
-        self._route_cmd.clear_routes(net_interface=interface)
+        routes = list(self._route_cmd.get_routes())
+        self._clear_routes(setup, routes, interface)
 
         if hostapd_config.bss_lookup:
             # The dhcp_bss dictionary is created to hold the key/value
@@ -256,7 +278,7 @@ class AccessPoint(object):
                     hostapd_config.bss_lookup[
                         bss].bssid = interface_mac_orig.stdout[:-1] + str(
                             counter)
-                self._route_cmd.clear_routes(net_interface=str(bss))
+                self._clear_routes(setup, routes, str(bss))
                 if interface is self.wlan_2g:
                     starting_ip_range = self._AP_2G_SUBNET_STR
                 else:
@@ -267,13 +289,19 @@ class AccessPoint(object):
                                          (a, b, str(int(c) + counter), d)))
                 counter = counter + 1
 
-        apd.start(hostapd_config, additional_parameters=additional_parameters)
+        apd.start(
+            hostapd_config,
+            additional_parameters=additional_parameters,
+            batch=setup)
 
         # The DHCP serer requires interfaces to have ips and routes before
-        # the server will come up.
+        # the server will come up. The interfaces of the bss only exist once
+        # hostapd is up, so their addresses are flushed instead of read and
+        # removed one by one.
         interface_ip = ipaddress.ip_interface(
             '%s/%s' % (subnet.router, subnet.network.netmask))
-        self._ip_cmd.set_ipv4_address(interface, interface_ip)
+        setup_ip_cmd.flush_ipv4_addresses(interface)
+        setup_ip_cmd.add_ipv4_address(interface, interface_ip)
         if hostapd_config.bss_lookup:
             # This loop goes through each interface that was setup for
             # hostapd and assigns the DHCP scopes that were defined but
@@ -283,7 +311,8 @@ class AccessPoint(object):
                 bss_interface_ip = ipaddress.ip_interface(
                     '%s/%s' % (dhcp_bss[k].router,
                                dhcp_bss[k].network.netmask))
-                self._ip_cmd.set_ipv4_address(str(k), bss_interface_ip)
+                setup_ip_cmd.flush_ipv4_addresses(str(k))
+                setup_ip_cmd.add_ipv4_address(str(k), bss_interface_ip)
 
         # Restart the DHCP server with our updated list of subnets.
         configured_subnets = [x.subnet for x in self._aps.values()]
@@ -291,19 +320,42 @@ class AccessPoint(object):
             for k, v in dhcp_bss.items():
                 configured_subnets.append(v)
 
-        self._dhcp.start(config=dhcp_config.DhcpConfig(configured_subnets))
+        self._dhcp.start(
+            config=dhcp_config.DhcpConfig(configured_subnets), batch=setup)
 
         # The following three commands are needed to enable bridging between
         # the WAN and LAN/WLAN ports.  This means anyone connecting to the
         # WLAN/LAN ports will be able to access the internet if the WAN port
         # is connected to the internet.
-        self.ssh.run('iptables -t nat -F')
-        self.ssh.run(
+        setup.run('iptables -t nat -F')
+        setup.run(
             'iptables -t nat -A POSTROUTING -o %s -j MASQUERADE' % self.wan)
-        self.ssh.run('echo 1 > /proc/sys/net/ipv4/ip_forward')
+        setup.run('echo 1 > /proc/sys/net/ipv4/ip_forward')
+
+        self.log.debug('Starting ap on %s with:\n%s' % (interface,
+                                                         setup.script()))
+        setup.execute()
 
         return interface
 
+    def _clear_routes(self, setup, routes, net_interface):
+        """Adds the removal of the routes of a network interface to a batch.
+
+        Args:
+            setup: commands.batch.CommandBatch, The batch to add to.
+            routes: The routes of the ap, as given by get_routes.
+            net_interface: string, The network interface to clear routes on.
+        """
+        for address, route_interface in routes:
+            if route_interface == net_interface:
+                # The batch only reports the status once it has run, so a
+                # route which is already gone is ignored in on_result, as
+                # LinuxRouteCommand.remove_route does.
+                setup.add(
+                    'ip route del %s dev %s' % (address, route_interface),
+                    ignore_status=True,
+                    on_result=_check_route_removed)
+
     def get_bssid_from_ssid(self, ssid, band):
         """Gets the BSSID from a provided SSID
 
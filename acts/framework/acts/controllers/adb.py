@@ -19,7 +19,9 @@ from builtins import str
 import logging
 import re
 import shellescape
+import time
 
+from acts import call_stats
 from acts import error
 from acts.libs.proc import job
 
@@ -164,7 +166,11 @@ class AdbProxy(object):
         Raises:
             AdbError is raised if adb cannot find the device.
         """
-        result = job.run(cmd, ignore_status=True, timeout=timeout)
+        start_time = time.time()
+        try:
+            result = job.run(cmd, ignore_status=True, timeout=timeout)
+        finally:
+            call_stats.add_call(call_stats.ADB, time.time() - start_time)
         ret, out, err = result.exit_status, result.stdout, result.stderr
 
         if DEVICE_OFFLINE_REGEX.match(err):
@@ -31,7 +31,9 @@ from acts import signals
 from acts import tracelogger
 from acts import utils
 from acts.controllers import adb
+from acts.controllers.android_lib import logcat
 from acts.controllers import fastboot
+from acts.controllers.sl4a_lib import clock_offset
 from acts.controllers.sl4a_lib import sl4a_manager
 from acts.controllers.utils_lib.ssh import connection
 from acts.controllers.utils_lib.ssh import settings
@@ -116,6 +118,31 @@ def destroy(ads):
             ad.log.exception("Failed to clean up properly.")
 
 
+def reset(ads):
+    """Checks that AndroidDevice objects can be used by another test class.
+
+    Restarts adb logcat if it stopped. Devices which are no longer attached,
+    or whose SL4A server stopped, need to be created again.
+
+    Args:
+        ads: A list of AndroidDevice objects.
+
+    Returns:
+        True if all the AndroidDevice objects can be reused.
+    """
+    connected = list_adb_devices()
+    for ad in ads:
+        if ad.serial not in connected:
+            ad.log.warning("Device is no longer attached.")
+            return False
+        if not ad.skip_sl4a and not (ad.droid and ad.is_sl4a_running()):
+            ad.log.warning("SL4A is no longer running.")
+            return False
+        if not ad.is_adb_logcat_on:
+            ad.start_adb_logcat(cont_logcat_file=True)
+    return True
+
+
 def get_info(ads):
     """Get information on a list of AndroidDevice objects.
 
@@ -383,7 +410,7 @@ class AndroidDevice:
                 'serial': self.serial
             }))
         self._event_dispatchers = {}
-        self.adb_logcat_process = None
+        self._logcat_supervisor = None
         self.adb_logcat_file_path = None
         self.adb = adb.AdbProxy(serial, ssh_connection=ssh_connection)
         self.fastboot = fastboot.FastbootProxy(
@@ -399,6 +426,7 @@ class AndroidDevice:
         self.data_accounting = collections.defaultdict(int)
         self._sl4a_manager = sl4a_manager.Sl4aManager(self.adb)
         self.last_logcat_timestamp = None
+        self._clock_offset_tracker = None
 
     def clean_up(self):
         """Cleans up the AndroidDevice object and releases any resources it
@@ -537,28 +565,54 @@ class AndroidDevice:
         else:
             return None
 
+    def get_clock_offset_tracker(self):
+        """Returns the ClockOffsetTracker of the elapsed realtime clock of the
+        device, which is synced over SL4A when first requested.
+
+        The elapsed realtime is the time since boot, including deep sleep. It
+        is not changed by setting the time of the device. Call sync or
+        sync_if_older on the tracker to follow its drift during a run.
+
+        Raises:
+            AndroidDeviceError: if there is no SL4A session to read the clock.
+        """
+        if self._clock_offset_tracker is None:
+            if not self.droid:
+                raise AndroidDeviceError(
+                    'An SL4A session is needed to read the device clock.')
+            tracker = clock_offset.ClockOffsetTracker(
+                self._read_elapsed_realtime)
+            tracker.sync()
+            self.log.debug('Device clock offset: %s, drift: %s',
+                           tracker.samples[-1], tracker.drift)
+            self._clock_offset_tracker = tracker
+        return self._clock_offset_tracker
+
+    def _read_elapsed_realtime(self):
+        """Returns the elapsed realtime of the device (s)."""
+        return self.droid.getSystemElapsedRealtimeNanos() / 1e9
+
     @property
     def sl4a_sessions(self):
         """Returns a dictionary of session ids to sessions."""
         return list(self._sl4a_manager.sessions)
 
+    @property
+    def adb_logcat_process(self):
+        """The process collecting the adb logcat, if any."""
+        if self._logcat_supervisor:
+            return self._logcat_supervisor.process
+        return None
+
     @property
     def is_adb_logcat_on(self):
         """Whether there is an ongoing adb logcat collection.
+
+        The logcat process is restarted in the background when it dies, e.g.
+        while the device reboots, so this does not run any command.
         """
-        if self.adb_logcat_process:
-            try:
-                utils._assert_subprocess_running(self.adb_logcat_process)
-                return True
-            except Exception:
-                # if skip_sl4a is true, there is no sl4a session
-                # if logcat died due to device reboot and sl4a session has
-                # not restarted there is no droid.
-                if self.droid:
-                    self.droid.logI('Logcat died')
-                self.log.info("Logcat to %s died", self.adb_logcat_file_path)
-                return False
-        return False
+        return bool(self._logcat_supervisor
+                    and self._logcat_supervisor.is_supervising)
 
     def load_config(self, config):
         """Add attributes to the AndroidDevice object based on json config.
@@ -726,6 +780,9 @@ class AndroidDevice:
         """Starts a standing adb logcat collection in separate subprocesses and
         save the logcat in a file.
 
+        The logcat process is restarted from the last line written whenever
+        it dies, until stop_adb_logcat is called.
+
         Args:
             cont_logcat_file: Specifies whether to continue the previous logcat
                               file.  This allows for start_adb_logcat to act
@@ -746,22 +803,31 @@ class AndroidDevice:
             self.log.info(
                 'Restarting logcat on file %s' % self.adb_logcat_file_path)
             logcat_file_path = self.adb_logcat_file_path
+            timestamp = (logcat.get_last_timestamp(logcat_file_path)
+                         or self.last_logcat_timestamp)
         else:
             f_name = "adblog,{},{}.txt".format(self.model, self.serial)
             utils.create_dir(self.log_path)
             logcat_file_path = os.path.join(self.log_path, f_name)
+            timestamp = self.last_logcat_timestamp
         if hasattr(self, 'adb_logcat_param'):
             extra_params = self.adb_logcat_param
         else:
             extra_params = "-b all"
-        if self.last_logcat_timestamp:
-            begin_at = '-T "%s"' % self.last_logcat_timestamp
-        else:
-            begin_at = '-T 1'
-    # TODO(markdr): Pull 'adb -s %SERIAL' from the AdbProxy object.
-        cmd = "adb -s {} logcat {} -v year {} >> {}".format(
-            self.serial, begin_at, extra_params, logcat_file_path)
-        self.adb_logcat_process = utils.start_standing_subprocess(cmd)
+
+        def start_process(timestamp):
+            if timestamp:
+                begin_at = '-T "%s"' % timestamp
+            else:
+                begin_at = '-T 1'
+            # TODO(markdr): Pull 'adb -s %SERIAL' from the AdbProxy object.
+            cmd = "adb -s {} logcat {} -v year {} >> {}".format(
+                self.serial, begin_at, extra_params, logcat_file_path)
+            return utils.start_standing_subprocess(cmd)
+
+        self._logcat_supervisor = logcat.LogcatSupervisor(
+            start_process, logcat_file_path, self.log)
+        self._logcat_supervisor.start(timestamp)
         self.adb_logcat_file_path = logcat_file_path
 
     def stop_adb_logcat(self):
@@ -778,8 +844,8 @@ class AndroidDevice:
         next_line = logcat_output.find('\n')
         self.last_logcat_timestamp = logcat_output[next_line + 1:
                                                    next_line + 24]
-        utils.stop_standing_subprocess(self.adb_logcat_process)
-        self.adb_logcat_process = None
+        self._logcat_supervisor.stop()
+        self._logcat_supervisor = None
 
     def get_apk_uid(self, apk_name):
         """Get the uid of the given apk.
@@ -1128,6 +1194,11 @@ class AndroidDevice:
             self.fastboot.reboot()
             return
         self.terminate_all_sessions()
+        # Logcat is started again from this point with the other services.
+        if self.is_adb_logcat_on:
+            self.stop_adb_logcat()
+        # The elapsed realtime restarts from zero.
+        self._clock_offset_tracker = None
         self.log.info("Rebooting")
         self.adb.reboot()
         self.wait_for_boot_completion()
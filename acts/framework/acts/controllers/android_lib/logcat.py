@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Keeps the adb logcat of a device collected while the device comes and goes.
+
+A thread waits for the logcat process to exit, which takes no CPU and no adb
+command while it runs, and starts it again from the last line written. Test
+classes only read a flag to know whether logcat is collected.
+"""
+
+import os
+import re
+import threading
+import time
+
+from acts import utils
+
+# The delays before restarting a logcat process which exited (s). The delay
+# doubles when a restarted process exits again within MAX_RESTART_DELAY.
+MIN_RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+
+# The timestamp starting the lines printed with '-v year', e.g.
+# 2018-03-01 12:34:56.789  1000  1234 I Tag: message
+_TIMESTAMP_REGEX = re.compile(
+    br'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3})', re.MULTILINE)
+
+
+def get_last_timestamp(file_path, max_bytes=65536):
+    """Returns the timestamp of the last line of a logcat file.
+
+    Only the end of the file is read.
+
+    Args:
+        file_path: the path of a logcat printed with '-v year'.
+        max_bytes: the number of bytes read from the end of the file.
+
+    Returns:
+        The timestamp, in the format given to 'logcat -T', or None if the
+        file does not exist or has no timestamp.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - max_bytes))
+            data = f.read()
+    except (IOError, OSError):
+        return None
+    timestamps = _TIMESTAMP_REGEX.findall(data)
+    if not timestamps:
+        return None
+    return timestamps[-1].decode('ascii')
+
+
+class LogcatSupervisor(object):
+    """Keeps a logcat process running until stopped.
+
+    Attributes:
+        file_path: the path of the file the logcat is written to.
+        restart_count: the number of times the process was restarted.
+    """
+
+    def __init__(self,
+                 start_process,
+                 file_path,
+                 log,
+                 min_restart_delay=MIN_RESTART_DELAY,
+                 max_restart_delay=MAX_RESTART_DELAY):
+        """Creates a LogcatSupervisor.
+
+        Args:
+            start_process: a function starting the logcat process with
+                utils.start_standing_subprocess. It is given the timestamp to
+                start the logcat from, or None to use the default.
+            file_path: the path of the file the logcat is written to.
+            log: the logger of the device.
+            min_restart_delay: the delay before the first restart (s).
+            max_restart_delay: the maximum delay before a restart (s).
+        """
+        self._start_process = start_process
+        self.file_path = file_path
+        self._log = log
+        self._min_restart_delay = min_restart_delay
+        self._max_restart_delay = max_restart_delay
+        self.restart_count = 0
+        self._process = None
+        self._start_time = None
+        self._is_running = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def process(self):
+        """The current logcat process."""
+        return self._process
+
+    @property
+    def is_running(self):
+        """Whether the logcat process is running.
+
+        This does not check the process, and may only turn False a moment
+        after it exits.
+        """
+        return self._is_running
+
+    @property
+    def is_supervising(self):
+        """Whether the logcat process is kept running."""
+        return (self._thread is not None and self._thread.is_alive()
+                and not self._stop_event.is_set())
+
+    def _start(self, timestamp):
+        self._process = self._start_process(timestamp)
+        self._start_time = time.time()
+        self._is_running = True
+
+    def start(self, timestamp=None):
+        """Starts the logcat process and its supervision.
+
+        Args:
+            timestamp: the timestamp to start the logcat from, or None to use
+                the default of start_process.
+        """
+        self._start(timestamp)
+        self._thread = threading.Thread(
+            target=self._supervise,
+            name='LogcatSupervisor-%s' % os.path.basename(self.file_path))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _supervise(self):
+        delay = self._min_restart_delay
+        while True:
+            ret = self._process.wait()
+            self._is_running = False
+            if self._stop_event.is_set():
+                return
+            if time.time() - self._start_time >= self._max_restart_delay:
+                delay = self._min_restart_delay
+            self._log.warning('Logcat to %s died with %s, restarting in %s s.',
+                              self.file_path, ret, delay)
+            # Restarting fails while the device is away, e.g. when adb is
+            # killed. Keep retrying so logcat comes back with the device.
+            while not self._is_running:
+                if self._stop_event.wait(delay):
+                    return
+                delay = min(delay * 2, self._max_restart_delay)
+                with self._lock:
+                    if self._stop_event.is_set():
+                        return
+                    try:
+                        timestamp = get_last_timestamp(self.file_path)
+                        self._log.info('Restarting logcat on file %s from %s.',
+                                       self.file_path, timestamp)
+                        self._start(timestamp)
+                    except Exception:
+                        self._log.exception(
+                            'Failed to restart logcat on file %s, retrying in '
+                            '%s s.', self.file_path, delay)
+                        continue
+                    self.restart_count += 1
+
+    def stop(self):
+        """Stops the logcat process and its supervision."""
+        with self._lock:
+            self._stop_event.set()
+            if self._is_running:
+                try:
+                    utils.stop_standing_subprocess(self._process)
+                except (utils.ActsUtilsError, ProcessLookupError):
+                    # The process exited meanwhile.
+                    pass
+        if self._thread is not None:
+            self._thread.join()
@@ -12,11 +12,16 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import time
+from acts.controllers.utils_lib.commands import batch as command_batch
 from acts.controllers.utils_lib.commands import shell
 
 _ROUTER_DNS = '8.8.8.8, 4.4.4.4'
 
+# The lines the dhcp server logs when it has no interface to listen on and
+# once it is up.
+_NO_INTERFACE = 'Not configured to listen on any interfaces'
+_SERVER_UP = 'Wrote [0-9]* leases to leases file'
+
 
 class Error(Exception):
     """An error caused by the dhcp server."""
@@ -53,7 +58,7 @@ class DhcpServer(object):
         self._lease_file = 'dhcpd_%s.leases' % interface
         self._identifier = '%s.*%s' % (self.PROGRAM_FILE, self._config_file)
 
-    def start(self, config, timeout=60):
+    def start(self, config, timeout=60, batch=None):
         """Starts the dhcp server.
 
         Starts the dhcp server daemon and runs it in the background.
@@ -61,6 +66,11 @@ class DhcpServer(object):
         Args:
             config: dhcp_config.DhcpConfig, Configs to start the dhcp server
                     with.
+            timeout: Time to wait for the dhcp server to come up.
+            batch: commands.batch.CommandBatch, If given the commands that
+                   start the dhcp server are added to this batch instead of
+                   being run right away, and errors are raised when the batch
+                   is executed.
 
         Returns:
             True if the daemon could be started. Note that the daemon can still
@@ -72,23 +82,34 @@ class DhcpServer(object):
         if self.is_alive():
             self.stop()
 
-        self._write_configs(config)
-        self._shell.delete_file(self._log_file)
-        self._shell.touch_file(self._lease_file)
-
+        start_batch = batch
+        if start_batch is None:
+            start_batch = command_batch.CommandBatch(self._runner)
+        batch_shell = shell.ShellCommand(start_batch, self._working_dir)
+        self._write_configs(batch_shell, config)
+        start_batch.add('cd "%s"; rm -f "%s"' % (self._working_dir,
+                                                 self._log_file))
+        batch_shell.touch_file(self._lease_file)
+
+        # The server is started and followed in the same command so that the
+        # wait can use its pid. The status is an error if the server exited.
         dhcpd_command = '%s -cf "%s" -lf %s -f""' % (self.PROGRAM_FILE,
                                                      self._config_file,
                                                      self._lease_file)
-        base_command = 'cd "%s"; %s' % (self._working_dir, dhcpd_command)
-        job_str = '%s > "%s" 2>&1' % (base_command, self._log_file)
-        self._runner.run_async(job_str)
-
-        try:
-            self._wait_for_process(timeout=timeout)
-            self._wait_for_server(timeout=timeout)
-        except:
-            self.stop()
-            raise
+        follow_command = shell.log_follow_command(
+            self._log_file, [_NO_INTERFACE, _SERVER_UP], timeout, pid='$pid')
+        start_batch.add(
+            'cd "%s"; %s > "%s" 2>&1 < /dev/null & pid=$!; %s; kill -0 $pid' %
+            (self._working_dir, dhcpd_command, self._log_file,
+             follow_command),
+            on_result=self._check_start)
+
+        if batch is None:
+            try:
+                start_batch.execute()
+            except:
+                self.stop()
+                raise
 
     def stop(self):
         """Kills the daemon if it is running."""
@@ -109,73 +130,42 @@ class DhcpServer(object):
         """
         return self._shell.read_file(self._log_file)
 
-    def _wait_for_process(self, timeout=60):
-        """Waits for the process to come up.
-
-        Waits until the dhcp server process is found running, or there is
-        a timeout. If the program never comes up then the log file
-        will be scanned for errors.
-
-        Raises: See _scan_for_errors
-        """
-        start_time = time.time()
-        while time.time() - start_time < timeout and not self.is_alive():
-            self._scan_for_errors(False)
-            time.sleep(0.1)
-
-        self._scan_for_errors(True)
-
-    def _wait_for_server(self, timeout=60):
-        """Waits for dhcp server to report that the server is up.
-
-        Waits until dhcp server says the server has been brought up or an
-        error occurs.
-
-        Raises: see _scan_for_errors
-        """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            success = self._shell.search_file(
-                'Wrote [0-9]* leases to leases file', self._log_file)
-            if success:
-                return
-
-            self._scan_for_errors(True)
-
-    def _scan_for_errors(self, should_be_up):
-        """Scans the dhcp server log for any errors.
+    def _check_start(self, result):
+        """Checks that the dhcp server reported that the server is up.
 
         Args:
-            should_be_up: If true then dhcp server is expected to be alive.
-                          If it is found not alive while this is true an error
-                          is thrown.
+            result: The job.Result of the command that started the dhcp
+                    server and followed its log until the server was up, an
+                    error was logged, the server exited or there was a
+                    timeout.
 
         Raises:
-            Error: Raised when a dhcp server error is found.
+            NoInterfaceError: Raised when the server has no interface to
+                              listen on.
+            Error: Raised when the dhcp server exited.
         """
-        # If this is checked last we can run into a race condition where while
-        # scanning the log the process has not died, but after scanning it
-        # has. If this were checked last in that condition then the wrong
-        # error will be thrown. To prevent this we gather the alive state first
-        # so that if it is dead it will definitely give the right error before
-        # just giving a generic one.
-        is_dead = not self.is_alive()
-
-        no_interface = self._shell.search_file(
-            'Not configured to listen on any interfaces', self._log_file)
-        if no_interface:
+        match = shell.find_log_match([_NO_INTERFACE, _SERVER_UP],
+                                     result.stdout)
+        if match is None:
+            if result.exit_status:
+                self.stop()
+                raise Error('Dhcp server failed to start.', self)
+            return
+
+        pattern, _ = match
+        if pattern == _NO_INTERFACE:
+            self.stop()
             raise NoInterfaceError(
                 'Dhcp does not contain a subnet for any of the networks the'
                 ' current interfaces are on.')
 
-        if should_be_up and is_dead:
-            raise Error('Dhcp server failed to start.', self)
-
-    def _write_configs(self, config):
-        """Writes the configs to the dhcp server config file."""
-
-        self._shell.delete_file(self._config_file)
+    def _write_configs(self, shell_command, config):
+        """Writes the configs to the dhcp server config file.
 
+        Args:
+            shell_command: The shell.ShellCommand to write the file with.
+            config: dhcp_config.DhcpConfig, The configs to write.
+        """
         lines = []
 
         if config.default_lease_time:
@@ -217,4 +207,4 @@ class DhcpServer(object):
 
         config_str = '\n'.join(lines)
 
-        self._shell.write_file(self._config_file, config_str)
+        shell_command.write_file(self._config_file, config_str)
@@ -16,11 +16,14 @@ import collections
 import itertools
 import logging
 import os
-import time
 
 from acts.controllers.ap_lib import hostapd_config
+from acts.controllers.utils_lib.commands import batch as command_batch
 from acts.controllers.utils_lib.commands import shell
 
+# The line hostapd logs once the interface is up.
+_INTERFACE_UP = 'Setup of interface done'
+
 
 class Error(Exception):
     """An error caused by hostapd."""
@@ -53,7 +56,11 @@ class Hostapd(object):
         self._config_file = 'hostapd-%s.conf' % self._interface
         self._identifier = '%s.*%s' % (self.PROGRAM_FILE, self._config_file)
 
-    def start(self, config, timeout=60, additional_parameters=None):
+    def start(self,
+              config,
+              timeout=60,
+              additional_parameters=None,
+              batch=None):
         """Starts hostapd
 
         Starts the hostapd daemon and runs it in the background.
@@ -65,6 +72,10 @@ class Hostapd(object):
                                    directly into the hostapd config file.  This
                                    can be used for debugging and or adding one
                                    off parameters into the config.
+            batch: commands.batch.CommandBatch, If given the commands that
+                   start hostapd are added to this batch instead of being
+                   run right away, and errors are raised when the batch is
+                   executed.
 
         Returns:
             True if the daemon could be started. Note that the daemon can still
@@ -78,23 +89,34 @@ class Hostapd(object):
 
         self.config = config
 
-        self._shell.delete_file(self._ctrl_file)
-        self._shell.delete_file(self._log_file)
-        self._shell.delete_file(self._config_file)
-        self._write_configs(additional_parameters=additional_parameters)
-
+        start_batch = batch
+        if start_batch is None:
+            start_batch = command_batch.CommandBatch(self._runner)
+        start_batch.add('cd "%s"; rm -f "%s" "%s" "%s"' %
+                        (self._working_dir, self._ctrl_file, self._log_file,
+                         self._config_file))
+        batch_shell = shell.ShellCommand(start_batch, self._working_dir)
+        self._write_configs(
+            batch_shell, additional_parameters=additional_parameters)
+
+        # Hostapd is started and followed in the same command so that the
+        # wait can use its pid. The status is an error if hostapd exited.
         hostapd_command = '%s -dd -t "%s"' % (self.PROGRAM_FILE,
                                               self._config_file)
-        base_command = 'cd "%s"; %s' % (self._working_dir, hostapd_command)
-        job_str = '%s > "%s" 2>&1' % (base_command, self._log_file)
-        self._runner.run_async(job_str)
-
-        try:
-            self._wait_for_process(timeout=timeout)
-            self._wait_for_interface(timeout=timeout)
-        except:
-            self.stop()
-            raise
+        follow_command = shell.log_follow_command(
+            self._log_file, self._start_patterns(), timeout, pid='$pid')
+        start_batch.add(
+            'cd "%s"; %s > "%s" 2>&1 < /dev/null & pid=$!; %s; kill -0 $pid' %
+            (self._working_dir, hostapd_command, self._log_file,
+             follow_command),
+            on_result=self._check_start)
+
+        if batch is None:
+            try:
+                start_batch.execute()
+            except:
+                self.stop()
+                raise
 
     def stop(self):
         """Kills the daemon if it is running."""
@@ -116,67 +138,43 @@ class Hostapd(object):
         # TODO: Auto pulling of logs when stop is called.
         return self._shell.read_file(self._log_file)
 
-    def _wait_for_process(self, timeout=60):
-        """Waits for the process to come up.
+    def _start_patterns(self):
+        """Returns the log patterns that end the wait for hostapd to start."""
+        return [
+            'Interface initialization failed',
+            "Interface %s wasn't started" % self._interface, _INTERFACE_UP
+        ]
 
-        Waits until the hostapd process is found running, or there is
-        a timeout. If the program never comes up then the log file
-        will be scanned for errors.
-
-        Raises: See _scan_for_errors
-        """
-        start_time = time.time()
-        while time.time() - start_time < timeout and not self.is_alive():
-            self._scan_for_errors(False)
-            time.sleep(0.1)
-
-    def _wait_for_interface(self, timeout=60):
-        """Waits for hostapd to report that the interface is up.
-
-        Waits until hostapd says the interface has been brought up or an
-        error occurs.
-
-        Raises: see _scan_for_errors
-        """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            success = self._shell.search_file('Setup of interface done',
-                                              self._log_file)
-            if success:
-                return
-
-            self._scan_for_errors(True)
-
-    def _scan_for_errors(self, should_be_up):
-        """Scans the hostapd log for any errors.
+    def _check_start(self, result):
+        """Checks that hostapd reported that the interface is up.
 
         Args:
-            should_be_up: If true then hostapd program is expected to be alive.
-                          If it is found not alive while this is true an error
-                          is thrown.
+            result: The job.Result of the command that started hostapd and
+                    followed its log until the interface was up, an error was
+                    logged, hostapd exited or there was a timeout.
 
         Raises:
             Error: Raised when a hostapd error is found.
         """
-        # Store this so that all other errors have priority.
-        is_dead = not self.is_alive()
-
-        bad_config = self._shell.search_file('Interface initialization failed',
-                                             self._log_file)
-        if bad_config:
-            raise Error('Interface failed to start', self)
-
-        bad_config = self._shell.search_file(
-            "Interface %s wasn't started" % self._interface, self._log_file)
-        if bad_config:
+        match = shell.find_log_match(self._start_patterns(), result.stdout)
+        if match is None:
+            if result.exit_status:
+                self.stop()
+                raise Error('Hostapd failed to start', self)
+            return
+
+        pattern, _ = match
+        if pattern != _INTERFACE_UP:
+            self.stop()
             raise Error('Interface failed to start', self)
 
-        if should_be_up and is_dead:
-            raise Error('Hostapd failed to start', self)
+    def _write_configs(self, shell_command, additional_parameters=None):
+        """Writes the configs to the hostapd config file.
 
-    def _write_configs(self, additional_parameters=None):
-        """Writes the configs to the hostapd config file."""
-        self._shell.delete_file(self._config_file)
+        Args:
+            shell_command: The shell.ShellCommand to write the file with.
+            additional_parameters: Extra parameters for the config file.
+        """
 
         our_configs = collections.OrderedDict()
         our_configs['interface'] = self._interface
@@ -198,4 +196,4 @@ class Hostapd(object):
         logging.debug('\n%s' % hostapd_conf)
         logging.debug('*******************End********************')
 
-        self._shell.write_file(self._config_file, hostapd_conf)
+        shell_command.write_file(self._config_file, hostapd_conf)
@@ -71,6 +71,11 @@ def destroy(objs):
         attn.instrument.close()
 
 
+def reset(objs):
+    """Returns True if the connections to the attenuators are still open."""
+    return all(attn.instrument.is_open() for attn in objs)
+
+
 r"""
 Base classes which define how attenuators should be accessed, managed, and manipulated.
 
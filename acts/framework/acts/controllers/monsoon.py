@@ -53,6 +53,11 @@ def destroy(objs):
         obj.mon._tempfile.close()
 
 
+def reset(objs):
+    """Returns True if the serial ports of the Monsoons are still open."""
+    return all(obj.mon.ser.isOpen() for obj in objs)
+
+
 class MonsoonError(acts.signals.ControllerError):
     """Raised for exceptions encountered in monsoon lib."""
 
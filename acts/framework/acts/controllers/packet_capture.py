@@ -19,6 +19,7 @@ from acts.controllers.ap_lib.hostapd_constants import AP_DEFAULT_CHANNEL_2G
 from acts.controllers.ap_lib.hostapd_constants import AP_DEFAULT_CHANNEL_5G
 from acts.controllers.utils_lib.ssh import connection
 from acts.controllers.utils_lib.ssh import settings
+from acts.libs.pcap import stream as pcap_stream
 
 import os
 import threading
@@ -39,6 +40,8 @@ SCAN_TIMEOUT = 120
 SEP = ':'
 SIGNAL = 'signal'
 SSID = 'SSID'
+STREAM_START_TIMEOUT = 3
+STREAM_STOP_TIMEOUT = 10
 
 
 def create(configs):
@@ -60,13 +63,16 @@ class PcapProperties(object):
         pcap_dir: tmp dir location where pcap files are saved
         pcap_file: pcap file name
         pcap_thread: thread used to push files to logpath
+        stream: pcap_stream.PcapStream saving the capture to logpath, for
+                streaming captures
     """
-    def __init__(self, pid, pcap_dir, pcap_file, pcap_thread):
+    def __init__(self, pid, pcap_dir, pcap_file, pcap_thread, stream=None):
         """Initialize object."""
         self.pid = pid
         self.pcap_dir = pcap_dir
         self.pcap_file = pcap_file
         self.pcap_thread = pcap_thread
+        self.stream = stream
 
 
 class PacketCaptureError(Exception):
@@ -83,6 +89,8 @@ class PacketCapture(object):
     Attributes:
         pcap: dict that specifies packet capture properties for a band.
         tmp_dirs: list of tmp directories created for pcap files.
+        streaming: True if captures are streamed to the log path by default,
+                   from the 'streaming' key of the config.
     """
     def __init__(self, configs):
         """Initialize objects.
@@ -102,6 +110,7 @@ class PacketCapture(object):
         self.pcap_properties = dict()
         self._pcap_stop_lock = threading.Lock()
         self.tmp_dirs = []
+        self.streaming = configs.get('streaming', False)
 
     def _create_interface(self, iface, mode):
         """Create interface of monitor/managed mode.
@@ -269,7 +278,8 @@ class PacketCapture(object):
             return False
         return True
 
-    def start_packet_capture(self, band, log_path, pcap_file):
+    def start_packet_capture(self, band, log_path, pcap_file, streaming=None,
+                             max_files=None):
         """Start packet capture for band.
 
         band = 2G starts tcpdump on 'mon0' interface.
@@ -280,10 +290,21 @@ class PacketCapture(object):
         is moved to log_path once a new file is generated. This ensures that
         there is no crash on the onhub router due to lack of space.
 
+        In streaming mode the output of tcpdump is sent over ssh as it is
+        captured and split into 50MB files in log_path, so that nothing is
+        stored on the router and no polling is needed. Each file is indexed as
+        it is written, so that the frames of a test can be extracted with
+        acts.libs.pcap.index.extract_test_frames.
+
         Args:
             band: '2g' or '2G' and '5g' or '5G'.
             log_path: test log path to save the pcap file.
             pcap_file: name of the pcap file.
+            streaming: True to stream the capture. Defaults to the streaming
+                       attribute.
+            max_files: for streaming captures, the number of 50MB files to
+                       keep. Older files are removed, keeping the last part of
+                       the capture. None keeps all files.
 
         Returns:
             pid: process id of the tcpdump.
@@ -293,6 +314,11 @@ class PacketCapture(object):
             self.log.error("Invalid band or packet capture already running")
             return None
 
+        if streaming is None:
+            streaming = self.streaming
+        if streaming:
+            return self._start_stream(band, log_path, pcap_file, max_files)
+
         pcap_dir = self.ssh.run('mktemp -d', ignore_status=True).stdout.rstrip()
         self.tmp_dirs.append(pcap_dir)
         pcap_file = os.path.join(pcap_dir, "%s_%s.pcap" % (pcap_file, band))
@@ -314,11 +340,60 @@ class PacketCapture(object):
             pid, pcap_dir, pcap_file, pcap_thread)
         return pid
 
+    def _start_stream(self, band, log_path, pcap_file, max_files):
+        """Start a streaming packet capture for band.
+
+        Args:
+            band: '2G' or '5G'.
+            log_path: test log path to save the pcap files.
+            pcap_file: name of the pcap file.
+            max_files: number of pcap files to keep, or None to keep all.
+
+        Returns:
+            pid: process id of the tcpdump.
+        """
+        pcap_file = os.path.join(log_path, "%s_%s.pcap" % (pcap_file, band))
+        writer = pcap_stream.RotatingPcapWriter(pcap_file,
+                                                max_files=max_files,
+                                                index=True)
+        process = self.ssh.open_stream(
+            pcap_stream.TCPDUMP_STREAM_COMMAND % BAND_IFACE[band])
+        stream = pcap_stream.PcapStream(process, writer, name=band)
+        if (not stream.wait_for_start(STREAM_START_TIMEOUT)
+                or stream.remote_pid is None):
+            self.log.error("Failed to start packet capture")
+            stream.close()
+            return None
+
+        self.pcap_properties[band] = PcapProperties(
+            stream.remote_pid, None, pcap_file, None, stream=stream)
+        return stream.remote_pid
+
+    def get_capture_stats(self, band):
+        """Get the statistics of a streaming packet capture.
+
+        Args:
+            band: '2g' or '2G' and '5g' or '5G'.
+
+        Returns:
+            Dictionary of the byte, packet and file counts of the stream, see
+            pcap_stream.PcapStream.stats, or None if no streaming capture is
+            running for band.
+        """
+        properties = self.pcap_properties.get(band.upper())
+        if not properties or not properties.stream:
+            return None
+        return properties.stream.stats
+
     def stop_packet_capture(self, pid):
         """Stop the packet capture.
 
         Args:
             pid: process id of tcpdump to kill.
+
+        Returns:
+            For streaming captures, the statistics of the stream including
+            the packets dropped by tcpdump, see get_capture_stats.
         """
         for key,val in self.pcap_properties.items():
             if val.pid == pid:
@@ -329,6 +404,9 @@ class PacketCapture(object):
             self.log.error("Failed to stop tcpdump. Invalid PID %s" % pid)
             return
 
+        if val.stream:
+            return self._stop_stream(key, val.stream)
+
         pcap_dir = val.pcap_dir
         pcap_thread = val.pcap_thread
         self.ssh.run('kill %s' % pid, ignore_status=True)
@@ -338,11 +416,41 @@ class PacketCapture(object):
         self.ssh.run('rm -rf %s' % pcap_dir, ignore_status=True)
         self.tmp_dirs.remove(pcap_dir)
 
+    def _stop_stream(self, band, stream):
+        """Stop a streaming packet capture.
+
+        tcpdump is stopped with a signal so that it prints its statistics
+        and the end of the stream is saved.
+
+        Args:
+            band: band of the capture.
+            stream: pcap_stream.PcapStream of the capture.
+
+        Returns:
+            The statistics of the stream.
+        """
+        self.ssh.run('kill %s' % stream.remote_pid, ignore_status=True)
+        with self._pcap_stop_lock:
+            del self.pcap_properties[band]
+        if not stream.join(STREAM_STOP_TIMEOUT):
+            self.log.warning("Packet capture stream for %s did not end, "
+                             "closing it" % band)
+            stream.close()
+        stats = stream.stats
+        self.log.info("Packet capture stream for %s: %s" % (band, stats))
+        if stats['packets_dropped']:
+            self.log.warning("tcpdump dropped %s packets on %s" %
+                             (stats['packets_dropped'], band))
+        return stats
+
     def close(self):
         """Cleanup.
 
         Cleans up all the monitor mode interfaces and closes ssh connections.
         """
+        for band, properties in list(self.pcap_properties.items()):
+            if properties.stream:
+                self._stop_stream(band, properties.stream)
         self._cleanup_interface(MON_2G)
         self._cleanup_interface(MON_5G)
         for tmp_dir in self.tmp_dirs:
@@ -16,8 +16,12 @@
 """Collection of utility functions to generate and send custom packets.
 
 """
+import heapq
 import logging
+import math
 import multiprocessing
+import queue
+import random
 import socket
 import time
 
@@ -53,6 +57,11 @@ MDNS_V4_MAC_DST = '01:00:5E:00:00:FB'
 MDNS_RECURSIVE = 1
 MDNS_V6_IP_DST = 'FF02::FB'
 MDNS_V6_MAC_DST = '33:33:00:00:00:FB'
+# Time before a send deadline spent polling the clock instead of sleeping,
+# since sleeps can overshoot by more than the interval at high rates.
+PACING_SPIN_TIME = 0.0005
+# Time to wait for a sending process to report its statistics (s)
+STATS_TIMEOUT = 5
 
 
 def create(configs):
@@ -75,6 +84,7 @@ def destroy(objs):
     """
     for pkt_sender in objs:
         pkt_sender.stop_sending(True)
+        pkt_sender.close()
     return
 
 
@@ -90,41 +100,297 @@ def get_info(objs):
     return [pkt_sender.interface for pkt_sender in objs]
 
 
+class SendStats(object):
+    """Timing statistics of packets sent at a given interval.
+
+    Attributes:
+        packets_sent: number of packets sent
+        bursts: number of bursts the packets were sent in
+        duration: time between the first and the last burst (s)
+        max_lateness: largest delay of a burst after its deadline (s)
+    """
+
+    def __init__(self):
+        self.packets_sent = 0
+        self.bursts = 0
+        self.duration = 0
+        self.max_lateness = 0
+        self._mean_lateness = 0
+        self._lateness_m2 = 0
+
+    def add_burst(self, packets, lateness):
+        """Records a burst of packets sent lateness seconds after its deadline.
+        """
+        self.packets_sent += packets
+        self.bursts += 1
+        self.max_lateness = max(self.max_lateness, lateness)
+        # Welford's online algorithm, so that continuous sending does not
+        # keep every sample.
+        delta = lateness - self._mean_lateness
+        self._mean_lateness += delta / self.bursts
+        self._lateness_m2 += delta * (lateness - self._mean_lateness)
+
+    @property
+    def rate(self):
+        """Achieved number of packets per second."""
+        if not self.duration:
+            return 0
+        # The last burst is not followed by an interval.
+        return (self.packets_sent * (self.bursts - 1) /
+                (self.bursts * self.duration))
+
+    @property
+    def jitter(self):
+        """Standard deviation of the lateness of the bursts (s)."""
+        if self.bursts < 2:
+            return 0
+        return math.sqrt(self._lateness_m2 / (self.bursts - 1))
+
+    def __repr__(self):
+        return ('%d packets in %.3fs: %.1f packets/s, jitter %.1fus, max '
+                'lateness %.1fus' % (self.packets_sent, self.duration,
+                                     self.rate, self.jitter * 1e6,
+                                     self.max_lateness * 1e6))
+
+
+def open_raw_socket(interface):
+    """Opens a socket sending raw Ethernet frames over an interface.
+
+    Args:
+        interface: network interface name (e.g., 'eth0')
+    """
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+    sock.bind((interface, 0))
+    return sock
+
+
+def send_paced(sock, frame, interval, ntimes=None, burst=1,
+               stop_signal=None):
+    """Sends a serialized frame in bursts, one burst per interval.
+
+    The deadlines of the bursts are fixed from the start, so a late burst
+    does not delay the following ones.
+
+    Args:
+        sock: socket from open_raw_socket
+        frame: bytes of the frame to send
+        interval: interval between consecutive bursts (s)
+        ntimes: number of frames to send, or None to send until stop_signal
+                is set
+        burst: number of frames sent back to back at each deadline
+        stop_signal: event to stop sending (Optional)
+
+    Returns:
+        A SendStats of the frames sent.
+    """
+    stats = SendStats()
+    clock = time.perf_counter
+    start = deadline = clock()
+    while ntimes is None or stats.packets_sent < ntimes:
+        remaining = deadline - clock()
+        if remaining > PACING_SPIN_TIME:
+            # Waiting on the signal keeps long intervals responsive to stops.
+            if stop_signal is None:
+                time.sleep(remaining - PACING_SPIN_TIME)
+            elif stop_signal.wait(remaining - PACING_SPIN_TIME):
+                break
+        elif stop_signal is not None and stop_signal.is_set():
+            break
+        now = clock()
+        while now < deadline:
+            now = clock()
+        packets = burst
+        if ntimes is not None:
+            packets = min(burst, ntimes - stats.packets_sent)
+        for _ in range(packets):
+            sock.send(frame)
+        stats.add_burst(packets, now - deadline)
+        stats.duration = now - start
+        deadline += interval
+    return stats
+
+
+class PacketStream(object):
+    """A packet sent repeatedly as one of the streams of a schedule.
+
+    Attributes:
+        frame: bytes of the packet
+        interval: interval between consecutive packets (s)
+        jitter: largest random delay added to each packet (s)
+        start_time: time of the first packet after the schedule starts (s)
+        stop_time: time after the schedule starts when no more packets are
+                   sent (s), or None to send until the schedule stops
+        name: name of the stream in logs
+    """
+
+    def __init__(self,
+                 packet,
+                 rate,
+                 jitter=0,
+                 start_time=0,
+                 stop_time=None,
+                 name=None):
+        """Initializes the stream.
+
+        Args:
+            packet: custom built packet from Layer 2 up to Application layer,
+                    e.g. the packet of a generator below, or its bytes
+            rate: number of packets per second
+            jitter: largest random delay added to each packet (s)
+            start_time: time of the first packet after the schedule starts (s)
+            stop_time: time after the schedule starts when no more packets
+                       are sent (s), or None to send until it stops
+            name: name of the stream in logs, defaults to the packet summary
+        """
+        if packet is None:
+            raise PacketSenderError(
+                'There is no packet to send. Create a packet first.')
+        if rate <= 0:
+            raise PacketSenderError('Invalid stream rate: %s' % rate)
+        self.frame = bytes(packet)
+        self.interval = 1.0 / rate
+        self.jitter = jitter
+        self.start_time = start_time
+        self.stop_time = stop_time
+        if name is None and hasattr(packet, 'summary'):
+            name = packet.summary()
+        self.name = name
+
+    def __repr__(self):
+        return '<PacketStream %s every %.6fs>' % (self.name, self.interval)
+
+
+def send_schedule(sock,
+                  streams,
+                  duration=None,
+                  stop_signal=None,
+                  seed=None):
+    """Sends several streams of frames interleaved from a single socket.
+
+    The packets of all the streams are merged in order of their deadlines on
+    a heap. As in send_paced, deadlines are fixed from the start, and the
+    jitter of each packet is drawn from a generator seeded with seed, so a
+    given seed always sends the same sequence of packets at the same times.
+
+    Args:
+        sock: socket from open_raw_socket
+        streams: list of PacketStream to send
+        duration: time after which sending stops (s), or None to send until
+                  every stream stops or stop_signal is set
+        stop_signal: event to stop sending (Optional)
+        seed: seed of the jitter, or None for a random one
+
+    Returns:
+        A list with a SendStats of the packets sent for each stream.
+    """
+    rng = random.Random(seed)
+    stats = [SendStats() for _ in streams]
+    first_sent = [None] * len(streams)
+    # Entries are (time after the start, stream index, packet count).
+    schedule = []
+
+    def schedule_packet(index, count):
+        stream = streams[index]
+        offset = stream.start_time + count * stream.interval
+        if stream.stop_time is not None and offset >= stream.stop_time:
+            return
+        if stream.jitter:
+            offset += rng.uniform(0, stream.jitter)
+        heapq.heappush(schedule, (offset, index, count))
+
+    for index in range(len(streams)):
+        schedule_packet(index, 0)
+
+    clock = time.perf_counter
+    start = clock()
+    while schedule:
+        offset, index, count = heapq.heappop(schedule)
+        if duration is not None and offset > duration:
+            break
+        deadline = start + offset
+        remaining = deadline - clock()
+        if remaining > PACING_SPIN_TIME:
+            # Waiting on the signal keeps slow streams responsive to stops.
+            if stop_signal is None:
+                time.sleep(remaining - PACING_SPIN_TIME)
+            elif stop_signal.wait(remaining - PACING_SPIN_TIME):
+                break
+        elif stop_signal is not None and stop_signal.is_set():
+            break
+        now = clock()
+        while now < deadline:
+            now = clock()
+        sock.send(streams[index].frame)
+        if first_sent[index] is None:
+            first_sent[index] = now
+        stats[index].add_burst(1, now - deadline)
+        stats[index].duration = now - first_sent[index]
+        schedule_packet(index, count + 1)
+    return stats
+
+
 class ThreadSendPacket(multiprocessing.Process):
     """Creates a thread that keeps sending the same packet until a stop signal.
 
     Attributes:
         stop_signal: signal to stop the thread execution
-        packet: desired packet to keep sending
+        frame: bytes of the desired packet to keep sending
         interval: interval between consecutive packets (s)
         interface: network interface name (e.g., 'eth0')
         log: object used for logging
+        burst: number of packets sent back to back at each interval
+        stats_queue: queue the SendStats are put on once stopped
     """
 
-    def __init__(self, signal, packet, interval, interface, log):
+    def __init__(self, signal, frame, interval, interface, log, burst=1):
         multiprocessing.Process.__init__(self)
         self.stop_signal = signal
-        self.packet = packet
+        self.frame = frame
         self.interval = interval
         self.interface = interface
         self.log = log
+        self.burst = burst
+        self.stats_queue = multiprocessing.Queue()
 
     def run(self):
         self.log.info('Packet Sending Started.')
-        while True:
-            if self.stop_signal.is_set():
-                # Poison pill means shutdown
-                self.log.info('Packet Sending Stopped.')
-                break
+        stats = None
+        try:
+            with open_raw_socket(self.interface) as sock:
+                stats = self.send(sock)
+            self.log.info('Packet Sending Stopped. %s', stats)
+        except Exception:
+            self.log.exception('Exception when trying to send packet')
+        finally:
+            self.stats_queue.put(stats)
+
+    def send(self, sock):
+        """Sends packets over sock until stopped and returns their stats."""
+        return send_paced(
+            sock,
+            self.frame,
+            self.interval,
+            burst=self.burst,
+            stop_signal=self.stop_signal)
+
+
+class ThreadSendSchedule(ThreadSendPacket):
+    """Creates a thread that sends several streams of packets until stopped.
 
-            try:
-                scapy.sendp(self.packet, iface=self.interface, verbose=0)
-                time.sleep(self.interval)
-            except Exception:
-                self.log.exception('Exception when trying to send packet')
-                return
+    Attributes:
+        streams: list of PacketStream to send
+        seed: seed of the jitter of the streams
+    """
 
-        return
+    def __init__(self, signal, streams, interface, log, seed=None):
+        super(ThreadSendSchedule, self).__init__(signal, None, None,
+                                                 interface, log)
+        self.streams = streams
+        self.seed = seed
+
+    def send(self, sock):
+        return send_schedule(
+            sock, self.streams, stop_signal=self.stop_signal, seed=self.seed)
 
 
 class PacketSenderError(acts.signals.ControllerError):
@@ -134,6 +400,9 @@ class PacketSenderError(acts.signals.ControllerError):
 class PacketSender(object):
     """Send any custom packet over a desired interface.
 
+    Packets are serialized once and sent as raw frames over a socket kept
+    open between calls, at deadlines spaced by the requested interval.
+
     Attributes:
         log: class logging object
         thread_active: indicates whether or not the send thread is active
@@ -154,26 +423,69 @@ class PacketSender(object):
         self.thread_send = None
         self.stop_signal = multiprocessing.Event()
         self.interface = ifname
+        self._socket = None
+
+    def _get_socket(self):
+        """Returns the raw socket of the interface, opening it if needed."""
+        if self._socket is None:
+            self._socket = open_raw_socket(self.interface)
+        return self._socket
 
-    def send_ntimes(self, packet, ntimes, interval):
+    def close(self):
+        """Closes the raw socket of the interface, if open."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def send_ntimes(self, packet, ntimes, interval, burst=1):
         """Sends a packet ntimes at a given interval.
 
         Args:
-            packet: custom built packet from Layer 2 up to Application layer
+            packet: custom built packet from Layer 2 up to Application layer,
+                    or its bytes
             ntimes: number of packets to send
             interval: interval between consecutive packet transmissions (s)
+            burst: number of packets sent back to back at each interval
+
+        Returns:
+            A SendStats of the packets sent, or None if sending failed.
         """
         if packet is None:
             raise PacketSenderError(
                 'There is no packet to send. Create a packet first.')
 
-        for _ in range(ntimes):
-            try:
-                scapy.sendp(packet, iface=self.interface, verbose=0)
-                time.sleep(interval)
-            except socket.error as excpt:
-                self.log.exception('Caught socket exception : %s' % excpt)
-                return
+        try:
+            stats = send_paced(self._get_socket(),
+                               bytes(packet), interval, ntimes, burst)
+        except socket.error as excpt:
+            self.log.exception('Caught socket exception : %s' % excpt)
+            self.close()
+            return None
+        self.log.debug('Sent %s', stats)
+        return stats
+
+    def send_streams(self, streams, duration, seed=None):
+        """Sends several streams of packets interleaved for a given time.
+
+        Args:
+            streams: list of PacketStream to send
+            duration: time to send for (s)
+            seed: seed of the jitter of the streams, or None for a random one
+
+        Returns:
+            A list with a SendStats of the packets sent for each stream, or
+            None if sending failed.
+        """
+        try:
+            stats = send_schedule(self._get_socket(), streams, duration,
+                                  seed=seed)
+        except socket.error as excpt:
+            self.log.exception('Caught socket exception : %s' % excpt)
+            self.close()
+            return None
+        for stream, stream_stats in zip(streams, stats):
+            self.log.debug('Sent %s: %s', stream.name, stream_stats)
+        return stats
 
     def send_receive_ntimes(self, packet, ntimes, interval):
         """Sends a packet and receives the reply ntimes at a given interval.
@@ -197,15 +509,17 @@ class PacketSender(object):
                 self.log.exception('Caught socket exception : %s' % excpt)
                 return
 
-    def start_sending(self, packet, interval):
+    def start_sending(self, packet, interval, burst=1):
         """Sends packets in parallel with the main process.
 
         Creates a thread and keeps sending the same packet at a given interval
         until a stop signal is received
 
         Args:
-            packet: custom built packet from Layer 2 up to Application layer
+            packet: custom built packet from Layer 2 up to Application layer,
+                    or its bytes
             interval: interval between consecutive packets (s)
+            burst: number of packets sent back to back at each interval
         """
         if packet is None:
             raise PacketSenderError(
@@ -216,24 +530,56 @@ class PacketSender(object):
                 ('There is already an active thread. Stop it'
                  'before starting another transmission.'))
 
-        self.thread_send = ThreadSendPacket(self.stop_signal, packet, interval,
-                                            self.interface, self.log)
+        self.thread_send = ThreadSendPacket(self.stop_signal, bytes(packet),
+                                            interval, self.interface, self.log,
+                                            burst)
+        self.thread_send.start()
+        self.thread_active = True
+
+    def start_sending_streams(self, streams, seed=None):
+        """Sends several streams of packets in parallel with the main process.
+
+        All the streams are sent from a single thread, which is stopped with
+        stop_sending.
+
+        Args:
+            streams: list of PacketStream to send
+            seed: seed of the jitter of the streams, or None for a random one
+        """
+        if not streams:
+            raise PacketSenderError('There are no streams to send.')
+
+        if self.thread_active:
+            raise PacketSenderError(
+                ('There is already an active thread. Stop it'
+                 'before starting another transmission.'))
+
+        self.thread_send = ThreadSendSchedule(self.stop_signal, streams,
+                                              self.interface, self.log, seed)
         self.thread_send.start()
         self.thread_active = True
 
     def stop_sending(self, ignore_status=False):
         """Stops the concurrent thread that is continuously sending packets.
 
+        Returns:
+            A SendStats of the packets sent by the thread, a list of them for
+            each stream if it was started with start_sending_streams, or None
+            if it failed or did not report them.
        """
         if not self.thread_active:
             if ignore_status:
-                return
+                return None
             else:
                 raise PacketSenderError(
                     'Error: There is no acive thread running to stop.')
 
         # Stop thread
         self.stop_signal.set()
+        try:
+            stats = self.thread_send.stats_queue.get(timeout=STATS_TIMEOUT)
+        except queue.Empty:
+            stats = None
         self.thread_send.join()
 
         # Just as precaution
@@ -244,6 +590,7 @@ class PacketSender(object):
         self.stop_signal.clear()
         self.thread_send = None
         self.thread_active = False
+        return stats
 
 
 class ArpGenerator(object):
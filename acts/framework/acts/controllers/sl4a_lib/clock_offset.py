@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Estimates the offset of a device clock from the host clock.
+
+Each sample reads the device clock over an RPC round trip and, as NTP does,
+assumes it was read halfway through the round trip, so the error of a sample
+is at most half of its round trip time. The samples with the shortest round
+trips are kept, and a line is fitted through them to follow the drift of the
+device clock during a run. Host timestamps, e.g. of power samples or iperf
+intervals, can then be converted to device time and back without querying
+the device again.
+"""
+
+import collections
+import time
+
+# Number of round trips of each sync; only the shortest one is kept.
+DEFAULT_ROUND_TRIPS = 5
+# Number of syncs the drift is fitted over.
+DEFAULT_MAX_SYNCS = 20
+
+
+class ClockOffsetError(Exception):
+    """Raised when a device clock cannot be mapped to the host clock."""
+
+
+class ClockSample(object):
+    """A reading of the device clock.
+
+    Attributes:
+        host_time: the host time halfway through the round trip (s).
+        device_time: the device time read (s).
+        round_trip_time: the duration of the round trip (s).
+    """
+
+    def __init__(self, host_time, device_time, round_trip_time):
+        self.host_time = host_time
+        self.device_time = device_time
+        self.round_trip_time = round_trip_time
+
+    @property
+    def offset(self):
+        """The device time minus the host time (s)."""
+        return self.device_time - self.host_time
+
+    def __repr__(self):
+        return 'offset=%.6fs, round_trip_time=%.6fs' % (self.offset,
+                                                       self.round_trip_time)
+
+
+class ClockOffsetTracker(object):
+    """Tracks the offset and drift of a device clock from the host clock.
+
+    The device time is modeled as
+        device_time = offset + host_time + drift * (host_time - reference)
+    where reference is the host time of the latest sync.
+
+    Attributes:
+        samples: the ClockSamples of the latest syncs, oldest first.
+        reference: the host time of the latest sync (s).
+        offset: the device time minus the host time at the latest sync (s).
+        drift: the rate at which the offset changes, e.g. 1e-5 for a device
+               clock gaining 10us per second.
+    """
+
+    def __init__(self,
+                 read_device_time,
+                 host_clock=time.time,
+                 round_trips=DEFAULT_ROUND_TRIPS,
+                 max_syncs=DEFAULT_MAX_SYNCS):
+        """Initializes the tracker. No sample is taken until sync is called.
+
+        Args:
+            read_device_time: a function returning the device time (s).
+            host_clock: a function returning the host time (s).
+            round_trips: the number of round trips of each sync.
+            max_syncs: the number of syncs the drift is fitted over.
+        """
+        self._read_device_time = read_device_time
+        self._host_clock = host_clock
+        self._round_trips = round_trips
+        self.samples = collections.deque(maxlen=max_syncs)
+        self.reference = None
+        self.offset = None
+        self.drift = 0
+
+    def sample(self):
+        """Reads the device clock once and returns the ClockSample."""
+        start = self._host_clock()
+        device_time = self._read_device_time()
+        end = self._host_clock()
+        return ClockSample((start + end) / 2, device_time, end - start)
+
+    def sync(self):
+        """Samples the device clock and updates the offset and drift.
+
+        Returns:
+            The ClockSample with the shortest round trip, which was added to
+            the samples.
+        """
+        best = min(
+            (self.sample() for _ in range(self._round_trips)),
+            key=lambda sample: sample.round_trip_time)
+        self.samples.append(best)
+        self._fit()
+        return best
+
+    def sync_if_older(self, max_age):
+        """Syncs unless the latest sync is less than max_age seconds old."""
+        if (self.offset is None
+                or self._host_clock() - self.reference > max_age):
+            self.sync()
+
+    def _fit(self):
+        """Fits the offset and drift to the samples, by least squares."""
+        latest = self.samples[-1]
+        self.reference = latest.host_time
+        count = len(self.samples)
+        if count < 2:
+            self.offset = latest.offset
+            self.drift = 0
+            return
+        # Times relative to the latest sample, to keep the precision of the
+        # differences between large epoch times.
+        xs = [s.host_time - latest.host_time for s in self.samples]
+        ys = [s.offset - latest.offset for s in self.samples]
+        mean_x = sum(xs) / count
+        mean_y = sum(ys) / count
+        variance = sum((x - mean_x)**2 for x in xs)
+        if not variance:
+            self.offset = latest.offset
+            self.drift = 0
+            return
+        self.drift = sum((x - mean_x) * (y - mean_y)
+                         for x, y in zip(xs, ys)) / variance
+        self.offset = latest.offset + mean_y - self.drift * mean_x
+
+    @property
+    def uncertainty(self):
+        """The largest error of the latest sync (s), half its round trip."""
+        if not self.samples:
+            return None
+        return self.samples[-1].round_trip_time / 2
+
+    def _check_synced(self):
+        if self.offset is None:
+            raise ClockOffsetError(
+                'The device clock has not been synced with the host.')
+
+    def to_device_time(self, host_time):
+        """Converts a host time to the device time at that moment (s)."""
+        self._check_synced()
+        return (host_time + self.offset +
+                self.drift * (host_time - self.reference))
+
+    def to_host_time(self, device_time):
+        """Converts a device time to the host time at that moment (s)."""
+        self._check_synced()
+        # Inverse of to_device_time.
+        return ((device_time - self.offset + self.drift * self.reference) /
+                (1 + self.drift))
@@ -21,6 +21,7 @@ import threading
 import time
 
 from acts import logger
+from acts.controllers.sl4a_lib import event_stats
 from acts.controllers.sl4a_lib import rpc_client
 
 
@@ -49,6 +50,11 @@ class EventDispatcher:
         _event_dict: A dictionary of str eventName = Queue<Event> eventQueue
         _handlers: A dictionary of str eventName => (lambda, args) handler
         _lock: A lock that prevents multiple reads/writes to the event queues.
+        _event_added: A condition of _lock notified when an event is queued.
+        _matchers: A dictionary of str regex_pattern => (compiled pattern,
+                   dictionary of str eventName => bool match)
+        _event_stats: A dictionary of str eventName => EventStats of all the
+                      events received, including the handled ones.
         log: The EventDispatcher's logger.
     """
 
@@ -62,6 +68,9 @@ class EventDispatcher:
         self._event_dict = {}
         self._handlers = {}
         self._lock = threading.RLock()
+        self._event_added = threading.Condition(self._lock)
+        self._matchers = {}
+        self._event_stats = {}
 
         def _log_formatter(message):
             """Defines the formatting used in the logger."""
@@ -73,7 +82,9 @@ class EventDispatcher:
     def poll_events(self):
         """Continuously polls all types of events from sl4a.
 
-        Events are sorted by name and store in separate queues.
+        Events are sorted by name and store in separate queues. The host time
+        at which each event is received is added to it, under
+        event_stats.HOST_TIME_KEY, and recorded in the event statistics.
         If there are registered handlers, the handlers will be called with
         corresponding event immediately upon event discovery, and the event
         won't be stored. If exceptions occur, stop the dispatcher and return
@@ -82,6 +93,7 @@ class EventDispatcher:
             try:
                 # 60000 in ms, timeout in second
                 event_obj = self._rpc_client.eventWait(60000, timeout=120)
+                receive_time = time.time() * 1000
             except rpc_client.Sl4aConnectionError as e:
                 if self._rpc_client.is_alive:
                     self.log.warning('Closing due to closed session.')
@@ -97,6 +109,8 @@ class EventDispatcher:
                 continue
             else:
                 event_name = event_obj['name']
+                event_obj[event_stats.HOST_TIME_KEY] = receive_time
+                self._record_event_stats(event_name, event_obj)
             # if handler registered, process event
             if event_name == 'EventDispatcherShutdown':
                 self.log.debug('Received shutdown signal.')
@@ -113,8 +127,43 @@ class EventDispatcher:
                     q = queue.Queue()
                     q.put(event_obj)
                     self._event_dict[event_name] = q
+                self._event_added.notify_all()
                 self._lock.release()
 
+    def _record_event_stats(self, event_name, event_obj):
+        """Adds a received event to the statistics of its name."""
+        with self._lock:
+            stats = self._event_stats.get(event_name)
+            if stats is None:
+                stats = event_stats.EventStats()
+                self._event_stats[event_name] = stats
+            stats.add(event_obj)
+
+    def get_event_stats(self, event_name):
+        """Returns the EventStats of the events of a name received so far.
+
+        Args:
+            event_name: Name of the events.
+
+        Returns:
+            An EventStats with the latency and inter-arrival histograms of
+            the events, or None if none was received.
+        """
+        with self._lock:
+            return self._event_stats.get(event_name)
+
+    def get_all_event_stats(self):
+        """Returns a dictionary of str eventName => EventStats of all the
+        events received so far.
+        """
+        with self._lock:
+            return dict(self._event_stats)
+
+    def clear_event_stats(self):
+        """Clears the statistics of all the events received so far."""
+        with self._lock:
+            self._event_stats.clear()
+
     def register_handler(self, handler, event_name, args):
         """Registers an event handler.
 
@@ -273,7 +322,8 @@ class EventDispatcher:
 
         If such event(s) exist, pop one event from each event queue that
         satisfies the condition. Otherwise, wait for an event that satisfies
-        the condition to occur, with timeout.
+        the condition to occur, with timeout. The wait sleeps until an event
+        is received, rather than polling the queues.
 
         Results are sorted by timestamp in ascending order.
 
@@ -282,6 +332,8 @@ class EventDispatcher:
                 should match in order to be popped.
             timeout: Number of seconds to wait for events in case no event
                 matching the condition exits when the function is called.
+            freq: Unused, kept for compatibility. Waiting used to poll the
+                queues every freq seconds.
 
         Returns:
             results: Pop events whose names match a regex pattern.
@@ -295,33 +347,94 @@ class EventDispatcher:
         if not self._started:
             raise IllegalStateError(
                 "Dispatcher needs to be started before popping.")
-        deadline = time.time() + timeout
-        while True:
-            # TODO: fix the sleep loop
-            results = self._match_and_pop(regex_pattern)
-            if len(results) != 0 or time.time() > deadline:
-                break
-            time.sleep(freq)
+        results = self._wait_and_pop(regex_pattern, timeout)
         if len(results) == 0:
             raise queue.Empty('Timeout after {}s waiting for event: {}'.format(
                 timeout, regex_pattern))
 
         return sorted(results, key=lambda event: event['time'])
 
-    def _match_and_pop(self, regex_pattern):
+    def drain_events(self, regex_pattern, timeout):
+        """Pop all events whose names match a regex pattern.
+
+        Pops all the matching events stored, then keeps popping the matching
+        events received until none is received for timeout seconds. Use a
+        regex_pattern of '.*' and check that the result is empty to verify
+        that no more events come.
+
+        Args:
+            regex_pattern: The regular expression pattern that an event name
+                should match in order to be popped.
+            timeout: Number of seconds without a matching event after which
+                to stop waiting.
+
+        Returns:
+            results: The events popped, sorted by timestamp in ascending
+                order. Empty if none was received.
+
+        Raises:
+            IllegalStateError: Raised if pop is called before the dispatcher
+                starts polling.
+        """
+        if not self._started:
+            raise IllegalStateError(
+                "Dispatcher needs to be started before popping.")
+        results = []
+        while True:
+            events = self._wait_and_pop(regex_pattern, timeout, pop_all=True)
+            if not events:
+                break
+            results.extend(events)
+
+        return sorted(results, key=lambda event: event['time'])
+
+    def _wait_and_pop(self, regex_pattern, timeout, pop_all=False):
+        """Wait up to timeout seconds for events matching regex_pattern to be
+        stored, then pop them as _match_and_pop does.
+        """
+        deadline = time.time() + timeout
+        with self._event_added:
+            while True:
+                results = self._match_and_pop(regex_pattern, pop_all)
+                remaining = deadline - time.time()
+                if results or remaining <= 0:
+                    return results
+                self._event_added.wait(remaining)
+
+    def _matches(self, regex_pattern, name):
+        """Whether an event name matches regex_pattern.
+
+        Patterns are compiled once and the result for each name is cached,
+        since the same few patterns are matched against the same names every
+        time an event is received.
+        """
+        matcher = self._matchers.get(regex_pattern)
+        if matcher is None:
+            matcher = (re.compile(regex_pattern), {})
+            self._matchers[regex_pattern] = matcher
+        regex, matched_names = matcher
+        matched = matched_names.get(name)
+        if matched is None:
+            matched = regex.match(name) is not None
+            matched_names[name] = matched
+        return matched
+
+    def _match_and_pop(self, regex_pattern, pop_all=False):
         """Pop one event from each of the event queues whose names
         match (in a sense of regular expression) regex_pattern.
+
+        If pop_all is True, pop all the events of these queues instead.
         """
         results = []
         self._lock.acquire()
-        for name in self._event_dict.keys():
-            if re.match(regex_pattern, name):
-                q = self._event_dict[name]
-                if q:
-                    try:
+        for name, q in self._event_dict.items():
+            if q and self._matches(regex_pattern, name):
+                try:
+                    results.append(q.get(False))
+                    while pop_all:
                         results.append(q.get(False))
-                    except queue.Empty:
-                        pass
+                except queue.Empty:
+                    pass
         self._lock.release()
         return results
 
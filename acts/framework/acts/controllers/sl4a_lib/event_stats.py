@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Latency statistics of the events received from SL4A.
+
+SL4A timestamps each event on the device when it is posted, in milliseconds
+since the epoch. The EventDispatcher adds the host time at which the event
+was received, so the delay of the RPC transport, and any offset between the
+clocks, can be told apart from the timing of the events on the device.
+"""
+
+# Key of the host receive time added to every event (ms since the epoch).
+HOST_TIME_KEY = 'host_time'
+# Key of the device time of every SL4A event (ms since the epoch).
+DEVICE_TIME_KEY = 'time'
+
+# (lowest value, bucket width, number of buckets) of the histograms, in ms.
+# Latencies may be negative when the device clock is ahead of the host's.
+LATENCY_BUCKETS = (-1000, 1, 3000)
+INTER_ARRIVAL_BUCKETS = (0, 10, 1000)
+
+
+class Histogram(object):
+    """A histogram of values in fixed buckets, updated in constant time.
+
+    Attributes:
+        low: the lowest value of the first bucket.
+        width: the width of each bucket.
+        buckets: the number of values in each bucket.
+        underflow: the number of values below the first bucket.
+        overflow: the number of values above the last bucket.
+        count: the number of values added.
+        total: the sum of the values added.
+        min: the smallest value added, or None.
+        max: the largest value added, or None.
+    """
+
+    def __init__(self, low, width, num_buckets):
+        self.low = low
+        self.width = width
+        self.buckets = [0] * num_buckets
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Adds a value to the histogram."""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        index = int((value - self.low) // self.width)
+        if index < 0:
+            self.underflow += 1
+        elif index >= len(self.buckets):
+            self.overflow += 1
+        else:
+            self.buckets[index] += 1
+
+    @property
+    def mean(self):
+        """The mean of the values added, or None."""
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def get_percentile(self, percent):
+        """Returns the smallest bucket bound below which percent% of the values
+        are, or None if the histogram is empty.
+
+        Values outside of the buckets are bounded by min and max.
+        """
+        if not self.count:
+            return None
+        # Same convention as aware_test_utils.extract_cdf_decile: the value at
+        # which the CDF reaches percent.
+        rank = percent * self.count / 100
+        seen = self.underflow
+        if seen and seen >= rank:
+            return self.min
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                upper_bound = self.low + (index + 1) * self.width
+                return min(upper_bound, self.max)
+        return self.max
+
+    def get_deciles(self):
+        """Returns the 10%, 20%, ..., 90% percentiles (a list of 9 values)."""
+        return [self.get_percentile(percent) for percent in range(10, 100, 10)]
+
+    def __repr__(self):
+        if not self.count:
+            return 'count=0'
+        return 'count=%d, min=%.2f, max=%.2f, mean=%.2f, deciles=%s' % (
+            self.count, self.min, self.max, self.mean, self.get_deciles())
+
+
+class EventStats(object):
+    """The latency statistics of the events of one name.
+
+    Attributes:
+        latency: histogram of the host receive time minus the device time of
+                 the events (ms). It includes the delay of the RPC transport
+                 and the offset of the device clock.
+        inter_arrival: histogram of the device time between consecutive
+                       events (ms), which does not depend on the transport.
+    """
+
+    def __init__(self):
+        self.latency = Histogram(*LATENCY_BUCKETS)
+        self.inter_arrival = Histogram(*INTER_ARRIVAL_BUCKETS)
+        self._last_device_time = None
+
+    def add(self, event):
+        """Adds an event received from SL4A to the statistics."""
+        device_time = event.get(DEVICE_TIME_KEY)
+        if device_time is None:
+            return
+        self.latency.add(event[HOST_TIME_KEY] - device_time)
+        if self._last_device_time is not None:
+            self.inter_arrival.add(device_time - self._last_device_time)
+        self._last_device_time = device_time
+
+    def __repr__(self):
+        return 'latency: %s; inter-arrival: %s' % (self.latency,
+                                                   self.inter_arrival)
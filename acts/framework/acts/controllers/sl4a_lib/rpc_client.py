@@ -19,12 +19,17 @@ import threading
 import time
 from concurrent import futures
 
+from acts import call_stats
 from acts import error
 from acts import logger
 
 # The default timeout value when no timeout is set.
 SOCKET_TIMEOUT = 60
 
+# RPCs not added to the call_stats. eventWait blocks until an event comes, in
+# the polling thread of the EventDispatcher.
+UNCOUNTED_RPCS = ('eventWait', )
+
 # The Session UID when a UID has not been received yet.
 UNKNOWN_UID = -1
 
@@ -158,6 +163,42 @@ class RpcClient(object):
         self._working_connections = []
         self.is_alive = False
 
+    def open_connections(self, count):
+        """Opens connections ahead of time so that RPCs do not wait on them.
+
+        The connections are opened in parallel, and no more than
+        max_connections are kept in total. Failures are logged, the
+        connections missing are opened on demand by later RPCs instead.
+
+        Args:
+            count: The number of free connections wanted.
+
+        Returns:
+            The number of connections opened.
+        """
+        with self._lock:
+            count = min(count - len(self._free_connections),
+                        self.max_connections - len(self._free_connections) -
+                        len(self._working_connections))
+        if count <= 0:
+            return 0
+        opened = 0
+        with futures.ThreadPoolExecutor(max_workers=count) as executor:
+            pending = [
+                executor.submit(self._create_connection_func, self.uid)
+                for _ in range(count)
+            ]
+            for future in futures.as_completed(pending):
+                try:
+                    connection = future.result()
+                except Exception as e:
+                    self._log.warning('Unable to open a connection: %s', e)
+                    continue
+                with self._lock:
+                    self._free_connections.append(connection)
+                opened += 1
+        return opened
+
     def _get_free_connection(self):
         """Returns a free connection to be used for an RPC call.
 
@@ -219,6 +260,7 @@ class RpcClient(object):
             Sl4aProtocolError: Something went wrong with the sl4a protocol.
             Sl4aApiError: The rpc went through, however executed with errors.
         """
+        start_time = time.time()
         connection = self._get_free_connection()
         ticket = connection.get_new_ticket()
         timed_out = False
@@ -273,6 +315,8 @@ class RpcClient(object):
                 if timeout:
                     connection.set_timeout(SOCKET_TIMEOUT)
                 self._release_working_connection(connection)
+            if method not in UNCOUNTED_RPCS:
+                call_stats.add_call(call_stats.RPC, time.time() - start_time)
         result = json.loads(str(response, encoding='utf8'))
 
         if result['error']:
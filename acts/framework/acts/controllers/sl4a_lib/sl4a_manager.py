@@ -18,6 +18,7 @@ import threading
 import time
 
 from acts import logger
+from acts.libs.proc import job
 from acts.controllers.sl4a_lib import rpc_client
 from acts.controllers.sl4a_lib import sl4a_session
 from acts.controllers.sl4a_lib import error_reporter
@@ -25,6 +26,13 @@ from acts.controllers.sl4a_lib import error_reporter
 ATTEMPT_INTERVAL = .25
 MAX_WAIT_ON_SERVER_SECONDS = 5
 
+# The number of RPC connections a new session opens in parallel when it is
+# created, so that concurrent RPCs do not wait on new connections.
+DEFAULT_PREOPEN_CONNECTIONS = 1
+
+# The time given to adb on top of the time the device waits for a port.
+_WAIT_FOR_PORT_ADB_MARGIN = 10
+
 _SL4A_LAUNCH_SERVER_CMD = (
     'am startservice -a com.googlecode.android_scripting.action.LAUNCH_SERVER '
     '--ei com.googlecode.android_scripting.extra.USE_SERVICE_PORT %s '
@@ -62,6 +70,22 @@ _SL4A_USER_FIND_PORT_CMD = (
     # Only grab the port
     'sed s/.*://g')
 
+# The command that waits on the device for SL4A to listen on a port which is
+# not known yet, so that a new server port is found with a single adb call
+# instead of one per attempt. It prints 'port <port>', or 'timeout' after
+# the given number of attempts.
+_SL4A_WAIT_FOR_PORT_CMD = (
+    'i=0; '
+    'while [ $i -lt {attempts} ]; do '
+    'for port in $({find_port_cmd}); do '
+    'case " {known_ports} " in *" $port "*) ;; '
+    '*) echo "port $port"; exit 0;; esac; '
+    'done; '
+    'sleep {interval} 2>/dev/null || sleep 1; '
+    'i=$((i + 1)); '
+    'done; '
+    'echo timeout')
+
 # The command that begins the SL4A ScriptingLayerService.
 _SL4A_START_SERVICE_CMD = (
     'am startservice '
@@ -102,7 +126,11 @@ class Sl4aManager(object):
         _sl4a_ports: A set of all known SL4A server ports in use.
         adb: A reference to the AndroidDevice's AdbProxy.
         log: The logger for this object.
+        preopen_connections: The number of connections new sessions open
+            in parallel when they are created.
         sessions: A dictionary of session_ids to sessions.
+        startup_timings: A dictionary of the seconds taken by each phase of
+            the startup of the last session created.
     """
 
     def __init__(self, adb):
@@ -113,6 +141,10 @@ class Sl4aManager(object):
             lambda msg: '[SL4A Manager|%s] %s' % (adb.serial, msg))
         self.sessions = {}
         self._started = False
+        self._adb_version = None
+        self._find_port_command = None
+        self.preopen_connections = DEFAULT_PREOPEN_CONNECTIONS
+        self.startup_timings = {}
         self.error_reporter = error_reporter.ErrorReporter(
             'SL4A %s' % adb.serial)
 
@@ -128,6 +160,13 @@ class Sl4aManager(object):
         of ADB/device."""
         self.error_reporter.create_error_report(self, session, connection)
 
+    def get_adb_version(self):
+        """Returns the version number of ADB, only asking ADB the first time.
+        """
+        if self._adb_version is None:
+            self._adb_version = self.adb.get_version_number()
+        return self._adb_version
+
     def start_sl4a_server(self, device_port, try_interval=ATTEMPT_INTERVAL):
         """Opens a server socket connection on SL4A.
 
@@ -145,11 +184,74 @@ class Sl4aManager(object):
             Sl4aConnectionError if SL4A's opened port cannot be found.
         """
         # Launch a server through SL4A.
+        start_time = time.time()
         self.adb.shell(_SL4A_LAUNCH_SERVER_CMD % device_port)
+        self.startup_timings['launch_server'] = time.time() - start_time
 
         # There is a chance that the server has not come up yet by the time the
-        # launch command has finished. Try to read get the listening port again
-        # after a small amount of time.
+        # launch command has finished, so wait for the port to open.
+        start_time = time.time()
+        port = self._wait_for_open_listening_port(try_interval)
+        self.startup_timings['find_port'] = time.time() - start_time
+        if port is not None:
+            return port
+
+        raise rpc_client.Sl4aConnectionError(
+            'Unable to find a valid open port for a new server connection. '
+            'Expected port: %s. Open ports: %s' % (device_port,
+                                                   self._sl4a_ports))
+
+    def _wait_for_open_listening_port(self, try_interval):
+        """Waits on the device for SL4A to listen on a new port.
+
+        Falls back to polling the ports from the host if the device shell
+        cannot run the wait, or if adb times out waiting for it.
+
+        Returns:
+            The new port, or None if no new port opened in time.
+        """
+        deadline = time.time() + MAX_WAIT_ON_SERVER_SECONDS
+        while True:
+            time_left = deadline - time.time()
+            if time_left <= 0:
+                return None
+            with self._listen_for_port_lock:
+                known_ports = ' '.join(self._sl4a_ports)
+            attempts = max(int(time_left / try_interval), 1)
+            # Shells without a fractional sleep wait 1 second per attempt.
+            timeout = (attempts * max(try_interval, 1) +
+                       _WAIT_FOR_PORT_ADB_MARGIN)
+            try:
+                output = self.adb.shell(
+                    _SL4A_WAIT_FOR_PORT_CMD.format(
+                        attempts=attempts,
+                        find_port_cmd=self._get_all_ports_command(),
+                        known_ports=known_ports,
+                        interval=try_interval),
+                    ignore_status=True,
+                    timeout=timeout)
+            except job.TimeoutError:
+                self.log.warning('Timed out waiting for a new SL4A port on '
+                                 'the device, polling from the host.')
+                return self._poll_open_listening_port(try_interval)
+            words = output.split()
+            if words == ['timeout']:
+                return None
+            if len(words) != 2 or words[0] != 'port':
+                return self._poll_open_listening_port(try_interval)
+            with self._listen_for_port_lock:
+                if words[1] not in self._sl4a_ports:
+                    self._sl4a_ports.add(words[1])
+                    return int(words[1])
+            # Another thread took the port in the meantime, so wait for the
+            # next one.
+
+    def _poll_open_listening_port(self, try_interval):
+        """Polls the open ports until SL4A listens on a new port.
+
+        Returns:
+            The new port, or None if no new port opened in time.
+        """
         time_left = MAX_WAIT_ON_SERVER_SECONDS
         while time_left > 0:
             port = self._get_open_listening_port()
@@ -158,14 +260,20 @@ class Sl4aManager(object):
                 time_left -= try_interval
             else:
                 return port
-
-        raise rpc_client.Sl4aConnectionError(
-            'Unable to find a valid open port for a new server connection. '
-            'Expected port: %s. Open ports: %s' % (device_port,
-                                                   self._sl4a_ports))
+        return None
 
     def _get_all_ports_command(self):
-        """Returns the list of all ports from the command to get ports."""
+        """Returns the command to get all ports.
+
+        Whether the device can be put into root mode is only checked the first
+        time.
+        """
+        if self._find_port_command is None:
+            self._find_port_command = self._choose_all_ports_command()
+        return self._find_port_command
+
+    def _choose_all_ports_command(self):
+        """Returns the command to get all ports for the root state."""
         is_root = True
         if not self.adb.is_root():
             is_root = self.adb.ensure_root()
@@ -244,7 +352,8 @@ class Sl4aManager(object):
     def create_session(self,
                        max_connections=None,
                        client_port=0,
-                       server_port=None):
+                       server_port=None,
+                       preopen_connections=None):
         """Creates an SL4A server with the given ports if possible.
 
         The ports are not guaranteed to be available for use. If the port
@@ -256,6 +365,8 @@ class Sl4aManager(object):
             server_port: The port on the Android device.
             max_connections: The max number of client connections for the
                 session.
+            preopen_connections: The number of connections to open in
+                parallel before returning. Defaults to preopen_connections.
 
         Returns:
             A new Sl4aServer instance.
@@ -268,15 +379,31 @@ class Sl4aManager(object):
             # Otherwise, open a new server on a random port.
             else:
                 server_port = 0
+        if preopen_connections is None:
+            preopen_connections = self.preopen_connections
+        self.startup_timings = {}
+        start_time = time.time()
         self.start_sl4a_service()
+        self.startup_timings['start_service'] = time.time() - start_time
         session = sl4a_session.Sl4aSession(
             self.adb,
             client_port,
             server_port,
             self.obtain_sl4a_server,
             self.diagnose_failure,
-            max_connections=max_connections)
+            max_connections=max_connections,
+            get_adb_version_func=self.get_adb_version)
+        self.startup_timings.update(session.connection_timings)
         self.sessions[session.uid] = session
+        if preopen_connections > 1:
+            preopen_start_time = time.time()
+            session.rpc_client.open_connections(preopen_connections)
+            self.startup_timings['preopen_connections'] = (
+                time.time() - preopen_start_time)
+        self.log.debug('Started session %s in %.3fs (%s).' % (
+            session.uid, time.time() - start_time, ', '.join(
+                '%s: %.3fs' % (phase, seconds)
+                for phase, seconds in self.startup_timings.items())))
         return session
 
     def stop_service(self):
@@ -290,6 +417,9 @@ class Sl4aManager(object):
             session.terminate()
         self.sessions = {}
         self._close_all_ports()
+        # The root state of the device can change before the next session,
+        # e.g. after a reboot.
+        self._find_port_command = None
 
     def _close_all_ports(self, try_interval=ATTEMPT_INTERVAL):
         """Closes all ports opened on SL4A."""
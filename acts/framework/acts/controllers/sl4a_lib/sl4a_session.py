@@ -15,6 +15,7 @@
 #   limitations under the License.
 import socket
 import threading
+import time
 
 import errno
 
@@ -43,6 +44,8 @@ class Sl4aSession(object):
         _terminated: A bool that stores whether or not this session has been
             terminated. Terminated sessions cannot be restarted.
         adb: A reference to the AndroidDevice's AdbProxy.
+        connection_timings: A dictionary of the seconds taken by each phase
+            of opening the last RPC connection of the session.
         log: The logger for this Sl4aSession
         server_port: The SL4A server port this session is established on.
         uid: The uid that corresponds the the SL4A Server's session id. This
@@ -55,7 +58,8 @@ class Sl4aSession(object):
                  device_port,
                  get_server_port_func,
                  on_error_callback,
-                 max_connections=None):
+                 max_connections=None,
+                 get_adb_version_func=None):
         """Creates an SL4A Session.
 
         Args:
@@ -67,6 +71,8 @@ class Sl4aSession(object):
                 server for its first connection.
             device_port: The SL4A server port to be used as a hint for which
                 SL4A server to connect to.
+            get_adb_version_func: A function that returns the version number
+                of ADB, e.g. a cached one. Defaults to asking ADB.
         """
         self._event_dispatcher = None
         self._terminate_lock = threading.Lock()
@@ -83,6 +89,9 @@ class Sl4aSession(object):
         self.uid = UNKNOWN_UID
         self.obtain_server_port = get_server_port_func
         self._on_error_callback = on_error_callback
+        self._get_adb_version = (get_adb_version_func
+                                 or self.adb.get_version_number)
+        self.connection_timings = {}
 
         connection_creator = self._rpc_connection_creator(host_port)
         self.rpc_client = rpc_client.RpcClient(
@@ -116,7 +125,7 @@ class Sl4aSession(object):
 
         Raises AdbError if the version of ADB is too old, or the command fails.
         """
-        if self.adb.get_version_number() < 37 and hinted_port == 0:
+        if self._get_adb_version() < 37 and hinted_port == 0:
             self.log.error(
                 'The current version of ADB does not automatically provide a '
                 'port to forward. Please upgrade ADB to version 1.0.37 or '
@@ -152,15 +161,23 @@ class Sl4aSession(object):
         """
         if ports is None:
             ports = sl4a_ports.Sl4aPorts(0, 0, 0)
+        timings = {}
+        start_time = time.time()
         # Open a new server if a server cannot be inferred.
         ports.server_port = self.obtain_server_port(ports.server_port)
         self.server_port = ports.server_port
+        timings['obtain_server'] = time.time() - start_time
         # Forward the device port to the host.
+        start_time = time.time()
         ports.forwarded_port = self._create_forwarded_port(ports.server_port)
+        timings['forward_port'] = time.time() - start_time
+        start_time = time.time()
         client_socket, fd = self._create_client_side_connection(ports)
         client = rpc_connection.RpcConnection(
             self.adb, ports, client_socket, fd, uid=uid)
         client.open()
+        timings['handshake'] = time.time() - start_time
+        self.connection_timings = timings
         if uid == UNKNOWN_UID:
             self.uid = client.uid
         return client
@@ -16,6 +16,9 @@
 
 import importlib
 import logging
+import os
+
+from acts.libs.pcap import index as pcap_index
 
 ACTS_CONTROLLER_CONFIG_NAME = "Sniffer"
 ACTS_CONTROLLER_REFERENCE_NAME = "sniffers"
@@ -267,6 +270,31 @@ class Sniffer(object):
         """
         raise NotImplementedError("Base class should not be called directly!")
 
+    def extract_test_frames(self, record, output_path=None, **filters):
+        """Copies the frames captured while a test ran to a small pcap.
+
+        The capture is indexed on first use, see pcap_index.PcapIndex, so the
+        frames of each test are found without reading the whole capture
+        again.
+
+        Args:
+            record: The records.TestResultRecord of the test.
+            output_path: The path of the pcap to write. Defaults to the
+                capture file name followed by the test name.
+            filters: The margin, addresses and frame_types arguments of
+                pcap_index.extract_test_frames.
+
+        Returns:
+            The path of the pcap written.
+        """
+        capture_file = self.get_capture_file()
+        if output_path is None:
+            output_path = '%s_%s.pcap' % (os.path.splitext(capture_file)[0],
+                                          record.test_name)
+        pcap_index.extract_test_frames(capture_file, output_path, record,
+                                       **filters)
+        return output_path
+
 
 class ActiveCaptureContext(object):
     """This class defines an object representing an active sniffer capture.
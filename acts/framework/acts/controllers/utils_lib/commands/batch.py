@@ -0,0 +1,180 @@
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import uuid
+
+from acts.libs.proc import job
+
+_SCRIPT_START = 'batch_dir=$(mktemp -d)\n'
+
+# Runs one step in a subshell with its output saved to files, then prints a
+# header with the step index, the exit status and the sizes of the output
+# followed by the output itself.
+_STEP = ('(\n{command}\n) > "$batch_dir/out" 2> "$batch_dir/err" < /dev/null\n'
+         'status=$?\n'
+         'printf "{marker} {index} %d %d %d\\n" "$status" '
+         '$(wc -c < "$batch_dir/out") $(wc -c < "$batch_dir/err")\n'
+         'cat "$batch_dir/out" "$batch_dir/err"\n')
+
+# The script does not end with a newline, so that the runner can append to
+# its last line, e.g. SshFormatter.format_remote_command appends ';'.
+_SCRIPT_END = 'rm -rf "$batch_dir"\nprintf "\\n{marker} end\\n"'
+
+# Ends the script early after a failed step.
+_STOP_ON_ERROR = '[ "$status" -eq 0 ] || {{ {end}\nexit 0; }}\n'
+
+_Step = collections.namedtuple('_Step',
+                               ['command', 'ignore_status', 'on_result'])
+
+
+class CommandBatch(object):
+    """A sequence of shell commands run as one script in a single call.
+
+    Each command added to the batch is a step of the script. The steps run
+    one after another, each in its own subshell, and the script stops at the
+    first step that fails unless the step ignores its status. The output and
+    exit status of each step are sent back framed, so that every step gets
+    its own job.Result.
+
+    The batch has a run method like a runner, so objects that only use their
+    runner to make changes, like ShellCommand.write_file or
+    LinuxIpCommand.add_ipv4_address, can add their commands to a batch.
+    """
+
+    def __init__(self, runner):
+        """
+        Args:
+            runner: The object that runs the script (eg.
+                    connection.SshConnection).
+        """
+        self._runner = runner
+        self._steps = []
+
+    def __len__(self):
+        return len(self._steps)
+
+    @property
+    def commands(self):
+        """The commands of the steps, in order."""
+        return [step.command for step in self._steps]
+
+    def add(self, command, ignore_status=False, on_result=None):
+        """Adds a command to the batch.
+
+        Args:
+            command: The command to run, as a string.
+            ignore_status: bool True to keep going if the command fails.
+            on_result: A function called with the job.Result of the command
+                       when the batch runs, before its exit status is
+                       checked. Exceptions it raises stop the batch.
+
+        Returns:
+            The index of the step.
+        """
+        self._steps.append(_Step(command, ignore_status, on_result))
+        return len(self._steps) - 1
+
+    def run(self, command, timeout=None, ignore_status=False):
+        """Adds a command to the batch, like the run method of a runner.
+
+        The command does not run until execute is called, so nothing is
+        returned.
+
+        Args:
+            command: The command to run, as a string.
+            timeout: Unused, the timeout is given to execute.
+            ignore_status: bool True to keep going if the command fails.
+        """
+        self.add(command, ignore_status=ignore_status)
+
+    def script(self, marker='BATCH'):
+        """Creates the shell script that runs the batch.
+
+        This can also be used as a dry run to see the commands that would be
+        run on the target.
+
+        Args:
+            marker: The string which frames the output of the steps.
+
+        Returns:
+            The script as a string.
+        """
+        end = _SCRIPT_END.format(marker=marker)
+        lines = [_SCRIPT_START]
+        for index, step in enumerate(self._steps):
+            lines.append(
+                _STEP.format(command=step.command, marker=marker, index=index))
+            if not step.ignore_status:
+                lines.append(_STOP_ON_ERROR.format(end=end))
+        lines.append(end)
+        return ''.join(lines)
+
+    def execute(self, timeout=3600, io_encoding='utf-8'):
+        """Runs the batch in a single call to the runner.
+
+        Args:
+            timeout: number seconds to wait for all the commands to finish.
+            io_encoding: str unicode encoding of command output.
+
+        Returns:
+            A list of the job.Result of each step that ran, in order. Steps
+            after a failed step are not run and have no result.
+
+        Raises:
+            job.TimeoutError: When the batch took too long to execute.
+            job.Error: When a step exited with a non zero status and does not
+                       ignore its status.
+        """
+        if not self._steps:
+            return []
+        marker = uuid.uuid4().hex
+        result = self._runner.run(
+            self.script(marker), timeout=timeout, ignore_status=True)
+        results = self._parse_output(result._raw_stdout, marker, io_encoding)
+        if len(results) < len(self._steps) and result.exit_status:
+            # The script itself failed rather than one of the steps.
+            raise job.Error(result)
+        for step, step_result in zip(self._steps, results):
+            if step.on_result:
+                step.on_result(step_result)
+            if step_result.exit_status and not step.ignore_status:
+                raise job.Error(step_result)
+        return results
+
+    def _parse_output(self, output, marker, io_encoding):
+        """Splits the output of the script into the results of the steps."""
+        results = []
+        header = ('%s ' % marker).encode()
+        position = output.find(header)
+        while position != -1:
+            header_end = output.find(b'\n', position)
+            if header_end == -1:
+                # SshConnection.run strips the newline ending the output.
+                header_end = len(output)
+            fields = output[position + len(header):header_end].split()
+            if fields == [b'end']:
+                break
+            index, status, stdout_size, stderr_size = map(int, fields)
+            stdout_end = header_end + 1 + stdout_size
+            stderr_end = stdout_end + stderr_size
+            results.append(
+                job.Result(
+                    command=self._steps[index].command,
+                    stdout=output[header_end + 1:stdout_end],
+                    stderr=output[stdout_end:stderr_end],
+                    exit_status=status,
+                    encoding=io_encoding))
+            position = output.find(header, stderr_end)
+        return results
@@ -124,6 +124,18 @@ class LinuxIpCommand(object):
         self.clear_ipv4_addresses(net_interface)
         self.add_ipv4_address(net_interface, address, broadcast)
 
+    def flush_ipv4_addresses(self, net_interface):
+        """Removes all ipv4 addresses of a net_interface in one command.
+
+        Unlike clear_ipv4_addresses the addresses are not read first, so this
+        can be added to a commands.batch.CommandBatch.
+
+        Args:
+            net_interface: string, The network interface to clear addresses from
+                           (eg. wlan0).
+        """
+        self._runner.run('ip -4 addr flush dev %s' % net_interface)
+
     def clear_ipv4_addresses(self, net_interface):
         """Clears all ipv4 addresses registered to a net_interface.
 
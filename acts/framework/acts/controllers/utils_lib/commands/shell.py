@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
+import re
 import shellescape
 import signal
 import time
@@ -19,6 +21,85 @@ import time
 from acts.controllers.utils_lib.ssh import connection
 from acts.libs.proc import job
 
+# Follows a file from its first line in the target shell, until the program
+# whose pid is given as first argument exits if there is one. The shell prints
+# its pid before it becomes the tail, so that the tail can be stopped as soon
+# as a line matches instead of when it next writes to the closed pipe.
+_LOG_FOLLOW_COMMAND = ('echo $$; exec tail -n +1 -F ${1:+--pid=$1} %s '
+                       '2>/dev/null')
+
+# Checks that the target has the GNU timeout and tail --pid used to follow a
+# file. BusyBox and other minimal systems may lack them.
+_LOG_FOLLOW_CHECK = ('timeout 1 true 2>/dev/null && '
+                     'tail --pid=$$ -n 0 /dev/null 2>/dev/null')
+
+# Searches a file once a second instead when the file cannot be followed.
+# Whether the program is running is checked before each search, so the
+# lines it wrote before exiting are still searched.
+_LOG_POLL_COMMAND = ('end=$(($(date +%%s) + %s)); while :; do r=1; '
+                     '[ -z "$p" ] || kill -0 $p 2>/dev/null || r=; '
+                     'grep -m 1 -E %s %s 2>/dev/null && break; '
+                     '[ -n "$r" ] && [ $(date +%%s) -lt $end ] || break; '
+                     'sleep 1; done; true')
+
+# Extra time given to the runner on top of the timeout of a log follow, so
+# that the remote timeout always ends the follow first.
+_LOG_FOLLOW_TIMEOUT_MARGIN = 10
+
+
+def log_follow_command(file_name, patterns, timeout=60, pid=None):
+    """Creates a command that waits for a line of a file to match a pattern.
+
+    The command prints the first matching line, if any, and exits with a zero
+    status. See ShellCommand.wait_for_log.
+
+    The file is followed with GNU timeout and tail --pid. If the target does
+    not have them, the command searches the whole file once a second
+    instead, which finds the same line but later.
+
+    Args:
+        file_name: The name of the file to follow.
+        patterns: A list of regular expressions to look for.
+        timeout: How long to wait for a matching line (in seconds).
+        pid: The pid of the program writing the file, either an int or a
+             shell expression such as "$!". If given, the wait stops when
+             the program exits.
+
+    Returns:
+        The command as a string.
+    """
+    grep_patterns = ' '.join(
+        '-e %s' % shellescape.quote(pattern) for pattern in patterns)
+    follow_command = (
+        'timeout %s sh -c %s sh "$p" | { read tail_pid; '
+        'grep -m 1 -E %s; kill $tail_pid 2>/dev/null; true; }' %
+        (timeout, shellescape.quote(_LOG_FOLLOW_COMMAND % file_name),
+         grep_patterns))
+    poll_command = _LOG_POLL_COMMAND % (int(math.ceil(timeout)),
+                                        grep_patterns, file_name)
+    return 'p="%s"; if %s; then %s; else %s; fi' % (
+        pid or '', _LOG_FOLLOW_CHECK, follow_command, poll_command)
+
+
+def find_log_match(patterns, output):
+    """Finds the pattern matched by the output of a log follow command.
+
+    Args:
+        patterns: The list of patterns given to log_follow_command.
+        output: The output of the command.
+
+    Returns:
+        A tuple of the matched pattern and the matching line, or None if no
+        line matched. Output that none of the patterns matches with the re
+        module, e.g. stray output of the target shell, is not a match either.
+    """
+    if not output:
+        return None
+    for pattern in patterns:
+        if re.search(pattern, output):
+            return pattern, output
+    return None
+
 
 class ShellCommand(object):
     """Wraps basic commands that tend to be tied very closely to a shell.
@@ -27,7 +108,8 @@ class ShellCommand(object):
     any object that has a run command. Basic shell functionality for managing
     the system, programs, and files in wrapped within this class.
 
-    Note: At the moment this only works with the ssh runner.
+    Note: At the moment this only works with the ssh runner, either an
+    SshConnection or a ChannelRunner created by one.
     """
 
     def __init__(self, runner, working_dir=None):
@@ -106,7 +188,7 @@ class ShellCommand(object):
         try:
             result = self.run('ps aux | grep -v grep | grep %s' % identifier)
         except job.Error:
-            raise StopIteration
+            return
 
         lines = result.stdout.splitlines()
 
@@ -136,6 +218,34 @@ class ShellCommand(object):
         except job.Error:
             return False
 
+    def wait_for_log(self, file_name, patterns, timeout=60, pid=None):
+        """Waits for a line of a file to match one of a list of patterns.
+
+        Follows the file with a single tail -F in the target shell and
+        matches the lines as they are written, instead of searching the whole
+        file again and again. Lines already in the file are matched too, and
+        the file does not need to exist yet. This needs GNU timeout and tail
+        --pid on the target; without them the file is searched once a second.
+
+        Args:
+            file_name: The name of the file to follow, e.g. a log file.
+            patterns: A list of regular expressions to look for, in a syntax
+                      understood by both grep -E and the re module. If a
+                      line matches several, the first one in the list is
+                      reported.
+            timeout: How long to wait for a matching line (in seconds).
+            pid: int, The pid of the program writing the file. If given, the
+                 wait stops when the program exits.
+
+        Returns:
+            A tuple of the matched pattern and the matching line, or None if
+            no line matched before the timeout or the exit of the program.
+        """
+        result = self.run(
+            log_follow_command(file_name, patterns, timeout, pid),
+            timeout=timeout + _LOG_FOLLOW_TIMEOUT_MARGIN)
+        return find_log_match(patterns, result.stdout)
+
     def read_file(self, file_name):
         """Reads a file through the shell.
 
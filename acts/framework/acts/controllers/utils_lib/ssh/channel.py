@@ -0,0 +1,307 @@
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import selectors
+import shellescape
+import subprocess
+import threading
+import time
+import uuid
+
+from acts import logger
+from acts.libs.proc import job
+
+# The default maximum number of commands a ChannelRunner runs concurrently.
+DEFAULT_MAX_CHANNELS = 4
+
+# The size of the reads from the channel pipes.
+_READ_SIZE = 65536
+
+# The shell code sent to run one command. The command runs in its own shell so
+# that it cannot change the state of the channel shell or read its input. The
+# frame marker is written on a new line after the output on both stdout and
+# stderr, preceded by the exit status of the command on stdout.
+_FRAMED_COMMAND = ('"${SHELL:-sh}" -c %s < /dev/null; '
+                   'printf "\\n%%d %%s\\n" "$?" %s; '
+                   'printf "\\n%%s\\n" %s >&2\n')
+
+
+class ChannelClosedError(Exception):
+    """The shell of a channel exited or closed its output."""
+
+
+class ChannelSendError(ChannelClosedError):
+    """The shell of a channel exited before a command was sent to it."""
+
+
+class ShellChannel(object):
+    """A long lived shell which runs commands one at a time.
+
+    The channel starts a shell process, usually a remote shell over ssh, and
+    writes each command to its standard input. The end of the output of a
+    command and its exit status are found from a frame marker which the shell
+    prints once the command has exited, so the shell is reused for all the
+    commands instead of starting a new process for each of them.
+
+    A channel is not thread safe. Use a ChannelRunner to run commands from
+    several threads.
+    """
+
+    def __init__(self, shell_command):
+        """
+        Args:
+            shell_command: The command that starts the shell, as a list or a
+                           string. The shell must read commands from its
+                           standard input.
+        """
+        self._proc = subprocess.Popen(
+            shell_command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=not isinstance(shell_command, list))
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._proc.stdout, selectors.EVENT_READ)
+        self._selector.register(self._proc.stderr, selectors.EVENT_READ)
+
+    @property
+    def is_alive(self):
+        """True if the shell of the channel is still running."""
+        return self._proc is not None and self._proc.poll() is None
+
+    def run(self, command, timeout=3600, env=None, io_encoding='utf-8'):
+        """Runs a command in the shell of the channel.
+
+        Args:
+            command: The command to run, as a string.
+            timeout: number seconds to wait for command to finish.
+            env: dict environment variables to set for the command.
+            io_encoding: str unicode encoding of command output.
+
+        Returns:
+            A job.Result containing the results of the command. The exit
+            status is not checked.
+
+        Raises:
+            job.TimeoutError: When the command took too long to execute. The
+                              channel is closed as its shell is still busy.
+            ChannelSendError: When the shell exited before the command was
+                              sent. The channel is closed.
+            ChannelClosedError: When the shell exited before the command was
+                                done. The channel is closed.
+        """
+        if not self.is_alive:
+            self.close()
+            raise ChannelSendError('The channel shell is not running.')
+        if env:
+            command = 'export %s; %s' % (' '.join(
+                '%s=%s' % (name, value) for name, value in env.items()),
+                                         command)
+        marker = uuid.uuid4().hex
+        start_time = time.time()
+        try:
+            self._proc.stdin.write((_FRAMED_COMMAND % (
+                shellescape.quote(command), marker, marker)).encode(
+                    io_encoding))
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            self.close()
+            raise ChannelSendError('Failed to send command to the channel.')
+
+        stdout_pipe = self._proc.stdout
+        stderr_pipe = self._proc.stderr
+        frame_ends = {
+            stdout_pipe: (' %s\n' % marker).encode(),
+            stderr_pipe: ('\n%s\n' % marker).encode()
+        }
+        buffers = {stdout_pipe: bytearray(), stderr_pipe: bytearray()}
+        frame_indexes = {}
+        deadline = start_time + timeout
+        while len(frame_indexes) < len(buffers):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.close()
+                result = job.Result(
+                    command=command,
+                    stdout=bytes(buffers[stdout_pipe]),
+                    stderr=bytes(buffers[stderr_pipe]),
+                    duration=time.time() - start_time,
+                    did_timeout=True,
+                    encoding=io_encoding)
+                raise job.TimeoutError(result)
+            for key, _ in self._selector.select(remaining):
+                pipe = key.fileobj
+                data = os.read(pipe.fileno(), _READ_SIZE)
+                if not data:
+                    self.close()
+                    raise ChannelClosedError(
+                        'The channel shell closed its output.')
+                buffer = buffers[pipe]
+                # Only the new data and the end of the previous data can
+                # contain the frame end.
+                search_start = max(0, len(buffer) - len(frame_ends[pipe]))
+                buffer.extend(data)
+                if pipe not in frame_indexes:
+                    index = buffer.find(frame_ends[pipe], search_start)
+                    if index != -1:
+                        frame_indexes[pipe] = index
+
+        stdout = buffers[stdout_pipe]
+        status_index = stdout.rfind(b'\n', 0, frame_indexes[stdout_pipe])
+        return job.Result(
+            command=command,
+            stdout=bytes(stdout[:status_index]),
+            stderr=bytes(buffers[stderr_pipe][:frame_indexes[stderr_pipe]]),
+            exit_status=int(
+                stdout[status_index + 1:frame_indexes[stdout_pipe]]),
+            duration=time.time() - start_time,
+            encoding=io_encoding)
+
+    def close(self):
+        """Stops the shell of the channel."""
+        if self._proc is None:
+            return
+        self._selector.close()
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        for pipe in (self._proc.stdin, self._proc.stdout, self._proc.stderr):
+            try:
+                pipe.close()
+            except (BrokenPipeError, OSError):
+                pass
+        self._proc = None
+
+
+class ChannelRunner(object):
+    """Runs commands through a pool of long lived shell channels.
+
+    This is a drop-in replacement for the runner of a ShellCommand: it has the
+    same run and run_async methods as an SshConnection. Each command is run in
+    an idle channel. New channels are started when all are busy, up to
+    max_channels commands running concurrently. Channels whose shell exited
+    are replaced, and the command is tried again if it was not sent yet.
+    """
+
+    def __init__(self, shell_command, max_channels=DEFAULT_MAX_CHANNELS,
+                 name=None):
+        """
+        Args:
+            shell_command: The command that starts the shell of a channel.
+            max_channels: The maximum number of channels, i.e. of commands run
+                          concurrently.
+            name: The name used in log messages, e.g. the remote host name.
+        """
+        self._shell_command = shell_command
+        self._idle_channels = []
+        self._semaphore = threading.BoundedSemaphore(max_channels)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        def log_line(msg):
+            return '[ChannelRunner | %s] %s' % (name or shell_command, msg)
+
+        self.log = logger.create_logger(log_line)
+
+    def _acquire_channel(self):
+        """Returns an idle channel, starting a new one if there is none."""
+        with self._lock:
+            if self._closed:
+                raise ChannelClosedError('The runner was closed.')
+            while self._idle_channels:
+                channel = self._idle_channels.pop()
+                if channel.is_alive:
+                    return channel
+                channel.close()
+        self.log.debug('Starting a new channel.')
+        return ShellChannel(self._shell_command)
+
+    def _release_channel(self, channel):
+        """Returns a channel to the idle channels once its command is done."""
+        with self._lock:
+            if channel.is_alive and not self._closed:
+                self._idle_channels.append(channel)
+                return
+        channel.close()
+
+    def run(self,
+            command,
+            timeout=3600,
+            ignore_status=False,
+            env=None,
+            io_encoding='utf-8',
+            attempts=2):
+        """Runs a command in one of the channels.
+
+        Args:
+            command: The command to execute, as a string.
+            timeout: number seconds to wait for command to finish.
+            ignore_status: bool True to ignore the exit code of the command.
+            env: dict environment variables to set for the command.
+            io_encoding: str unicode encoding of command output.
+            attempts: Number of channels to try the command in before giving
+                      up when the command cannot be sent to them.
+
+        Returns:
+            A job.Result containing the results of the command.
+
+        Raises:
+            job.TimeoutError: When the command took to long to execute.
+            job.Error: When the command exited with a non zero status and
+                       ignore_status is False.
+            ChannelSendError: When the command could not be sent in any
+                              attempt because the channel shells exited.
+            ChannelClosedError: When the channel shell exited after the
+                                command was sent. The command is not tried
+                                again, as it may have run.
+        """
+        with self._semaphore:
+            for attempt in range(attempts, 0, -1):
+                channel = self._acquire_channel()
+                try:
+                    result = channel.run(command, timeout, env, io_encoding)
+                    break
+                except ChannelSendError:
+                    if attempt == 1:
+                        raise
+                    self.log.warning('Channel closed before running %s, '
+                                     'reconnecting.', command)
+                finally:
+                    self._release_channel(channel)
+        if result.exit_status and not ignore_status:
+            raise job.Error(result)
+        return result
+
+    def run_async(self, command, env=None):
+        """Starts up a background command.
+
+        Args:
+            command: The command to start.
+            env: A dictionary of environment variables to set for the command.
+
+        Returns:
+            The result of the command to launch the background job, with the
+            pid of the background job as output.
+        """
+        command = '(%s) < /dev/null > /dev/null 2>&1 & echo -n $!' % command
+        return self.run(command, env=env)
+
+    def close(self):
+        """Stops all the channels."""
+        with self._lock:
+            self._closed = True
+            channels, self._idle_channels = self._idle_channels, []
+        for channel in channels:
+            channel.close()
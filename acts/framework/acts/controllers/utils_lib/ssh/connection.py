@@ -16,6 +16,7 @@ import collections
 import os
 import re
 import shutil
+import subprocess
 import tempfile
 import threading
 import time
@@ -23,6 +24,7 @@ import uuid
 
 from acts import logger
 from acts.controllers.utils_lib import host_utils
+from acts.controllers.utils_lib.ssh import channel
 from acts.controllers.utils_lib.ssh import formatter
 from acts.libs.proc import job
 
@@ -269,6 +271,69 @@ class SshConnection(object):
                      attempts - 1)
         raise Error('The job failed for unknown reasons.', result)
 
+    def create_channel_runner(self,
+                              max_channels=channel.DEFAULT_MAX_CHANNELS):
+        """Creates a runner which reuses remote shells to run commands.
+
+        The returned runner keeps up to max_channels ssh sessions open, each
+        running a remote shell, and sends commands to them instead of starting
+        an ssh process per command. It can be used in place of this connection
+        as the runner of a ShellCommand.
+
+        Args:
+            max_channels: The maximum number of commands run concurrently.
+
+        Returns:
+            A channel.ChannelRunner. The caller should close it when done.
+        """
+        return channel.ChannelRunner(
+            self._format_session_command('sh'),
+            max_channels=max_channels,
+            name=self._settings.hostname)
+
+    def open_stream(self, command):
+        """Starts a remote command whose output is read as it is produced.
+
+        Unlike run, this does not wait for the command to finish. The output
+        is not checked for the connection message, so it is passed through
+        unchanged, e.g. binary data.
+
+        Args:
+            command: The command to run on the remote host, as a string.
+
+        Returns:
+            A subprocess.Popen of the local ssh process, with stdout and
+            stderr pipes. The caller should wait for or kill it.
+        """
+        return subprocess.Popen(
+            self._format_session_command(command),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
+
+    def _format_session_command(self, command):
+        """Formats an ssh command for a long lived session.
+
+        The session uses the master ssh connection if it can be set up, so
+        that no new connection is made for it.
+
+        Args:
+            command: The command to run on the remote host.
+
+        Returns:
+            The ssh command as a list.
+        """
+        try:
+            self.setup_master_ssh(self._settings.connect_timeout)
+        except Error:
+            self.log.warning('Failed to create master ssh connection, using '
+                             'a normal ssh connection for the session.')
+        extra_options = {'BatchMode': True}
+        if self._master_ssh_proc:
+            extra_options['ControlPath'] = self.socket_path
+        return self._formatter.format_ssh_command(
+            command, self._settings, extra_options=extra_options)
+
     def run_async(self, command, env=None):
         """Starts up a background command over ssh.
 
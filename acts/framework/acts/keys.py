@@ -36,6 +36,9 @@ class Config(enum.Enum):
     key_random = "random"
     key_test_case_iterations = "test_case_iterations"
     key_test_failure_tracebacks = "test_failure_tracebacks"
+    key_reuse_controllers = "reuse_controllers"
+    key_test_shard = "test_shard"
+    key_profile_interval_ms = "profile_interval_ms"
     # Config names for controllers packaged in ACTS.
     key_android_device = "AndroidDevice"
     key_chameleon_device = "ChameleonDevice"
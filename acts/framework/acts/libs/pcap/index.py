@@ -0,0 +1,263 @@
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+
+import numpy
+
+from acts.libs.pcap import reader
+
+# The suffix of the index file saved next to a capture.
+INDEX_SUFFIX = '.index.npz'
+
+# The time added before the begin and after the end of a test when its frames
+# are extracted, in seconds.
+DEFAULT_TEST_MARGIN = 1.0
+
+# The snapshot length written in the header of extracted files.
+_EXTRACT_SNAPLEN = 262144
+
+_FIELDS = ('timestamps', 'offsets', 'captured_lengths', 'original_lengths',
+           'link_types')
+
+
+class PcapIndex(object):
+    """The timestamps and positions of the frames of a capture.
+
+    With an index, the frames of a time range are found with a binary search
+    and read directly from the file, without parsing the frames before them.
+
+    Attributes:
+        timestamps: numpy array of the frame timestamps, in nanoseconds since
+                    the epoch.
+        offsets: numpy array of the positions of the frame data in the file.
+        captured_lengths: numpy array of the number of bytes of each frame
+                          in the file.
+        original_lengths: numpy array of the lengths of the frames on the
+                          wire.
+        link_types: numpy array of the link type of each frame.
+    """
+
+    def __init__(self, timestamps, offsets, captured_lengths,
+                 original_lengths, link_types):
+        self.timestamps = numpy.asarray(timestamps, dtype=numpy.int64)
+        self.offsets = numpy.asarray(offsets, dtype=numpy.int64)
+        self.captured_lengths = numpy.asarray(
+            captured_lengths, dtype=numpy.uint32)
+        self.original_lengths = numpy.asarray(
+            original_lengths, dtype=numpy.uint32)
+        self.link_types = numpy.asarray(link_types, dtype=numpy.uint16)
+        self._sorted = bool(numpy.all(numpy.diff(self.timestamps) >= 0))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Creates the index of a list of reader.Frames."""
+        if not frames:
+            return cls([], [], [], [], [])
+        return cls(*zip(*frames))
+
+    @classmethod
+    def build(cls, path):
+        """Creates the index of a pcap or pcapng file by reading all of it.
+
+        Args:
+            path: The path of the capture.
+
+        Returns:
+            A PcapIndex.
+
+        Raises:
+            reader.Error: If the file is not a pcap or pcapng file.
+        """
+        with reader.PcapReader(path) as pcap:
+            return cls.from_frames(list(pcap.frames()))
+
+    @classmethod
+    def load(cls, path):
+        """Loads an index saved with save."""
+        with numpy.load(path) as saved:
+            return cls(*[saved[field] for field in _FIELDS])
+
+    def save(self, path):
+        """Saves the index, e.g. to the index path of the capture."""
+        with open(path, 'wb') as f:
+            numpy.savez(f, **{field: getattr(self, field)
+                              for field in _FIELDS})
+
+    @classmethod
+    def for_capture(cls, path):
+        """Gets the index of a capture, building it if it is not saved.
+
+        The index is saved next to the capture, see index_path, so that it
+        is only built once. A saved index older than the capture is rebuilt.
+
+        Args:
+            path: The path of the capture.
+
+        Returns:
+            A PcapIndex.
+        """
+        saved_path = index_path(path)
+        if (os.path.exists(saved_path)
+                and os.path.getmtime(saved_path) >= os.path.getmtime(path)):
+            return cls.load(saved_path)
+        index = cls.build(path)
+        index.save(saved_path)
+        return index
+
+    def select(self, start_time=None, end_time=None):
+        """Finds the frames of a time range.
+
+        Args:
+            start_time: The start of the range in seconds since the epoch, or
+                        None for the start of the capture.
+            end_time: The end of the range in seconds since the epoch, or None
+                      for the end of the capture. Frames at end_time are in
+                      the range.
+
+        Returns:
+            numpy array of the indices of the frames in the range, in file
+            order.
+        """
+        start = (None if start_time is None else
+                 numpy.int64(round(start_time * 1e9)))
+        end = None if end_time is None else numpy.int64(round(end_time * 1e9))
+        if self._sorted:
+            first = (0 if start is None else numpy.searchsorted(
+                self.timestamps, start, side='left'))
+            last = (len(self) if end is None else numpy.searchsorted(
+                self.timestamps, end, side='right'))
+            return numpy.arange(first, max(first, last))
+        mask = numpy.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps <= end
+        return numpy.flatnonzero(mask)
+
+
+def index_path(path):
+    """Returns the path of the saved index of a capture."""
+    return path + INDEX_SUFFIX
+
+
+def extract(pcap_paths, output_path, start_time=None, end_time=None,
+            addresses=None, frame_types=None):
+    """Copies the frames of captures that match some filters to a new pcap.
+
+    The frames are read with their index, see PcapIndex.for_capture, so only
+    the frames in the time range are read from the captures. The output is a
+    pcap file with microsecond timestamps. Frames with a different link type
+    than the first matching frame are left out.
+
+    Args:
+        pcap_paths: The path of a capture, or a list of the paths of the files
+                    of a capture, e.g. RotatingPcapWriter.files, in order.
+        output_path: The path of the pcap file to write.
+        start_time: The start of the time range in seconds since the epoch, or
+                    None for no start.
+        end_time: The end of the time range in seconds since the epoch, or
+                  None for no end.
+        addresses: A list of MAC addresses like 'aa:bb:cc:dd:ee:ff'. If given,
+                   only the frames to or from one of them are kept.
+        frame_types: A list of 802.11 frame types, e.g.
+                     reader.FRAME_TYPE_DATA, or of (type, subtype) tuples. If
+                     given, only the frames of these types are kept.
+
+    Returns:
+        The number of frames written.
+    """
+    if isinstance(pcap_paths, str):
+        pcap_paths = [pcap_paths]
+    address_filter = (set(reader.mac_to_bytes(mac) for mac in addresses)
+                      if addresses else None)
+    type_filter = set(frame_types) if frame_types else None
+    link_type = None
+    count = 0
+    with open(output_path, 'wb') as output:
+        for path in pcap_paths:
+            index = PcapIndex.for_capture(path)
+            selected = index.select(start_time, end_time)
+            if not len(selected):
+                continue
+            with reader.PcapReader(path) as pcap:
+                for i in selected:
+                    frame = reader.Frame(
+                        int(index.timestamps[i]), int(index.offsets[i]),
+                        int(index.captured_lengths[i]),
+                        int(index.original_lengths[i]),
+                        int(index.link_types[i]))
+                    if link_type is None:
+                        link_type = frame.link_type
+                        output.write(_pcap_global_header(link_type))
+                    elif frame.link_type != link_type:
+                        continue
+                    data = pcap.read(frame)
+                    if not _matches(data, frame.link_type, address_filter,
+                                    type_filter):
+                        continue
+                    seconds, nanoseconds = divmod(frame.timestamp, 1000000000)
+                    output.write(
+                        struct.pack('<IIII', seconds, nanoseconds // 1000,
+                                    frame.captured_length,
+                                    frame.original_length))
+                    output.write(data)
+                    count += 1
+        if link_type is None:
+            output.write(_pcap_global_header(reader.LINKTYPE_ETHERNET))
+    return count
+
+
+def extract_test_frames(pcap_paths, output_path, record,
+                        margin=DEFAULT_TEST_MARGIN, **filters):
+    """Copies the frames captured while a test ran to a new pcap.
+
+    Args:
+        pcap_paths: The path or list of paths of the capture files.
+        output_path: The path of the pcap file to write.
+        record: The records.TestResultRecord of the test.
+        margin: The number of seconds before the begin and after the end of
+                the test to also extract.
+        filters: The addresses and frame_types arguments of extract.
+
+    Returns:
+        The number of frames written.
+    """
+    start_time = record.begin_time / 1000.0 - margin
+    end_time = (None if record.end_time is None else
+                record.end_time / 1000.0 + margin)
+    return extract(pcap_paths, output_path, start_time, end_time, **filters)
+
+
+def _matches(data, link_type, address_filter, type_filter):
+    """Checks a frame against the address and frame type filters."""
+    if type_filter is not None:
+        kind = reader.frame_type(data, link_type)
+        if kind is None or (kind not in type_filter
+                            and kind[0] not in type_filter):
+            return False
+    if address_filter is not None:
+        if not address_filter.intersection(
+                reader.frame_addresses(data, link_type)):
+            return False
+    return True
+
+
+def _pcap_global_header(link_type):
+    return struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, _EXTRACT_SNAPLEN,
+                       link_type)
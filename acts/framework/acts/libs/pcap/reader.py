@@ -0,0 +1,309 @@
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Reads the frames of pcap and pcapng files.
+
+The files are memory mapped, so that only the parts that are used are read
+from disk and the size of a file does not matter.
+"""
+
+import collections
+import mmap
+import struct
+
+PCAP_GLOBAL_HEADER_SIZE = 24
+PCAP_RECORD_HEADER_SIZE = 16
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+FRAME_TYPE_MANAGEMENT = 0
+FRAME_TYPE_CONTROL = 1
+FRAME_TYPE_DATA = 2
+
+# The byte order and the number of nanoseconds per unit of the fractional
+# part of the timestamps of the pcap formats, by their magic number as
+# written in the first four bytes of the file.
+PCAP_FORMATS = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1000),
+    b'\xa1\xb2\xc3\xd4': ('>', 1000),
+    b'\x4d\x3c\xb2\xa1': ('<', 1),
+    b'\xa1\xb2\x3c\x4d': ('>', 1),
+}
+
+_PCAPNG_SECTION_HEADER = 0x0A0D0D0A
+_PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+_PCAPNG_INTERFACE_DESCRIPTION = 1
+_PCAPNG_PACKET = 2
+_PCAPNG_SIMPLE_PACKET = 3
+_PCAPNG_ENHANCED_PACKET = 6
+_PCAPNG_OPTION_END = 0
+_PCAPNG_OPTION_TSRESOL = 9
+
+# Control frames which only have a receiver address: CTS and ACK.
+_CONTROL_SUBTYPES_WITHOUT_TRANSMITTER = (12, 13)
+
+# A frame of a capture. The timestamp is in nanoseconds since the epoch and
+# the offset is the position of the frame data in the file.
+Frame = collections.namedtuple('Frame', [
+    'timestamp', 'offset', 'captured_length', 'original_length', 'link_type'
+])
+
+
+class Error(Exception):
+    """Raised when a file is not a valid pcap or pcapng file."""
+
+
+class PcapReader(object):
+    """Reads the frames of a pcap or pcapng file.
+
+    Usage:
+        with PcapReader(path) as reader:
+            for frame in reader.frames():
+                data = reader.read(frame)
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: The path of the pcap or pcapng file.
+
+        Raises:
+            Error: If the file is neither a pcap nor a pcapng file.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            self._file.close()
+            raise Error('%s is empty.' % path)
+        magic = self._map[:4]
+        if magic in PCAP_FORMATS:
+            self.is_pcapng = False
+        elif magic == struct.pack('<I', _PCAPNG_SECTION_HEADER):
+            self.is_pcapng = True
+        else:
+            self.close()
+            raise Error('%s is not a pcap or pcapng file.' % path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Closes the file."""
+        self._map.close()
+        self._file.close()
+
+    def frames(self):
+        """Returns an iterator of the Frames of the file, in file order."""
+        if self.is_pcapng:
+            return self._pcapng_frames()
+        return self._pcap_frames()
+
+    def read(self, frame):
+        """Reads the data of a frame.
+
+        Args:
+            frame: A Frame of this file, or any object with the offset and
+                   captured_length of a frame.
+
+        Returns:
+            The captured bytes of the frame.
+        """
+        return self._map[frame.offset:frame.offset + frame.captured_length]
+
+    def _pcap_frames(self):
+        data = self._map
+        byte_order, fraction_ns = PCAP_FORMATS[data[:4]]
+        link_type, = struct.unpack_from(byte_order + 'I', data, 20)
+        record_header = struct.Struct(byte_order + 'IIII')
+        offset = PCAP_GLOBAL_HEADER_SIZE
+        size = len(data)
+        while offset + PCAP_RECORD_HEADER_SIZE <= size:
+            seconds, fraction, captured_length, original_length = (
+                record_header.unpack_from(data, offset))
+            offset += PCAP_RECORD_HEADER_SIZE
+            if offset + captured_length > size:
+                # The last frame was cut off, e.g. by a capture in progress.
+                break
+            yield Frame(seconds * 1000000000 + fraction * fraction_ns, offset,
+                        captured_length, original_length, link_type)
+            offset += captured_length
+
+    def _pcapng_frames(self):
+        data = self._map
+        size = len(data)
+        offset = 0
+        byte_order = '<'
+        interfaces = []
+        timestamp = 0
+        while offset + 12 <= size:
+            block_type, = struct.unpack_from('<I', data, offset)
+            if block_type == _PCAPNG_SECTION_HEADER:
+                magic, = struct.unpack_from('<I', data, offset + 8)
+                byte_order = '<' if magic == _PCAPNG_BYTE_ORDER_MAGIC else '>'
+                interfaces = []
+            else:
+                block_type, = struct.unpack_from(byte_order + 'I', data,
+                                                 offset)
+            block_length, = struct.unpack_from(byte_order + 'I', data,
+                                               offset + 4)
+            if block_length < 12 or offset + block_length > size:
+                break
+            body = offset + 8
+            body_end = offset + block_length - 4
+            if block_type == _PCAPNG_INTERFACE_DESCRIPTION:
+                interfaces.append(
+                    self._pcapng_interface(byte_order, body, body_end))
+            elif block_type in (_PCAPNG_ENHANCED_PACKET, _PCAPNG_PACKET):
+                if block_type == _PCAPNG_ENHANCED_PACKET:
+                    interface_id, = struct.unpack_from(
+                        byte_order + 'I', data, body)
+                else:
+                    interface_id, = struct.unpack_from(
+                        byte_order + 'H', data, body)
+                high, low, captured_length, original_length = (
+                    struct.unpack_from(byte_order + 'IIII', data, body + 4))
+                link_type, to_ns = interfaces[interface_id]
+                timestamp = to_ns((high << 32) | low)
+                yield Frame(timestamp, body + 20, captured_length,
+                            original_length, link_type)
+            elif block_type == _PCAPNG_SIMPLE_PACKET:
+                # Simple packets have no timestamp, they are given the one of
+                # the frame before them.
+                original_length, = struct.unpack_from(byte_order + 'I', data,
+                                                      body)
+                captured_length = min(original_length, body_end - body - 4)
+                yield Frame(timestamp, body + 4, captured_length,
+                            original_length, interfaces[0][0])
+            offset += block_length
+
+    def _pcapng_interface(self, byte_order, body, body_end):
+        """Parses an interface description block.
+
+        Returns:
+            A tuple of the link type of the interface and a function which
+            converts its timestamps to nanoseconds.
+        """
+        data = self._map
+        link_type, = struct.unpack_from(byte_order + 'H', data, body)
+        resolution = 6
+        offset = body + 8
+        while offset + 4 <= body_end:
+            code, length = struct.unpack_from(byte_order + 'HH', data, offset)
+            if code == _PCAPNG_OPTION_END:
+                break
+            if code == _PCAPNG_OPTION_TSRESOL:
+                resolution = data[offset + 4]
+            offset += 4 + (length + 3) // 4 * 4
+        return link_type, _timestamp_converter(resolution)
+
+
+def _timestamp_converter(resolution):
+    """Returns a function converting pcapng timestamps to nanoseconds.
+
+    Args:
+        resolution: The if_tsresol option of the interface. The timestamps
+                    are in units of 10^-resolution seconds, or of
+                    2^-resolution seconds if the high bit is set.
+    """
+    if resolution & 0x80:
+        units_per_second = 2**(resolution & 0x7f)
+        return lambda units: units * 1000000000 // units_per_second
+    if resolution <= 9:
+        scale = 10**(9 - resolution)
+        return lambda units: units * scale
+    scale = 10**(resolution - 9)
+    return lambda units: units // scale
+
+
+def ieee80211_header_offset(data, link_type):
+    """Finds the 802.11 header of a frame.
+
+    Args:
+        data: The bytes of the frame.
+        link_type: The link type of the frame.
+
+    Returns:
+        The offset of the 802.11 header in data, or None if the frame is not
+        an 802.11 frame.
+    """
+    if link_type == LINKTYPE_IEEE802_11:
+        return 0
+    if link_type == LINKTYPE_IEEE802_11_RADIOTAP and len(data) >= 4:
+        radiotap_length, = struct.unpack_from('<H', data, 2)
+        return radiotap_length
+    return None
+
+
+def frame_type(data, link_type):
+    """Gets the 802.11 type of a frame.
+
+    Args:
+        data: The bytes of the frame.
+        link_type: The link type of the frame.
+
+    Returns:
+        A tuple of the type, e.g. FRAME_TYPE_DATA, and the subtype of the
+        frame, or None if it is not an 802.11 frame.
+    """
+    offset = ieee80211_header_offset(data, link_type)
+    if offset is None or len(data) < offset + 2:
+        return None
+    frame_control = data[offset]
+    return (frame_control >> 2) & 0x3, frame_control >> 4
+
+
+def frame_addresses(data, link_type):
+    """Gets the MAC addresses of a frame.
+
+    Args:
+        data: The bytes of the frame.
+        link_type: The link type of the frame.
+
+    Returns:
+        A list of the addresses in the 802.11 or ethernet header of the
+        frame, each as 6 bytes.
+    """
+    if link_type == LINKTYPE_ETHERNET:
+        return [data[0:6], data[6:12]] if len(data) >= 12 else []
+    offset = ieee80211_header_offset(data, link_type)
+    if offset is None or len(data) < offset + 10:
+        return []
+    frame_control, flags = data[offset], data[offset + 1]
+    kind, subtype = (frame_control >> 2) & 0x3, frame_control >> 4
+    if kind == FRAME_TYPE_CONTROL:
+        count = 1 if subtype in _CONTROL_SUBTYPES_WITHOUT_TRANSMITTER else 2
+    elif kind == FRAME_TYPE_DATA and flags & 0x3 == 0x3:
+        # Frames with both to DS and from DS set have a fourth address after
+        # the sequence control field.
+        count = 4
+    else:
+        count = 3
+    positions = [4, 10, 16, 24][:count]
+    return [
+        data[offset + position:offset + position + 6]
+        for position in positions if len(data) >= offset + position + 6
+    ]
+
+
+def mac_to_bytes(mac):
+    """Converts a MAC address like 'aa:bb:cc:dd:ee:ff' to 6 bytes."""
+    return bytes.fromhex(mac.replace(':', '').replace('-', ''))
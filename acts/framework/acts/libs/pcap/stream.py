@@ -0,0 +1,322 @@
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import re
+import struct
+import subprocess
+import threading
+
+from acts.libs.pcap import index as pcap_index
+from acts.libs.pcap import reader
+
+# The size of each file written from a stream, like tcpdump -C 50.
+DEFAULT_FILE_SIZE = 50 * 1000 * 1000
+
+PCAP_GLOBAL_HEADER_SIZE = reader.PCAP_GLOBAL_HEADER_SIZE
+PCAP_RECORD_HEADER_SIZE = reader.PCAP_RECORD_HEADER_SIZE
+
+# The size of the reads from the stream.
+_READ_SIZE = 65536
+
+# The statistics tcpdump prints on stderr when it exits.
+_TCPDUMP_STATS = {
+    'packets_captured': re.compile(r'(\d+) packets? captured'),
+    'packets_received': re.compile(r'(\d+) packets? received by filter'),
+    'packets_dropped': re.compile(r'(\d+) packets? dropped by kernel'),
+}
+
+# The line tcpdump prints on stderr once it is capturing.
+_LISTENING = 'listening on'
+
+# The line printed before tcpdump starts, with the pid it runs as.
+_PID_LINE = re.compile(r'^pid (\d+)$')
+
+# A remote command that streams the packets captured on an interface to its
+# standard output. The shell prints its pid on stderr before it becomes
+# tcpdump, so the capture can be stopped with a signal and print its
+# statistics.
+TCPDUMP_STREAM_COMMAND = ('sh -c \'echo "pid $$" >&2; '
+                          'exec tcpdump -i %s -U -w -\'')
+
+
+class Error(Exception):
+    """Raised when a stream is not a valid pcap stream."""
+
+
+class RotatingPcapWriter(object):
+    """Writes a pcap byte stream into files of limited size.
+
+    The stream is split on packet boundaries, and every file starts with the
+    global header of the stream so that each one is a valid pcap file. The
+    files are named like the files of tcpdump -C, i.e. the path prefix
+    followed by a two digit file number.
+
+    Attributes:
+        files: The paths of the files that are kept, oldest first.
+        bytes_received: The number of bytes given to write.
+        packets: The number of complete packets written.
+        files_deleted: The number of files removed to keep max_files.
+    """
+
+    def __init__(self, path_prefix, file_size=DEFAULT_FILE_SIZE,
+                 max_files=None, index=False):
+        """
+        Args:
+            path_prefix: The path of the files without the file number.
+            file_size: The size in bytes after which a new file is started.
+                       A file is only bigger if it holds a single packet.
+            max_files: The number of files to keep. Once more are written the
+                       oldest is removed, making the files a ring buffer of
+                       the last max_files * file_size bytes. None keeps all
+                       the files.
+            index: True to save the pcap_index.PcapIndex of each file next
+                   to it once the file is complete, so that frames can be
+                   extracted from it without reading the whole file.
+        """
+        self._path_prefix = path_prefix
+        self._file_size = file_size
+        self._max_files = max_files
+        self._index = [] if index else None
+        self._buffer = bytearray()
+        self._header = None
+        self._record_format = None
+        self._fraction_ns = None
+        self._link_type = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_number = 0
+        self.files = []
+        self.bytes_received = 0
+        self.packets = 0
+        self.files_deleted = 0
+
+    def write(self, data):
+        """Writes the complete packets of the stream received so far.
+
+        Args:
+            data: The next bytes of the stream.
+
+        Raises:
+            Error: If the stream does not start with a pcap global header.
+        """
+        self.bytes_received += len(data)
+        buffer = self._buffer
+        buffer.extend(data)
+        if self._header is None:
+            if len(buffer) < PCAP_GLOBAL_HEADER_SIZE:
+                return
+            pcap_format = reader.PCAP_FORMATS.get(bytes(buffer[:4]))
+            if pcap_format is None:
+                raise Error('Not a pcap stream, magic number %r.' %
+                            bytes(buffer[:4]))
+            byte_order, self._fraction_ns = pcap_format
+            self._header = bytes(buffer[:PCAP_GLOBAL_HEADER_SIZE])
+            self._record_format = byte_order + 'IIII'
+            self._link_type, = struct.unpack_from(byte_order + 'I', buffer, 20)
+            del buffer[:PCAP_GLOBAL_HEADER_SIZE]
+            self._open_next_file()
+
+        # Packets are written in runs so that a read of many small packets
+        # results in a single write per file.
+        start = offset = 0
+        while len(buffer) - offset >= PCAP_RECORD_HEADER_SIZE:
+            seconds, fraction, captured_length, original_length = (
+                struct.unpack_from(self._record_format, buffer, offset))
+            end = offset + PCAP_RECORD_HEADER_SIZE + captured_length
+            if end > len(buffer):
+                break
+            pending = offset - start
+            if (self._file_bytes + pending + end - offset > self._file_size
+                    and self._file_bytes + pending > len(self._header)):
+                self._write_to_file(buffer[start:offset])
+                self._open_next_file()
+                start = offset
+            if self._index is not None:
+                # The fields of a reader.Frame.
+                self._index.append(
+                    (seconds * 1000000000 + fraction * self._fraction_ns,
+                     self._file_bytes + offset - start +
+                     PCAP_RECORD_HEADER_SIZE, captured_length,
+                     original_length, self._link_type))
+            offset = end
+            self.packets += 1
+        self._write_to_file(buffer[start:offset])
+        del buffer[:offset]
+
+    def close(self):
+        """Closes the current file.
+
+        Returns:
+            The number of bytes of an incomplete packet at the end of the
+            stream, which are not written.
+        """
+        self._close_file()
+        return len(self._buffer)
+
+    def _write_to_file(self, data):
+        if data:
+            self._file.write(data)
+            self._file_bytes += len(data)
+
+    def _close_file(self):
+        """Closes the current file and saves its index."""
+        if not self._file:
+            return
+        self._file.close()
+        self._file = None
+        if self._index is not None:
+            pcap_index.PcapIndex.from_frames(self._index).save(
+                pcap_index.index_path(self.files[-1]))
+            self._index = []
+
+    def _open_next_file(self):
+        """Starts a new file, removing the oldest one if there are too many."""
+        self._close_file()
+        path = '%s%02i' % (self._path_prefix, self._file_number)
+        self._file_number += 1
+        self._file = open(path, 'wb')
+        self._file.write(self._header)
+        self._file_bytes = len(self._header)
+        self.files.append(path)
+        if self._max_files and len(self.files) > self._max_files:
+            removed = self.files.pop(0)
+            os.remove(removed)
+            if os.path.exists(pcap_index.index_path(removed)):
+                os.remove(pcap_index.index_path(removed))
+            self.files_deleted += 1
+
+
+class PcapStream(object):
+    """Saves the pcap stream printed by a process, e.g. a remote tcpdump.
+
+    Two threads read the standard output of the process into a
+    RotatingPcapWriter and its standard error for the state of tcpdump, until
+    the process exits.
+
+    Attributes:
+        remote_pid: The pid printed by the process before tcpdump started,
+                    see TCPDUMP_STREAM_COMMAND, or None.
+        writer: The RotatingPcapWriter the stream is written to.
+    """
+
+    def __init__(self, process, writer, name=None):
+        """
+        Args:
+            process: A subprocess.Popen with stdout and stderr pipes.
+            writer: The RotatingPcapWriter to write the stream to.
+            name: A name used in log messages, e.g. the band.
+        """
+        self._process = process
+        self.writer = writer
+        self._name = name or 'pcap stream'
+        self.remote_pid = None
+        self._listening = False
+        self._start_event = threading.Event()
+        self._stderr_lines = []
+        self._truncated_bytes = 0
+        self._threads = [
+            threading.Thread(target=self._read_stdout),
+            threading.Thread(target=self._read_stderr)
+        ]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def _read_stdout(self):
+        """Writes the standard output of the process until it closes."""
+        try:
+            while True:
+                data = os.read(self._process.stdout.fileno(), _READ_SIZE)
+                if not data:
+                    break
+                self.writer.write(data)
+        except (Error, OSError) as e:
+            logging.error('Stopped writing %s: %s', self._name, e)
+        finally:
+            self._truncated_bytes = self.writer.close()
+
+    def _read_stderr(self):
+        """Reads the pid and the state of tcpdump from standard error."""
+        for line in self._process.stderr:
+            line = line.decode('utf-8', 'replace').strip()
+            match = _PID_LINE.match(line)
+            if match and self.remote_pid is None:
+                self.remote_pid = int(match.group(1))
+                continue
+            self._stderr_lines.append(line)
+            if _LISTENING in line:
+                self._listening = True
+                self._start_event.set()
+        self._start_event.set()
+
+    def wait_for_start(self, timeout):
+        """Waits for tcpdump to report that it is capturing.
+
+        Args:
+            timeout: The time to wait in seconds.
+
+        Returns:
+            True if tcpdump started, False if it exited or did not start in
+            time.
+        """
+        self._start_event.wait(timeout)
+        return self._listening
+
+    def join(self, timeout=None):
+        """Waits for the process to exit and the stream to be saved.
+
+        Args:
+            timeout: The time to wait for the process in seconds.
+
+        Returns:
+            True if the process exited, False if it is still running.
+        """
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        for thread in self._threads:
+            thread.join()
+        return True
+
+    def close(self):
+        """Kills the local process and waits for the stream to be saved."""
+        if self._process.poll() is None:
+            self._process.kill()
+        self.join()
+
+    @property
+    def stats(self):
+        """A dictionary of statistics about the stream.
+
+        The byte, packet and file counts are updated as the stream is saved.
+        The tcpdump packet counts are only known once it has exited and are
+        None until then.
+        """
+        stats = {
+            'bytes_received': self.writer.bytes_received,
+            'packets_written': self.writer.packets,
+            'files': len(self.writer.files),
+            'files_deleted': self.writer.files_deleted,
+            'truncated_bytes': self._truncated_bytes,
+        }
+        for key, pattern in _TCPDUMP_STATS.items():
+            stats[key] = None
+            for line in self._stderr_lines:
+                match = pattern.search(line)
+                if match:
+                    stats[key] = int(match.group(1))
+        return stats
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3.4
+#
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A sampling profiler of the host side of a test run.
+
+A background thread takes the Python stack of every thread at a fixed
+interval, along with the CPU time each thread used since the previous sample.
+A thread waiting on a device, e.g. for an RPC response or an adb command to
+finish, uses no CPU time, so the profile tells the time spent in host-side
+Python apart from the time spent waiting. Samples are grouped by the label
+set with set_label, which the test runner and BaseTestClass set to the test
+class and test case being run.
+
+Taking a sample walks the stacks of all threads. At the default interval the
+overhead is about 1% of a CPU for ten threads, and is written in the summary.
+"""
+
+import collections
+import os
+import re
+import sys
+import threading
+import time
+
+DEFAULT_INTERVAL = 0.01
+# Deeper stacks are truncated to their innermost frames.
+MAX_DEPTH = 128
+# The label of samples taken outside of test classes.
+RUNNER_LABEL = 'runner'
+SUMMARY_FILE_NAME = 'profile_summary.txt'
+TOP_FUNCTIONS = 30
+
+_HAS_THREAD_CPU_CLOCK = hasattr(time, 'pthread_getcpuclockid')
+
+_label = None
+
+
+def set_label(label):
+    """Sets the label of the samples taken from now on.
+
+    Args:
+        label: the name of the test class or test case being run, or None
+            outside of test classes.
+    """
+    global _label
+    _label = label
+
+
+def get_label():
+    """Returns the label of the samples taken now."""
+    return _label or RUNNER_LABEL
+
+
+def _get_thread_cpu_time(thread_id):
+    """Returns the CPU time used by a thread (s), or None if unknown."""
+    if not _HAS_THREAD_CPU_CLOCK:
+        return None
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+    except OSError:
+        # The thread has exited since the stacks were taken.
+        return None
+
+
+def get_function_name(code):
+    """Returns the name of a function in stacks, e.g. 'rpc (rpc_client.py:99)'.
+
+    Args:
+        code: the code object of the function.
+    """
+    return '%s (%s:%d)' % (code.co_name, os.path.basename(code.co_filename),
+                           code.co_firstlineno)
+
+
+class Profiler(object):
+    """Samples the stacks of all threads of this process.
+
+    Attributes:
+        interval: the time between samples (s).
+        overhead: the total time spent taking samples (s).
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.overhead = 0
+        # Maps (label, stack) to [wall time, CPU time], where stack is a tuple
+        # of code objects from the outermost frame.
+        self._stacks = collections.defaultdict(lambda: [0, 0])
+        # Maps a label to [elapsed time, CPU time].
+        self._label_times = collections.defaultdict(lambda: [0, 0])
+        self._cpu_times = {}
+        self._last_sample_time = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Starts taking samples in the background.
+
+        A profiler may be started again after being stopped, the samples are
+        added to the ones already taken.
+        """
+        if self._thread is not None:
+            return
+        self._last_sample_time = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='Profiler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops taking samples."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        thread_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.sample(ignored_thread_id=thread_id)
+
+    def sample(self, ignored_thread_id=None):
+        """Adds the current stack of every thread to the profile.
+
+        Each stack is weighted by the time since the previous sample, and by
+        the CPU time its thread used in that time. The frame of this call is
+        left out of the stack of the calling thread.
+
+        Args:
+            ignored_thread_id: the id of a thread not to sample, i.e. the
+                thread taking the samples.
+        """
+        start_time = time.monotonic()
+        if self._last_sample_time is None:
+            elapsed = self.interval
+        else:
+            elapsed = start_time - self._last_sample_time
+        self._last_sample_time = start_time
+        label = get_label()
+        label_times = self._label_times[label]
+        label_times[0] += elapsed
+        current_thread_id = threading.get_ident()
+        cpu_times = {}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == ignored_thread_id:
+                continue
+            cpu_time = _get_thread_cpu_time(thread_id)
+            cpu_times[thread_id] = cpu_time
+            previous_cpu_time = self._cpu_times.get(thread_id)
+            if cpu_time is None or previous_cpu_time is None:
+                cpu = 0
+            else:
+                cpu = cpu_time - previous_cpu_time
+            if thread_id == current_thread_id:
+                frame = frame.f_back
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            times = self._stacks[(label, tuple(stack))]
+            times[0] += elapsed
+            times[1] += cpu
+            label_times[1] += cpu
+        self._cpu_times = cpu_times
+        self.overhead += time.monotonic() - start_time
+
+    def get_labels(self):
+        """Returns the labels of the samples, in the order they were taken."""
+        return list(self._label_times)
+
+    def get_label_times(self, label):
+        """Returns the (elapsed time, CPU time) sampled under a label (s).
+
+        The CPU time is the sum of the CPU time of all threads, and may be
+        greater than the elapsed time.
+        """
+        return tuple(self._label_times.get(label, (0, 0)))
+
+    def get_collapsed_stacks(self, label, cpu=True):
+        """Returns the stacks sampled under a label.
+
+        Args:
+            label: the label of the samples.
+            cpu: if True, stacks are weighted by CPU time. Otherwise they are
+                weighted by the time threads spent in them, busy or not.
+
+        Returns:
+            A dict mapping stacks in the collapsed format, e.g.
+            'main (act.py:143);run (test_runner.py:607)', to their time (s).
+        """
+        weight_index = 1 if cpu else 0
+        collapsed = collections.defaultdict(float)
+        for (stack_label, stack), times in self._stacks.items():
+            if stack_label == label and times[weight_index]:
+                key = ';'.join(get_function_name(code) for code in stack)
+                collapsed[key] += times[weight_index]
+        return dict(collapsed)
+
+    def get_top_functions(self, count=TOP_FUNCTIONS, inclusive=False):
+        """Returns the functions that used the most CPU time.
+
+        Args:
+            count: the number of functions to return.
+            inclusive: if True, the CPU time of a function includes the time
+                spent in the functions it called.
+
+        Returns:
+            A list of (function name, CPU time) tuples, highest first.
+        """
+        cpu_times = collections.defaultdict(float)
+        for (_, stack), (_, cpu) in self._stacks.items():
+            if not cpu or not stack:
+                continue
+            if inclusive:
+                for code in set(stack):
+                    cpu_times[code] += cpu
+            else:
+                cpu_times[stack[-1]] += cpu
+        top = sorted(cpu_times.items(), key=lambda item: -item[1])[:count]
+        return [(get_function_name(code), cpu) for code, cpu in top]
+
+    def write(self, directory):
+        """Writes the profile into a directory.
+
+        For each label, <label>.cpu.collapsed and <label>.wall.collapsed hold
+        the stacks weighted by CPU and wall time (ms), in the format read by
+        flamegraph.pl. The time and the top functions of each label are
+        written to profile_summary.txt.
+
+        Args:
+            directory: the directory to write to, created if needed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for label in self.get_labels():
+            file_name = re.sub(r'[^\w.-]', '_', label)
+            for kind, cpu in (('cpu', True), ('wall', False)):
+                path = os.path.join(directory,
+                                    '%s.%s.collapsed' % (file_name, kind))
+                with open(path, 'w') as f:
+                    stacks = self.get_collapsed_stacks(label, cpu=cpu)
+                    for stack, weight in sorted(stacks.items()):
+                        f.write('%s %d\n' % (stack, round(weight * 1000)))
+        with open(os.path.join(directory, SUMMARY_FILE_NAME), 'w') as f:
+            f.write(self.summary_str())
+
+    def summary_str(self):
+        """Returns a summary of where the host CPU time was spent."""
+        lines = [
+            'Sampled every %g ms, sampling took %.3f s.' %
+            (self.interval * 1000, self.overhead), '',
+            '%12s %12s  %s' % ('Elapsed (s)', 'CPU (s)', 'Label')
+        ]
+        total_cpu = 0
+        for label in self.get_labels():
+            elapsed, cpu = self.get_label_times(label)
+            total_cpu += cpu
+            lines.append('%12.3f %12.3f  %s' % (elapsed, cpu, label))
+        for title, inclusive in (('self', False), ('inclusive', True)):
+            lines += [
+                '', 'Top functions by %s CPU time:' % title,
+                '%12s %12s  %s' % ('CPU (s)', 'CPU (%)', 'Function')
+            ]
+            for name, cpu in self.get_top_functions(inclusive=inclusive):
+                lines.append('%12.3f %12.1f  %s' %
+                             (cpu, 100 * cpu / total_cpu, name))
+        return '\n'.join(lines) + '\n'
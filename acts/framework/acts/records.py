@@ -16,9 +16,12 @@
 """This module is where all the record definitions and record containers live.
 """
 
+import collections
+import contextlib
 import json
 import logging
 import pprint
+import time
 
 from acts import logger
 from acts import signals
@@ -43,11 +46,17 @@ class TestResultEnums(object):
     RECORD_EXTRAS = "Extras"
     RECORD_ADDITIONAL_ERRORS = "Extra Errors"
     RECORD_DETAILS = "Details"
+    RECORD_PHASE_TIMINGS = "Phase Timings"
+    RECORD_CALLS = "Calls"
     TEST_RESULT_PASS = "PASS"
     TEST_RESULT_FAIL = "FAIL"
     TEST_RESULT_SKIP = "SKIP"
     TEST_RESULT_BLOCKED = "BLOCKED"
     TEST_RESULT_UNKNOWN = "UNKNOWN"
+    PHASE_LOGCAT_RESTART = "logcat_restart"
+    PHASE_SETUP_TEST = "setup_test"
+    PHASE_TEST = "test"
+    PHASE_TEARDOWN_TEST = "teardown_test"
 
 
 class TestResultRecord(object):
@@ -61,6 +70,11 @@ class TestResultRecord(object):
         self.result: Test result, PASS/FAIL/SKIP.
         self.extras: User defined extra information of the test result.
         self.details: A string explaining the details of the test case.
+        self.phase_timings: A dict of phase name => seconds spent in that
+            phase of the test case, e.g. setup_test or on_fail.
+        self.calls: A dict of call kind => {'count': count, 'time': seconds}
+            of the adb commands and RPCs made during the test case, see
+            acts.call_stats.
     """
 
     def __init__(self, t_name, t_class=None):
@@ -75,6 +89,8 @@ class TestResultRecord(object):
         self.extras = None
         self.details = None
         self.additional_errors = {}
+        self.phase_timings = {}
+        self.calls = {}
 
     def test_begin(self):
         """Call this when the test case it records begins execution.
@@ -149,6 +165,29 @@ class TestResultRecord(object):
         """
         self._test_end(TestResultEnums.TEST_RESULT_UNKNOWN, e)
 
+    def add_phase_time(self, phase, duration):
+        """Adds time spent in a phase of the test case.
+
+        Args:
+            phase: The name of the phase, e.g. PHASE_SETUP_TEST.
+            duration: The number of seconds spent.
+        """
+        self.phase_timings[phase] = self.phase_timings.get(phase,
+                                                           0) + duration
+
+    @contextlib.contextmanager
+    def time_phase(self, phase):
+        """Adds the time spent in the with block to a phase of the test case.
+
+        Args:
+            phase: The name of the phase, e.g. PHASE_SETUP_TEST.
+        """
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.add_phase_time(phase, time.time() - start_time)
+
     def add_error(self, tag, e):
         """Add extra error happened during a test mark the test result as
         UNKNOWN.
@@ -192,6 +231,8 @@ class TestResultRecord(object):
         d[TestResultEnums.RECORD_EXTRAS] = self.extras
         d[TestResultEnums.RECORD_DETAILS] = self.details
         d[TestResultEnums.RECORD_ADDITIONAL_ERRORS] = self.additional_errors
+        d[TestResultEnums.RECORD_PHASE_TIMINGS] = self.phase_timings
+        d[TestResultEnums.RECORD_CALLS] = self.calls
         return d
 
     def json_str(self):
@@ -308,6 +349,28 @@ class TestResult(object):
             self.executed.append(record)
             self.unknown.append(record)
 
+    def get_phase_timings(self):
+        """Gets the total time spent in each phase of the test cases, by test
+        class.
+
+        Returns:
+            A dict of test class name => {phase name => seconds}, and
+            {'calls': {call kind => {'count': count, 'time': seconds}}} for the
+            adb commands and RPCs made by its test cases.
+        """
+        summary = collections.OrderedDict()
+        for record in self.executed + self.skipped + self.blocked:
+            class_summary = summary.setdefault(record.test_class, {})
+            for phase, duration in record.phase_timings.items():
+                class_summary[phase] = class_summary.get(phase, 0) + duration
+            for kind, calls in record.calls.items():
+                class_calls = class_summary.setdefault('calls', {}).setdefault(
+                    kind, {'count': 0,
+                           'time': 0})
+                class_calls['count'] += calls['count']
+                class_calls['time'] += calls['time']
+        return summary
+
     @property
     def is_all_pass(self):
         """True if no tests failed or threw errors, False otherwise."""
@@ -337,6 +400,7 @@ class TestResult(object):
         d["Results"] = [record.to_dict() for record in self.executed]
         d["Summary"] = self.summary_dict()
         d["Extras"] = self.extras
+        d["PhaseTimings"] = self.get_phase_timings()
         json_str = json.dumps(d, indent=4, sort_keys=True)
         return json_str
 
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3.4
+#
+# Copyright 2018 - The Android Open Source Project
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Declarative parameter spaces for generated test cases.
+
+A test method decorated with generated_tests is a template, run once for each
+parameter set of a parameter space as a separate test case. Spaces compute
+the parameter set at an index on demand, so defining a large space costs
+nothing when the test class is imported, and sampling, sharding or selecting
+its cases by name does not build the parameter sets of the other cases.
+
+Example:
+    @test_params.generated_tests(test_params.Product(
+        ('scan_mode', ['low_power', 'balanced']),
+        ('tx_power', ['low', 'high'])))
+    def test_scan(self, scan_mode, tx_power):
+        ...
+
+runs 4 test cases, named test_scan_scan_mode_low_power_tx_power_low, etc.
+"""
+
+import bisect
+import collections
+import random
+import re
+
+# Characters of parameter values replaced in test case names.
+_NAME_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9]+')
+
+
+class ParamSpace(object):
+    """An ordered sequence of parameter sets.
+
+    Each parameter set is an OrderedDict of parameter name => value, in the
+    order the parameters were given, passed as keyword arguments to the test
+    method.
+
+    Attributes:
+        names: the names of the parameters, in order.
+        values: the list of values of each parameter, in the same order.
+    """
+
+    def __len__(self):
+        raise NotImplementedError()
+
+    def get(self, index):
+        """Returns the parameter set at a valid, non-negative index."""
+        raise NotImplementedError()
+
+    def find(self, value_indices):
+        """Finds a parameter set by the index of the value of each parameter.
+
+        Args:
+            value_indices: the index in values of the value of each
+                parameter, in the order of names.
+
+        Returns:
+            The index of the parameter set in this space, or None if the
+            space does not contain it.
+        """
+        raise NotImplementedError()
+
+    def __getitem__(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('Parameter set index out of range')
+        return self.get(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.get(index)
+
+    def sample(self, count, seed=0):
+        """Returns a Sample of count parameter sets of this space."""
+        return Sample(self, count, seed)
+
+    def shard(self, index, count):
+        """Returns the Shard index of count of this space."""
+        return Shard(self, index, count)
+
+
+class Product(ParamSpace):
+    """All the combinations of the values of the parameters.
+
+    The combinations are in the order of itertools.product, the last
+    parameter changing fastest.
+    """
+
+    def __init__(self, *params):
+        """Initializes the space.
+
+        Args:
+            params: a (name, values) pair for each parameter. Keyword
+                arguments are not taken, as their order is lost before
+                Python 3.6.
+        """
+        self.names = [name for name, _ in params]
+        self.values = [list(values) for _, values in params]
+
+    def __len__(self):
+        length = 1
+        for values in self.values:
+            length *= len(values)
+        return length
+
+    def get(self, index):
+        params = {}
+        for name, values in reversed(list(zip(self.names, self.values))):
+            index, value_index = divmod(index, len(values))
+            params[name] = values[value_index]
+        return collections.OrderedDict(
+            (name, params[name]) for name in self.names)
+
+    def find(self, value_indices):
+        index = 0
+        for values, value_index in zip(self.values, value_indices):
+            index = index * len(values) + value_index
+        return index
+
+
+class Pairwise(ParamSpace):
+    """Parameter sets covering every pair of values of any two parameters.
+
+    Faults caused by a single parameter or the interaction of two are found
+    with far fewer cases than the Product of many parameters. The cases are
+    chosen greedily, in the same order on every run, when the space is first
+    used.
+    """
+
+    def __init__(self, *params):
+        """Initializes the space.
+
+        Args:
+            params: a (name, values) pair for each parameter, as for Product.
+        """
+        self.names = [name for name, _ in params]
+        self.values = [list(values) for _, values in params]
+        self._cases = None
+
+    def _get_cases(self):
+        if self._cases is None:
+            self._cases = self._generate_cases()
+        return self._cases
+
+    def _generate_cases(self):
+        """Returns the lists of value indices of the covering cases."""
+        sizes = [len(values) for values in self.values]
+        num_params = len(sizes)
+        if num_params < 2 or 0 in sizes:
+            # There are no pairs, every combination is needed.
+            indices = Product(
+                *(('p%d' % k, range(size)) for k, size in enumerate(sizes)))
+            return [list(params.values()) for params in indices]
+        uncovered = set()
+        for i in range(num_params):
+            for j in range(i + 1, num_params):
+                for a in range(sizes[i]):
+                    for b in range(sizes[j]):
+                        uncovered.add((i, a, j, b))
+        cases = []
+        while uncovered:
+            # Start from the first uncovered pair, so every case covers at
+            # least one new pair.
+            i, a, j, b = min(uncovered)
+            case = [None] * num_params
+            case[i] = a
+            case[j] = b
+            for k in range(num_params):
+                if case[k] is not None:
+                    continue
+                # The value covering the most new pairs with the parameters
+                # already chosen, the first one on ties.
+                best_value, best_count = 0, -1
+                for value in range(sizes[k]):
+                    count = 0
+                    for other, other_value in enumerate(case):
+                        if other_value is None:
+                            continue
+                        if other < k:
+                            pair = (other, other_value, k, value)
+                        else:
+                            pair = (k, value, other, other_value)
+                        if pair in uncovered:
+                            count += 1
+                    if count > best_count:
+                        best_value, best_count = value, count
+                case[k] = best_value
+            for k in range(num_params):
+                for l in range(k + 1, num_params):
+                    uncovered.discard((k, case[k], l, case[l]))
+            cases.append(case)
+        return cases
+
+    def __len__(self):
+        return len(self._get_cases())
+
+    def get(self, index):
+        case = self._get_cases()[index]
+        return collections.OrderedDict(
+            (name, values[value_index])
+            for name, values, value_index in zip(self.names, self.values,
+                                                 case))
+
+    def find(self, value_indices):
+        value_indices = list(value_indices)
+        for index, case in enumerate(self._get_cases()):
+            if case == value_indices:
+                return index
+        return None
+
+
+class Sample(ParamSpace):
+    """A random sample of the parameter sets of a space, in the space order.
+
+    The sample is drawn from a generator seeded with seed, so the same cases
+    are picked on every run.
+    """
+
+    def __init__(self, space, count, seed=0):
+        self.space = space
+        self.names = space.names
+        self.values = space.values
+        self.count = count
+        self.seed = seed
+        self._indices = None
+
+    def _get_indices(self):
+        if self._indices is None:
+            length = len(self.space)
+            # Sampling a range does not build the list of all the indices.
+            self._indices = sorted(
+                random.Random(self.seed).sample(
+                    range(length), min(self.count, length)))
+        return self._indices
+
+    def __len__(self):
+        return len(self._get_indices())
+
+    def get(self, index):
+        return self.space.get(self._get_indices()[index])
+
+    def find(self, value_indices):
+        space_index = self.space.find(value_indices)
+        if space_index is None:
+            return None
+        indices = self._get_indices()
+        index = bisect.bisect_left(indices, space_index)
+        if index < len(indices) and indices[index] == space_index:
+            return index
+        return None
+
+
+class Shard(ParamSpace):
+    """Every count-th parameter set of a space, starting at index."""
+
+    def __init__(self, space, index, count):
+        if not 0 <= index < count:
+            raise ValueError('Invalid shard %s of %s' % (index, count))
+        self.space = space
+        self.names = space.names
+        self.values = space.values
+        self.index = index
+        self.count = count
+
+    def __len__(self):
+        return len(range(self.index, len(self.space), self.count))
+
+    def get(self, index):
+        return self.space.get(self.index + index * self.count)
+
+    def find(self, value_indices):
+        space_index = self.space.find(value_indices)
+        if (space_index is None or space_index < self.index
+                or (space_index - self.index) % self.count):
+            return None
+        return (space_index - self.index) // self.count
+
+
+def get_test_name(template_name, params):
+    """Returns the default name of a generated test case.
+
+    The name is made of the name of the template and of each parameter and
+    its value, so it does not change when cases are added to or removed from
+    the space.
+
+    Args:
+        template_name: the name of the test method, e.g. 'test_scan'.
+        params: the parameter set of the case, in the order of its names.
+    """
+    parts = [template_name]
+    for name, value in params.items():
+        parts.append(name)
+        parts.append(_get_value_name(value))
+    return '_'.join(parts)
+
+
+def _get_value_name(value):
+    """Returns a parameter value as written in get_test_name."""
+    return _NAME_UNSAFE_CHARS.sub('_', str(value)).strip('_')
+
+
+def find_test_cases(space, template_name, test_name):
+    """Finds the cases of a space which get_test_name gives a name.
+
+    The name is parsed against the names and values of the parameters, so
+    a case is found without naming the other cases of the space.
+
+    Args:
+        space: the ParamSpace of the cases.
+        template_name: the name of the test method, e.g. 'test_scan'.
+        test_name: the name of the case to find.
+
+    Returns:
+        The list of the indices in space of the cases with this name. It has
+        more than one index if the names of different cases are the same.
+    """
+    if not test_name.startswith(template_name):
+        return []
+    value_names = [[_get_value_name(value) for value in values]
+                   for values in space.values]
+    indices = []
+
+    def parse(position, value_indices):
+        param = len(value_indices)
+        if param == len(space.names):
+            if position == len(test_name):
+                index = space.find(value_indices)
+                if index is not None:
+                    indices.append(index)
+            return
+        head = '_%s_' % space.names[param]
+        if not test_name.startswith(head, position):
+            return
+        position += len(head)
+        for value_index, value_name in enumerate(value_names[param]):
+            if test_name.startswith(value_name, position):
+                parse(position + len(value_name),
+                      value_indices + [value_index])
+
+    parse(len(template_name), [])
+    return sorted(indices)
+
+
+def generated_tests(space, name_func=None):
+    """Decorator making a test method the template of generated test cases.
+
+    The method is run with each parameter set of space as keyword arguments,
+    as a test case named by name_func. Requesting the name of the method runs
+    all its cases; a case can also be requested by its name, or by a pattern
+    of names such as 'test_scan_*_tx_power_high'.
+
+    Apply it last (on top) if other decorators are used.
+
+    Args:
+        space: the ParamSpace of the cases.
+        name_func: a function taking the method name and a parameter set and
+                   returning the name of the case. Defaults to get_test_name.
+    """
+
+    def decorator(func):
+        func.param_space = space
+        func.param_name_func = name_func or get_test_name
+        return func
+
+    return decorator
+
+
+def get_param_space(test_func):
+    """Returns the ParamSpace of a template test method, or None."""
+    return getattr(test_func, 'param_space', None)
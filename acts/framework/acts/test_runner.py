@@ -26,11 +26,13 @@ import logging
 import os
 import pkgutil
 import sys
+import time
 
 from acts import base_test
 from acts import config_parser
 from acts import keys
 from acts import logger
+from acts import profiler
 from acts import records
 from acts import signals
 from acts import utils
@@ -106,6 +108,9 @@ class TestRunner(object):
         self.log: The logger object used throughout this test run.
         self.controller_registry: A dictionary that holds the controller
                                   objects used in a test run.
+        self.controller_timings: A dictionary mapping controller names to
+                                 the number of times their objects were
+                                 created and reused, and the time spent.
         self.test_classes: A dictionary where we can look up the test classes
                            by name to instantiate. Supports unix shell style
                            wildcards.
@@ -132,6 +137,9 @@ class TestRunner(object):
         logger.setup_test_logger(self.log_path, self.testbed_name)
         self.log = logging.getLogger()
         self.controller_registry = {}
+        self.controller_timings = {}
+        # The controller modules registered by the current test class.
+        self._class_controllers = set()
         if self.test_configs.get(keys.Config.key_random.value):
             test_case_iterations = self.test_configs.get(
                 keys.Config.key_test_case_iterations.value, 10)
@@ -145,6 +153,11 @@ class TestRunner(object):
             self.run_list = run_list
         self.results = records.TestResult()
         self.running = False
+        self.profiler = None
+        profile_interval_ms = self.test_configs.get(
+            keys.Config.key_profile_interval_ms.value)
+        if profile_interval_ms:
+            self.profiler = profiler.Profiler(profile_interval_ms / 1000)
 
     def import_test_modules(self, test_paths):
         """Imports test classes from test scripts.
@@ -309,6 +322,16 @@ class TestRunner(object):
                     The list of controller objects created by the module
                 Returns:
                     A (name, data) tuple.
+            def reset(objects):
+                [Optional] Prepares the controller objects for another test
+                class, when "reuse_controllers" is set in the test config.
+                This should be a cheap health check, restarting what is
+                missing. Modules without it are created for every test class.
+                Args:
+                    A list of controller objects created by the create function.
+                Returns:
+                    True if the objects can be used by the next test class,
+                    False to have them destroyed and created again.
         Registering a controller module declares a test class's dependency the
         controller. If the module config exists and the module matches the
         controller interface, controller objects will be instantiated with
@@ -337,9 +360,17 @@ class TestRunner(object):
         module_ref_name = self.get_module_reference_name(controller_module)
 
         if controller_module in self.controller_registry:
-            raise signals.ControllerError(
-                "Controller module %s has already been registered. It can not "
-                "be registered again." % module_ref_name)
+            if controller_module in self._class_controllers:
+                raise signals.ControllerError(
+                    "Controller module %s has already been registered. It can "
+                    "not be registered again." % module_ref_name)
+            # Kept from a previous test class.
+            controllers = self._reset_controllers(controller_module)
+            if controllers is not None:
+                self._class_controllers.add(controller_module)
+                if builtin:
+                    self.test_run_info[module_ref_name] = controllers
+                return controllers
         # Create controller objects.
         module_config_name = controller_module.ACTS_CONTROLLER_CONFIG_NAME
         if module_config_name not in self.testbed_configs:
@@ -357,7 +388,10 @@ class TestRunner(object):
             # in case the controller module modifies the config internally.
             original_config = self.testbed_configs[module_config_name]
             controller_config = copy.deepcopy(original_config)
+            start_time = time.time()
             controllers = controller_module.create(controller_config)
+            self._add_controller_timing(module_ref_name, 'create',
+                                        time.time() - start_time)
         except:
             self.log.exception(
                 "Failed to initialize objects for controller %s, abort!",
@@ -368,6 +402,7 @@ class TestRunner(object):
                 "Controller module %s did not return a list of objects, abort."
                 % module_ref_name)
         self.controller_registry[controller_module] = controllers
+        self._class_controllers.add(controller_module)
         # Collect controller information and write to test result.
         # Implementation of "get_info" is optional for a controller module.
         if hasattr(controller_module, "get_info"):
@@ -388,23 +423,98 @@ class TestRunner(object):
                        module_config_name)
         return controllers
 
+    def _add_controller_timing(self, module_ref_name, action, duration):
+        """Counts a creation or reset of controller objects, and its time."""
+        timing = self.controller_timings.setdefault(module_ref_name, {
+            'create_count': 0,
+            'create_time': 0.0,
+            'reset_count': 0,
+            'reset_time': 0.0
+        })
+        timing['%s_count' % action] += 1
+        timing['%s_time' % action] += duration
+
+    def _reset_controllers(self, controller_module):
+        """Prepares controller objects kept from a previous test class.
+
+        Args:
+            controller_module: A registered controller module with a reset
+                function.
+
+        Returns:
+            The controller objects, or None if they failed to reset and were
+            destroyed.
+        """
+        name = self.get_module_reference_name(controller_module)
+        controllers = self.controller_registry[controller_module]
+        start_time = time.time()
+        try:
+            reset = controller_module.reset(controllers)
+        except Exception:
+            self.log.exception('Exception occurred resetting %s.', name)
+            reset = False
+        if reset:
+            self._add_controller_timing(name, 'reset', time.time() - start_time)
+            self.log.debug('Reusing %s.', name)
+            return controllers
+        self.log.warning('Failed to reset %s, creating it again.', name)
+        self._destroy_controllers(controller_module)
+        return None
+
+    def _destroy_controllers(self, controller_module):
+        """Destroys the objects of a controller module and unregisters it."""
+        controllers = self.controller_registry.pop(controller_module)
+        self._class_controllers.discard(controller_module)
+        name = self.get_module_reference_name(controller_module)
+        if hasattr(controller_module, 'get_post_job_info'):
+            self.log.debug('Getting post job info for %s', name)
+            name, value = controller_module.get_post_job_info(controllers)
+            self.results.set_extra_data(name, value)
+        try:
+            self.log.debug('Destroying %s.', name)
+            controller_module.destroy(controllers)
+        except:
+            self.log.exception("Exception occurred destroying %s.", name)
+
+    def release_class_controllers(self):
+        """Ends the use of controller objects by the current test class.
+
+        Controller objects which can be reset are kept for the next test
+        class, the others are destroyed.
+        """
+        for controller_module in list(self.controller_registry):
+            if not hasattr(controller_module, 'reset'):
+                self._destroy_controllers(controller_module)
+        self._class_controllers = set()
+
     def unregister_controllers(self):
         """Destroy controller objects and clear internal registry.
 
         This will be called at the end of each TestRunner.run call.
         """
-        for controller_module, controllers in self.controller_registry.items():
-            name = self.get_module_reference_name(controller_module)
-            if hasattr(controller_module, 'get_post_job_info'):
-                self.log.debug('Getting post job info for %s', name)
-                name, value = controller_module.get_post_job_info(controllers)
-                self.results.set_extra_data(name, value)
-            try:
-                self.log.debug('Destroying %s.', name)
-                controller_module.destroy(controllers)
-            except:
-                self.log.exception("Exception occurred destroying %s.", name)
-        self.controller_registry = {}
+        for controller_module in list(self.controller_registry):
+            self._destroy_controllers(controller_module)
+        self._class_controllers = set()
+
+    def _log_controller_timings(self):
+        """Logs the time saved by reusing controllers, and adds it to the
+        results.
+        """
+        for name, timing in self.controller_timings.items():
+            if not timing['create_count']:
+                continue
+            average_create_time = (
+                timing['create_time'] / timing['create_count'])
+            timing['saved_time'] = max(
+                average_create_time * timing['reset_count'] -
+                timing['reset_time'], 0)
+            self.log.info(
+                'Controller %s: created %d times in %.1fs, reused %d times '
+                'in %.1fs, saving about %.1fs.', name, timing['create_count'],
+                timing['create_time'], timing['reset_count'],
+                timing['reset_time'], timing['saved_time'])
+        self.results.set_extra_data('Controller Timings',
+                                    self.controller_timings)
 
     def parse_config(self, test_configs):
         """Parses the test configuration and unpacks objects and parameters
@@ -490,15 +600,19 @@ class TestRunner(object):
                 test_case_iterations = self.test_configs.get(
                     keys.Config.key_test_case_iterations.value, 1)
 
-            with test_cls(self.test_run_info) as test_cls_instance:
-                try:
-                    cls_result = test_cls_instance.run(test_cases,
-                                                       test_case_iterations)
-                    self.results += cls_result
-                    self._write_results_json_str()
-                except signals.TestAbortAll as e:
-                    self.results += e.results
-                    raise e
+            profiler.set_label(test_cls_name_match)
+            try:
+                with test_cls(self.test_run_info) as test_cls_instance:
+                    try:
+                        cls_result = test_cls_instance.run(
+                            test_cases, test_case_iterations)
+                        self.results += cls_result
+                        self._write_results_json_str()
+                    except signals.TestAbortAll as e:
+                        self.results += e.results
+                        raise e
+            finally:
+                profiler.set_label(None)
 
     def run(self, test_class=None):
         """Executes test cases.
@@ -507,6 +621,11 @@ class TestRunner(object):
         classes. This can be called multiple times to repeatedly execute the
         requested test cases.
 
+        Controller objects are created for every test class, unless
+        "reuse_controllers" is set in the test config. Then the objects of
+        controller modules with a reset function are kept across the test
+        classes of this call, and are only destroyed at its end.
+
         A call to TestRunner.stop should eventually happen to conclude the life
         cycle of a TestRunner.
 
@@ -525,28 +644,54 @@ class TestRunner(object):
         else:
             t_paths = self.test_configs[keys.Config.key_test_paths.value]
             self.test_classes = self.import_test_modules(t_paths)
+        reuse_controllers = self.test_configs.get(
+            keys.Config.key_reuse_controllers.value, False)
         self.log.debug("Executing run list %s.", self.run_list)
-        for test_cls_name, test_case_names in self.run_list:
-            if not self.running:
-                break
-
-            if test_case_names:
-                self.log.debug("Executing test cases %s in test class %s.",
-                               test_case_names, test_cls_name)
-            else:
-                self.log.debug("Executing test class %s", test_cls_name)
-            try:
-                # Import and register the built-in controller modules specified
-                # in testbed config.
-                for module in self._import_builtin_controllers():
-                    self.register_controller(module, builtin=True)
-                self.run_test_class(test_cls_name, test_case_names)
-            except signals.TestAbortAll as e:
-                self.log.warning(
-                    "Abort all subsequent test classes. Reason: %s", e)
-                raise
-            finally:
-                self.unregister_controllers()
+        if self.profiler:
+            self.profiler.start()
+        try:
+            for test_cls_name, test_case_names in self.run_list:
+                if not self.running:
+                    break
+
+                if test_case_names:
+                    self.log.debug("Executing test cases %s in test class %s.",
+                                   test_case_names, test_cls_name)
+                else:
+                    self.log.debug("Executing test class %s", test_cls_name)
+                try:
+                    # Import and register the built-in controller modules
+                    # specified in testbed config.
+                    for module in self._import_builtin_controllers():
+                        self.register_controller(module, builtin=True)
+                    self.run_test_class(test_cls_name, test_case_names)
+                except signals.TestAbortAll as e:
+                    self.log.warning(
+                        "Abort all subsequent test classes. Reason: %s", e)
+                    raise
+                finally:
+                    if reuse_controllers:
+                        self.release_class_controllers()
+                    else:
+                        self.unregister_controllers()
+        finally:
+            self.unregister_controllers()
+            if reuse_controllers:
+                self._log_controller_timings()
+            if self.profiler:
+                self._write_profile()
+
+    def _write_profile(self):
+        """Stops the profiler and writes the profile of the test run so far.
+
+        The profile is written under the profile directory of the log path,
+        and includes the samples of previous calls to run.
+        """
+        self.profiler.stop()
+        path = os.path.join(self.log_path, "profile")
+        self.profiler.write(path)
+        self.log.info("Wrote the host profile of test run %s to %s.", self.id,
+                      path)
 
     def stop(self):
         """Releases resources from test run. Should always be called after
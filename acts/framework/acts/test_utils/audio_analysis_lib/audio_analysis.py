@@ -40,6 +40,14 @@ PATTERN_MATCHING_THRESHOLD = 0.85
 # Window size for peak detection.
 PEAK_WINDOW_SIZE_HZ = 20
 
+# The minimum test block length for which pattern matching correlates blocks
+# through FFT instead of directly.
+_FFT_CORRELATION_MIN_LENGTH = 1024
+
+# The number of test blocks whose correlation indices are computed together
+# in anomaly detection.
+_PATTERN_MATCHING_BATCH_SIZE = 4096
+
 
 class RMSTooSmallError(Exception):
     """Error when signal RMS is too small."""
@@ -126,12 +134,88 @@ def spectral_analysis(signal,
 
     # y_f is complex so consider its absolute value for magnitude.
     abs_y_f = numpy.abs(y_f)
-    threshold = max(abs_y_f) * min_peak_ratio
+
+    return _spectrum_peaks(x_f, abs_y_f, min_peak_ratio, peak_window_size_hz)
+
+
+def averaged_spectral_analysis(signal,
+                               rate,
+                               block_size,
+                               saturate_value=None,
+                               min_peak_ratio=DEFAULT_MIN_PEAK_RATIO,
+                               peak_window_size_hz=PEAK_WINDOW_SIZE_HZ):
+    """Gets the dominant frequencies from the average spectrum of blocks.
+
+    Unlike spectral_analysis, the signal is read block by block and the
+    magnitude spectra of the blocks are averaged, so memory usage is bounded
+    by the block size however long the signal is. The frequency resolution
+    is rate / block_size.
+
+    Args:
+        signal: A 1-D array-like object for one-channel PCM data. It can be a
+                numpy.memmap view of a file.
+        rate: Sampling rate in samples per second. Example inputs: 44100,
+        48000
+        block_size: The number of samples in each block.
+        saturate_value: If not None, signal is not normalized yet and each
+                        block is normalized by this value after being read.
+        min_peak_ratio: Ref to spectral_analysis.
+        peak_window_size_hz: Ref to spectral_analysis.
+
+    Returns:
+        Same as spectral_analysis.
+
+    """
+    length = len(signal)
+    if length == 0:
+        raise EmptyDataError('Signal data is empty')
+    block_size = min(block_size, length)
+
+    x_f = _rfft_freq(block_size, rate)
+    window = numpy.hanning(block_size)
+    sum_abs_y_f = numpy.zeros(len(x_f))
+    sum_of_squares = 0.0
+    number_of_blocks = 0
+    for start in range(0, length, block_size):
+        block = numpy.asarray(signal[start:start + block_size], dtype=float)
+        if saturate_value is not None:
+            block = block / float(saturate_value)
+        sum_of_squares += numpy.dot(block, block)
+        # The last block is zero padded to block size.
+        y_f = 2.0 / block_size * numpy.fft.rfft(
+            block * window[:len(block)], block_size)
+        sum_abs_y_f += numpy.abs(y_f)
+        number_of_blocks += 1
+
+    signal_rms = numpy.sqrt(sum_of_squares / length)
+    logging.debug('signal RMS = %s', signal_rms)
+    if signal_rms < MEANINGFUL_RMS_THRESHOLD:
+        logging.warning(
+            'RMS %s is too small to be meaningful. Set frequency to 0.',
+            signal_rms)
+        return [(0, 0)]
+
+    return _spectrum_peaks(x_f, sum_abs_y_f / number_of_blocks,
+                           min_peak_ratio, peak_window_size_hz)
+
+
+def _spectrum_peaks(x_f, abs_y_f, min_peak_ratio, peak_window_size_hz):
+    """Finds the peaks in a magnitude spectrum.
+
+    Args:
+        x_f: A numpy array of the frequency at each index of abs_y_f.
+        abs_y_f: A numpy array of the magnitude at each frequency.
+        min_peak_ratio: Ref to spectral_analysis.
+        peak_window_size_hz: Ref to spectral_analysis.
+
+    Returns:
+        Same as spectral_analysis.
+
+    """
+    threshold = numpy.max(abs_y_f) * min_peak_ratio
 
     # Suppresses all coefficients that are below threshold.
-    for i in range(len(abs_y_f)):
-        if abs_y_f[i] < threshold:
-            abs_y_f[i] = 0
+    abs_y_f[abs_y_f < threshold] = 0
 
     # Gets the peak detection window size in indice.
     # x_f[1] is the frequency difference per index.
@@ -167,6 +251,33 @@ def _rfft_freq(length, rate):
     return numpy.linspace(0, (result_length - 1) * val, result_length)
 
 
+def _sliding_window_max(array, window_size):
+    """Computes the maximum of every window of an array.
+
+    The maximum of a window of length n is the maximum of two overlapping
+    windows of length 2^k, where 2^k <= n < 2^(k + 1). The windows of length
+    2^k are built by doubling, so this takes O(len(array) * log(n)) time
+    without any Python-level loop over the array.
+
+    Args:
+        array: A 1-D numpy array.
+        window_size: The length of each window. Must be at least 1.
+
+    Returns:
+        A numpy array of length len(array) - window_size + 1 where the i-th
+            element is the maximum of array[i:i + window_size].
+
+    """
+    maxima = array
+    width = 1
+    while width * 2 <= window_size:
+        maxima = numpy.maximum(maxima[:-width], maxima[width:])
+        width *= 2
+    number_of_windows = len(array) - window_size + 1
+    return numpy.maximum(maxima[:number_of_windows],
+                         maxima[window_size - width:][:number_of_windows])
+
+
 def peak_detection(array, window_size):
     """Detects peaks in an array.
 
@@ -176,6 +287,10 @@ def peak_detection(array, window_size):
     then there is no peak in this window.
     Note that we only consider peak with value greater than 0.
 
+    The maximum of the left and right half windows of every point is
+    computed with vectorized sliding window maxima, so the cost does not
+    depend on the number of candidate peaks in the array.
+
     Args:
         array: The input array to detect peaks in. Array is a list of
         absolute values of the magnitude of transformed coefficient.
@@ -188,76 +303,30 @@ def peak_detection(array, window_size):
               where the tuples are sorted by peak values.
 
     """
-    half_window_size = window_size / 2
-    length = len(array)
-
-    def mid_is_peak(array, mid, left, right):
-        """Checks if value at mid is the largest among left to right in array.
-
-        Args:
-            array: A list of numbers.
-            mid: The mid index.
-            left: The left index.
-            rigth: The right index.
-
-        Returns:
-            A tuple (is_peak, next_candidate)
-                  is_peak is True if array[index] is the maximum among numbers
-                  in array between index [left, right] inclusively.
-                  next_candidate is the index of next candidate for peak if
-                  is_peak is False. It is the index of maximum value in
-                  [mid + 1, right]. If is_peak is True, next_candidate is
-                  right + 1.
-
-        """
-        value_mid = array[int(mid)]
-        is_peak = True
-        next_peak_candidate_index = None
-
-        # Check the left half window.
-        for index in range(int(left), int(mid)):
-            if array[index] >= value_mid:
-                is_peak = False
-                break
-
-        # Mid is at the end of array.
-        if mid == right:
-            return is_peak, right + 1
-
-        # Check the right half window and also record next candidate.
-        # Favor the larger index for next_peak_candidate_index.
-        for index in range(int(right), int(mid), -1):
-            if (next_peak_candidate_index is None or
-                    array[index] > array[next_peak_candidate_index]):
-                next_peak_candidate_index = index
-
-        if array[next_peak_candidate_index] >= value_mid:
-            is_peak = False
-
-        if is_peak:
-            next_peak_candidate_index = right + 1
-
-        return is_peak, next_peak_candidate_index
-
-    results = []
-    mid = 0
-    next_candidate_idx = None
-    while mid < length:
-        left = max(0, mid - half_window_size)
-        right = min(length - 1, mid + half_window_size)
-
-        # Only consider value greater than 0.
-        if array[int(mid)] == 0:
-            mid = mid + 1
-            continue
-
-        is_peak, next_candidate_idx = mid_is_peak(array, mid, left, right)
-
-        if is_peak:
-            results.append((mid, array[int(mid)]))
-
-        # Use the next candidate found in [mid + 1, right], or right + 1.
-        mid = next_candidate_idx
+    half_window_size = int(window_size) // 2
+    values = numpy.asarray(array, dtype=float)
+    length = len(values)
+    if length == 0:
+        return []
+
+    if half_window_size > 0:
+        padding = numpy.full(half_window_size, -numpy.inf)
+        # left_max[i] is the maximum of values[i - half_window_size:i].
+        left_max = _sliding_window_max(
+            numpy.concatenate((padding, values[:-1])), half_window_size)
+        # right_max[i] is the maximum of
+        # values[i + 1:i + half_window_size + 1].
+        right_max = _sliding_window_max(
+            numpy.concatenate((values[1:], padding)), half_window_size)
+        is_peak = (values > left_max) & (values > right_max)
+    else:
+        is_peak = numpy.ones(length, dtype=bool)
+
+    # Only consider value greater than 0.
+    is_peak &= values != 0
+
+    results = [(int(index), array[index])
+               for index in numpy.flatnonzero(is_peak)]
 
     # Sort the peaks by values.
     return sorted(results, key=lambda x: x[1], reverse=True)
@@ -299,18 +368,158 @@ def anomaly_detection(signal,
 
     golden_y = _generate_golden_pattern(rate, freq, block_size)
 
-    results = []
+    signal = numpy.asarray(signal, dtype=float)
+    step = int(block_size / 2)
+    starts = numpy.arange(0, len(signal), step)
+
+    # Blocks that fit entirely in the signal are matched together. The blocks
+    # at the end of the signal are shorter than block size and are matched
+    # one by one.
+    number_of_full_blocks = 0
+    if len(signal) >= block_size:
+        number_of_full_blocks = (len(signal) - block_size) // step + 1
+    matched = _batch_pattern_matching(
+        golden_y, _strided_windows(signal, block_size, step,
+                                   number_of_full_blocks), threshold)
+    for start in starts[number_of_full_blocks:]:
+        test_signal = signal[start:start + block_size]
+        matched.append(
+            _moving_pattern_matching(golden_y, test_signal, threshold))
+
+    results = [
+        float(start) / rate for start, block_matched in zip(starts, matched)
+        if not block_matched
+    ]
 
-    for start in range(0, len(signal), int(block_size / 2)):
-        end = start + block_size
-        test_signal = signal[start:end]
-        matched = _moving_pattern_matching(golden_y, test_signal, threshold)
-        if not matched:
-            results.append(start)
+    return results
 
-    results = [float(x) / rate for x in results]
 
-    return results
+def _strided_windows(signal, window_size, step, number_of_windows):
+    """Gets a read-only 2-D view of equally spaced windows of a signal.
+
+    Args:
+        signal: A 1-D numpy array.
+        window_size: The number of samples in each window.
+        step: The number of samples between the starts of two windows.
+        number_of_windows: The number of windows to view.
+
+    Returns:
+        A numpy array of shape (number_of_windows, window_size) sharing memory
+            with signal.
+
+    """
+    signal = numpy.ascontiguousarray(signal)
+    stride = signal.strides[0]
+    windows = numpy.lib.stride_tricks.as_strided(
+        signal,
+        shape=(number_of_windows, window_size),
+        strides=(step * stride, stride))
+    windows.flags.writeable = False
+    return windows
+
+
+def _sliding_norms(signal, window_size):
+    """Computes the L2 norm of every window of a signal.
+
+    Args:
+        signal: A 1-D numpy array.
+        window_size: The number of samples in each window.
+
+    Returns:
+        A numpy array where the i-th element is the norm of
+            signal[i:i + window_size].
+
+    """
+    windows = _strided_windows(signal, window_size, 1,
+                               len(signal) - window_size + 1)
+    return numpy.linalg.norm(windows, axis=1)
+
+
+def _sliding_correlation(golden_signal, test_signal):
+    """Correlates test signal with every block of golden signal.
+
+    Long test signals are correlated through FFT, which takes
+    O(n * log(n)) instead of O(n * m) time.
+
+    Args:
+        golden_signal: A 1-D numpy array.
+        test_signal: A 1-D numpy array no longer than golden_signal.
+
+    Returns:
+        A numpy array where the i-th element is the dot product of
+            golden_signal[i:i + len(test_signal)] and test_signal.
+
+    """
+    block_length = len(test_signal)
+    if block_length < _FFT_CORRELATION_MIN_LENGTH:
+        return numpy.correlate(golden_signal, test_signal, 'valid')
+    fft_length = 1 << (len(golden_signal) + block_length - 1).bit_length()
+    spectrum = (numpy.fft.rfft(golden_signal, fft_length) *
+                numpy.fft.rfft(test_signal[::-1], fft_length))
+    correlation = numpy.fft.irfft(spectrum, fft_length)
+    return correlation[block_length - 1:len(golden_signal)]
+
+
+def _batch_pattern_matching(golden_signal, test_blocks, threshold):
+    """Checks if each test block is similar to any block of golden signal.
+
+    This gives the same results as calling _moving_pattern_matching on each
+    row of test_blocks, but computes the correlation indices of all the test
+    blocks against all the golden signal blocks as one matrix product.
+
+    Args:
+        golden_signal: A 1-D array for golden signal.
+        test_blocks: A 2-D array where each row is a block of test signal.
+        threshold: The threshold of correlation index to be judge as matched.
+
+    Returns:
+        A list of booleans, True for each test block that is matched.
+
+    Raises:
+        GoldenSignalNormTooSmallError: if any block of golden signal has a
+            norm too small to be meaningful.
+
+    """
+    number_of_blocks, block_length = test_blocks.shape
+    if number_of_blocks == 0:
+        return []
+    if len(golden_signal) < block_length:
+        raise ValueError('Test signal is longer than golden signal')
+
+    golden_signal = numpy.asarray(golden_signal, dtype=float)
+    golden_norms = _sliding_norms(golden_signal, block_length)
+    if numpy.any(golden_norms <= _MINIMUM_SIGNAL_NORM):
+        raise GoldenSignalNormTooSmallError(
+            'No meaningful data as norm is too small.')
+    golden_blocks = _strided_windows(golden_signal, block_length, 1,
+                                     len(golden_norms))
+
+    test_norms = numpy.zeros(number_of_blocks)
+    max_corr = numpy.full(number_of_blocks, -numpy.inf)
+    # Works on bounded batches of test blocks to bound memory usage for long
+    # signals.
+    for begin in range(0, number_of_blocks, _PATTERN_MATCHING_BATCH_SIZE):
+        end = begin + _PATTERN_MATCHING_BATCH_SIZE
+        batch = test_blocks[begin:end]
+        batch_norms = numpy.linalg.norm(batch, axis=1)
+        test_norms[begin:end] = batch_norms
+        meaningful_rows = numpy.flatnonzero(
+            batch_norms > _MINIMUM_SIGNAL_NORM)
+        # correlations[i][j] is the correlation index between test block i
+        # and the golden signal block starting at index j.
+        correlations = batch[meaningful_rows].dot(golden_blocks.T)
+        correlations /= numpy.outer(batch_norms[meaningful_rows],
+                                    golden_norms)
+        max_corr[begin + meaningful_rows] = correlations.max(axis=1)
+
+    meaningful = test_norms > _MINIMUM_SIGNAL_NORM
+    if not numpy.all(meaningful):
+        logging.info('Caught %d blocks of test signal that have no '
+                     'meaningful norm', numpy.count_nonzero(~meaningful))
+    unmatched = meaningful & (max_corr < threshold)
+    for corr in max_corr[unmatched]:
+        logging.debug('Got one unmatched block with max_corr: %s', corr)
+    return list(meaningful & (max_corr >= threshold))
 
 
 def _generate_golden_pattern(rate, freq, block_size):
@@ -366,26 +575,32 @@ def _moving_pattern_matching(golden_signal, test_signal, threshold):
     if len(golden_signal) < len(test_signal):
         raise ValueError('Test signal is longer than golden signal')
 
+    golden_signal = numpy.asarray(golden_signal, dtype=float)
+    test_signal = numpy.asarray(test_signal, dtype=float)
     block_length = len(test_signal)
-    number_of_movings = len(golden_signal) - block_length + 1
-    correlation_indices = []
-    for moving_index in range(number_of_movings):
-        # Cuts one block of golden signal from start index.
-        # The block length is the same as test signal.
-        start = moving_index
-        end = start + block_length
-        golden_signal_block = golden_signal[start:end]
-        try:
-            correlation_index = _get_correlation_index(golden_signal_block,
-                                                       test_signal)
-        except TestSignalNormTooSmallError:
-            logging.info(
-                'Caught one block of test signal that has no meaningful norm')
-            return False
-        correlation_indices.append(correlation_index)
+
+    # Checks the norms in the same order as _get_correlation_index does for
+    # the first golden block.
+    golden_norms = _sliding_norms(golden_signal, block_length)
+    if golden_norms[0] <= _MINIMUM_SIGNAL_NORM:
+        raise GoldenSignalNormTooSmallError(
+            'No meaningful data as norm is too small.')
+    norm_test = numpy.linalg.norm(test_signal)
+    if norm_test <= _MINIMUM_SIGNAL_NORM:
+        logging.info(
+            'Caught one block of test signal that has no meaningful norm')
+        return False
+    if numpy.any(golden_norms <= _MINIMUM_SIGNAL_NORM):
+        raise GoldenSignalNormTooSmallError(
+            'No meaningful data as norm is too small.')
+
+    # Computes the correlation index against every block of golden signal
+    # at once.
+    correlation_indices = (_sliding_correlation(golden_signal, test_signal) /
+                           (golden_norms * norm_test))
 
     # Checks if the maximum correlation index is high enough.
-    max_corr = max(correlation_indices)
+    max_corr = correlation_indices.max()
     if max_corr < threshold:
         logging.debug('Got one unmatched block with max_corr: %s', max_corr)
         return False
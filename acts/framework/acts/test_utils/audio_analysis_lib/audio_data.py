@@ -18,6 +18,7 @@
 import contextlib
 import copy
 import numpy
+import os
 import struct
 from io import StringIO
 """The dict containing information on how to parse sample from raw data.
@@ -90,23 +91,65 @@ class AudioRawData(object):
         """Reads samples from binary and fills channel_data.
 
         Reads samples of fixed width from binary string into a numpy array
-        and shapes them into each channel.
+        and shapes them into each channel. The samples are not copied, so
+        channel_data holds read-only views of binary.
 
         Args:
             binary: A string containing binary data.
         """
-        sample_format_dict = SAMPLE_FORMATS[self.sample_format]
+        # Reads data from a string into 1-D array.
+        np_array = numpy.frombuffer(binary, dtype=self._get_numpy_dtype())
+        self._set_channel_data(np_array)
 
-        # The data type used in numpy fromstring function. For example,
-        # <i4 for 32-bit signed int.
-        np_dtype = '%s%d' % (sample_format_dict['dtype_str'],
-                             sample_format_dict['size_bytes'])
+    def read_file(self, filename, offset=0, n_frames=None):
+        """Memory-maps samples in a file and fills channel_data.
 
-        # Reads data from a string into 1-D array.
-        np_array = numpy.fromstring(binary, dtype=np_dtype)
+        The samples are paged in from the file as they are accessed instead
+        of being read into memory, so channel_data can hold recordings larger
+        than the available memory.
 
-        n_frames = len(np_array) / self.channel
+        Args:
+            filename: The file containing samples of sample_format.
+            offset: The offset in bytes of the first sample in the file.
+            n_frames: The number of frames to read. None to read until the
+                      end of the file.
+        """
+        np_dtype = self._get_numpy_dtype()
+        if n_frames is None:
+            file_size = os.path.getsize(filename)
+            n_frames = (file_size - offset) // (np_dtype.itemsize *
+                                                self.channel)
+        if n_frames == 0:
+            np_array = numpy.zeros(0, dtype=np_dtype)
+        else:
+            np_array = numpy.memmap(
+                filename,
+                dtype=np_dtype,
+                mode='r',
+                offset=offset,
+                shape=(n_frames * self.channel, ))
+        self._set_channel_data(np_array)
+
+    def _get_numpy_dtype(self):
+        """Gets the numpy data type of one sample.
+
+        Returns:
+            A numpy.dtype. For example, <i4 for 32-bit signed int.
+        """
+        sample_format_dict = SAMPLE_FORMATS[self.sample_format]
+        return numpy.dtype('%s%d' % (sample_format_dict['dtype_str'],
+                                     sample_format_dict['size_bytes']))
+
+    def _set_channel_data(self, np_array):
+        """Shapes interleaved samples into each channel.
+
+        Args:
+            np_array: A 1-D numpy array of interleaved samples.
+        """
+        n_frames = len(np_array) // self.channel
         # Reshape np_array into an array of shape (n_frames, channel).
-        np_array = np_array.reshape(int(n_frames), self.channel)
-        # Transpose np_arrya so it becomes of shape (channel, n_frames).
+        np_array = np_array[:n_frames * self.channel].reshape(
+            n_frames, self.channel)
+        # Transpose np_array so it becomes of shape (channel, n_frames). Each
+        # channel is a strided view on the interleaved samples.
         self.channel_data = np_array.transpose()
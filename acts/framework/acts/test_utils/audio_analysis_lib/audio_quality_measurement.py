@@ -16,6 +16,7 @@
 """This module provides utilities to detect some artifacts and measure the
     quality of audio."""
 
+import collections
 import logging
 import math
 import numpy
@@ -139,6 +140,10 @@ NEAR_DATA_START_OR_END_SECS = 0.01
 # sine wave. | d | is determined by NEAR_SINE_START_OR_END_SECS.
 NEAR_SINE_START_OR_END_SECS = 0.01
 
+# In block streaming mode, the signal is read and analyzed this many seconds at
+# a time, so memory usage does not grow with the length of the signal.
+DEFAULT_STREAM_BLOCK_SECS = 10
+
 
 class SineWaveNotFound(Exception):
     """Error when there's no sine wave found in the signal"""
@@ -197,13 +202,10 @@ def noised_sine_wave(frequency, rate, noise_level):
         A sine wave with specified noise level.
 
     """
-    wave = []
-    for index in range(0, rate * 2):
-        sample = 2.0 * math.pi * frequency * float(index) / float(rate)
-        sine_wave = math.sin(sample)
-        noise = noise_level * numpy.random.standard_normal()
-        wave.append(sine_wave + noise)
-    return wave
+    sample = 2.0 * math.pi * frequency * numpy.arange(rate * 2) / float(rate)
+    # Draws the same random numbers as drawing one sample at a time.
+    noise = noise_level * numpy.random.standard_normal(rate * 2)
+    return numpy.sin(sample) + noise
 
 
 def average_teager_value(wave, amplitude):
@@ -220,15 +222,27 @@ def average_teager_value(wave, amplitude):
         Average teager value.
 
     """
-    teager_value, length = 0, len(wave)
-    for i in range(1, length - 1):
-        ith_teager_value = abs(wave[i] * wave[i] - wave[i - 1] * wave[i + 1])
-        ith_teager_value *= max(1, abs(wave[i]))
-        teager_value += ith_teager_value
+    length = len(wave)
+    teager_value = numpy.sum(_teager_values(numpy.asarray(wave, dtype=float)))
     teager_value = (float(teager_value) / length) / (amplitude**2)
     return teager_value
 
 
+def _teager_values(wave):
+    """Applies teager operator to each sample except the first and the last.
+
+    Args:
+        wave: A numpy array of the wave.
+
+    Returns:
+        A numpy array of the teager value of wave[1:-1].
+
+    """
+    teager_values = abs(wave[1:-1] * wave[1:-1] - wave[:-2] * wave[2:])
+    teager_values *= numpy.maximum(1, abs(wave[1:-1]))
+    return teager_values
+
+
 def noise_level(amplitude, frequency, rate, teager_value_of_input):
     """Computes the noise level compared with standard_noise.
 
@@ -290,6 +304,35 @@ def hilbert_analysis(signal, rate, block_size):
         A tuple of list: (amplitude, frequency) composed of amplitude and
             frequency of each time.
 
+    """
+    signal = numpy.asarray(signal, dtype=float)
+    length = len(signal)
+    return _block_amplitude_and_frequency((0, signal), 0, length, length,
+                                          rate, block_size)
+
+
+def _block_amplitude_and_frequency(window, begin, end, length, rate,
+                                   block_size):
+    """Finds amplitude and frequency of part of a signal by Hilbert transform.
+
+    The results are the same as the part of the results of hilbert_analysis
+    on the full signal, so blocks of a signal can be analyzed separately.
+
+    Args:
+        window: A tuple (window_begin, samples) where samples is a numpy
+                array of the signal from index window_begin, which covers
+                [begin, end) and the segments transformed for it.
+        begin: The first index in the signal.
+        end: The index after the last index in the signal.
+        length: The length of the full signal.
+        rate: Sampling rate in samples per second.
+        block_size: The size of block to transform.
+
+    Returns:
+        A tuple of numpy arrays (amplitude, frequency) at [begin, end).
+            frequency is one element shorter if end is the length of the
+            signal.
+
     """
     # To apply Hilbert transform, the wave will be transformed
     # segment by segment. For each segment, its size will be
@@ -309,22 +352,71 @@ def hilbert_analysis(signal, rate, block_size):
     #       |-----|=====|=====|-----|           |-----|=====|=====|
     #                   |-----|=====|=====|-----|
     # Specially, beginning and ending part may not have ignored part.
-    length = len(signal)
-    result = []
-    for left_border in range(0, length, hilbert_block):
+    # Segments of the same length are transformed together.
+    #
+    # One more sample is transformed to find the frequency at end - 1.
+    first = begin - begin % hilbert_block
+    last = min(length, end + 1 + (-end - 1) % hilbert_block)
+    read_begin = max(0, first - half_hilbert_block)
+    window_begin, samples = window
+    samples = samples[read_begin - window_begin:
+                      min(length, last + half_hilbert_block) - window_begin]
+
+    left_borders = numpy.arange(first, last, hilbert_block)
+    is_whole_segment = ((left_borders >= half_hilbert_block) &
+                        (left_borders + hilbert_block + half_hilbert_block <=
+                         length))
+    whole_segments = left_borders[is_whole_segment]
+    result = numpy.empty(last - first, dtype=complex)
+    if len(whole_segments):
+        segment_length = hilbert_block + 2 * half_hilbert_block
+        segment_start = whole_segments[0] - half_hilbert_block - read_begin
+        segments = numpy.lib.stride_tricks.as_strided(
+            samples[segment_start:],
+            shape=(len(whole_segments), segment_length),
+            strides=(hilbert_block * samples.strides[0],
+                     samples.strides[0]))
+        transformed = _batch_hilbert(segments)
+        result[whole_segments[0] - first:
+               whole_segments[-1] + hilbert_block - first] = (
+                   transformed[:, half_hilbert_block:half_hilbert_block +
+                               hilbert_block].reshape(-1))
+    for left_border in left_borders[~is_whole_segment]:
         right_border = min(length, left_border + hilbert_block)
         temp_left_border = max(0, left_border - half_hilbert_block)
         temp_right_border = min(length, right_border + half_hilbert_block)
-        temp = hilbert(signal[temp_left_border:temp_right_border])
-        for index in range(left_border, right_border):
-            result.append(temp[index - temp_left_border])
-    result = numpy.asarray(result)
-    amplitude = numpy.abs(result)
+        temp = hilbert(samples[temp_left_border - read_begin:
+                               temp_right_border - read_begin])
+        result[left_border - first:right_border - first] = temp[
+            left_border - temp_left_border:right_border - temp_left_border]
+
+    result = result[begin - first:]
+    amplitude = numpy.abs(result[:end - begin])
     phase = numpy.unwrap(numpy.angle(result))
-    frequency = numpy.diff(phase) / (2.0 * numpy.pi) * rate
-    #frequency.append(frequency[len(frequency)-1])
-    frequecny = numpy.append(frequency, frequency[len(frequency) - 1])
-    return (amplitude, frequency)
+    frequency = numpy.diff(phase)[:end - begin] / (2.0 * numpy.pi) * rate
+    return amplitude, frequency
+
+
+def _batch_hilbert(x):
+    """Applies hilbert to each row of a 2-D array.
+
+    Args:
+        x: A 2-D numpy array of real signals.
+
+    Returns:
+        A 2-D numpy array of the analytic signal of each row.
+
+    """
+    N = x.shape[1]
+    Xf = numpy.fft.fft(x, N, axis=1)
+    h = numpy.zeros(N)
+    if N % 2 == 0:
+        h[0] = h[N // 2] = 1
+        h[1:N // 2] = 2
+    else:
+        h[0] = 1
+        h[1:(N + 1) // 2] = 2
+    return numpy.fft.ifft(Xf * h, axis=1)
 
 
 def find_block_average_value(arr, side_block_size, block_size):
@@ -349,42 +441,54 @@ def find_block_average_value(arr, side_block_size, block_size):
                                  right_block_average_array,
                                  block_average_array)
     """
+    arr = numpy.asarray(arr, dtype=float)
     length = len(arr)
-    left_border, right_border = 0, 1
-    left_block_sum = arr[0]
-    right_block_sum = arr[0]
-    left_average_array = numpy.zeros(length)
-    right_average_array = numpy.zeros(length)
-    block_average_array = numpy.zeros(length)
-    for index in range(0, length):
-        while left_border < index - side_block_size:
-            left_block_sum -= arr[left_border]
-            left_border += 1
-        while right_border < min(length, index + side_block_size):
-            right_block_sum += arr[right_border]
-            right_border += 1
-
-        left_average_value = float(left_block_sum) / (index - left_border + 1)
-        right_average_value = float(right_block_sum) / (right_border - index)
-        left_average_array[index] = left_average_value
-        right_average_array[index] = right_average_value
-
-        if index + 1 < length:
-            left_block_sum += arr[index + 1]
-        right_block_sum -= arr[index]
-    left_border, right_border = 0, 1
-    block_sum = 0
-    for index in range(0, length):
-        while left_border < index - block_size / 2:
-            block_sum -= arr[left_border]
-            left_border += 1
-        while right_border < min(length, index + block_size / 2):
-            block_sum += arr[right_border]
-            right_border += 1
-
-        average_value = float(block_sum) / (right_border - left_border)
-        block_average_array[index] = average_value
-    return (left_average_array, right_average_array, block_average_array)
+    return _block_average_values(arr, 0, 0, length, length, side_block_size,
+                                 block_size, arr[0])
+
+
+def _block_average_values(arr, arr_begin, begin, end, length,
+                          side_block_size, block_size, first_value):
+    """Computes find_block_average_value for part of an array.
+
+    Args:
+        arr: A numpy array of part of the array to be computed, which covers
+             the blocks of all indices in [begin, end).
+        arr_begin: The index of arr[0] in the full array.
+        begin: The first index to compute average values for.
+        end: The index after the last index to compute average values for.
+        length: The length of the full array.
+        side_block_size: the size of the left_block and right_block.
+        block_size: the size of the block.
+        first_value: The first element of the full array.
+
+    Returns:
+        A tuple of numpy arrays (left_block_average_array,
+            right_block_average_array, block_average_array) at [begin, end).
+
+    """
+    sums = numpy.concatenate(([0.0], numpy.cumsum(arr)))
+
+    def window_sum(left, right):
+        return sums[right - arr_begin] - sums[left - arr_begin]
+
+    index = numpy.arange(begin, end)
+    left_border = numpy.maximum(0, index - side_block_size)
+    left_average = (window_sum(left_border, index + 1) /
+                    (index - left_border + 1))
+    right_border = numpy.minimum(length, index + side_block_size)
+    right_average = window_sum(index, right_border) / (right_border - index)
+
+    # The block sum never included the first element but subtracted it once
+    # the block moved past it, which is kept for the same results.
+    left_border = numpy.maximum(0, numpy.ceil(index - block_size / 2))
+    right_border = numpy.maximum(
+        1, numpy.ceil(numpy.minimum(length, index + block_size / 2)))
+    left_border = left_border.astype(int)
+    right_border = right_border.astype(int)
+    block_average = ((window_sum(left_border, right_border) - first_value) /
+                     (right_border - left_border))
+    return left_average, right_average, block_average
 
 
 def find_start_end_index(dominant_frequency, block_frequency_delta, block_size,
@@ -412,19 +516,78 @@ def find_start_end_index(dominant_frequency, block_frequency_delta, block_size,
 
     """
     length = len(block_frequency_delta)
-
-    # Finds the start/end time index of playing based on dominant frequency
-    start_index, end_index = length - 1, 0
-    for index in range(0, length):
-        left_border = max(0, index - block_size / 2)
-        right_border = min(length - 1, index + block_size / 2)
-        frequency_error = block_frequency_delta[index] / dominant_frequency
-        if frequency_error < frequency_error_threshold:
-            start_index = min(start_index, left_border)
-            end_index = max(end_index, right_border + 1)
+    start_index, end_index = _start_end_index(
+        numpy.asarray(block_frequency_delta), 0, length, dominant_frequency,
+        block_size, frequency_error_threshold)
+    if start_index is None:
+        return (length - 1, 0)
     return (start_index, end_index)
 
 
+def _start_end_index(block_frequency_delta, offset, length, dominant_frequency,
+                     block_size, frequency_error_threshold):
+    """Finds start and end index of sine wave in part of a signal.
+
+    Args:
+        block_frequency_delta: A numpy array of part of block_frequency_delta
+                               of find_start_end_index.
+        offset: The index of block_frequency_delta[0] in the full array.
+        length: The length of the full array.
+        Other arguments: Ref to find_start_end_index.
+
+    Returns:
+        A tuple (start_index, end_index) as in find_start_end_index, or
+            (None, None) if no block is within the sine wave.
+
+    """
+    frequency_error = block_frequency_delta / dominant_frequency
+    indices = numpy.flatnonzero(frequency_error < frequency_error_threshold)
+    if not len(indices):
+        return None, None
+    start_index = max(0, int(indices[0]) + offset - block_size / 2)
+    end_index = min(length - 1, int(indices[-1]) + offset + block_size / 2) + 1
+    return start_index, end_index
+
+
+def _event_runs(is_event, offset, same_event_samples):
+    """Groups indices where an event is detected into events.
+
+    Detected indices are the same event if they are less than
+    same_event_samples apart.
+
+    Args:
+        is_event: A boolean numpy array, True where an event is detected.
+        offset: The index of is_event[0] in the signal.
+        same_event_samples: The maximum distance of indices of same event.
+
+    Returns:
+        A list of [first_index, last_index] of each event.
+
+    """
+    indices = numpy.flatnonzero(is_event) + offset
+    if not len(indices):
+        return []
+    # An event at index 0 is never continued, as in the original detectors.
+    is_new_event = ((numpy.diff(indices) >= same_event_samples) |
+                    (indices[:-1] == 0))
+    firsts = numpy.concatenate(([0], numpy.flatnonzero(is_new_event) + 1))
+    lasts = numpy.concatenate((firsts[1:] - 1, [len(indices) - 1]))
+    return [[int(indices[first]), int(indices[last])]
+            for first, last in zip(firsts, lasts)]
+
+
+def _index_time(index, rate):
+    """Returns the time in seconds of an index of the signal with zeros."""
+    return float(index) / rate - APPEND_ZEROS_SECS
+
+
+def _event_durations(runs, rate):
+    """Converts events to a list of (time, duration) in seconds."""
+    return [(_index_time(first, rate),
+             _index_time(last + 1, rate) - _index_time(first, rate))
+            for first, last in runs]
+
+
 def noise_detection(start_index, end_index, block_amplitude, average_amplitude,
                     rate, noise_amplitude_threshold):
     """Detects noise before/after sine wave.
@@ -452,53 +615,54 @@ def noise_detection(start_index, end_index, block_amplitude, average_amplitude,
 
     """
     length = len(block_amplitude)
-    amplitude_threshold = average_amplitude * noise_amplitude_threshold
-    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
+    is_noise = _is_noise(
+        numpy.arange(length), numpy.asarray(block_amplitude), start_index,
+        end_index, length, average_amplitude, rate, noise_amplitude_threshold)
+    return _split_noise(
+        _event_runs(is_noise, 0, rate * DEFAULT_SAME_EVENT_SECS), start_index,
+        rate)
 
-    # Detects noise before playing.
-    noise_time_point = []
-    last_noise_end_time_point = []
-    previous_noise_index = None
-    times = 0
-    for index in range(0, length):
-        # Ignore noise too close to the beginning or the end of sine wave.
-        # Check the docstring of NEAR_SINE_START_OR_END_SECS.
-        if ((start_index - rate * NEAR_SINE_START_OR_END_SECS) <= index and
-            (index < end_index + rate * NEAR_SINE_START_OR_END_SECS)):
-            continue
 
-        # Ignore noise too close to the beginning or the end of original data.
-        # Check the docstring of NEAR_DATA_START_OR_END_SECS.
-        if (float(index) / rate <=
-                NEAR_DATA_START_OR_END_SECS + APPEND_ZEROS_SECS):
-            continue
-        if (float(length - index) / rate <=
-                NEAR_DATA_START_OR_END_SECS + APPEND_ZEROS_SECS):
-            continue
-        if block_amplitude[index] > amplitude_threshold:
-            same_event = False
-            if previous_noise_index:
-                same_event = (index - previous_noise_index
-                              ) < same_event_samples
-            if not same_event:
-                index_start_sec = float(index) / rate - APPEND_ZEROS_SECS
-                index_end_sec = float(index + 1) / rate - APPEND_ZEROS_SECS
-                noise_time_point.append(index_start_sec)
-                last_noise_end_time_point.append(index_end_sec)
-                times += 1
-            index_end_sec = float(index + 1) / rate - APPEND_ZEROS_SECS
-            last_noise_end_time_point[times - 1] = index_end_sec
-            previous_noise_index = index
+def _is_noise(index, block_amplitude, start_index, end_index, length,
+              average_amplitude, rate, noise_amplitude_threshold):
+    """Returns a boolean numpy array, True where noise_detection detects noise.
+
+    Args:
+        index: A numpy array of the indices to check.
+        block_amplitude: A numpy array of the block amplitude at index.
+        length: The length of the signal.
+        Other arguments: Ref to noise_detection.
 
+    """
+    # Ignore noise too close to the beginning or the end of sine wave.
+    # Check the docstring of NEAR_SINE_START_OR_END_SECS.
+    near_sine = (
+        (start_index - rate * NEAR_SINE_START_OR_END_SECS <= index) &
+        (index < end_index + rate * NEAR_SINE_START_OR_END_SECS))
+    # Ignore noise too close to the beginning or the end of original data.
+    # Check the docstring of NEAR_DATA_START_OR_END_SECS.
+    near_data = (
+        (index / rate <= NEAR_DATA_START_OR_END_SECS + APPEND_ZEROS_SECS) |
+        ((length - index) / rate <=
+         NEAR_DATA_START_OR_END_SECS + APPEND_ZEROS_SECS))
+    return ~near_sine & ~near_data & (
+        block_amplitude > average_amplitude * noise_amplitude_threshold)
+
+
+def _split_noise(runs, start_index, rate):
+    """Splits noise events into (noise_before_playing, noise_after_playing)."""
     noise_before_playing, noise_after_playing = [], []
-    for i in range(times):
-        duration = last_noise_end_time_point[i] - noise_time_point[i]
-        if noise_time_point[i] < float(start_index) / rate - APPEND_ZEROS_SECS:
-            noise_before_playing.append((noise_time_point[i], duration))
+    for noise in _event_durations(runs, rate):
+        if noise[0] < _index_time(start_index, rate):
+            noise_before_playing.append(noise)
         else:
-            noise_after_playing.append((noise_time_point[i], duration))
+            noise_after_playing.append(noise)
+    return noise_before_playing, noise_after_playing
 
-    return (noise_before_playing, noise_after_playing)
+
+def _sine_slice(start_index, end_index):
+    """Returns the slice of the indices within the sine wave."""
+    return slice(int(start_index), int(end_index))
 
 
 def delay_detection(start_index, end_index, block_amplitude, average_amplitude,
@@ -541,57 +705,51 @@ def delay_detection(start_index, end_index, block_amplitude, average_amplitude,
               where time and duration are in seconds.
 
     """
-    delay_time_points = []
-    last_delay_end_time_points = []
-    previous_delay_index = None
-    times = 0
-    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
-    start_time = float(start_index) / rate - APPEND_ZEROS_SECS
-    end_time = float(end_index) / rate - APPEND_ZEROS_SECS
-    for index in range(int(start_index), int(end_index)):
-        if block_amplitude[
-                index] > average_amplitude * delay_amplitude_threshold:
-            continue
-        now_time = float(index) / rate - APPEND_ZEROS_SECS
-        if abs(now_time - start_time) < NEAR_START_OR_END_SECS:
-            continue
-        if abs(now_time - end_time) < NEAR_START_OR_END_SECS:
-            continue
-        # If amplitude less than its left/right side and small enough,
-        # it will be considered as a delay.
-        amp_threshold = average_amplitude * delay_amplitude_threshold
-        left_threshold = delay_amplitude_threshold * left_block_amplitude[
-            index]
-        amp_threshold = min(amp_threshold, left_threshold)
-        right_threshold = delay_amplitude_threshold * right_block_amplitude[
-            index]
-        amp_threshold = min(amp_threshold, right_threshold)
-
-        frequency_error = block_frequency_delta[index] / dominant_frequency
-
-        amplitude_too_small = block_amplitude[index] < amp_threshold
-        frequency_not_match = frequency_error > frequency_error_threshold
-
-        if amplitude_too_small or frequency_not_match:
-            same_event = False
-            if previous_delay_index:
-                same_event = (index - previous_delay_index
-                              ) < same_event_samples
-            if not same_event:
-                index_start_sec = float(index) / rate - APPEND_ZEROS_SECS
-                index_end_sec = float(index + 1) / rate - APPEND_ZEROS_SECS
-                delay_time_points.append(index_start_sec)
-                last_delay_end_time_points.append(index_end_sec)
-                times += 1
-            previous_delay_index = index
-            index_end_sec = float(index + 1) / rate - APPEND_ZEROS_SECS
-            last_delay_end_time_points[times - 1] = index_end_sec
-
-    delay_list = []
-    for i in range(len(delay_time_points)):
-        duration = last_delay_end_time_points[i] - delay_time_points[i]
-        delay_list.append((delay_time_points[i], duration))
-    return delay_list
+    sine = _sine_slice(start_index, end_index)
+    is_delay = _is_delay(
+        numpy.arange(int(start_index), int(end_index)),
+        numpy.asarray(block_amplitude)[sine],
+        numpy.asarray(left_block_amplitude)[sine],
+        numpy.asarray(right_block_amplitude)[sine],
+        numpy.asarray(block_frequency_delta)[sine] / dominant_frequency,
+        start_index, end_index, average_amplitude, rate,
+        delay_amplitude_threshold, frequency_error_threshold)
+    return _event_durations(
+        _event_runs(is_delay, int(start_index),
+                    rate * DEFAULT_SAME_EVENT_SECS), rate)
+
+
+def _is_delay(index, block_amplitude, left_block_amplitude,
+              right_block_amplitude, frequency_error, start_index, end_index,
+              average_amplitude, rate, delay_amplitude_threshold,
+              frequency_error_threshold):
+    """Returns a boolean numpy array, True where delay_detection detects delay.
+
+    Args:
+        index: A numpy array of the indices to check, within the sine wave.
+        block_amplitude, left_block_amplitude, right_block_amplitude: numpy
+            arrays of the block amplitudes at index.
+        frequency_error: A numpy array of the block frequency delta at index
+                         divided by the dominant frequency.
+        Other arguments: Ref to delay_detection.
+
+    """
+    start_time = _index_time(start_index, rate)
+    end_time = _index_time(end_index, rate)
+    now_time = index / rate - APPEND_ZEROS_SECS
+    # If amplitude less than its left/right side and small enough,
+    # it will be considered as a delay.
+    amp_threshold = numpy.minimum(
+        numpy.minimum(average_amplitude * delay_amplitude_threshold,
+                      delay_amplitude_threshold * left_block_amplitude),
+        delay_amplitude_threshold * right_block_amplitude)
+    amplitude_too_small = block_amplitude < amp_threshold
+    frequency_not_match = frequency_error > frequency_error_threshold
+    return (
+        (block_amplitude <= average_amplitude * delay_amplitude_threshold) &
+        (abs(now_time - start_time) >= NEAR_START_OR_END_SECS) &
+        (abs(now_time - end_time) >= NEAR_START_OR_END_SECS) &
+        (amplitude_too_small | frequency_not_match))
 
 
 def burst_detection(start_index, end_index, block_amplitude, average_amplitude,
@@ -632,42 +790,45 @@ def burst_detection(start_index, end_index, block_amplitude, average_amplitude,
               where time is in seconds.
 
     """
-    burst_time_points = []
-    previous_burst_index = None
-    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
-    for index in range(int(start_index), int(end_index)):
-        # If amplitude higher than its left/right side and large enough,
-        # it will be considered as a burst.
-        if block_amplitude[
-                index] <= average_amplitude * DEFAULT_BURST_TOO_SMALL:
-            continue
-        if abs(index - start_index) < rate * NEAR_START_OR_END_SECS:
-            continue
-        if abs(index - end_index) < rate * NEAR_START_OR_END_SECS:
-            continue
-        amp_threshold = average_amplitude * DEFAULT_BURST_TOO_SMALL
-        left_threshold = burst_amplitude_threshold * left_block_amplitude[
-            index]
-        amp_threshold = max(amp_threshold, left_threshold)
-        right_threshold = burst_amplitude_threshold * right_block_amplitude[
-            index]
-        amp_threshold = max(amp_threshold, right_threshold)
-
-        frequency_error = block_frequency_delta[index] / dominant_frequency
-
-        amplitude_too_large = block_amplitude[index] > amp_threshold
-        frequency_not_match = frequency_error > frequency_error_threshold
+    sine = _sine_slice(start_index, end_index)
+    is_burst = _is_burst(
+        numpy.arange(int(start_index), int(end_index)),
+        numpy.asarray(block_amplitude)[sine],
+        numpy.asarray(left_block_amplitude)[sine],
+        numpy.asarray(right_block_amplitude)[sine],
+        numpy.asarray(block_frequency_delta)[sine] / dominant_frequency,
+        start_index, end_index, average_amplitude, rate,
+        burst_amplitude_threshold, frequency_error_threshold)
+    return [
+        _index_time(first, rate)
+        for first, _ in _event_runs(is_burst, int(start_index),
+                                    rate * DEFAULT_SAME_EVENT_SECS)
+    ]
+
+
+def _is_burst(index, block_amplitude, left_block_amplitude,
+              right_block_amplitude, frequency_error, start_index, end_index,
+              average_amplitude, rate, burst_amplitude_threshold,
+              frequency_error_threshold):
+    """Returns a boolean numpy array, True where burst_detection detects burst.
 
-        if amplitude_too_large or frequency_not_match:
-            same_event = False
-            if previous_burst_index:
-                same_event = index - previous_burst_index < same_event_samples
-            if not same_event:
-                burst_time_points.append(
-                    float(index) / rate - APPEND_ZEROS_SECS)
-            previous_burst_index = index
+    Args:
+        Ref to _is_delay and burst_detection.
 
-    return burst_time_points
+    """
+    # If amplitude higher than its left/right side and large enough,
+    # it will be considered as a burst.
+    amp_threshold = numpy.maximum(
+        numpy.maximum(average_amplitude * DEFAULT_BURST_TOO_SMALL,
+                      burst_amplitude_threshold * left_block_amplitude),
+        burst_amplitude_threshold * right_block_amplitude)
+    amplitude_too_large = block_amplitude > amp_threshold
+    frequency_not_match = frequency_error > frequency_error_threshold
+    return (
+        (block_amplitude > average_amplitude * DEFAULT_BURST_TOO_SMALL) &
+        (abs(index - start_index) >= rate * NEAR_START_OR_END_SECS) &
+        (abs(index - end_index) >= rate * NEAR_START_OR_END_SECS) &
+        (amplitude_too_large | frequency_not_match))
 
 
 def changing_volume_detection(start_index, end_index, average_amplitude, rate,
@@ -705,57 +866,71 @@ def changing_volume_detection(start_index, end_index, average_amplitude, rate,
             decreasing.
 
     """
-    length = len(left_block_amplitude)
+    sine = _sine_slice(start_index, end_index)
+    is_rising, is_falling = _is_volume_changing(
+        numpy.arange(int(start_index), int(end_index)),
+        numpy.asarray(left_block_amplitude)[sine],
+        numpy.asarray(right_block_amplitude)[sine], start_index, end_index,
+        average_amplitude, rate, volume_changing_amplitude_threshold)
+    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
+    return _combine_volume_changes(
+        _event_runs(is_rising, int(start_index), same_event_samples),
+        _event_runs(is_falling, int(start_index), same_event_samples), rate)
+
 
-    # Detects rising and/or falling volume.
-    previous_rising_index, previous_falling_index = None, None
-    changing_time = []
-    changing_events = []
+def _is_volume_changing(index, left_block_amplitude, right_block_amplitude,
+                        start_index, end_index, average_amplitude, rate,
+                        volume_changing_amplitude_threshold):
+    """Finds where changing_volume_detection detects a volume change.
+
+    Args:
+        Ref to _is_delay and changing_volume_detection.
+
+    Returns:
+        A tuple of boolean numpy arrays (is_rising, is_falling).
+
+    """
+    # Skips if amplitude is too small, or if changing is from start or end
+    # time.
     amplitude_threshold = average_amplitude * DEFAULT_VOLUME_CHANGE_TOO_SMALL
-    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
-    for index in range(int(start_index), int(end_index)):
-        # Skips if amplitude is too small.
-        if left_block_amplitude[index] < amplitude_threshold:
-            continue
-        if right_block_amplitude[index] < amplitude_threshold:
-            continue
-        # Skips if changing is from start or end time
-        if float(abs(start_index - index)) / rate < NEAR_START_OR_END_SECS:
-            continue
-        if float(abs(end_index - index)) / rate < NEAR_START_OR_END_SECS:
-            continue
+    is_checked = (
+        (left_block_amplitude >= amplitude_threshold) &
+        (right_block_amplitude >= amplitude_threshold) &
+        (abs(start_index - index) / rate >= NEAR_START_OR_END_SECS) &
+        (abs(end_index - index) / rate >= NEAR_START_OR_END_SECS))
+    delta_margin = numpy.where(
+        left_block_amplitude > 0,
+        volume_changing_amplitude_threshold * left_block_amplitude,
+        volume_changing_amplitude_threshold)
+    is_rising = is_checked & (
+        right_block_amplitude > left_block_amplitude + delta_margin)
+    is_falling = is_checked & (
+        right_block_amplitude < left_block_amplitude - delta_margin)
+    return is_rising, is_falling
+
+
+def _combine_volume_changes(rising_runs, falling_runs, rate):
+    """Combines consecutive increasing/decreasing events.
 
-        delta_margin = volume_changing_amplitude_threshold
-        if left_block_amplitude[index] > 0:
-            delta_margin *= left_block_amplitude[index]
-
-        increasing_threshold = left_block_amplitude[index] + delta_margin
-        decreasing_threshold = left_block_amplitude[index] - delta_margin
-
-        if right_block_amplitude[index] > increasing_threshold:
-            same_event = False
-            if previous_rising_index:
-                same_event = index - previous_rising_index < same_event_samples
-            if not same_event:
-                changing_time.append(float(index) / rate - APPEND_ZEROS_SECS)
-                changing_events.append(+1)
-            previous_rising_index = index
-        if right_block_amplitude[index] < decreasing_threshold:
-            same_event = False
-            if previous_falling_index:
-                same_event = index - previous_falling_index < same_event_samples
-            if not same_event:
-                changing_time.append(float(index) / rate - APPEND_ZEROS_SECS)
-                changing_events.append(-1)
-            previous_falling_index = index
-
-    # Combines consecutive increasing/decreasing event.
+    Args:
+        rising_runs: A list of [first_index, last_index] of increasing events.
+        falling_runs: A list of [first_index, last_index] of decreasing
+                      events.
+        rate: Sampling rate in samples per second.
+
+    Returns:
+        Ref to changing_volume_detection.
+
+    """
+    # Rising events come before falling events at the same index.
+    changing_events = sorted([(first, 0, +1) for first, _ in rising_runs] +
+                             [(first, 1, -1) for first, _ in falling_runs])
     combined_changing_events, prev = [], 0
-    for i in range(len(changing_events)):
-        if changing_events[i] == prev:
+    for index, _, change in changing_events:
+        if change == prev:
             continue
-        combined_changing_events.append((changing_time[i], changing_events[i]))
-        prev = changing_events[i]
+        combined_changing_events.append((_index_time(index, rate), change))
+        prev = change
     return combined_changing_events
 
 
@@ -927,3 +1102,466 @@ def quality_measurement(
         'volume_changes': volume_changes,
         'equivalent_noise_level': noise
     }
+
+
+# Holder for the parameters shared by all blocks in block streaming mode.
+# length is the length of the signal after zeros are appended, padding is
+# the number of zeros appended on each side, and first_amplitude and
+# first_frequency_delta are the amplitude and frequency delta at index 0.
+_StreamParams = collections.namedtuple('_StreamParams', [
+    'rate', 'length', 'padding', 'block_size', 'saturate_value',
+    'dominant_frequency', 'first_amplitude', 'first_frequency_delta'
+])
+
+
+def stream_quality_measurement(
+        signal,
+        rate,
+        dominant_frequency=None,
+        block_size_secs=DEFAULT_BLOCK_SIZE_SECS,
+        frequency_error_threshold=DEFAULT_FREQUENCY_ERROR,
+        delay_amplitude_threshold=DEFAULT_DELAY_AMPLITUDE_THRESHOLD,
+        noise_amplitude_threshold=DEFAULT_NOISE_AMPLITUDE_THRESHOLD,
+        burst_amplitude_threshold=DEFAULT_BURST_AMPLITUDE_THRESHOLD,
+        volume_changing_amplitude_threshold=DEFAULT_VOLUME_CHANGE_AMPLITUDE,
+        stream_block_secs=DEFAULT_STREAM_BLOCK_SECS,
+        saturate_value=None,
+        pool=None):
+    """Detects artifacts and estimates the noise level block by block.
+
+    This gives the same result as quality_measurement, up to floating point
+    rounding, but reads and analyzes the signal in blocks of
+    stream_block_secs so memory usage does not depend on the length of the
+    signal. Each block is extended by enough samples on both sides that the
+    Hilbert transform and the block averages of the samples in the block are
+    the same as when analyzing the full signal.
+
+    The signal is read twice. The first pass finds the start and end of the
+    sine wave and its average amplitude. The second pass runs the detectors,
+    and the events found in each block are merged with the events of the
+    previous block.
+
+    Blocks are independent of each other within a pass, so they can be
+    analyzed in parallel by a process pool. The samples of each block are
+    read by the calling process and sent to the pool, and the results are
+    merged in block order, so the result does not depend on the pool.
+
+    Args:
+        signal: A 1-D array-like object for one-channel PCM data which
+                supports slicing, e.g. a channel of AudioRawData read with
+                read_file.
+        rate: Sampling rate in samples per second. Example inputs: 44100,
+        48000
+        dominant_frequency: Dominant frequency of signal. Set None to
+                            recalculate the frequency with
+                            audio_analysis.averaged_spectral_analysis.
+        block_size_secs: Ref to quality_measurement.
+        frequency_error_threshold: Ref to quality_measurement.
+        delay_amplitude_threshold: Ref to quality_measurement.
+        noise_amplitude_threshold: Ref to quality_measurement.
+        burst_amplitude_threshold: Ref to quality_measurement.
+        volume_changing_amplitude_threshold: Ref to quality_measurement.
+        stream_block_secs: The length in seconds of signal read at a time.
+        saturate_value: If not None, signal is not normalized yet and each
+                        block is normalized by this value after being read.
+        pool: A multiprocessing.Pool to analyze the blocks with. None to
+              analyze the blocks in the calling process.
+
+    Returns:
+        Same as quality_measurement.
+
+    """
+    block_size = int(block_size_secs * rate)
+    padding = int(rate * APPEND_ZEROS_SECS)
+    length = len(signal) + 2 * padding
+    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
+
+    if not dominant_frequency:
+        dominant_frequency = audio_analysis.averaged_spectral_analysis(
+            signal, rate, int(stream_block_secs * rate), saturate_value)[0][0]
+
+    params = _StreamParams(
+        rate=rate,
+        length=length,
+        padding=padding,
+        block_size=block_size,
+        saturate_value=saturate_value,
+        dominant_frequency=dominant_frequency,
+        first_amplitude=None,
+        first_frequency_delta=None)
+    first_amplitude, first_frequency = _block_amplitude_and_frequency(
+        _block_window(signal, 0, 1, params), 0, 1, length, rate, block_size)
+    params = params._replace(
+        first_amplitude=first_amplitude[0],
+        first_frequency_delta=abs(first_frequency[0] - dominant_frequency))
+
+    blocks = _stream_blocks(length, block_size, stream_block_secs * rate)
+    # Both map functions read the tasks lazily and keep their order.
+    map_function = pool.imap if pool else map
+
+    # Finds start and end index of sine wave and the sum of amplitude in
+    # each block.
+    start_index, end_index = length - 2, 0
+    block_amplitude_sums = []
+    tasks = ((_find_block_start_end_index,
+              _block_window(signal, begin, end, params), begin, end, params,
+              frequency_error_threshold) for begin, end in blocks)
+    for block_start, block_end, amplitude_sum in map_function(
+            _run_block_task, tasks):
+        if block_start is not None:
+            start_index = min(start_index, block_start)
+            end_index = max(end_index, block_end)
+        block_amplitude_sums.append(amplitude_sum)
+
+    if start_index > end_index:
+        raise SineWaveNotFound('No sine wave found in signal')
+
+    logging.debug('Found sine wave: start: %s, end: %s',
+                  float(start_index) / rate - APPEND_ZEROS_SECS,
+                  float(end_index) / rate - APPEND_ZEROS_SECS)
+
+    # Finds average amplitude of sine wave. Only the blocks containing the
+    # start or the end of sine wave are analyzed again.
+    sum_of_amplitude = 0.0
+    for (begin, end), amplitude_sum in zip(blocks, block_amplitude_sums):
+        sine_begin = max(begin, int(start_index))
+        sine_end = min(end, int(end_index))
+        if sine_begin >= sine_end:
+            continue
+        if sine_begin == begin and sine_end == end:
+            sum_of_amplitude += amplitude_sum
+        else:
+            amplitude, _ = _block_amplitude_and_frequency(
+                _block_window(signal, begin, end, params), sine_begin,
+                sine_end, length, rate, block_size)
+            sum_of_amplitude += float(numpy.sum(amplitude))
+    average_amplitude = sum_of_amplitude / (end_index - start_index)
+
+    # Runs the detectors on each block and merges their events.
+    events = collections.defaultdict(list)
+    teager_value = 0.0
+    tasks = ((_detect_block_events, _block_window(signal, begin, end, params),
+              begin, end, params, start_index, end_index, average_amplitude,
+              frequency_error_threshold, delay_amplitude_threshold,
+              noise_amplitude_threshold, burst_amplitude_threshold,
+              volume_changing_amplitude_threshold) for begin, end in blocks)
+    for block_events, block_teager_value in map_function(
+            _run_block_task, tasks):
+        for name, runs in block_events.items():
+            events[name] = _merge_event_runs(events[name], runs,
+                                             same_event_samples)
+        teager_value += block_teager_value
+
+    return _stream_quality_result(events, teager_value, start_index,
+                                  end_index, average_amplitude, params)
+
+
+def _stream_blocks(length, block_size, stream_block_samples):
+    """Splits the padded signal into blocks of whole Hilbert blocks.
+
+    Args:
+        length: The length of the padded signal.
+        block_size: The block size in samples, as in quality_measurement.
+        stream_block_samples: The desired number of samples in each block.
+
+    Returns:
+        A list of tuples (begin, end) of each block.
+
+    """
+    hilbert_block = block_size // 2
+    step = max(1, int(stream_block_samples) // hilbert_block) * hilbert_block
+    return [(begin, min(length, begin + step))
+            for begin in range(0, length, step)]
+
+
+def _run_block_task(task):
+    """Runs a function on a block in a worker of the pool.
+
+    Args:
+        task: A tuple of the function and its arguments.
+
+    Returns:
+        The return value of the function.
+
+    """
+    return task[0](*task[1:])
+
+
+def _block_window(signal, begin, end, params):
+    """Reads all the samples needed to analyze a block.
+
+    Args:
+        signal: The signal passed to stream_quality_measurement.
+        begin: The first index of the block in the padded signal.
+        end: The index after the last index of the block in the padded signal.
+        params: A _StreamParams.
+
+    Returns:
+        A tuple (window_begin, samples) where samples is a numpy array of the
+            normalized samples of the padded signal from index window_begin.
+
+    """
+    hilbert_block = params.block_size // 2
+    half_hilbert_block = hilbert_block // 2
+    # The block averages of each index need the amplitude of two block sizes
+    # on each side, and the frequency of the last of them needs one more
+    # sample.
+    margin = params.block_size * 2 + 2
+    window_begin = max(0, begin - margin)
+    window_end = min(params.length, end + margin)
+    # The Hilbert transform is applied to whole segments.
+    window_begin -= window_begin % hilbert_block + half_hilbert_block
+    window_end += (-window_end) % hilbert_block + half_hilbert_block
+    window_begin = max(0, window_begin)
+    window_end = min(params.length, window_end)
+    return window_begin, _read_padded_signal(signal, window_begin,
+                                             window_end, params)
+
+
+def _window_samples(window, begin, end):
+    """Gets the samples at [begin, end) of the padded signal from a window.
+
+    Args:
+        window: A window returned by _block_window.
+        begin: The first index in the padded signal.
+        end: The index after the last index in the padded signal.
+
+    Returns:
+        A numpy array of samples.
+
+    """
+    window_begin, samples = window
+    return samples[begin - window_begin:end - window_begin]
+
+
+def _read_padded_signal(signal, begin, end, params):
+    """Reads samples of the signal with zeros appended on both sides.
+
+    Args:
+        signal: The signal passed to stream_quality_measurement.
+        begin: The first index in the padded signal.
+        end: The index after the last index in the padded signal.
+        params: A _StreamParams.
+
+    Returns:
+        A numpy array of normalized samples at [begin, end) of padded signal.
+
+    """
+    samples = numpy.zeros(end - begin)
+    data_begin = max(begin, params.padding)
+    data_end = min(end, params.length - params.padding)
+    if data_begin < data_end:
+        data = numpy.asarray(
+            signal[data_begin - params.padding:data_end - params.padding],
+            dtype=float)
+        if params.saturate_value is not None:
+            data = data / float(params.saturate_value)
+        samples[data_begin - begin:data_end - begin] = data
+    return samples
+
+
+def _block_features(window, begin, end, params):
+    """Computes the per-sample values used by the detectors in a block.
+
+    Args:
+        window: A window returned by _block_window for this block.
+        begin: The first index in the padded signal.
+        end: The index after the last index in the padded signal.
+        params: A _StreamParams.
+
+    Returns:
+        A tuple of numpy arrays (left_block_amplitude, right_block_amplitude,
+            block_amplitude, block_frequency_delta, amplitude) at
+            [begin, end). block_frequency_delta is one element shorter if end
+            is the length of the padded signal.
+
+    """
+    side_block_size = params.block_size * 2
+    window_begin = max(0, begin - side_block_size - 1)
+    window_end = min(params.length, end + side_block_size + 1)
+    amplitude, frequency = _block_amplitude_and_frequency(
+        window, window_begin, window_end, params.length, params.rate,
+        params.block_size)
+    frequency_delta = abs(frequency - params.dominant_frequency)
+
+    left_block_amplitude, right_block_amplitude, block_amplitude = (
+        _block_average_values(amplitude, window_begin, begin, end,
+                              params.length, side_block_size,
+                              params.block_size, params.first_amplitude))
+    _, _, block_frequency_delta = _block_average_values(
+        frequency_delta, window_begin, begin, min(end, params.length - 1),
+        params.length - 1, side_block_size, params.block_size,
+        params.first_frequency_delta)
+    return (left_block_amplitude, right_block_amplitude, block_amplitude,
+            block_frequency_delta,
+            amplitude[begin - window_begin:end - window_begin])
+
+
+def _find_block_start_end_index(window, begin, end, params,
+                                frequency_error_threshold):
+    """Finds start and end index of sine wave within a block.
+
+    Args:
+        window: A window returned by _block_window for this block.
+        begin: The first index in the padded signal.
+        end: The index after the last index in the padded signal.
+        params: A _StreamParams.
+        frequency_error_threshold: Ref to DEFAULT_FREQUENCY_ERROR.
+
+    Returns:
+        A tuple (start_index, end_index, amplitude_sum) where start_index and
+            end_index are computed as in find_start_end_index, or None if no
+            block in this block is within the sine wave, and amplitude_sum
+            is the sum of amplitude in this block.
+
+    """
+    _, _, _, block_frequency_delta, amplitude = _block_features(
+        window, begin, end, params)
+    # The frequency has one element less than the padded signal.
+    start_index, end_index = _start_end_index(
+        block_frequency_delta, begin, params.length - 1,
+        params.dominant_frequency, params.block_size,
+        frequency_error_threshold)
+    return start_index, end_index, float(numpy.sum(amplitude))
+
+
+def _detect_block_events(
+        window, begin, end, params, start_index, end_index,
+        average_amplitude, frequency_error_threshold,
+        delay_amplitude_threshold, noise_amplitude_threshold,
+        burst_amplitude_threshold, volume_changing_amplitude_threshold):
+    """Runs the detectors on a block.
+
+    Args:
+        window: A window returned by _block_window for this block.
+        begin: The first index in the padded signal.
+        end: The index after the last index in the padded signal.
+        params: A _StreamParams.
+        start_index: Start index of sine wave.
+        end_index: End index of sine wave.
+        average_amplitude: Average amplitude of sine wave.
+        Other arguments: Ref to quality_measurement.
+
+    Returns:
+        A tuple (events, teager_value) where events is a dict from
+            'noise', 'delay', 'burst', 'rising' and 'falling' to the list of
+            [first_index, last_index] of each event in this block, and
+            teager_value is the sum of teager values in this block.
+
+    """
+    rate = params.rate
+    same_event_samples = rate * DEFAULT_SAME_EVENT_SECS
+    (left_block_amplitude, right_block_amplitude, block_amplitude,
+     block_frequency_delta, _) = _block_features(window, begin, end, params)
+    index = numpy.arange(begin, end)
+
+    events = {}
+    is_noise = _is_noise(index, block_amplitude, start_index, end_index,
+                         params.length, average_amplitude, rate,
+                         noise_amplitude_threshold)
+    events['noise'] = _event_runs(is_noise, begin, same_event_samples)
+
+    # The other detectors only check indices within the sine wave.
+    sine_begin = max(begin, int(start_index))
+    sine_end = min(end, int(end_index))
+    if sine_begin >= sine_end:
+        for name in ['delay', 'burst', 'rising', 'falling']:
+            events[name] = []
+        return events, 0.0
+    sine = slice(sine_begin - begin, sine_end - begin)
+    index = index[sine]
+    left_block_amplitude = left_block_amplitude[sine]
+    right_block_amplitude = right_block_amplitude[sine]
+    block_amplitude = block_amplitude[sine]
+    frequency_error = (block_frequency_delta[sine] /
+                       params.dominant_frequency)
+
+    is_delay = _is_delay(index, block_amplitude, left_block_amplitude,
+                         right_block_amplitude, frequency_error, start_index,
+                         end_index, average_amplitude, rate,
+                         delay_amplitude_threshold, frequency_error_threshold)
+    events['delay'] = _event_runs(is_delay, sine_begin, same_event_samples)
+    is_burst = _is_burst(index, block_amplitude, left_block_amplitude,
+                         right_block_amplitude, frequency_error, start_index,
+                         end_index, average_amplitude, rate,
+                         burst_amplitude_threshold, frequency_error_threshold)
+    events['burst'] = _event_runs(is_burst, sine_begin, same_event_samples)
+    is_rising, is_falling = _is_volume_changing(
+        index, left_block_amplitude, right_block_amplitude, start_index,
+        end_index, average_amplitude, rate,
+        volume_changing_amplitude_threshold)
+    events['rising'] = _event_runs(is_rising, sine_begin, same_event_samples)
+    events['falling'] = _event_runs(is_falling, sine_begin,
+                                    same_event_samples)
+
+    # Computes the teager values of the sine wave in this block, which
+    # excludes the first and the last samples of the sine wave.
+    teager_begin = max(sine_begin, int(start_index) + 1)
+    teager_end = min(sine_end, int(end_index) - 1)
+    teager_value = 0.0
+    if teager_begin < teager_end:
+        wave = _window_samples(window, teager_begin - 1, teager_end + 1)
+        teager_value = float(numpy.sum(_teager_values(wave)))
+    return events, teager_value
+
+
+def _merge_event_runs(runs, next_runs, same_event_samples):
+    """Appends the events of the next block to the events found so far.
+
+    Args:
+        runs: A list of [first_index, last_index] of events found so far.
+        next_runs: A list of [first_index, last_index] of events in the next
+                   block.
+        same_event_samples: The maximum distance of indices of same event.
+
+    Returns:
+        The list of [first_index, last_index] of merged events.
+
+    """
+    if (runs and next_runs and runs[-1][1] and
+            next_runs[0][0] - runs[-1][1] < same_event_samples):
+        runs[-1][1] = next_runs[0][1]
+        next_runs = next_runs[1:]
+    return runs + next_runs
+
+
+def _stream_quality_result(events, teager_value, start_index, end_index,
+                           average_amplitude, params):
+    """Converts the merged events to the result of quality_measurement.
+
+    Args:
+        events: A dict of merged events as returned by _detect_block_events.
+        teager_value: The sum of teager values of sine wave.
+        start_index: Start index of sine wave.
+        end_index: End index of sine wave.
+        average_amplitude: Average amplitude of sine wave.
+        params: A _StreamParams.
+
+    Returns:
+        Same as quality_measurement.
+
+    """
+    rate = params.rate
+    noise_before_playing, noise_after_playing = _split_noise(
+        events['noise'], start_index, rate)
+    burst_time_points = [
+        _index_time(first, rate) for first, _ in events['burst']
+    ]
+    volume_changes = _combine_volume_changes(events['rising'],
+                                             events['falling'], rate)
+
+    teager_value = (teager_value / (int(end_index) - int(start_index)) /
+                    (average_amplitude**2))
+    noise = noise_level(average_amplitude, params.dominant_frequency, rate,
+                        teager_value)
+
+    return {
+        'artifacts': {
+            'noise_before_playback': noise_before_playing,
+            'noise_after_playback': noise_after_playing,
+            'delay_during_playback': _event_durations(events['delay'], rate),
+            'burst_during_playback': burst_time_points
+        },
+        'volume_changes': volume_changes,
+        'equivalent_noise_level': noise
+    }
@@ -17,12 +17,15 @@
 
 import argparse
 import collections
+import concurrent.futures
 import json
 import logging
 import math
+import multiprocessing
 import numpy
 import os
 import pprint
+import struct
 import subprocess
 import tempfile
 import wave
@@ -59,6 +62,9 @@ class WaveFormatExtensibleException(Exception):
 class WaveFile(object):
     """Class which handles wave file reading.
 
+    The samples are memory-mapped rather than read into memory, so long
+    recordings can be analyzed without loading them entirely.
+
     Properties:
         raw_data: audio_data.AudioRawData object for data in wave file.
         rate: sampling rate.
@@ -79,7 +85,6 @@ class WaveFile(object):
         self._n_channels = None
         self._sample_width_bits = None
         self._n_frames = None
-        self._binary = None
 
         try:
             self._read_wave_file(filename)
@@ -130,7 +135,7 @@ class WaveFile(object):
         try:
             self._wave_reader = wave.open(filename, 'r')
             self._read_wave_header()
-            self._read_wave_binary()
+            self._read_wave_binary(filename)
         except wave.Error as e:
             if 'unknown format: 65534' in str(e):
                 raise WaveFormatExtensibleException()
@@ -162,14 +167,48 @@ class WaveFile(object):
         if comptype != 'NONE' or compname != 'not compressed':
             raise WaveFileException('Can not support compressed wav file.')
 
-    def _read_wave_binary(self):
-        """Reads in samples in wave file."""
-        self._binary = self._wave_reader.readframes(self._n_frames)
+    def _read_wave_binary(self, filename):
+        """Memory-maps samples in wave file.
+
+        Args:
+            filename: The wave file to be read.
+
+        """
+        offset = _find_wave_data_offset(filename)
+        frame_size = self._n_channels * self._sample_width_bits // 8
+        n_frames = min(self._n_frames,
+                       (os.path.getsize(filename) - offset) // frame_size)
         format_str = 'S%d_LE' % self._sample_width_bits
         self.raw_data = audio_data.AudioRawData(
-            binary=self._binary,
-            channel=self._n_channels,
-            sample_format=format_str)
+            binary=None, channel=self._n_channels, sample_format=format_str)
+        self.raw_data.read_file(filename, offset=offset, n_frames=n_frames)
+
+
+def _find_wave_data_offset(filename):
+    """Finds the offset of samples in a wave file.
+
+    Args:
+        filename: The wave file to be read.
+
+    Returns:
+        The offset in bytes of the data chunk content.
+
+    Raises:
+        WaveFileException: wave file has no data chunk.
+
+    """
+    with open(filename, 'rb') as f:
+        # Skips the RIFF header: 'RIFF', file size and 'WAVE'.
+        f.seek(12)
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise WaveFileException('No data chunk in wave file.')
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'data':
+                return f.tell()
+            # Chunks are aligned to 2 bytes.
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
 
 
 class QualityCheckerError(Exception):
@@ -204,71 +243,153 @@ class QualityChecker(object):
         self._spectrals = []
         self._quality_result = []
 
-    def do_spectral_analysis(self, ignore_high_freq, check_quality,
-                             quality_params):
+    def do_spectral_analysis(self,
+                             ignore_high_freq,
+                             check_quality,
+                             quality_params,
+                             stream_block_secs=None,
+                             processes=None):
         """Gets the spectral_analysis result.
 
         Args:
             ignore_high_freq: Ignore high frequencies above this threshold.
             check_quality: Check quality of each channel.
             quality_params: A QualityParams object for quality measurement.
+            stream_block_secs: If not None, each channel is read and analyzed
+                               in blocks of this many seconds so memory usage
+                               does not depend on the length of the data.
+                               The spectral analysis is then done on the
+                               average spectrum of the blocks.
+            processes: If not None, the channels are analyzed concurrently
+                       and the quality measurement blocks are spread over a
+                       pool of this many worker processes. Implies stream
+                       mode with the default block length when
+                       stream_block_secs is not given.
 
         """
         self.has_data()
-        for channel_idx in range(self._raw_data.channel):
-            signal = self._raw_data.channel_data[channel_idx]
-            max_abs = max(numpy.abs(signal))
-            logging.debug('Channel %d max abs signal: %f', channel_idx,
-                          max_abs)
-            if max_abs == 0:
-                logging.info('No data on channel %d, skip this channel',
-                             channel_idx)
+        channels = range(self._raw_data.channel)
+        if not processes:
+            results = [
+                self._analyze_channel(channel_idx, ignore_high_freq,
+                                      check_quality, quality_params,
+                                      stream_block_secs)
+                for channel_idx in channels
+            ]
+        else:
+            if not stream_block_secs:
+                stream_block_secs = (
+                    audio_quality_measurement.DEFAULT_STREAM_BLOCK_SECS)
+            with multiprocessing.Pool(processes) as pool, \
+                    concurrent.futures.ThreadPoolExecutor(
+                        len(channels) or 1) as executor:
+                futures = [
+                    executor.submit(self._analyze_channel, channel_idx,
+                                    ignore_high_freq, check_quality,
+                                    quality_params, stream_block_secs, pool)
+                    for channel_idx in channels
+                ]
+                results = [future.result() for future in futures]
+
+        for spectral, quality in results:
+            if spectral is None:
                 continue
+            if check_quality:
+                self._quality_result.append(quality)
+            self._spectrals.append(spectral)
+
+    def _analyze_channel(self,
+                         channel_idx,
+                         ignore_high_freq,
+                         check_quality,
+                         quality_params,
+                         stream_block_secs,
+                         pool=None):
+        """Analyzes one channel.
+
+        Args:
+            channel_idx: The index of the channel to analyze.
+            ignore_high_freq: Ignore high frequencies above this threshold.
+            check_quality: Check quality of the channel.
+            quality_params: A QualityParams object for quality measurement.
+            stream_block_secs: See do_spectral_analysis.
+            pool: A multiprocessing.Pool for the quality measurement blocks,
+                  or None to analyze them in this process.
+
+        Returns:
+            A tuple (spectral, quality). Both are None if the channel has no
+            data or failed to be analyzed. quality is None if check_quality
+            is False.
 
-            saturate_value = audio_data.get_maximum_value_from_sample_format(
-                self._raw_data.sample_format)
+        """
+        signal = self._raw_data.channel_data[channel_idx]
+        max_abs = _max_abs(signal, stream_block_secs, self._rate)
+        logging.debug('Channel %d max abs signal: %f', channel_idx, max_abs)
+        if max_abs == 0:
+            logging.info('No data on channel %d, skip this channel',
+                         channel_idx)
+            return None, None
+
+        saturate_value = audio_data.get_maximum_value_from_sample_format(
+            self._raw_data.sample_format)
+        logging.debug('saturate_value: %f', saturate_value)
+        if stream_block_secs:
+            spectral = audio_analysis.averaged_spectral_analysis(
+                signal, self._rate, int(stream_block_secs * self._rate),
+                saturate_value)
+        else:
             normalized_signal = audio_analysis.normalize_signal(
                 signal, saturate_value)
-            logging.debug('saturate_value: %f', saturate_value)
             logging.debug('max signal after normalized: %f',
-                          max(normalized_signal))
-            spectral = audio_analysis.spectral_analysis(
-                normalized_signal, self._rate)
+                          numpy.max(normalized_signal))
+            spectral = audio_analysis.spectral_analysis(normalized_signal,
+                                                        self._rate)
 
-            logging.debug('Channel %d spectral:\n%s', channel_idx,
-                          pprint.pformat(spectral))
+        logging.debug('Channel %d spectral:\n%s', channel_idx,
+                      pprint.pformat(spectral))
 
-            # Ignore high frequencies above the threshold.
-            spectral = [(f, c) for (f, c) in spectral if f < ignore_high_freq]
+        # Ignore high frequencies above the threshold.
+        spectral = [(f, c) for (f, c) in spectral if f < ignore_high_freq]
 
-            logging.info('Channel %d spectral after ignoring high frequencies '
-                         'above %f:\n%s', channel_idx, ignore_high_freq,
-                         pprint.pformat(spectral))
+        logging.info('Channel %d spectral after ignoring high frequencies '
+                     'above %f:\n%s', channel_idx, ignore_high_freq,
+                     pprint.pformat(spectral))
 
-            try:
-                if check_quality:
+        quality = None
+        try:
+            if check_quality:
+                quality_kwargs = dict(
+                    rate=self._rate,
+                    dominant_frequency=spectral[0][0],
+                    block_size_secs=quality_params.block_size_secs,
+                    frequency_error_threshold=quality_params.
+                    frequency_error_threshold,
+                    delay_amplitude_threshold=quality_params.
+                    delay_amplitude_threshold,
+                    noise_amplitude_threshold=quality_params.
+                    noise_amplitude_threshold,
+                    burst_amplitude_threshold=quality_params.
+                    burst_amplitude_threshold)
+                if stream_block_secs:
+                    quality = (
+                        audio_quality_measurement.stream_quality_measurement(
+                            signal=signal,
+                            stream_block_secs=stream_block_secs,
+                            saturate_value=saturate_value,
+                            pool=pool,
+                            **quality_kwargs))
+                else:
                     quality = audio_quality_measurement.quality_measurement(
-                        signal=normalized_signal,
-                        rate=self._rate,
-                        dominant_frequency=spectral[0][0],
-                        block_size_secs=quality_params.block_size_secs,
-                        frequency_error_threshold=quality_params.
-                        frequency_error_threshold,
-                        delay_amplitude_threshold=quality_params.
-                        delay_amplitude_threshold,
-                        noise_amplitude_threshold=quality_params.
-                        noise_amplitude_threshold,
-                        burst_amplitude_threshold=quality_params.
-                        burst_amplitude_threshold)
-
-                    logging.debug('Channel %d quality:\n%s', channel_idx,
-                                  pprint.pformat(quality))
-                    self._quality_result.append(quality)
-                self._spectrals.append(spectral)
-            except Exception as error:
-                logging.warning(
-                    "Failed to analyze channel {} with error: {}".format(
-                        channel_idx, error))
+                        signal=normalized_signal, **quality_kwargs)
+
+                logging.debug('Channel %d quality:\n%s', channel_idx,
+                              pprint.pformat(quality))
+        except Exception as error:
+            logging.warning(
+                "Failed to analyze channel {} with error: {}".format(
+                    channel_idx, error))
+            return None, None
+        return spectral, quality
 
     def has_data(self):
         """Checks if data has been set.
@@ -421,6 +542,29 @@ class QualityChecker(object):
             json.dump(dump_dict, f)
 
 
+def _max_abs(signal, stream_block_secs, rate):
+    """Finds the maximum absolute value of a signal.
+
+    Args:
+        signal: A 1-D array-like object for one-channel PCM data.
+        stream_block_secs: If not None, the signal is read in blocks of this
+                           many seconds.
+        rate: Sampling rate in samples per second.
+
+    Returns:
+        The maximum absolute value, or 0 if signal is empty.
+
+    """
+    if not len(signal):
+        return 0
+    if not stream_block_secs:
+        return numpy.max(numpy.abs(signal))
+    block_size = max(1, int(stream_block_secs * rate))
+    return max(
+        numpy.max(numpy.abs(signal[start:start + block_size]))
+        for start in range(0, len(signal), block_size))
+
+
 class CheckQualityError(Exception):
     """Error in check_quality main function."""
     pass
@@ -439,7 +583,8 @@ def read_audio_file(filename, channel, bit_width, rate):
 
     Returns:
         A tuple (raw_data, rate) where raw_data is audio_data.AudioRawData, rate
-            is sampling rate.
+            is sampling rate. The samples in raw_data are memory-mapped from
+            the file.
 
     """
     if filename.endswith('.wav'):
@@ -447,11 +592,9 @@ def read_audio_file(filename, channel, bit_width, rate):
         raw_data = wavefile.raw_data
         rate = wavefile.rate
     elif filename.endswith('.raw'):
-        binary = None
-        with open(filename, 'rb') as f:
-            binary = f.read()
         raw_data = audio_data.AudioRawData(
-            binary=binary, channel=channel, sample_format='S%d_LE' % bit_width)
+            binary=None, channel=channel, sample_format='S%d_LE' % bit_width)
+        raw_data.read_file(filename)
     else:
         raise CheckQualityError(
             'File format for %s is not supported' % filename)
@@ -505,6 +648,8 @@ def quality_analysis(
         quality_delay_amplitude_threshold=DEFAULT_DELAY_AMPLITUDE_THRESHOLD,
         quality_frequency_error_threshold=DEFAULT_FREQUENCY_ERROR_THRESHOLD,
         quality_noise_amplitude_threshold=DEFAULT_NOISE_AMPLITUDE_THRESHOLD,
+        stream_block_secs=None,
+        processes=None,
 ):
     """ Runs various functions to measure audio quality base on user input.
 
@@ -529,6 +674,11 @@ def quality_analysis(
         threshold.
         quality_burst_amplitude_threshold: Input the burst aplitutde
         threshold.
+        stream_block_secs: If not None, analyze each channel in blocks of
+        this many seconds so memory usage does not depend on the length of
+        the recording.
+        processes: If not None, analyze the channels concurrently and spread
+        the quality measurement blocks over this many worker processes.
     """
     format = '%(asctime)-15s:%(levelname)s:%(pathname)s:%(lineno)d: %(message)s'
     logging.basicConfig(format=format, level=logging.INFO)
@@ -544,7 +694,9 @@ def quality_analysis(
     checker.do_spectral_analysis(
         ignore_high_freq=ignore_high_freq,
         check_quality=(not spectral_only),
-        quality_params=quality_params)
+        quality_params=quality_params,
+        stream_block_secs=stream_block_secs,
+        processes=processes)
 
     checker.dump(output_file)
 
@@ -20,6 +20,9 @@ import queue
 import re
 import statistics
 import time
+
+import numpy
+
 from acts import asserts
 
 from acts.test_utils.net import connectivity_const as cconsts
@@ -158,17 +161,12 @@ def verify_no_more_events(ad, timeout=EVENT_TIMEOUT):
     prefix = ''
     if hasattr(ad, 'pretty_name'):
         prefix = '[%s] ' % ad.pretty_name
-    should_fail = False
-    try:
-        while True:
-            event = ad.ed.pop_events('.*', timeout, freq=0)
-            ad.log.info('%sQueue contains %s', prefix, event)
-            should_fail = True
-    except queue.Empty:
-        if should_fail:
-            asserts.fail('%sEvent queue not empty' % prefix)
-        ad.log.info('%sNo events in the queue (as expected)', prefix)
-        return
+    events = ad.ed.drain_events('.*', timeout)
+    for event in events:
+        ad.log.info('%sQueue contains %s', prefix, event)
+    if events:
+        asserts.fail('%sEvent queue not empty' % prefix)
+    ad.log.info('%sNo events in the queue (as expected)', prefix)
 
 
 def encode_list(list_of_objects):
@@ -347,6 +345,35 @@ def extract_stats(ad, data, results, key_prefix, log_prefix):
             data_cdf_decile)
 
 
+def extract_histogram_stats(ad, histogram, results, key_prefix, log_prefix):
+    """Extract statistics from a histogram, e.g. the latency of the events of
+  the EventDispatcher, store in the results dictionary, and output to the info
+  log. Same keys as extract_stats, without the stdev and the raw data.
+
+  Args:
+    ad: Android device (for logging)
+    histogram: An event_stats.Histogram of the data to be analyzed.
+    results: A dictionary into which to place the statistics.
+    key_prefix: A string prefix to use for the dict keys storing the
+                extracted stats.
+    log_prefix: A string prefix to use for the info log.
+  """
+    results['%snum_samples' % key_prefix] = histogram.count
+
+    if not histogram.count:
+        return
+
+    data_cdf_decile = histogram.get_deciles()
+    results['%smin' % key_prefix] = histogram.min
+    results['%smax' % key_prefix] = histogram.max
+    results['%smean' % key_prefix] = histogram.mean
+    results['%scdf_decile' % key_prefix] = data_cdf_decile
+
+    ad.log.info('%s: num_samples=%d, min=%.2f, max=%.2f, mean=%.2f, '
+                'cdf_decile=%s', log_prefix, histogram.count, histogram.min,
+                histogram.max, histogram.mean, data_cdf_decile)
+
+
 def extract_cdf_decile(cdf):
     """Extracts the 10%, 20%, ..., 90% points from the CDF and returns their
   value (a list of 9 values).
@@ -356,15 +383,12 @@ def extract_cdf_decile(cdf):
   Args:
     cdf: a list of 2 lists, the X and Y of the CDF.
   """
-    decades = []
-    next_decade = 10
-    for x, y in zip(cdf[0], cdf[1]):
-        while 100 * y >= next_decade:
-            decades.append(x)
-            next_decade = next_decade + 10
-        if next_decade == 100:
-            break
-    return decades
+    if not len(cdf[0]):
+        return []
+    # The index of the first point at or above each decile.
+    indices = numpy.searchsorted(
+        100 * numpy.asarray(cdf[1]), range(10, 100, 10), side='left')
+    return [cdf[0][i] for i in indices]
 
 
 def extract_cdf(data):
@@ -375,28 +399,13 @@ def extract_cdf(data):
 
   Returns: a list of 2 lists: the X and Y axis of the CDF.
   """
-    x = []
-    cdf = []
-    if not data:
-        return (x, cdf)
-
-    all_values = sorted(data)
-    for val in all_values:
-        if not x:
-            x.append(val)
-            cdf.append(1)
-        else:
-            if x[-1] == val:
-                cdf[-1] += 1
-            else:
-                x.append(val)
-                cdf.append(cdf[-1] + 1)
+    if not len(data):
+        return ([], [])
 
-    scale = 1.0 / len(all_values)
-    for i in range(len(cdf)):
-        cdf[i] = cdf[i] * scale
+    x, counts = numpy.unique(data, return_counts=True)
+    cdf = numpy.cumsum(counts) * (1.0 / len(data))
 
-    return (x, cdf)
+    return (x.tolist(), cdf.tolist())
 
 
 def get_mac_addr(device, interface):
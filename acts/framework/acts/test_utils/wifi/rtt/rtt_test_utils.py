@@ -14,8 +14,11 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import collections
+import itertools
+import numpy
+import operator
 import queue
-import statistics
 import time
 
 from acts import asserts
@@ -25,6 +28,21 @@ from acts.test_utils.wifi.rtt import rtt_const as rconsts
 # arbitrary timeout for events
 EVENT_TIMEOUT = 10
 
+# Fields extracted from successful RTT results by extract_stats, and the keys of
+# the RTT result events they are extracted from. All but the LCI and LCR are
+# numeric, and their statistics are computed with numpy.
+RESULT_ARRAY_FIELDS = collections.OrderedDict([
+    ('distance_mm', rconsts.EVENT_CB_RANGING_KEY_DISTANCE_MM),
+    ('distance_std_dev_mm', rconsts.EVENT_CB_RANGING_KEY_DISTANCE_STD_DEV_MM),
+    ('rssi', rconsts.EVENT_CB_RANGING_KEY_RSSI),
+    ('num_attempted_measurements',
+     rconsts.EVENT_CB_RANGING_KEY_NUM_ATTEMPTED_MEASUREMENTS),
+    ('num_successful_measurements',
+     rconsts.EVENT_CB_RANGING_KEY_NUM_SUCCESSFUL_MEASUREMENTS),
+    ('lci', rconsts.EVENT_CB_RANGING_KEY_LCI),
+    ('lcr', rconsts.EVENT_CB_RANGING_KEY_LCR),
+])
+
 
 def decorate_event(event_name, id):
     return '%s_%d' % (event_name, id)
@@ -301,89 +319,60 @@ def extract_stats(results,
   Returns: A dictionary of stats.
   """
     stats = {}
-    stats['num_results'] = 0
-    stats['num_success_results'] = 0
-    stats['num_no_results'] = 0
-    stats['num_failures'] = 0
-    stats['num_range_out_of_margin'] = 0
-    stats['num_invalid_rssi'] = 0
-    stats['any_lci_mismatch'] = False
-    stats['any_lcr_mismatch'] = False
-    stats['invalid_num_attempted'] = False
-    stats['invalid_num_successful'] = False
-
-    range_max_mm = range_reference_mm + range_margin_mm
-    range_min_mm = range_reference_mm - range_margin_mm
-
-    distances = []
-    distance_std_devs = []
-    rssis = []
-    num_attempted_measurements = []
-    num_successful_measurements = []
-    status_codes = []
-    lcis = []
-    lcrs = []
-
-    for i in range(len(results)):
-        result = results[i]
-
-        if result is None:  # None -> timeout waiting for RTT result
-            stats['num_no_results'] = stats['num_no_results'] + 1
-            continue
-        stats['num_results'] = stats['num_results'] + 1
-
-        status_codes.append(result[rconsts.EVENT_CB_RANGING_KEY_STATUS])
-        if status_codes[-1] != rconsts.EVENT_CB_RANGING_STATUS_SUCCESS:
-            stats['num_failures'] = stats['num_failures'] + 1
-            continue
-        stats['num_success_results'] = stats['num_success_results'] + 1
-
-        distance_mm = result[rconsts.EVENT_CB_RANGING_KEY_DISTANCE_MM]
-        distances.append(distance_mm)
-        if not range_min_mm <= distance_mm <= range_max_mm:
-            stats[
-                'num_range_out_of_margin'] = stats['num_range_out_of_margin'] + 1
-        distance_std_devs.append(
-            result[rconsts.EVENT_CB_RANGING_KEY_DISTANCE_STD_DEV_MM])
-
-        rssi = result[rconsts.EVENT_CB_RANGING_KEY_RSSI]
-        rssis.append(rssi)
-        if not min_rssi <= rssi <= 0:
-            stats['num_invalid_rssi'] = stats['num_invalid_rssi'] + 1
-
-        num_attempted = result[
-            rconsts.EVENT_CB_RANGING_KEY_NUM_ATTEMPTED_MEASUREMENTS]
-        num_attempted_measurements.append(num_attempted)
-        if num_attempted == 0:
-            stats['invalid_num_attempted'] = True
-
-        num_successful = result[
-            rconsts.EVENT_CB_RANGING_KEY_NUM_SUCCESSFUL_MEASUREMENTS]
-        num_successful_measurements.append(num_successful)
-        if num_successful == 0:
-            stats['invalid_num_successful'] = True
-
-        lcis.append(result[rconsts.EVENT_CB_RANGING_KEY_LCI])
-        if (result[rconsts.EVENT_CB_RANGING_KEY_LCI] != reference_lci):
-            stats['any_lci_mismatch'] = True
-        lcrs.append(result[rconsts.EVENT_CB_RANGING_KEY_LCR])
-        if (result[rconsts.EVENT_CB_RANGING_KEY_LCR] != reference_lcr):
-            stats['any_lcr_mismatch'] = True
+    completed = [result for result in results if result is not None]
+    # None -> timeout waiting for RTT result
+    stats['num_no_results'] = len(results) - len(completed)
+    stats['num_results'] = len(completed)
+
+    status_codes = [
+        result[rconsts.EVENT_CB_RANGING_KEY_STATUS] for result in completed
+    ]
+    is_success = (numpy.array(status_codes, dtype=int) ==
+                  rconsts.EVENT_CB_RANGING_STATUS_SUCCESS)
+    successes = list(itertools.compress(completed, is_success))
+    stats['num_success_results'] = len(successes)
+    stats['num_failures'] = len(completed) - len(successes)
+
+    # Extract each field of the successful results as a list.
+    fields = collections.OrderedDict(
+        (name, list(map(operator.itemgetter(key), successes)))
+        for name, key in RESULT_ARRAY_FIELDS.items())
+    lcis = fields.pop('lci')
+    lcrs = fields.pop('lcr')
+    columns = dict((name, numpy.array(values, dtype=float))
+                   for name, values in fields.items())
+    distances = columns['distance_mm']
+    rssis = columns['rssi']
+    stats['num_range_out_of_margin'] = int(
+        numpy.count_nonzero(
+            (distances < range_reference_mm - range_margin_mm) |
+            (distances > range_reference_mm + range_margin_mm)))
+    stats['num_invalid_rssi'] = int(
+        numpy.count_nonzero((rssis < min_rssi) | (rssis > 0)))
+    stats['invalid_num_attempted'] = bool(
+        numpy.any(columns['num_attempted_measurements'] == 0))
+    stats['invalid_num_successful'] = bool(
+        numpy.any(columns['num_successful_measurements'] == 0))
+
+    stats['any_lci_mismatch'] = lcis.count(reference_lci) != len(lcis)
+    stats['any_lcr_mismatch'] = lcrs.count(reference_lcr) != len(lcrs)
 
     if len(distances) > 0:
-        stats['distance_mean'] = statistics.mean(distances)
+        stats['distance_mean'] = float(numpy.mean(distances))
     if len(distances) > 1:
-        stats['distance_std_dev'] = statistics.stdev(distances)
+        stats['distance_std_dev'] = float(numpy.std(distances, ddof=1))
     if len(rssis) > 0:
-        stats['rssi_mean'] = statistics.mean(rssis)
+        stats['rssi_mean'] = float(numpy.mean(rssis))
     if len(rssis) > 1:
-        stats['rssi_std_dev'] = statistics.stdev(rssis)
+        stats['rssi_std_dev'] = float(numpy.std(rssis, ddof=1))
     if not summary_only:
-        stats['distances'] = distances
-        stats['distance_std_devs'] = distance_std_devs
-        stats['rssis'] = rssis
-        stats['num_attempted_measurements'] = num_attempted_measurements
-        stats['num_successful_measurements'] = num_successful_measurements
+        stats['distances'] = fields['distance_mm']
+        stats['distance_std_devs'] = fields['distance_std_dev_mm']
+        stats['rssis'] = fields['rssi']
+        stats['num_attempted_measurements'] = fields[
+            'num_attempted_measurements']
+        stats['num_successful_measurements'] = fields[
+            'num_successful_measurements']
         stats['status_codes'] = status_codes
         stats['lcis'] = lcis
         stats['lcrs'] = lcrs
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Columnar storage and post-processing of attenuation sweep results.
+
+A sweep result holds the attenuation steps of an RvR or RSSI sweep together
+with one NumPy column per measured quantity. A column is either a vector
+with one value per attenuation step (e.g. throughput) or a matrix with one
+row of raw samples per attenuation step (e.g. per chain RSSI). Invalid
+readings are stored as NaN.
+
+Sweep results are saved as compressed .npz archives, and can also be loaded
+from the JSON files written by older versions of the RvR and RSSI tests so
+that historical runs and golden files can be compared offline.
+"""
+
+import collections
+import json
+import os
+
+import numpy
+
+# Offset between per chain RSSI and the combined RSSI of two chains.
+CONST_3dB = 3.01029995664
+
+# Name of the metadata entry in saved sweep result archives.
+_METADATA_KEY = '__metadata__'
+# Prefix of the column entries in saved sweep result archives.
+_COLUMN_PREFIX = 'column:'
+
+# Number of golden points used to compute the throughput limits of a point.
+THROUGHPUT_LIMIT_NEIGHBORS = 3
+
+# Keys of the RSSI measurements in RSSI test results. scan_rssi is stored
+# per BSSID in the test results and only the connected BSSID is kept.
+RSSI_KEYS = ('signal_poll_rssi', 'signal_poll_avg_rssi', 'scan_rssi',
+             'chain_0_rssi', 'chain_1_rssi')
+
+
+class SweepResultError(Exception):
+    """Raised when a sweep result is inconsistent or cannot be loaded."""
+
+
+class SweepResult(object):
+    """Results of a sweep over attenuation steps.
+
+    Attributes:
+        metadata: OrderedDict of JSON serializable test information, e.g.
+                  test_name, ap_settings, fixed_attenuation.
+        attenuation: float array with the attenuation of each step in dB.
+        columns: OrderedDict mapping column names to float arrays whose first
+                 dimension is the attenuation step.
+    """
+
+    def __init__(self, attenuation, metadata=None):
+        self.attenuation = numpy.asarray(attenuation, dtype=float)
+        self.metadata = collections.OrderedDict(metadata or {})
+        self.columns = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.attenuation)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def add_column(self, name, values):
+        """Adds a column of per step values or per step samples.
+
+        Args:
+            name: The name of the column.
+            values: A sequence with one value, or one sequence of samples, per
+                    attenuation step. None values are stored as NaN.
+
+        Returns:
+            The column as a float array.
+
+        Raises:
+            SweepResultError: If values does not have one entry per step.
+        """
+        column = numpy.array(values, dtype=float)
+        if column.ndim == 0 or len(column) != len(self):
+            raise SweepResultError(
+                'Column {} has {} entries for {} attenuation steps.'.format(
+                    name, column.size, len(self)))
+        self.columns[name] = column
+        return column
+
+    @property
+    def total_attenuation(self):
+        """Attenuation of each step including fixed and front end losses."""
+        return (self.attenuation + self.metadata.get('fixed_attenuation', 0)
+                + self.metadata.get('dut_front_end_loss', 0))
+
+    def mean(self, name):
+        """Returns the mean of the valid samples of a column at each step.
+
+        Steps without valid samples have a NaN mean.
+        """
+        return sample_statistics(self.columns[name])[0]
+
+    def stdev(self, name):
+        """Returns the sample standard deviation of a column at each step.
+
+        Steps with a single valid sample have a standard deviation of 0 and
+        steps without valid samples have a NaN standard deviation.
+        """
+        return sample_statistics(self.columns[name])[1]
+
+    def to_dict(self):
+        """Returns the result as a JSON serializable OrderedDict.
+
+        Metadata entries come first, followed by the attenuation and the
+        columns as lists with NaN entries replaced by None.
+        """
+        result = collections.OrderedDict(self.metadata)
+        result['attenuation'] = self.attenuation.tolist()
+        for name, column in self.columns.items():
+            result[name] = numpy.where(
+                numpy.isnan(column), None, column).tolist()
+        return result
+
+    def save(self, file_path):
+        """Saves the result as a compressed .npz archive.
+
+        Args:
+            file_path: The path of the archive. The .npz extension is added by
+                       NumPy if missing.
+        """
+        arrays = {
+            _COLUMN_PREFIX + name: column
+            for name, column in self.columns.items()
+        }
+        numpy.savez_compressed(
+            file_path,
+            attenuation=self.attenuation,
+            **{_METADATA_KEY: numpy.array(json.dumps(self.metadata))},
+            **arrays)
+
+    @classmethod
+    def load(cls, file_path):
+        """Loads a result saved by save, or an RvR or RSSI JSON result.
+
+        Args:
+            file_path: The path of a .npz archive or of a JSON file.
+
+        Returns:
+            A SweepResult.
+
+        Raises:
+            SweepResultError: If the file is not a valid sweep result.
+        """
+        if os.path.splitext(file_path)[1] != '.npz':
+            with open(file_path, 'r') as json_file:
+                return cls.from_dict(json.load(json_file))
+        with numpy.load(file_path, allow_pickle=False) as archive:
+            if _METADATA_KEY not in archive.files:
+                raise SweepResultError(
+                    '{} is not a sweep result archive.'.format(file_path))
+            result = cls(
+                archive['attenuation'],
+                json.loads(
+                    str(archive[_METADATA_KEY]),
+                    object_pairs_hook=collections.OrderedDict))
+            for name in archive.files:
+                if name.startswith(_COLUMN_PREFIX):
+                    result.columns[name[len(_COLUMN_PREFIX):]] = archive[name]
+        return result
+
+    @classmethod
+    def from_dict(cls, result_dict):
+        """Builds a sweep result from an RvR or RSSI result dict.
+
+        RSSI results, which have an rssi_result list with the measurements of
+        each step, are converted with from_rssi_result. In other results,
+        every list with one entry per attenuation step becomes a column and
+        the remaining entries become metadata.
+
+        Args:
+            result_dict: The result dict, as saved in JSON by the tests.
+
+        Returns:
+            A SweepResult.
+
+        Raises:
+            SweepResultError: If the dict has no attenuation entry.
+        """
+        if 'attenuation' not in result_dict:
+            raise SweepResultError('Result has no attenuation steps.')
+        if 'rssi_result' in result_dict:
+            return cls.from_rssi_result(result_dict)
+        result = cls(result_dict['attenuation'])
+        for key, value in result_dict.items():
+            if key == 'attenuation':
+                continue
+            if isinstance(value, list) and len(value) == len(result):
+                result.add_column(key, value)
+            else:
+                result.metadata[key] = value
+        return result
+
+    @classmethod
+    def from_rssi_result(cls, rssi_result):
+        """Builds a sweep result from the result of an RSSI test.
+
+        Each RSSI measurement of the steps becomes a column of raw samples.
+        Scan RSSIs of the connected BSSID are stored in the scan_rssi column.
+
+        Args:
+            rssi_result: dict with attenuation, rssi_result and other meta
+                         data, as returned by WifiRssiTest.rssi_test_func.
+
+        Returns:
+            A SweepResult.
+        """
+        result = cls(rssi_result['attenuation'])
+        for key, value in rssi_result.items():
+            if key not in ('attenuation', 'rssi_result'):
+                result.metadata[key] = value
+        steps = rssi_result['rssi_result']
+        bssid = rssi_result['connected_bssid']
+        for key in RSSI_KEYS:
+            if key == 'scan_rssi':
+                samples = [step[key][bssid]['data'] for step in steps]
+            else:
+                samples = [step[key]['data'] for step in steps]
+            result.add_column(key, samples)
+        return result
+
+
+def sample_statistics(samples):
+    """Computes the mean and standard deviation of samples at each step.
+
+    NaN samples are ignored. The standard deviation is the sample standard
+    deviation, or 0 for steps with a single valid sample. Both are NaN for
+    steps without valid samples.
+
+    Args:
+        samples: A matrix with one row of samples per step, or a vector with
+                 one sample per step.
+
+    Returns:
+        A tuple of float arrays (mean, stdev) with one value per step.
+    """
+    samples = numpy.asarray(samples, dtype=float)
+    if samples.ndim == 1:
+        samples = samples[:, numpy.newaxis]
+    valid = ~numpy.isnan(samples)
+    count = valid.sum(axis=1)
+    zero_filled = numpy.where(valid, samples, 0)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mean = zero_filled.sum(axis=1) / count
+        deviation = numpy.where(valid, samples - mean[:, numpy.newaxis], 0)
+        variance = (deviation**2).sum(axis=1) / (count - 1)
+    stdev = numpy.where(count > 1, numpy.sqrt(variance), 0)
+    stdev[count == 0] = numpy.nan
+    return mean, stdev
+
+
+def predicted_rssi(result):
+    """Returns the RSSI predicted from the AP power at each step.
+
+    Args:
+        result: A SweepResult with ap_tx_power metadata.
+    """
+    return result.metadata['ap_tx_power'] - result.total_attenuation
+
+
+def rssi_error(result, key):
+    """Returns the error of the mean of an RSSI column at each step.
+
+    The error is the difference between the mean RSSI and the predicted RSSI.
+    Per chain RSSIs are compared to half of the predicted power.
+
+    Args:
+        result: A SweepResult built with SweepResult.from_rssi_result.
+        key: One of RSSI_KEYS.
+    """
+    error = result.mean(key) - predicted_rssi(result)
+    if 'chain' in key:
+        error += CONST_3dB
+    return error
+
+
+def error_statistics(error, absolute=True):
+    """Computes the average shift and error of a vector of errors.
+
+    NaN errors are ignored.
+
+    Args:
+        error: A sequence of errors, e.g. measured minus predicted RSSI.
+        absolute: If True, the average error is the mean absolute error.
+                  Otherwise it is the mean absolute deviation from the
+                  average shift, i.e. the error once the systematic shift has
+                  been removed.
+
+    Returns:
+        A tuple (avg_error, avg_shift). Both are NaN if no error is valid.
+    """
+    error = numpy.asarray(error, dtype=float)
+    error = error[~numpy.isnan(error)]
+    if not error.size:
+        return float('nan'), float('nan')
+    avg_shift = error.mean()
+    if absolute:
+        avg_error = numpy.abs(error).mean()
+    else:
+        avg_error = numpy.abs(error - avg_shift).mean()
+    return float(avg_error), float(avg_shift)
+
+
+def throughput_limits(attenuation,
+                      golden_attenuation,
+                      golden_throughput,
+                      abs_tolerance,
+                      pct_tolerance,
+                      num_neighbors=THROUGHPUT_LIMIT_NEIGHBORS):
+    """Computes throughput limits from the closest points of a golden sweep.
+
+    For each attenuation, the limits are the lowest and highest throughputs
+    of the num_neighbors closest golden attenuations, widened by the larger
+    of the absolute and percentage tolerances. The lower limit is at least 0.
+
+    Args:
+        attenuation: The total attenuations to compute limits at.
+        golden_attenuation: The total attenuations of the golden sweep.
+        golden_throughput: The throughputs of the golden sweep.
+        abs_tolerance: Absolute throughput tolerance in Mbps.
+        pct_tolerance: Throughput tolerance in percent of the throughput.
+        num_neighbors: Number of closest golden points to consider.
+
+    Returns:
+        A tuple of float arrays (lower_limit, upper_limit).
+    """
+    attenuation = numpy.asarray(attenuation, dtype=float)
+    golden_attenuation = numpy.asarray(golden_attenuation, dtype=float)
+    golden_throughput = numpy.asarray(golden_throughput, dtype=float)
+    distances = numpy.abs(attenuation[:, numpy.newaxis] -
+                          golden_attenuation[numpy.newaxis, :])
+    # A stable sort picks the earliest golden point among equal distances.
+    closest = numpy.argsort(distances, axis=1,
+                            kind='stable')[:, :num_neighbors]
+    closest_throughput = golden_throughput[closest]
+    lowest = closest_throughput.min(axis=1)
+    highest = closest_throughput.max(axis=1)
+    lower_limit = numpy.maximum(
+        lowest - numpy.maximum(abs_tolerance, lowest * pct_tolerance / 100),
+        0)
+    upper_limit = highest + numpy.maximum(abs_tolerance,
+                                          highest * pct_tolerance / 100)
+    return lower_limit, upper_limit
+
+
+def stack_results(results, name):
+    """Aligns a column of many sweep results on common attenuation steps.
+
+    This is meant for offline comparison of historical runs, which may not
+    have been run over the same attenuation range.
+
+    Args:
+        results: A list of SweepResult objects.
+        name: The name of a column with one value per step.
+
+    Returns:
+        A tuple (total_attenuation, values). total_attenuation is the sorted
+        union of the total attenuations of all results, and values is a
+        matrix with one row per result and one column per total attenuation,
+        with NaN where a result has no step at that attenuation.
+    """
+    total_attenuations = [result.total_attenuation for result in results]
+    if total_attenuations:
+        total_attenuation = numpy.unique(numpy.concatenate(total_attenuations))
+    else:
+        total_attenuation = numpy.array([])
+    values = numpy.full((len(results), len(total_attenuation)), numpy.nan)
+    for row, (result, attenuation) in enumerate(
+            zip(results, total_attenuations)):
+        values[row, numpy.searchsorted(total_attenuation,
+                                       attenuation)] = result[name]
+    return total_attenuation, values
@@ -19,10 +19,12 @@ import mock
 import os
 import shutil
 import tempfile
+import threading
 import unittest
 
 from acts import logger
 from acts.controllers import android_device
+from acts.controllers.sl4a_lib import clock_offset
 
 # Mock log path for a test run.
 MOCK_LOG_PATH = "/tmp/logs/MockTest/xx-xx-xx_xx-xx-xx/"
@@ -132,6 +134,20 @@ class MockAdbProxy(object):
         return adb_call
 
 
+class MockLogcatProcess(object):
+    """A logcat process which runs until killed."""
+
+    def __init__(self):
+        self._killed = threading.Event()
+
+    def kill(self):
+        self._killed.set()
+
+    def wait(self):
+        self._killed.wait()
+        return -15
+
+
 class MockFastbootProxy():
     """Mock class that swaps out calls to adb with mock calls."""
 
@@ -223,6 +239,32 @@ class ActsAndroidDeviceTest(unittest.TestCase):
                                     expected_msg):
             ad = android_device.get_device(ads, serial=target_serial)
 
+    @mock.patch.object(
+        android_device, "list_adb_devices", return_value=[0, 1])
+    def test_reset_restarts_logcat(self, _):
+        ads = get_mock_ads(2)
+        for ad in ads:
+            ad.skip_sl4a = True
+        ads[0].is_adb_logcat_on = True
+        ads[1].is_adb_logcat_on = False
+        self.assertTrue(android_device.reset(ads))
+        self.assertFalse(ads[0].start_adb_logcat.called)
+        ads[1].start_adb_logcat.assert_called_with(cont_logcat_file=True)
+
+    @mock.patch.object(android_device, "list_adb_devices", return_value=[0])
+    def test_reset_fails_when_device_is_detached(self, _):
+        ads = get_mock_ads(2)
+        for ad in ads:
+            ad.skip_sl4a = True
+        self.assertFalse(android_device.reset(ads))
+
+    @mock.patch.object(android_device, "list_adb_devices", return_value=[0])
+    def test_reset_fails_when_sl4a_stopped(self, _):
+        ads = get_mock_ads(1)
+        ads[0].skip_sl4a = False
+        ads[0].is_sl4a_running.return_value = False
+        self.assertFalse(android_device.reset(ads))
+
     def test_start_services_on_ads(self):
         """Makes sure when an AndroidDevice fails to start some services, all
         AndroidDevice objects get cleaned up.
@@ -395,8 +437,12 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         'acts.controllers.fastboot.FastbootProxy',
         return_value=MockFastbootProxy(MOCK_SERIAL))
     @mock.patch('acts.utils.create_dir')
-    @mock.patch('acts.utils.start_standing_subprocess', return_value="process")
-    @mock.patch('acts.utils.stop_standing_subprocess')
+    @mock.patch(
+        'acts.utils.start_standing_subprocess',
+        side_effect=lambda _: MockLogcatProcess())
+    @mock.patch(
+        'acts.utils.stop_standing_subprocess',
+        side_effect=lambda process: process.kill())
     @mock.patch('acts.utils._assert_subprocess_running')
     def test_AndroidDevice_take_logcat(self, check_proc_mock, stop_proc_mock,
                                        start_proc_mock, creat_dir_mock,
@@ -415,6 +461,8 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         ad.start_adb_logcat()
         # Verify start did the correct operations.
         self.assertTrue(ad.adb_logcat_process)
+        self.assertTrue(ad.is_adb_logcat_on)
+        process = ad.adb_logcat_process
         expected_log_path = os.path.join(logging.log_path,
                                          "AndroidDevice%s" % ad.serial,
                                          "adblog,fakemodel,%s.txt" % ad.serial)
@@ -431,8 +479,9 @@ class ActsAndroidDeviceTest(unittest.TestCase):
             ad.start_adb_logcat()
         # Verify stop did the correct operations.
         ad.stop_adb_logcat()
-        stop_proc_mock.assert_called_with("process")
+        stop_proc_mock.assert_called_with(process)
         self.assertIsNone(ad.adb_logcat_process)
+        self.assertFalse(ad.is_adb_logcat_on)
         self.assertEqual(ad.adb_logcat_file_path, expected_log_path)
 
     @mock.patch(
@@ -442,8 +491,12 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         'acts.controllers.fastboot.FastbootProxy',
         return_value=MockFastbootProxy(MOCK_SERIAL))
     @mock.patch('acts.utils.create_dir')
-    @mock.patch('acts.utils.start_standing_subprocess', return_value="process")
-    @mock.patch('acts.utils.stop_standing_subprocess')
+    @mock.patch(
+        'acts.utils.start_standing_subprocess',
+        side_effect=lambda _: MockLogcatProcess())
+    @mock.patch(
+        'acts.utils.stop_standing_subprocess',
+        side_effect=lambda process: process.kill())
     @mock.patch('acts.utils._assert_subprocess_running')
     def test_AndroidDevice_take_logcat_with_user_param(
             self, check_proc_mock, stop_proc_mock, start_proc_mock,
@@ -471,6 +524,7 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         start_proc_mock.assert_called_with(adb_cmd % (ad.serial,
                                                       expected_log_path))
         self.assertEqual(ad.adb_logcat_file_path, expected_log_path)
+        ad.stop_adb_logcat()
 
     @mock.patch(
         'acts.controllers.adb.AdbProxy',
@@ -505,6 +559,48 @@ class ActsAndroidDeviceTest(unittest.TestCase):
         ad.adb.return_value = "bad return value error"
         self.assertEqual(None, ad.get_package_pid("some_package"))
 
+    @mock.patch(
+        'acts.controllers.adb.AdbProxy',
+        return_value=MockAdbProxy(MOCK_SERIAL))
+    @mock.patch(
+        'acts.controllers.fastboot.FastbootProxy',
+        return_value=MockFastbootProxy(MOCK_SERIAL))
+    @mock.patch.object(
+        android_device.AndroidDevice, 'droid', new_callable=mock.PropertyMock)
+    def test_get_clock_offset_tracker(self, droid, fastboot_proxy,
+                                      adb_proxy):
+        """Verifies the tracker is synced once with the SL4A elapsed realtime
+        clock, and kept until the device reboots.
+        """
+        droid.return_value.getSystemElapsedRealtimeNanos.return_value = (
+            int(12.5e9))
+        ad = android_device.AndroidDevice(serial=MOCK_SERIAL)
+        tracker = ad.get_clock_offset_tracker()
+        self.assertEqual(tracker.samples[-1].device_time, 12.5)
+        self.assertIs(ad.get_clock_offset_tracker(), tracker)
+        self.assertEqual(droid.return_value.getSystemElapsedRealtimeNanos.
+                         call_count, clock_offset.DEFAULT_ROUND_TRIPS)
+
+        ad.terminate_all_sessions = mock.Mock()
+        ad.wait_for_boot_completion = mock.Mock()
+        ad.reboot(stop_at_lock_screen=True)
+        self.assertIsNot(ad.get_clock_offset_tracker(), tracker)
+
+    @mock.patch(
+        'acts.controllers.adb.AdbProxy',
+        return_value=MockAdbProxy(MOCK_SERIAL))
+    @mock.patch(
+        'acts.controllers.fastboot.FastbootProxy',
+        return_value=MockFastbootProxy(MOCK_SERIAL))
+    @mock.patch.object(
+        android_device.AndroidDevice, 'droid', new_callable=mock.PropertyMock)
+    def test_get_clock_offset_tracker_without_sl4a(self, droid,
+                                                   fastboot_proxy, adb_proxy):
+        droid.return_value = None
+        ad = android_device.AndroidDevice(serial=MOCK_SERIAL)
+        with self.assertRaises(android_device.AndroidDeviceError):
+            ad.get_clock_offset_tracker()
+
 
 if __name__ == "__main__":
     unittest.main()
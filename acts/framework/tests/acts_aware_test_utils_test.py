@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import mock
+
+from acts.controllers.sl4a_lib import event_stats
+from acts.test_utils.wifi.aware import aware_test_utils as autils
+
+
+class ExtractCdfTest(unittest.TestCase):
+    def test_extract_cdf(self):
+        x, cdf = autils.extract_cdf([3, 1, 2, 2])
+
+        self.assertEqual(x, [1, 2, 3])
+        self.assertEqual(cdf, [0.25, 0.75, 1.0])
+
+    def test_extract_cdf_empty(self):
+        self.assertEqual(autils.extract_cdf([]), ([], []))
+
+    def test_extract_cdf_decile(self):
+        cdf = autils.extract_cdf(list(range(1, 21)))
+
+        self.assertEqual(
+            autils.extract_cdf_decile(cdf), [2, 4, 6, 8, 10, 12, 14, 16, 18])
+
+    def test_extract_cdf_decile_single_value(self):
+        cdf = autils.extract_cdf([5, 5])
+
+        self.assertEqual(autils.extract_cdf_decile(cdf), [5] * 9)
+
+    def test_extract_cdf_decile_empty(self):
+        self.assertEqual(autils.extract_cdf_decile(([], [])), [])
+
+
+class ExtractStatsTest(unittest.TestCase):
+    def test_extract_histogram_stats(self):
+        histogram = event_stats.Histogram(0, 1, 100)
+        for value in range(1, 21):
+            histogram.add(value)
+        results = {}
+
+        autils.extract_histogram_stats(mock.Mock(), histogram, results,
+                                       'latency_', 'Latency')
+
+        self.assertEqual(results['latency_num_samples'], 20)
+        self.assertEqual(results['latency_min'], 1)
+        self.assertEqual(results['latency_max'], 20)
+        self.assertEqual(results['latency_mean'], 10.5)
+        # The deciles of the CDF of the data, rounded up to the bucket bounds.
+        cdf_decile = autils.extract_cdf_decile(
+            autils.extract_cdf(list(range(1, 21))))
+        self.assertEqual(results['latency_cdf_decile'],
+                         [value + 1 for value in cdf_decile])
+
+    def test_extract_histogram_stats_empty(self):
+        results = {}
+
+        autils.extract_histogram_stats(mock.Mock(),
+                                       event_stats.Histogram(0, 1, 10),
+                                       results, 'latency_', 'Latency')
+
+        self.assertEqual(results, {'latency_num_samples': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,7 +19,10 @@ import unittest
 
 from acts import asserts
 from acts import base_test
+from acts import call_stats
+from acts import keys
 from acts import signals
+from acts import test_params
 from acts import test_runner
 
 MSG_EXPECTED_EXCEPTION = "This is an expected exception."
@@ -1000,6 +1003,152 @@ class ActsBaseClassTest(unittest.TestCase):
         self.assertEqual(fail_record.details, MSG_EXPECTED_EXCEPTION)
         self.assertEqual(fail_record.extras, MOCK_EXTRA)
 
+    def create_param_test(self, space, name_func=None):
+        """Returns a test class with a template test_scan, run with space."""
+        test = self
+
+        class MockBaseTest(base_test.BaseTestClass):
+            def __init__(self, controllers):
+                super(MockBaseTest, self).__init__(controllers)
+                self.params_run = []
+
+            @test_params.generated_tests(space, name_func)
+            def test_scan(self, mode, power):
+                self.params_run.append((mode, power))
+                asserts.assert_true(power != 'high', MSG_EXPECTED_TEST_FAILURE)
+
+            def test_other(self):
+                pass
+
+        return MockBaseTest(self.mock_test_cls_configs)
+
+    def test_param_generated_tests(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power', 'balanced']),
+                                ('power', ['low', 'high'])))
+        bt_cls.run(test_names=['test_scan'])
+
+        self.assertEqual(bt_cls.params_run, [('low_power', 'low'),
+                                             ('low_power', 'high'),
+                                             ('balanced', 'low'),
+                                             ('balanced', 'high')])
+        self.assertEqual(
+            [record.test_name for record in bt_cls.results.passed],
+            ['test_scan_mode_low_power_power_low',
+             'test_scan_mode_balanced_power_low'])
+        self.assertEqual(len(bt_cls.results.failed), 2)
+        self.assertEqual(len(bt_cls.results.requested), 4)
+
+    def test_param_generated_tests_all_tests(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power']),
+                                ('power', ['low', 'high'])))
+        bt_cls.run()
+
+        self.assertEqual(bt_cls.results.requested, [
+            'test_other', 'test_scan_mode_low_power_power_low',
+            'test_scan_mode_low_power_power_high'
+        ])
+
+    def test_param_generated_tests_select_by_name(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power', 'balanced']),
+                                ('power', ['low', 'high'])))
+        bt_cls.run(test_names=[
+            'test_scan_mode_balanced_power_low', 'test_scan_*_power_high'
+        ])
+
+        self.assertEqual(bt_cls.params_run, [('balanced', 'low'),
+                                             ('low_power', 'high'),
+                                             ('balanced', 'high')])
+
+    def test_param_generated_tests_name_func(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power']), ('power', ['low'])),
+            name_func=lambda name, params: 'test_%s_%s' % (params['mode'],
+                                                            params['power']))
+        bt_cls.run(test_names=['test_low_power_*'])
+
+        self.assertEqual(bt_cls.results.passed[0].test_name,
+                         'test_low_power_low')
+
+    def test_param_generated_tests_shard(self):
+        self.mock_test_cls_configs['user_params'][
+            keys.Config.key_test_shard.value] = [1, 2]
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power', 'balanced']),
+                                ('power', ['low', 'high'])))
+        bt_cls.run(test_names=['test_scan'])
+
+        self.assertEqual(bt_cls.params_run, [('low_power', 'high'),
+                                             ('balanced', 'high')])
+
+    def test_param_generated_tests_select_by_name_large_space(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', range(10**5)),
+                                ('power', range(10**5))))
+        bt_cls.run(test_names=['test_scan_mode_12345_power_67890'])
+
+        self.assertEqual(bt_cls.params_run, [(12345, 67890)])
+
+    def test_param_generated_tests_select_by_name_name_func(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power', 'balanced']),
+                                ('power', ['low'])),
+            name_func=lambda name, params: 'test_%s_%s' % (params['mode'],
+                                                            params['power']))
+        bt_cls.run(test_names=['test_balanced_low'])
+
+        self.assertEqual(bt_cls.params_run, [('balanced', 'low')])
+
+    def test_param_generated_tests_same_name(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['a-b', 'a_b']), ('power', ['low'])))
+
+        with self.assertRaises(base_test.Error):
+            bt_cls.run(test_names=['test_scan_mode_a_b_power_low'])
+        with self.assertRaises(base_test.Error):
+            bt_cls.run(test_names=['test_scan'])
+        self.assertEqual(bt_cls.params_run, [])
+
+    def test_param_generated_tests_unknown_name(self):
+        bt_cls = self.create_param_test(
+            test_params.Product(('mode', ['low_power']), ('power', ['low'])))
+        bt_cls.run(test_names=['test_scan_mode_balanced_power_low'])
+
+        self.assertEqual(bt_cls.params_run, [])
+        self.assertEqual(len(bt_cls.results.skipped), 1)
+
+    def test_phase_timings_pass(self):
+        class MockBaseTest(base_test.BaseTestClass):
+            def test_something(self):
+                call_stats.add_call(call_stats.ADB, 0.5)
+
+        bt_cls = MockBaseTest(self.mock_test_cls_configs)
+        bt_cls.run(test_names=["test_something"])
+        record = bt_cls.results.passed[0]
+        self.assertEqual(
+            set(record.phase_timings),
+            {'setup_test', 'test', 'teardown_test', 'on_pass'})
+        self.assertEqual(record.calls,
+                         {call_stats.ADB: {
+                             'count': 1,
+                             'time': 0.5
+                         }})
+        self.assertIn('MockBaseTest', bt_cls.results.get_phase_timings())
+
+    def test_phase_timings_fail(self):
+        class MockBaseTest(base_test.BaseTestClass):
+            def test_something(self):
+                asserts.fail(MSG_EXPECTED_EXCEPTION)
+
+        bt_cls = MockBaseTest(self.mock_test_cls_configs)
+        bt_cls.run(test_names=["test_something"])
+        record = bt_cls.results.failed[0]
+        self.assertIn('on_fail', record.phase_timings)
+        self.assertNotIn('on_pass', record.phase_timings)
+        self.assertEqual(record.calls, {})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from acts import call_stats
+
+
+class CallStatsTest(unittest.TestCase):
+    """Tests the acts.call_stats module."""
+
+    def test_get_calls_since(self):
+        call_stats.add_call(call_stats.ADB, 1)
+        totals = call_stats.get_totals()
+        call_stats.add_call(call_stats.ADB, 0.5)
+        call_stats.add_call(call_stats.ADB, 0.25)
+        call_stats.add_call('new_kind', 2)
+
+        self.assertEqual(
+            call_stats.get_calls_since(totals), {
+                call_stats.ADB: {
+                    'count': 2,
+                    'time': 0.75
+                },
+                'new_kind': {
+                    'count': 1,
+                    'time': 2
+                }
+            })
+
+    def test_get_calls_since_no_calls(self):
+        call_stats.add_call(call_stats.RPC, 1)
+
+        self.assertEqual(
+            call_stats.get_calls_since(call_stats.get_totals()), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
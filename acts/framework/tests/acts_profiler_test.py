@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from acts import profiler
+
+
+def busy_function(duration):
+    """Uses the CPU for duration seconds."""
+    end_time = time.time() + duration
+    while time.time() < end_time:
+        pass
+
+
+class ProfilerTest(unittest.TestCase):
+    """Tests the acts.profiler module."""
+
+    def setUp(self):
+        self.profiler = profiler.Profiler(interval=0.01)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        profiler.set_label(None)
+        shutil.rmtree(self.tmp_dir)
+
+    def sample_busy_function(self):
+        """Samples the current thread while and after it uses the CPU."""
+        self.profiler.sample()
+        busy_function(0.05)
+        self.profiler.sample()
+
+    def test_get_label(self):
+        profiler.set_label('SampleTest.test_something')
+        self.assertEqual(profiler.get_label(), 'SampleTest.test_something')
+
+        profiler.set_label(None)
+        self.assertEqual(profiler.get_label(), profiler.RUNNER_LABEL)
+
+    def test_sample_adds_cpu_time_under_label(self):
+        profiler.set_label('SampleTest.test_busy')
+        self.sample_busy_function()
+
+        self.assertEqual(self.profiler.get_labels(), ['SampleTest.test_busy'])
+        elapsed, cpu = self.profiler.get_label_times('SampleTest.test_busy')
+        self.assertGreater(elapsed, 0.05)
+        self.assertGreater(cpu, 0.01)
+
+    def test_get_collapsed_stacks(self):
+        profiler.set_label('SampleTest.test_busy')
+        self.sample_busy_function()
+
+        stacks = self.profiler.get_collapsed_stacks('SampleTest.test_busy')
+        self.assertTrue(stacks)
+        for stack in stacks:
+            self.assertTrue(
+                stack.endswith('sample_busy_function (%s:%d)' %
+                               (os.path.basename(__file__),
+                                ProfilerTest.sample_busy_function.__code__.
+                                co_firstlineno)))
+        self.assertEqual(
+            self.profiler.get_collapsed_stacks('SampleTest.test_other'), {})
+
+    def test_get_top_functions(self):
+        self.sample_busy_function()
+
+        self_top = self.profiler.get_top_functions(inclusive=False)
+        inclusive_top = self.profiler.get_top_functions(inclusive=True)
+        self.assertTrue(self_top[0][0].startswith('sample_busy_function'))
+        self.assertIn(self_top[0][0], [name for name, _ in inclusive_top])
+        self.assertTrue(any(name.startswith('test_get_top_functions')
+                            for name, _ in inclusive_top))
+
+    def test_start_stop(self):
+        profiler.set_label('SampleTest.test_busy')
+        self.profiler.start()
+        busy_function(0.1)
+        self.profiler.stop()
+
+        elapsed, cpu = self.profiler.get_label_times('SampleTest.test_busy')
+        self.assertGreater(elapsed, 0)
+        self.assertGreater(cpu, 0)
+        self.assertTrue(
+            any('busy_function' in stack for stack in
+                self.profiler.get_collapsed_stacks('SampleTest.test_busy')))
+
+    def test_write(self):
+        profiler.set_label('SampleTest.test_busy')
+        self.sample_busy_function()
+        self.profiler.write(self.tmp_dir)
+
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)), [
+                'SampleTest.test_busy.cpu.collapsed',
+                'SampleTest.test_busy.wall.collapsed',
+                profiler.SUMMARY_FILE_NAME
+            ])
+        with open(os.path.join(self.tmp_dir,
+                               'SampleTest.test_busy.cpu.collapsed')) as f:
+            for line in f:
+                stack, weight = line.rsplit(' ', 1)
+                self.assertIn('sample_busy_function', stack)
+                self.assertGreater(int(weight), 0)
+        with open(os.path.join(self.tmp_dir,
+                               profiler.SUMMARY_FILE_NAME)) as f:
+            self.assertIn('SampleTest.test_busy', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
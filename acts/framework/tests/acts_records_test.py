@@ -14,6 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import json
 import unittest
 
 from acts import records
@@ -54,6 +55,8 @@ class ActsRecordsTest(unittest.TestCase):
         d[records.TestResultEnums.RECORD_UID] = None
         d[records.TestResultEnums.RECORD_CLASS] = None
         d[records.TestResultEnums.RECORD_ADDITIONAL_ERRORS] = {}
+        d[records.TestResultEnums.RECORD_PHASE_TIMINGS] = {}
+        d[records.TestResultEnums.RECORD_CALLS] = {}
         actual_d = record.to_dict()
         self.assertDictEqual(actual_d, d)
         # Verify that these code paths do not cause crashes and yield non-empty
@@ -65,6 +68,47 @@ class ActsRecordsTest(unittest.TestCase):
 
     """ Begin of Tests """
 
+    def test_result_record_phase_timings(self):
+        record = records.TestResultRecord(self.tn)
+        record.add_phase_time(records.TestResultEnums.PHASE_TEST, 1.5)
+        record.add_phase_time(records.TestResultEnums.PHASE_TEST, 0.5)
+        with record.time_phase(records.TestResultEnums.PHASE_SETUP_TEST):
+            pass
+
+        self.assertEqual(
+            record.phase_timings[records.TestResultEnums.PHASE_TEST], 2)
+        self.assertLess(
+            record.phase_timings[records.TestResultEnums.PHASE_SETUP_TEST], 1)
+
+    def test_result_phase_timings_by_class(self):
+        tr = records.TestResult()
+        for test_class, test_time, adb_calls in (('A', 1, 2), ('A', 2, 3),
+                                                 ('B', 4, 0)):
+            record = records.TestResultRecord(self.tn, test_class)
+            record.test_begin()
+            record.add_phase_time(records.TestResultEnums.PHASE_TEST,
+                                  test_time)
+            if adb_calls:
+                record.calls = {'adb': {'count': adb_calls, 'time': 0.5}}
+            record.test_pass()
+            tr.add_record(record)
+
+        self.assertEqual(tr.get_phase_timings(), {
+            'A': {
+                'test': 3,
+                'calls': {
+                    'adb': {
+                        'count': 5,
+                        'time': 1
+                    }
+                }
+            },
+            'B': {
+                'test': 4
+            }
+        })
+        self.assertIn('PhaseTimings', json.loads(tr.json_str()))
+
     def test_result_record_pass_none(self):
         record = records.TestResultRecord(self.tn)
         record.test_begin()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import itertools
+import unittest
+
+from acts import test_params
+
+
+class ProductTest(unittest.TestCase):
+    def test_order(self):
+        space = test_params.Product(('a', [1, 2]), ('b', ['x', 'y', 'z']))
+
+        self.assertEqual(len(space), 6)
+        self.assertEqual(
+            list(space),
+            [{'a': a, 'b': b} for a, b in itertools.product([1, 2], 'xyz')])
+        self.assertEqual(space[-1], {'a': 2, 'b': 'z'})
+        with self.assertRaises(IndexError):
+            space[6]
+
+    def test_large_space(self):
+        space = test_params.Product(
+            *(('p%d' % i, range(10)) for i in range(15)))
+
+        self.assertEqual(len(space), 10**15)
+        self.assertEqual(space[123]['p12'], 1)
+        self.assertEqual(space[123]['p14'], 3)
+
+    def test_parameter_order(self):
+        space = test_params.Product(('b', [1, 2]), ('a', ['x', 'y']))
+
+        self.assertEqual(list(space[0]), ['b', 'a'])
+        self.assertEqual([(case['b'], case['a']) for case in space],
+                         list(itertools.product([1, 2], 'xy')))
+
+
+class PairwiseTest(unittest.TestCase):
+    def assert_covers_pairs(self, space, params):
+        cases = list(space)
+        for (name1, values1), (name2, values2) in itertools.combinations(
+                params, 2):
+            for value1, value2 in itertools.product(values1, values2):
+                self.assertTrue(
+                    any(case[name1] == value1 and case[name2] == value2
+                        for case in cases),
+                    '%s=%s, %s=%s not covered' % (name1, value1, name2,
+                                                   value2))
+
+    def test_covers_all_pairs(self):
+        params = [('p%d' % i, list(range(4))) for i in range(10)]
+        space = test_params.Pairwise(*params)
+
+        self.assert_covers_pairs(space, params)
+        # 4^10 combinations.
+        self.assertLess(len(space), 100)
+
+    def test_stable(self):
+        params = [('a', [1, 2, 3]), ('b', [1, 2]), ('c', [1, 2, 3, 4])]
+
+        self.assertEqual(
+            list(test_params.Pairwise(*params)),
+            list(test_params.Pairwise(*params)))
+
+    def test_single_parameter(self):
+        space = test_params.Pairwise(('a', [1, 2, 3]))
+
+        self.assertEqual(list(space), [{'a': 1}, {'a': 2}, {'a': 3}])
+
+
+class SampleTest(unittest.TestCase):
+    def test_sample(self):
+        space = test_params.Product(
+            *(('p%d' % i, range(10)) for i in range(12)))
+        sample = space.sample(20, seed=1)
+
+        self.assertEqual(len(sample), 20)
+        self.assertEqual(list(sample), list(space.sample(20, seed=1)))
+        self.assertNotEqual(list(sample), list(space.sample(20, seed=2)))
+
+    def test_sample_larger_than_space(self):
+        space = test_params.Product(('a', [1, 2]))
+
+        self.assertEqual(list(space.sample(5)), list(space))
+
+
+class ShardTest(unittest.TestCase):
+    def test_shards_cover_space(self):
+        space = test_params.Product(('a', range(5)), ('b', range(3)))
+        shards = [space.shard(index, 4) for index in range(4)]
+
+        self.assertEqual([len(shard) for shard in shards], [4, 4, 4, 3])
+        cases = [case for shard in shards for case in shard]
+        self.assertEqual(
+            sorted(sorted(case.items()) for case in cases),
+            sorted(sorted(case.items()) for case in space))
+
+    def test_invalid_shard(self):
+        with self.assertRaises(ValueError):
+            test_params.Product(('a', [1])).shard(2, 2)
+
+
+class FindTest(unittest.TestCase):
+    def assert_finds_cases(self, space):
+        for index, case in enumerate(space):
+            value_indices = [
+                values.index(case[name])
+                for name, values in zip(space.names, space.values)
+            ]
+            self.assertEqual(space.find(value_indices), index)
+
+    def test_find(self):
+        space = test_params.Product(('a', [1, 2, 3]), ('b', ['x', 'y']),
+                                    ('c', [True, False]))
+
+        self.assert_finds_cases(space)
+        self.assert_finds_cases(test_params.Pairwise(*zip(space.names,
+                                                          space.values)))
+        self.assert_finds_cases(space.sample(5, seed=1))
+        self.assert_finds_cases(space.shard(1, 3))
+
+    def test_find_missing(self):
+        space = test_params.Product(('a', [1, 2, 3]), ('b', ['x', 'y']))
+
+        sample = space.sample(2, seed=1)
+
+        self.assertIsNone(space.shard(1, 3).find([0, 0]))
+        self.assertEqual(
+            len([
+                value_indices for value_indices in itertools.product(
+                    range(3), range(2))
+                if sample.find(value_indices) is not None
+            ]), 2)
+
+
+class FindTestCasesTest(unittest.TestCase):
+    def test_find_test_cases(self):
+        space = test_params.Product(
+            *(('p%d' % i, range(1000)) for i in range(5)))
+
+        self.assertEqual(
+            test_params.find_test_cases(
+                space, 'test_scan', 'test_scan_p0_1_p1_0_p2_0_p3_0_p4_12'),
+            [10**12 + 12])
+
+    def test_find_test_cases_unknown_name(self):
+        space = test_params.Product(('mode', ['low power']), ('n', [1, 2]))
+
+        self.assertEqual(
+            test_params.find_test_cases(space, 'test_scan',
+                                        'test_scan_mode_low_power_n_3'), [])
+        self.assertEqual(
+            test_params.find_test_cases(space, 'test_scan',
+                                        'test_scan_mode_low_power'), [])
+
+    def test_find_test_cases_same_name(self):
+        space = test_params.Product(('mode', ['a-b', 'a_b', 'a']),
+                                    ('n', ['b_n_1', 1]))
+
+        self.assertEqual(
+            test_params.find_test_cases(space, 'test_scan',
+                                        'test_scan_mode_a_b_n_1'),
+            [1, 3])
+        self.assertEqual(
+            test_params.find_test_cases(space, 'test_scan',
+                                        'test_scan_mode_a_n_b_n_1'),
+            [4])
+
+
+class GetTestNameTest(unittest.TestCase):
+    def test_get_test_name(self):
+        name = test_params.get_test_name(
+            'test_scan',
+            collections.OrderedDict([('mode', 'low power'),
+                                     ('uuid', '0000-1111'), ('n', 3)]))
+
+        self.assertEqual(name, 'test_scan_mode_low_power_uuid_0000_1111_n_3')
+
+
+if __name__ == '__main__':
+    unittest.main()
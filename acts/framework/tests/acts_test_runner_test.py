@@ -15,11 +15,13 @@
 #   limitations under the License.
 
 import mock
+import os
 import shutil
 import tempfile
 import unittest
 
 from acts import keys
+from acts import profiler
 from acts import signals
 from acts import test_runner
 
@@ -247,6 +249,98 @@ class ActsTestRunnerTest(unittest.TestCase):
         self.assertEqual(results["Executed"], 2)
         self.assertEqual(results["Passed"], 2)
 
+    def _run_integration_test_twice(self, reuse_controllers):
+        mock_test_config = dict(self.base_mock_test_config)
+        tb_key = keys.Config.key_testbed.value
+        mock_ctrlr_config_name = mock_controller.ACTS_CONTROLLER_CONFIG_NAME
+        mock_test_config[tb_key][mock_ctrlr_config_name] = ["magic1"]
+        mock_test_config[keys.Config.key_reuse_controllers.value] = (
+            reuse_controllers)
+        tr = test_runner.TestRunner(mock_test_config,
+                                    [('IntegrationTest', None),
+                                     ('IntegrationTest', None)])
+        with mock.patch.object(
+                mock_controller, 'create',
+                wraps=mock_controller.create) as mock_create, \
+                mock.patch.object(mock_controller, 'destroy') as mock_destroy:
+            tr.run()
+            tr.stop()
+        self.assertFalse(tr.controller_registry)
+        results = tr.results.summary_dict()
+        self.assertEqual(results["Passed"], 2)
+        return tr, mock_create.call_count, mock_destroy.call_count
+
+    @mock.patch.object(mock_controller, 'reset', create=True,
+                       return_value=True)
+    def test_run_reuse_controllers(self, mock_reset):
+        """Verifies that controllers with a reset function are created once
+        for all the test classes of a run when reuse_controllers is set.
+        """
+        tr, creations, destructions = self._run_integration_test_twice(True)
+        self.assertEqual(creations, 1)
+        self.assertEqual(destructions, 1)
+        self.assertEqual(mock_reset.call_count, 1)
+        timing = tr.controller_timings['mock_controller']
+        self.assertEqual(timing['create_count'], 1)
+        self.assertEqual(timing['reset_count'], 1)
+        self.assertIn('saved_time', timing)
+        self.assertIn('Controller Timings', tr.results.extras)
+
+    @mock.patch.object(mock_controller, 'reset', create=True,
+                       return_value=False)
+    def test_run_reuse_controllers_reset_fails(self, mock_reset):
+        """Verifies that controllers failing to reset are created again."""
+        _, creations, destructions = self._run_integration_test_twice(True)
+        self.assertEqual(creations, 2)
+        self.assertEqual(destructions, 2)
+        self.assertEqual(mock_reset.call_count, 1)
+
+    @mock.patch.object(mock_controller, 'reset', create=True,
+                       side_effect=Exception('Lost connection'))
+    def test_run_reuse_controllers_reset_raises(self, mock_reset):
+        """Verifies that controllers raising in reset are created again."""
+        _, creations, destructions = self._run_integration_test_twice(True)
+        self.assertEqual(creations, 2)
+        self.assertEqual(destructions, 2)
+
+    def test_run_reuse_controllers_without_reset(self):
+        """Verifies that controllers without a reset function are created for
+        every test class.
+        """
+        _, creations, destructions = self._run_integration_test_twice(True)
+        self.assertEqual(creations, 2)
+        self.assertEqual(destructions, 2)
+
+    @mock.patch.object(mock_controller, 'reset', create=True,
+                       return_value=True)
+    def test_run_without_reuse_controllers(self, mock_reset):
+        """Verifies that controllers are created for every test class by
+        default.
+        """
+        _, creations, destructions = self._run_integration_test_twice(False)
+        self.assertEqual(creations, 2)
+        self.assertEqual(destructions, 2)
+        self.assertFalse(mock_reset.called)
+
+    def test_run_profile(self):
+        """Verifies that the host profile is written under the log path when
+        profile_interval_ms is set.
+        """
+        mock_test_config = dict(self.base_mock_test_config)
+        tb_key = keys.Config.key_testbed.value
+        mock_ctrlr_config_name = mock_controller.ACTS_CONTROLLER_CONFIG_NAME
+        mock_test_config[tb_key][mock_ctrlr_config_name] = ["magic1"]
+        mock_test_config[keys.Config.key_profile_interval_ms.value] = 1
+        tr = test_runner.TestRunner(mock_test_config,
+                                    [('IntegrationTest', None)])
+        tr.run()
+        tr.stop()
+        self.assertEqual(tr.profiler.interval, 0.001)
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(tr.log_path, 'profile',
+                             profiler.SUMMARY_FILE_NAME)))
+
     def test_verify_controller_module(self):
         test_runner.TestRunner.verify_controller_module(mock_controller)
 
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import json
+import math
+import os
+import shutil
+import statistics
+import tempfile
+import unittest
+
+import numpy
+
+from acts.test_utils.wifi import wifi_sweep_results as sweep_results
+
+NAN = float('nan')
+
+
+def rssi_step(signal_poll, chain_0, scan):
+    """Returns the measurements of one step of an RSSI test."""
+
+    def measurement(data):
+        return collections.OrderedDict([('data', data), ('mean', None),
+                                        ('stdev', None)])
+
+    return collections.OrderedDict(
+        [('signal_poll_rssi', measurement(signal_poll)),
+         ('signal_poll_avg_rssi', measurement(signal_poll)),
+         ('chain_0_rssi', measurement(chain_0)),
+         ('chain_1_rssi', measurement(chain_0)),
+         ('scan_rssi', {'aa:bb': measurement(scan)})])
+
+
+class ActsWifiSweepResultsTest(unittest.TestCase):
+    """Tests for acts.test_utils.wifi.wifi_sweep_results."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.rvr_result = collections.OrderedDict(
+            [('test_name', 'test_rvr_TCP_DL_ch1_VHT20'),
+             ('ap_settings', {'2G': {'channel': 1}}),
+             ('fixed_attenuation', 40),
+             ('attenuation', [0, 2, 4, 6]),
+             ('throughput_receive', [100.0, 80.5, 20.25, 0])])
+        self.rssi_result = collections.OrderedDict(
+            [('test_name', 'test_rssi_vs_atten_ch1_VHT20_ActiveTraffic'),
+             ('attenuation', [0, 10, 20]),
+             ('connected_bssid', 'aa:bb'),
+             ('ap_tx_power', 20),
+             ('fixed_attenuation', 50),
+             ('dut_front_end_loss', 2),
+             ('rssi_result', [
+                 rssi_step([-30, -31, -32], [-33, -33, -34], [-31]),
+                 rssi_step([-41, NAN, -40], [-44, -43, NAN], [NAN]),
+                 rssi_step([NAN, NAN, NAN], [-55, NAN, NAN], [-50]),
+             ])])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_from_dict_splits_columns_and_metadata(self):
+        result = sweep_results.SweepResult.from_dict(self.rvr_result)
+        self.assertEqual(list(result.columns), ['throughput_receive'])
+        self.assertEqual(
+            list(result.metadata),
+            ['test_name', 'ap_settings', 'fixed_attenuation'])
+        numpy.testing.assert_array_equal(result.total_attenuation,
+                                         [40, 42, 44, 46])
+
+    def test_add_column_checks_length(self):
+        result = sweep_results.SweepResult([0, 1])
+        with self.assertRaises(sweep_results.SweepResultError):
+            result.add_column('throughput', [1, 2, 3])
+
+    def test_save_and_load(self):
+        result = sweep_results.SweepResult.from_rssi_result(self.rssi_result)
+        file_path = os.path.join(self.tmp_dir, 'result.npz')
+        result.save(file_path)
+        loaded = sweep_results.SweepResult.load(file_path)
+        self.assertEqual(loaded.metadata, result.metadata)
+        self.assertEqual(list(loaded.columns), list(result.columns))
+        for name in result.columns:
+            numpy.testing.assert_array_equal(loaded[name], result[name])
+
+    def test_load_json(self):
+        file_path = os.path.join(self.tmp_dir, 'result.json')
+        with open(file_path, 'w') as json_file:
+            json.dump(self.rvr_result, json_file)
+        loaded = sweep_results.SweepResult.load(file_path)
+        self.assertEqual(loaded.to_dict(), self.rvr_result)
+
+    def test_sample_statistics_match_statistics_module(self):
+        result = sweep_results.SweepResult.from_rssi_result(self.rssi_result)
+        for key in sweep_results.RSSI_KEYS:
+            mean = result.mean(key)
+            stdev = result.stdev(key)
+            for idx, step in enumerate(self.rssi_result['rssi_result']):
+                data = step[key]
+                if key == 'scan_rssi':
+                    data = data['aa:bb']
+                valid = [x for x in data['data'] if not math.isnan(x)]
+                if not valid:
+                    self.assertTrue(math.isnan(mean[idx]))
+                    self.assertTrue(math.isnan(stdev[idx]))
+                    continue
+                self.assertAlmostEqual(mean[idx], statistics.mean(valid))
+                if len(valid) > 1:
+                    self.assertAlmostEqual(stdev[idx],
+                                           statistics.stdev(valid))
+                else:
+                    self.assertEqual(stdev[idx], 0)
+
+    def test_rssi_error(self):
+        result = sweep_results.SweepResult.from_rssi_result(self.rssi_result)
+        predicted = sweep_results.predicted_rssi(result)
+        numpy.testing.assert_array_equal(predicted, [-32, -42, -52])
+        numpy.testing.assert_allclose(
+            sweep_results.rssi_error(result, 'chain_0_rssi'),
+            result.mean('chain_0_rssi') + sweep_results.CONST_3dB - predicted)
+        error = sweep_results.rssi_error(result, 'signal_poll_rssi')
+        numpy.testing.assert_allclose(error[:2], [1, 1.5])
+        self.assertTrue(math.isnan(error[2]))
+
+    def test_error_statistics(self):
+        self.assertEqual(
+            sweep_results.error_statistics([1, -3, NAN]), (2.0, -1.0))
+        self.assertEqual(
+            sweep_results.error_statistics([1, -3, NAN], absolute=False),
+            (2.0, -1.0))
+        self.assertEqual(
+            sweep_results.error_statistics([1, 3], absolute=False), (1.0, 2.0))
+        avg_error, avg_shift = sweep_results.error_statistics([NAN])
+        self.assertTrue(math.isnan(avg_error))
+        self.assertTrue(math.isnan(avg_shift))
+
+    def test_throughput_limits_match_closest_points(self):
+        golden_attenuation = numpy.arange(40, 70, 1.0)
+        golden_throughput = numpy.linspace(300, 0, len(golden_attenuation))
+        attenuation = numpy.arange(38, 72, 0.5)
+        lower_limit, upper_limit = sweep_results.throughput_limits(
+            attenuation, golden_attenuation, golden_throughput, 10, 15)
+        for idx, att in enumerate(attenuation):
+            distances = [abs(att - golden) for golden in golden_attenuation]
+            closest = [
+                golden_throughput[index] for index, _ in sorted(
+                    enumerate(distances), key=lambda x: x[1])[0:3]
+            ]
+            self.assertAlmostEqual(
+                lower_limit[idx],
+                max(min(closest) - max(10, min(closest) * 15 / 100), 0))
+            self.assertAlmostEqual(
+                upper_limit[idx],
+                max(closest) + max(10, max(closest) * 15 / 100))
+
+    def test_stack_results(self):
+        first = sweep_results.SweepResult.from_dict(self.rvr_result)
+        self.rvr_result['attenuation'] = [4, 6, 8, 10]
+        second = sweep_results.SweepResult.from_dict(self.rvr_result)
+        attenuation, values = sweep_results.stack_results(
+            [first, second], 'throughput_receive')
+        numpy.testing.assert_array_equal(attenuation,
+                                         [40, 42, 44, 46, 48, 50])
+        numpy.testing.assert_array_equal(
+            values, [[100, 80.5, 20.25, 0, NAN, NAN],
+                     [NAN, NAN, 100, 80.5, 20.25, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the audio analysis functions on synthetic recordings.
+
+Compares the vectorized implementations in audio_analysis against simple
+reference implementations with Python loops, on sine wave and noise
+recordings of increasing length, and checks that they give the same results.
+
+Usage:
+    PYTHONPATH=. python3 tests/audio_analysis_benchmark.py
+"""
+
+import logging
+import numpy
+import unittest
+
+import acts.test_utils.audio_analysis_lib.audio_analysis as audio_analysis
+
+import benchmark_utils
+
+# The lengths in seconds of the synthetic recordings.
+RECORDING_LENGTHS_SECS = [0.25, 1, 4, 16]
+
+RATE = 48000
+FREQUENCY = 440
+
+
+def reference_peak_detection(array, window_size):
+    """Detects peaks in an array by checking every point's window."""
+    half_window_size = window_size // 2
+    length = len(array)
+    results = []
+    for mid in range(length):
+        if array[mid] == 0:
+            continue
+        left = max(0, mid - half_window_size)
+        right = min(length - 1, mid + half_window_size)
+        if all(array[index] < array[mid] for index in range(left, right + 1)
+               if index != mid):
+            results.append((mid, array[mid]))
+    return sorted(results, key=lambda x: x[1], reverse=True)
+
+
+def reference_anomaly_detection(signal, rate, freq, block_size,
+                                threshold):
+    """Detects anomaly by correlating each block at every golden shift."""
+    golden_y = audio_analysis._generate_golden_pattern(rate, freq, block_size)
+    results = []
+    for start in range(0, len(signal), int(block_size / 2)):
+        test_signal = signal[start:start + block_size]
+        correlation_indices = []
+        try:
+            for shift in range(len(golden_y) - len(test_signal) + 1):
+                correlation_indices.append(
+                    audio_analysis._get_correlation_index(
+                        golden_y[shift:shift + len(test_signal)],
+                        test_signal))
+        except audio_analysis.TestSignalNormTooSmallError:
+            results.append(start)
+            continue
+        if max(correlation_indices) < threshold:
+            results.append(start)
+    return [float(x) / rate for x in results]
+
+
+def generate_recording(length_secs, noise_amplitude):
+    """Generates a sine wave recording with noise and a dropout."""
+    samples = int(length_secs * RATE)
+    x = numpy.arange(samples) / float(RATE)
+    y = numpy.sin(FREQUENCY * 2.0 * numpy.pi * x)
+    y += numpy.random.standard_normal(samples) * noise_amplitude
+    dropout_start = samples // 3
+    y[dropout_start:dropout_start + RATE // 200] = 0
+    return y
+
+
+class AudioAnalysisBenchmark(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(0)
+
+    def testPeakDetection(self):
+        for length_secs in RECORDING_LENGTHS_SECS:
+            signal = generate_recording(length_secs, 0.3)
+            spectrum = numpy.abs(numpy.fft.rfft(signal))
+            expected, reference_secs = benchmark_utils.timed(
+                reference_peak_detection, spectrum, 100)
+            actual, vectorized_secs = benchmark_utils.timed(
+                audio_analysis.peak_detection, spectrum, 100)
+            logging.info('peak_detection %6.2fs: reference %.3fs, '
+                         'vectorized %.3fs', length_secs, reference_secs,
+                         vectorized_secs)
+            self.assertEqual(expected, actual)
+
+    def testAnomalyDetection(self):
+        for length_secs in RECORDING_LENGTHS_SECS:
+            for noise_amplitude in [0, 0.3]:
+                signal = generate_recording(length_secs, noise_amplitude)
+                expected, reference_secs = benchmark_utils.timed(
+                    reference_anomaly_detection, signal, RATE, FREQUENCY,
+                    audio_analysis.ANOMALY_DETECTION_BLOCK_SIZE,
+                    audio_analysis.PATTERN_MATCHING_THRESHOLD)
+                actual, vectorized_secs = benchmark_utils.timed(
+                    audio_analysis.anomaly_detection, signal, RATE,
+                    FREQUENCY)
+                logging.info('anomaly_detection %6.2fs noise %.1f: '
+                             'reference %.3fs, vectorized %.3fs',
+                             length_secs, noise_amplitude, reference_secs,
+                             vectorized_secs)
+                self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    benchmark_utils.main()
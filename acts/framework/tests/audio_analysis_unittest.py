@@ -158,6 +158,35 @@ class SpectralAnalysisTest(unittest.TestCase):
             results = audio_analysis.spectral_analysis([], 100)
 
 
+class AudioRawDataTest(unittest.TestCase):
+    def testReadFile(self):
+        """Memory-mapped samples are the same as samples read in memory."""
+        file_path = os.path.join(
+            os.path.dirname(__file__), 'test_data', '1k_2k.raw')
+        binary = open(file_path, 'rb').read()
+        expected = audio_data.AudioRawData(binary, 2, 'S32_LE')
+        data = audio_data.AudioRawData(None, 2, 'S32_LE')
+        data.read_file(file_path)
+        self.assertEqual(expected.channel_data.shape, data.channel_data.shape)
+        for channel in [0, 1]:
+            self.assertTrue(
+                numpy.array_equal(expected.channel_data[channel],
+                                  data.channel_data[channel]))
+
+    def testReadFileOffset(self):
+        """Reads frames starting from an offset."""
+        file_path = os.path.join(
+            os.path.dirname(__file__), 'test_data', '1k_2k.raw')
+        binary = open(file_path, 'rb').read()
+        expected = audio_data.AudioRawData(binary, 2, 'S32_LE')
+        data = audio_data.AudioRawData(None, 2, 'S32_LE')
+        data.read_file(file_path, offset=8 * 10, n_frames=100)
+        for channel in [0, 1]:
+            self.assertTrue(
+                numpy.array_equal(expected.channel_data[channel][10:110],
+                                  data.channel_data[channel]))
+
+
 class NormalizeTest(unittest.TestCase):
     def testNormalize(self):
         y = [1, 2, 3, 4, 5]
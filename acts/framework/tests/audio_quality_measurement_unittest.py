@@ -16,6 +16,7 @@
 
 import logging
 import math
+import multiprocessing
 import numpy
 import unittest
 
@@ -70,7 +71,9 @@ class ErrorTest(unittest.TestCase):
             self.assertTrue(abs(ret - error[i]) < 0.001)
 
 
-class QualityMeasurementTest(unittest.TestCase):
+class TestSignalMixin(object):
+    """Creates the test signal and its artifacts for quality measurement."""
+
     def setUp(self):
         """Creates a test signal of sine wave."""
         numpy.random.seed(0)
@@ -149,6 +152,8 @@ class QualityMeasurementTest(unittest.TestCase):
         self.volume_changing = [+1, -1, +1, -1]
         self.volume_changing_time = [0.3, 0.6, 1.4, 1.7]
 
+
+class QualityMeasurementTest(TestSignalMixin, unittest.TestCase):
     def testGoodSignal(self):
         """Sine wave signal with no noise or artifacts."""
         result = audio_quality_measurement.quality_measurement(self.y,
@@ -264,5 +269,84 @@ class QualityMeasurementTest(unittest.TestCase):
                 self.volume_changing[i] == result['volume_changes'][i][1])
 
 
+class StreamQualityMeasurementTest(TestSignalMixin, unittest.TestCase):
+    """Checks that block streaming gives the same result as the full signal."""
+
+    def check_same_result(self):
+        """Compares the results except the noise level, which is random."""
+        expected = audio_quality_measurement.quality_measurement(
+            self.y, self.rate, self.freq)
+        for stream_block_secs in [0.05, 0.3, 10]:
+            result = audio_quality_measurement.stream_quality_measurement(
+                numpy.array(self.y),
+                self.rate,
+                self.freq,
+                stream_block_secs=stream_block_secs)
+            self.assertEqual(expected['artifacts'], result['artifacts'])
+            self.assertEqual(expected['volume_changes'],
+                             result['volume_changes'])
+            self.assertAlmostEqual(expected['equivalent_noise_level'],
+                                   result['equivalent_noise_level'], 3)
+
+    def testGoodSignal(self):
+        self.check_same_result()
+
+    def testGoodSignalNoise(self):
+        self.add_noise()
+        self.check_same_result()
+
+    def testDelay(self):
+        self.generate_delay()
+        self.check_same_result()
+
+    def testArtifactsBeforePlayback(self):
+        self.generate_artifacts_before_playback()
+        self.check_same_result()
+
+    def testArtifactsAfterPlayback(self):
+        self.generate_artifacts_after_playback()
+        self.check_same_result()
+
+    def testBurstDuringPlayback(self):
+        self.generate_burst_during_playback()
+        self.check_same_result()
+
+    def testVolumeChanging(self):
+        self.generate_volume_changing()
+        self.check_same_result()
+
+    def testNormalizesBlocks(self):
+        """Raw samples are normalized block by block."""
+        self.generate_delay()
+        saturate_value = audio_data.get_maximum_value_from_sample_format(
+            'S16_LE')
+        raw = (numpy.array(self.y) * (saturate_value - 1)).astype('<i2')
+        expected = audio_quality_measurement.quality_measurement(
+            raw / float(saturate_value), self.rate, self.freq)
+        result = audio_quality_measurement.stream_quality_measurement(
+            raw,
+            self.rate,
+            self.freq,
+            stream_block_secs=0.3,
+            saturate_value=saturate_value)
+        self.assertEqual(expected['artifacts'], result['artifacts'])
+        self.assertEqual(expected['volume_changes'], result['volume_changes'])
+
+    def testPool(self):
+        """Blocks analyzed by a process pool are stitched back in order."""
+        self.generate_burst_during_playback()
+        expected = audio_quality_measurement.stream_quality_measurement(
+            numpy.array(self.y), self.rate, self.freq, stream_block_secs=0.05)
+        with multiprocessing.Pool(2) as pool:
+            result = audio_quality_measurement.stream_quality_measurement(
+                numpy.array(self.y),
+                self.rate,
+                self.freq,
+                stream_block_secs=0.05,
+                pool=pool)
+        self.assertEqual(expected['artifacts'], result['artifacts'])
+        self.assertEqual(expected['volume_changes'], result['volume_changes'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Helpers shared by the benchmarks in this directory.
+
+The benchmarks are unittest modules run as scripts, e.g.:
+    PYTHONPATH=. python3 tests/rtt_test_utils_benchmark.py
+"""
+
+import logging
+import time
+import unittest
+
+
+def timed(function, *args):
+    """Returns the result of a function call and its duration in seconds."""
+    start = time.time()
+    result = function(*args)
+    return result, time.time() - start
+
+
+def main():
+    """Runs the benchmarks of the calling module, logging their timings."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    unittest.main(module='__main__')
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from acts.controllers import access_point
+from acts.controllers.utils_lib.commands import batch
+from acts.controllers.utils_lib.ssh import channel
+from acts.libs.proc import job
+
+# An ip command which fails to delete the routes of wlan1 like ip does for a
+# route that does not exist, and those of wlan2 with another error.
+FAKE_IP = '''#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls"
+case "$*" in
+    *wlan1*) echo "RTNETLINK answers: No such process" >&2; exit 2;;
+    *wlan2*) echo "RTNETLINK answers: Operation not permitted" >&2; exit 2;;
+esac
+'''
+
+
+class AccessPointClearRoutesTest(unittest.TestCase):
+    """Tests for AccessPoint._clear_routes in a batch."""
+
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp()
+        ip_path = os.path.join(self.bin_dir, 'ip')
+        with open(ip_path, 'w') as f:
+            f.write(FAKE_IP)
+        os.chmod(ip_path, 0o755)
+        self.runner = channel.ChannelRunner(
+            ['env', 'PATH=%s:%s' % (self.bin_dir, os.environ['PATH']), 'sh'])
+        self.batch = batch.CommandBatch(self.runner)
+        self.ap = access_point.AccessPoint.__new__(access_point.AccessPoint)
+
+    def tearDown(self):
+        self.runner.close()
+        shutil.rmtree(self.bin_dir)
+
+    def read_calls(self):
+        with open(os.path.join(self.bin_dir, 'calls')) as f:
+            return f.read().splitlines()
+
+    def test_clear_routes(self):
+        routes = [('10.0.0.0/24', 'wlan0'), ('10.0.1.0/24', 'eth0'),
+                  ('default', 'wlan0')]
+        self.ap._clear_routes(self.batch, routes, 'wlan0')
+        self.batch.execute()
+        self.assertEqual(self.read_calls(), [
+            'route del 10.0.0.0/24 dev wlan0', 'route del default dev wlan0'
+        ])
+
+    def test_clear_routes_already_removed(self):
+        self.ap._clear_routes(self.batch, [('10.0.0.0/24', 'wlan1')], 'wlan1')
+        self.batch.add('echo done')
+        self.assertEqual(self.batch.execute()[-1].stdout, 'done')
+
+    def test_clear_routes_error(self):
+        self.ap._clear_routes(self.batch, [('10.0.0.0/24', 'wlan2')], 'wlan2')
+        with self.assertRaises(job.Error) as context:
+            self.batch.execute()
+        self.assertIn('Operation not permitted',
+                      context.exception.result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from acts import utils
+from acts.controllers.android_lib import logcat
+
+LOGCAT_LINES = (b'--------- beginning of main\n'
+                b'2018-03-01 12:34:56.789  1000  1234 I Tag: first\n'
+                b'2018-03-01 12:34:57.001  1000  1234 I Tag: second\n'
+                b'--------- beginning of system\n')
+
+
+class GetLastTimestampTest(unittest.TestCase):
+    """Tests logcat.get_last_timestamp."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, 'adblog.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_last_timestamp(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(LOGCAT_LINES)
+
+        self.assertEqual(
+            logcat.get_last_timestamp(self.file_path),
+            '2018-03-01 12:34:57.001')
+
+    def test_get_last_timestamp_reads_end_of_file(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(LOGCAT_LINES)
+            f.write(b'2018-03-01 12:35:00.000  1000  1234 I Tag: %s\n' %
+                    (b'x' * 100))
+
+        self.assertEqual(
+            logcat.get_last_timestamp(self.file_path, max_bytes=200),
+            '2018-03-01 12:35:00.000')
+        self.assertIsNone(
+            logcat.get_last_timestamp(self.file_path, max_bytes=50))
+
+    def test_get_last_timestamp_no_file(self):
+        self.assertIsNone(logcat.get_last_timestamp(self.file_path))
+
+
+class LogcatSupervisorTest(unittest.TestCase):
+    """Tests logcat.LogcatSupervisor with standing subprocesses."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, 'adblog.txt')
+        self.timestamps = []
+        self.supervisor = None
+
+    def tearDown(self):
+        if self.supervisor:
+            self.supervisor.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def create_supervisor(self, commands, min_restart_delay=0.01):
+        """Creates a supervisor running each command in turn.
+
+        An exception given instead of a command is raised when starting.
+        """
+        commands = list(commands)
+
+        def start_process(timestamp):
+            self.timestamps.append(timestamp)
+            command = commands.pop(0)
+            if isinstance(command, Exception):
+                raise command
+            return utils.start_standing_subprocess(command)
+
+        self.supervisor = logcat.LogcatSupervisor(
+            start_process,
+            self.file_path,
+            logging.getLogger(),
+            min_restart_delay=min_restart_delay,
+            max_restart_delay=0.04)
+        return self.supervisor
+
+    def wait_for(self, condition, timeout=5):
+        end_time = time.time() + timeout
+        while not condition():
+            if time.time() > end_time:
+                self.fail('Timed out.')
+            time.sleep(0.01)
+
+    def test_start_stop(self):
+        supervisor = self.create_supervisor(['sleep 100'])
+        supervisor.start('2018-03-01 12:34:56.789')
+
+        self.assertTrue(supervisor.is_running)
+        self.assertTrue(supervisor.is_supervising)
+        self.assertEqual(self.timestamps, ['2018-03-01 12:34:56.789'])
+
+        supervisor.stop()
+        self.assertFalse(supervisor.is_running)
+        self.assertFalse(supervisor.is_supervising)
+        self.assertIsNotNone(supervisor.process.poll())
+        self.assertEqual(supervisor.restart_count, 0)
+
+    def test_restart_from_last_timestamp(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(LOGCAT_LINES)
+        supervisor = self.create_supervisor(['exit 1', 'sleep 100'])
+        supervisor.start()
+
+        self.wait_for(lambda: supervisor.restart_count == 1)
+        self.assertEqual(self.timestamps, [None, '2018-03-01 12:34:57.001'])
+        self.assertTrue(supervisor.is_running)
+        self.assertTrue(supervisor.is_supervising)
+
+    def test_restart_delay_doubles(self):
+        supervisor = self.create_supervisor(['exit 1'] * 4 + ['sleep 100'])
+        start_time = time.time()
+        supervisor.start()
+
+        self.wait_for(lambda: supervisor.restart_count == 4)
+        # 0.01 + 0.02 + 0.04 + 0.04
+        self.assertGreaterEqual(time.time() - start_time, 0.11)
+        self.assertTrue(supervisor.is_supervising)
+
+    def test_restart_retries_after_start_error(self):
+        error = utils.ActsUtilsError('adb is gone.')
+        supervisor = self.create_supervisor(
+            ['exit 1', error, error, 'sleep 100'])
+        with self.assertLogs(level=logging.ERROR) as logs:
+            supervisor.start()
+            self.wait_for(lambda: supervisor.restart_count == 1)
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(len(self.timestamps), 4)
+        self.assertTrue(supervisor.is_running)
+        self.assertTrue(supervisor.is_supervising)
+
+        supervisor.stop()
+        self.assertFalse(supervisor.is_supervising)
+        self.assertIsNotNone(supervisor.process.poll())
+
+    def test_stop_after_start_errors(self):
+        supervisor = self.create_supervisor(
+            ['exit 1'] + [utils.ActsUtilsError('adb is gone.')] * 10)
+        with self.assertLogs(level=logging.ERROR):
+            supervisor.start()
+            self.wait_for(lambda: len(self.timestamps) == 3)
+
+        self.assertFalse(supervisor.is_running)
+        self.assertTrue(supervisor.is_supervising)
+        supervisor.stop()
+        self.assertFalse(supervisor.is_supervising)
+        self.assertEqual(supervisor.restart_count, 0)
+
+    def test_stop_while_waiting_to_restart(self):
+        supervisor = self.create_supervisor(
+            ['exit 1', 'sleep 100'], min_restart_delay=100)
+        supervisor.start()
+        self.wait_for(lambda: not supervisor.is_running)
+
+        supervisor.stop()
+        self.assertFalse(supervisor.is_supervising)
+        self.assertEqual(supervisor.restart_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import socket
+import struct
+import threading
+import time
+import unittest
+
+import mock
+
+from acts.controllers import packet_sender
+
+# An Ethernet frame from a locally administered address, with an EtherType
+# reserved for local experiments so that it is not mistaken for other
+# traffic.
+TEST_ETHER_TYPE = 0x88b5
+TEST_FRAME = (b'\xff\xff\xff\xff\xff\xff\x02\x00\x00\x00\x00\x01' +
+              struct.pack('!H', TEST_ETHER_TYPE) + b'packet_sender_test')
+
+
+def can_open_raw_socket():
+    try:
+        packet_sender.open_raw_socket('lo').close()
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+class SendStatsTest(unittest.TestCase):
+    def test_rate_and_jitter(self):
+        stats = packet_sender.SendStats()
+        for lateness in (0.001, 0.003, 0.002):
+            stats.add_burst(10, lateness)
+        stats.duration = 0.2
+
+        self.assertEqual(stats.packets_sent, 30)
+        self.assertEqual(stats.bursts, 3)
+        # Two intervals of 10 packets in 0.2s.
+        self.assertAlmostEqual(stats.rate, 100)
+        self.assertAlmostEqual(stats.jitter, 0.001)
+        self.assertEqual(stats.max_lateness, 0.003)
+
+    def test_no_packets(self):
+        stats = packet_sender.SendStats()
+        self.assertEqual(stats.rate, 0)
+        self.assertEqual(stats.jitter, 0)
+
+
+class SendPacedTest(unittest.TestCase):
+    def test_sends_ntimes(self):
+        sock = mock.Mock()
+        stats = packet_sender.send_paced(sock, TEST_FRAME, 0.001, ntimes=20)
+
+        self.assertEqual(sock.send.call_count, 20)
+        sock.send.assert_called_with(TEST_FRAME)
+        self.assertEqual(stats.packets_sent, 20)
+        self.assertEqual(stats.bursts, 20)
+        self.assertGreaterEqual(stats.duration, 0.019)
+
+    def test_sends_bursts(self):
+        sock = mock.Mock()
+        stats = packet_sender.send_paced(
+            sock, TEST_FRAME, 0.001, ntimes=25, burst=10)
+
+        self.assertEqual(sock.send.call_count, 25)
+        self.assertEqual(stats.bursts, 3)
+        self.assertGreaterEqual(stats.duration, 0.002)
+
+    def test_deadlines_do_not_drift(self):
+        sock = mock.Mock()
+        # Every send takes longer than the interval.
+        sock.send.side_effect = lambda frame: time.sleep(0.002)
+        start_time = time.time()
+        packet_sender.send_paced(sock, TEST_FRAME, 0.01, ntimes=10)
+        # Sleeping after each send would take 0.12s.
+        self.assertLess(time.time() - start_time, 0.11)
+
+    def test_stops_on_signal(self):
+        sock = mock.Mock()
+        stop_signal = threading.Event()
+        timer = threading.Timer(0.05, stop_signal.set)
+        timer.start()
+        stats = packet_sender.send_paced(
+            sock, TEST_FRAME, 0.001, stop_signal=stop_signal)
+        timer.join()
+
+        self.assertGreater(stats.packets_sent, 0)
+        self.assertEqual(sock.send.call_count, stats.packets_sent)
+
+    def test_stops_on_signal_between_bursts(self):
+        # A long interval should not delay stopping until the next burst.
+        sock = mock.Mock()
+        stop_signal = threading.Event()
+        timer = threading.Timer(0.05, stop_signal.set)
+        timer.start()
+        start_time = time.time()
+        stats = packet_sender.send_paced(
+            sock, TEST_FRAME, 10, stop_signal=stop_signal)
+        timer.join()
+
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(stats.packets_sent, 1)
+
+
+class PacketStreamTest(unittest.TestCase):
+    def test_serializes_packet(self):
+        packet = packet_sender.scapy.Ether(TEST_FRAME)
+        stream = packet_sender.PacketStream(packet, 100)
+
+        self.assertEqual(stream.frame, TEST_FRAME)
+        self.assertEqual(stream.interval, 0.01)
+        self.assertEqual(stream.name, packet.summary())
+
+    def test_invalid_rate(self):
+        with self.assertRaises(packet_sender.PacketSenderError):
+            packet_sender.PacketStream(TEST_FRAME, 0)
+
+
+class SendScheduleTest(unittest.TestCase):
+    def send_frames(self, streams, **kwargs):
+        """Returns the frames sent for streams and their stats."""
+        sock = mock.Mock()
+        stats = packet_sender.send_schedule(sock, streams, **kwargs)
+        frames = [call[0][0] for call in sock.send.call_args_list]
+        return frames, stats
+
+    def test_merges_streams(self):
+        streams = [
+            packet_sender.PacketStream(b'fast', 200, stop_time=0.05),
+            packet_sender.PacketStream(
+                b'slow', 100, start_time=0.0075, stop_time=0.05),
+        ]
+        frames, stats = self.send_frames(streams)
+
+        self.assertEqual(frames, [
+            b'fast', b'fast', b'slow', b'fast', b'fast', b'slow', b'fast',
+            b'fast', b'slow', b'fast', b'fast', b'slow', b'fast', b'fast',
+            b'slow'
+        ])
+        self.assertEqual([s.packets_sent for s in stats], [10, 5])
+        self.assertGreaterEqual(stats[0].duration, 0.044)
+
+    def test_stops_after_duration(self):
+        streams = [packet_sender.PacketStream(TEST_FRAME, 1000)]
+        start_time = time.time()
+        frames, stats = self.send_frames(streams, duration=0.0495)
+
+        self.assertEqual(len(frames), 50)
+        self.assertEqual(stats[0].packets_sent, 50)
+        self.assertGreaterEqual(time.time() - start_time, 0.049)
+
+    def test_same_seed_same_order(self):
+        streams = [
+            packet_sender.PacketStream(b'a', 1000, jitter=0.005),
+            packet_sender.PacketStream(b'b', 1000, jitter=0.005),
+        ]
+        frames, _ = self.send_frames(streams, duration=0.02, seed=1)
+        same_frames, _ = self.send_frames(streams, duration=0.02, seed=1)
+        other_frames, _ = self.send_frames(streams, duration=0.02, seed=2)
+
+        self.assertEqual(frames, same_frames)
+        self.assertNotEqual(frames, other_frames)
+
+    def test_stops_on_signal(self):
+        # A slow stream should not delay stopping until its next packet.
+        streams = [packet_sender.PacketStream(TEST_FRAME, 0.1)]
+        stop_signal = threading.Event()
+        timer = threading.Timer(0.05, stop_signal.set)
+        timer.start()
+        start_time = time.time()
+        frames, stats = self.send_frames(streams, stop_signal=stop_signal)
+        timer.join()
+
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(stats[0].packets_sent, 1)
+
+
+@unittest.skipUnless(can_open_raw_socket(),
+                     'Needs CAP_NET_RAW to open a packet socket')
+class PacketSenderLoopbackTest(unittest.TestCase):
+    """Sends frames over the loopback interface and counts them."""
+
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_PACKET, socket.SOCK_RAW,
+                                      socket.htons(TEST_ETHER_TYPE))
+        self.receiver.bind(('lo', TEST_ETHER_TYPE))
+        self.receiver.settimeout(0.1)
+        self.sender = packet_sender.PacketSender('lo')
+
+    def tearDown(self):
+        self.sender.stop_sending(ignore_status=True)
+        self.sender.close()
+        self.receiver.close()
+
+    def count_received(self):
+        received = 0
+        try:
+            while True:
+                if self.receiver.recv(2048) == TEST_FRAME:
+                    received += 1
+        except socket.timeout:
+            return received
+
+    def test_send_ntimes(self):
+        stats = self.sender.send_ntimes(TEST_FRAME, 100, 0.0001, burst=5)
+
+        self.assertEqual(stats.packets_sent, 100)
+        self.assertEqual(self.count_received(), 100)
+
+    def test_start_and_stop_sending(self):
+        self.sender.start_sending(TEST_FRAME, 0.001)
+        time.sleep(0.2)
+        stats = self.sender.stop_sending()
+
+        self.assertGreater(stats.packets_sent, 0)
+        self.assertEqual(self.count_received(), stats.packets_sent)
+
+    def test_start_and_stop_sending_streams(self):
+        streams = [
+            packet_sender.PacketStream(TEST_FRAME, 200),
+            packet_sender.PacketStream(TEST_FRAME, 100, jitter=0.001),
+        ]
+        self.sender.start_sending_streams(streams, seed=0)
+        time.sleep(0.2)
+        stats = self.sender.stop_sending()
+
+        self.assertEqual(len(stats), 2)
+        self.assertGreater(stats[1].packets_sent, 0)
+        self.assertGreater(stats[0].packets_sent, stats[1].packets_sent)
+        self.assertEqual(self.count_received(),
+                         stats[0].packets_sent + stats[1].packets_sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
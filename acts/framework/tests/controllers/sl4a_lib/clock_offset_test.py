@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import unittest
+
+from acts.controllers.sl4a_lib import clock_offset
+
+HOST_START_TIME = 1500000000.0
+
+
+class FakeClocks(object):
+    """A host clock and a drifting device clock read over an RPC.
+
+    Every read of the host clock advances it by the given round trip times,
+    and the device clock is read halfway through.
+    """
+
+    def __init__(self, offset, drift, round_trip_times):
+        self.host_time = HOST_START_TIME
+        self.offset = offset
+        self.drift = drift
+        self.round_trip_times = list(round_trip_times)
+        self._half_round_trip = 0
+
+    def get_device_time(self, host_time):
+        return (host_time + self.offset +
+                self.drift * (host_time - HOST_START_TIME))
+
+    def read_host_time(self):
+        self.host_time += self._half_round_trip
+        return self.host_time
+
+    def read_device_time(self):
+        self._half_round_trip = self.round_trip_times.pop(0) / 2
+        self.host_time += self._half_round_trip
+        return self.get_device_time(self.host_time)
+
+    def wait(self, duration):
+        self.host_time += duration
+        self._half_round_trip = 0
+
+
+class ClockOffsetTrackerTest(unittest.TestCase):
+    """Tests the clock_offset.ClockOffsetTracker class."""
+
+    def create_tracker(self, clocks, round_trips=3):
+        return clock_offset.ClockOffsetTracker(
+            clocks.read_device_time,
+            host_clock=clocks.read_host_time,
+            round_trips=round_trips)
+
+    def test_sync_keeps_shortest_round_trip(self):
+        clocks = FakeClocks(-1000, 0, [0.04, 0.002, 0.01])
+        tracker = self.create_tracker(clocks)
+
+        sample = tracker.sync()
+
+        self.assertEqual(len(tracker.samples), 1)
+        # Epoch times are only precise to about 1e-7s.
+        self.assertAlmostEqual(sample.round_trip_time, 0.002, places=5)
+        self.assertAlmostEqual(tracker.offset, -1000, places=5)
+        self.assertAlmostEqual(tracker.uncertainty, 0.001, places=5)
+        self.assertEqual(tracker.drift, 0)
+
+    def test_fits_drift(self):
+        drift = 5e-5
+        clocks = FakeClocks(-1000, drift, [0.001] * 30)
+        tracker = self.create_tracker(clocks)
+        for _ in range(10):
+            tracker.sync()
+            clocks.wait(60)
+
+        self.assertAlmostEqual(tracker.drift, drift, places=9)
+        host_time = clocks.host_time + 300
+        device_time = clocks.get_device_time(host_time)
+        self.assertAlmostEqual(
+            tracker.to_device_time(host_time), device_time, places=5)
+        self.assertAlmostEqual(
+            tracker.to_host_time(device_time), host_time, places=5)
+
+    def test_sync_if_older(self):
+        clocks = FakeClocks(0, 0, [0.001] * 6)
+        tracker = self.create_tracker(clocks)
+
+        tracker.sync_if_older(10)
+        clocks.wait(5)
+        tracker.sync_if_older(10)
+        self.assertEqual(len(tracker.samples), 1)
+
+        clocks.wait(10)
+        tracker.sync_if_older(10)
+        self.assertEqual(len(tracker.samples), 2)
+
+    def test_keeps_max_syncs(self):
+        clocks = FakeClocks(0, 0, [0.001] * 5)
+        tracker = clock_offset.ClockOffsetTracker(
+            clocks.read_device_time,
+            host_clock=clocks.read_host_time,
+            round_trips=1,
+            max_syncs=3)
+        for _ in range(5):
+            tracker.sync()
+
+        self.assertEqual(len(tracker.samples), 3)
+
+    def test_convert_before_sync(self):
+        tracker = clock_offset.ClockOffsetTracker(lambda: 0)
+
+        with self.assertRaises(clock_offset.ClockOffsetError):
+            tracker.to_device_time(HOST_START_TIME)
+        self.assertIsNone(tracker.uncertainty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import queue
+import threading
+import time
+import unittest
+
+import mock
+
+from acts.controllers.sl4a_lib import event_dispatcher
+
+# Time the fake client blocks in eventWait before returning nothing.
+EVENT_WAIT_TIME = 0.05
+
+
+class FakeRpcClient(object):
+    """An RpcClient returning the events posted to it, like SL4A would."""
+
+    def __init__(self):
+        self.uid = 1
+        self.is_alive = True
+        self._events = queue.Queue()
+
+    def post_event(self, name, event_time=0):
+        self._events.put({'name': name, 'time': event_time, 'data': {}})
+
+    def post_device_event(self, name):
+        """Posts an event timestamped with the current time, as SL4A does."""
+        self.post_event(name, time.time() * 1000)
+
+    def eventWait(self, timeout_ms, timeout=None):
+        try:
+            return self._events.get(timeout=EVENT_WAIT_TIME)
+        except queue.Empty:
+            return None
+
+
+class EventDispatcherTest(unittest.TestCase):
+    """Tests the event_dispatcher.EventDispatcher class."""
+
+    def setUp(self):
+        self.rpc_client = FakeRpcClient()
+        self.dispatcher = event_dispatcher.EventDispatcher(
+            'serial', self.rpc_client)
+        self.dispatcher.start()
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def post_event_later(self, delay, name, event_time=0):
+        timer = threading.Timer(delay, self.rpc_client.post_event,
+                                (name, event_time))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_pop_events_wakes_up_on_event(self):
+        """Tests that pop_events returns as soon as a matching event comes."""
+        self.post_event_later(0.1, 'Other')
+        self.post_event_later(0.2, 'WifiAwareOnMatch')
+        start_time = time.time()
+
+        events = self.dispatcher.pop_events('WifiAware.*', 10)
+
+        self.assertEqual([e['name'] for e in events], ['WifiAwareOnMatch'])
+        self.assertLess(time.time() - start_time, 1)
+
+    def test_pop_events_pops_one_event_per_name(self):
+        for name, event_time in (('A', 3), ('B', 2), ('A', 1), ('C', 0)):
+            self.rpc_client.post_event(name, event_time)
+        # Waits for the dispatcher to receive the events.
+        self.dispatcher.drain_events('D', 0.2)
+
+        events = self.dispatcher.pop_events('[AB]', 0)
+
+        self.assertEqual([(e['name'], e['time']) for e in events],
+                         [('B', 2), ('A', 3)])
+
+    def test_pop_events_timeout(self):
+        with self.assertRaises(queue.Empty):
+            self.dispatcher.pop_events('.*', 0.1)
+
+    def test_pop_events_does_not_busy_wait(self):
+        """Benchmarks the CPU time used while waiting for events."""
+        # Events of other names are scanned every time the queues are polled.
+        for i in range(50):
+            self.rpc_client.post_event('Other%d' % i)
+        self.dispatcher.drain_events('NoMatch', 0.2)
+        self.dispatcher._match_and_pop = mock.Mock(
+            wraps=self.dispatcher._match_and_pop)
+        cpu_start_time = time.process_time()
+        start_time = time.time()
+
+        with self.assertRaises(queue.Empty):
+            self.dispatcher.pop_events('WifiAware.*', 1, freq=0)
+
+        self.assertGreaterEqual(time.time() - start_time, 1)
+        # Polling the queues uses a whole CPU for the timeout.
+        self.assertLess(time.process_time() - cpu_start_time, 0.2)
+        self.assertLessEqual(self.dispatcher._match_and_pop.call_count, 2)
+
+    def test_drain_events(self):
+        """Tests that drain_events waits until no more events come."""
+        for name, event_time in (('A', 3), ('B', 2), ('A', 1)):
+            self.rpc_client.post_event(name, event_time)
+        self.post_event_later(0.2, 'C', 4)
+        self.post_event_later(0.4, 'A', 5)
+
+        events = self.dispatcher.drain_events('.*', 0.3)
+
+        self.assertEqual([(e['name'], e['time']) for e in events],
+                         [('A', 1), ('B', 2), ('A', 3), ('C', 4), ('A', 5)])
+        self.assertEqual(self.dispatcher.drain_events('.*', 0), [])
+
+    def test_drain_events_no_events(self):
+        cpu_start_time = time.process_time()
+
+        self.assertEqual(self.dispatcher.drain_events('.*', 0.5), [])
+
+        self.assertLess(time.process_time() - cpu_start_time, 0.2)
+
+    def test_drain_events_only_matching(self):
+        self.rpc_client.post_event('A')
+        self.rpc_client.post_event('B')
+
+        events = self.dispatcher.drain_events('A', 0.2)
+
+        self.assertEqual([e['name'] for e in events], ['A'])
+        self.assertEqual(len(self.dispatcher.pop_all('B')), 1)
+
+    def test_records_host_time_and_stats(self):
+        for _ in range(3):
+            self.rpc_client.post_device_event('A')
+        self.rpc_client.post_device_event('B')
+
+        events = self.dispatcher.drain_events('A', 0.2)
+
+        for event in events:
+            self.assertGreaterEqual(event['host_time'], event['time'])
+        stats = self.dispatcher.get_event_stats('A')
+        self.assertEqual(stats.latency.count, 3)
+        self.assertGreaterEqual(stats.latency.min, 0)
+        self.assertLess(stats.latency.max, 1000)
+        self.assertEqual(stats.inter_arrival.count, 2)
+        self.assertEqual(
+            sorted(self.dispatcher.get_all_event_stats().keys()), ['A', 'B'])
+        self.assertIsNone(self.dispatcher.get_event_stats('C'))
+
+        self.dispatcher.clear_event_stats()
+        self.assertEqual(self.dispatcher.get_all_event_stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import unittest
+
+from acts.controllers.sl4a_lib import event_stats
+
+
+class HistogramTest(unittest.TestCase):
+    """Tests the event_stats.Histogram class."""
+
+    def test_add(self):
+        histogram = event_stats.Histogram(0, 10, 3)
+        for value in (-5, 0, 9, 15, 29, 30, 100):
+            histogram.add(value)
+
+        self.assertEqual(histogram.buckets, [2, 1, 1])
+        self.assertEqual(histogram.underflow, 1)
+        self.assertEqual(histogram.overflow, 2)
+        self.assertEqual(histogram.count, 7)
+        self.assertEqual(histogram.min, -5)
+        self.assertEqual(histogram.max, 100)
+        self.assertAlmostEqual(histogram.mean, 178 / 7)
+
+    def test_get_percentile(self):
+        histogram = event_stats.Histogram(0, 10, 10)
+        for value in range(100):
+            histogram.add(value)
+
+        self.assertEqual(histogram.get_percentile(10), 10)
+        self.assertEqual(histogram.get_percentile(15), 20)
+        # Bounded by the largest value.
+        self.assertEqual(histogram.get_percentile(100), 99)
+        self.assertEqual(histogram.get_deciles(),
+                         [10, 20, 30, 40, 50, 60, 70, 80, 90])
+
+    def test_get_percentile_out_of_buckets(self):
+        histogram = event_stats.Histogram(0, 10, 1)
+        for value in (-3, -2, 5, 20, 40):
+            histogram.add(value)
+
+        self.assertEqual(histogram.get_percentile(40), -3)
+        self.assertEqual(histogram.get_percentile(60), 10)
+        self.assertEqual(histogram.get_percentile(80), 40)
+
+    def test_empty(self):
+        histogram = event_stats.Histogram(0, 10, 10)
+
+        self.assertIsNone(histogram.mean)
+        self.assertIsNone(histogram.get_percentile(50))
+        self.assertEqual(repr(histogram), 'count=0')
+
+
+class EventStatsTest(unittest.TestCase):
+    """Tests the event_stats.EventStats class."""
+
+    def test_add(self):
+        stats = event_stats.EventStats()
+        for device_time, host_time in ((1000, 1003), (1100, 1102),
+                                       (1300, 1305)):
+            stats.add({'time': device_time, 'host_time': host_time})
+
+        self.assertEqual(stats.latency.count, 3)
+        self.assertEqual(stats.latency.min, 2)
+        self.assertEqual(stats.latency.max, 5)
+        self.assertEqual(stats.inter_arrival.count, 2)
+        self.assertEqual(stats.inter_arrival.min, 100)
+        self.assertEqual(stats.inter_arrival.max, 200)
+
+    def test_add_without_device_time(self):
+        stats = event_stats.EventStats()
+        stats.add({'host_time': 1000})
+
+        self.assertEqual(stats.latency.count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,7 @@ import unittest
 
 import mock
 
+from acts import call_stats
 from acts.controllers.sl4a_lib import rpc_client
 
 
@@ -66,6 +67,47 @@ class RpcClientTest(unittest.TestCase):
         for connection in working_connections + free_connections:
             self.assertTrue(connection.close.called)
 
+    def test_open_connections(self):
+        """Tests rpc_client.RpcClient.open_connections().
+
+        Tests that connections are opened up to the requested number of free
+        connections, without going over max_connections.
+        """
+        session = mock.Mock()
+
+        client = rpc_client.RpcClient(session.uid, session.adb.serial,
+                                      lambda _: mock.Mock(),
+                                      lambda _: mock.Mock(),
+                                      max_connections=4)
+        client._working_connections = [mock.Mock()]
+
+        self.assertEqual(client.open_connections(2), 1)
+        self.assertEqual(len(client._free_connections), 2)
+        self.assertEqual(client.open_connections(10), 1)
+        self.assertEqual(len(client._free_connections), 3)
+        self.assertEqual(client.open_connections(10), 0)
+
+    def test_open_connections_logs_failures(self):
+        """Tests rpc_client.RpcClient.open_connections().
+
+        Tests that a connection which fails to open is logged and skipped.
+        """
+        session = mock.Mock()
+        connections = [mock.Mock()]
+
+        def create_connection(_):
+            if connections:
+                return connections.pop()
+            raise rpc_client.Sl4aConnectionError('No more connections.')
+
+        client = rpc_client.RpcClient(session.uid, session.adb.serial,
+                                      lambda _: mock.Mock(),
+                                      create_connection)
+        client._log = mock.Mock()
+
+        self.assertEqual(client.open_connections(3), 0)
+        self.assertTrue(client._log.warning.called)
+
     def test_get_free_connection_get_available_client(self):
         """Tests rpc_client.RpcClient._get_free_connection().
 
@@ -182,6 +224,25 @@ class RpcClientTest(unittest.TestCase):
         self.assertTrue(connection in client._free_connections)
         self.assertFalse(connection in client._working_connections)
 
+    def test_rpc_adds_call_stats(self):
+        """Tests rpc_client.RpcClient.rpc().
+
+        Tests that RPCs are added to the call stats, except eventWait.
+        """
+        connection = mock.Mock()
+        connection.get_new_ticket.return_value = 1
+        connection.get_response.return_value = (
+            b'{"id": 1, "result": true, "error": null}')
+        client = rpc_client.RpcClient(1, 'serial', lambda _: mock.Mock(),
+                                      lambda _: connection)
+        totals = call_stats.get_totals()
+
+        self.assertTrue(client.rpc('wifiGetConnectionInfo'))
+        client.rpc('eventWait')
+
+        calls = call_stats.get_calls_since(totals)
+        self.assertEqual(calls[call_stats.RPC]['count'], 1)
+
     def test_future(self):
         """Tests rpc_client.RpcClient.future.
 
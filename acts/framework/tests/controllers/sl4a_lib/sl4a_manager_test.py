@@ -18,6 +18,7 @@ import unittest
 
 from acts.controllers.sl4a_lib import sl4a_manager
 from acts.controllers.sl4a_lib import rpc_client
+from acts.libs.proc import job
 
 
 class Sl4aManagerFactoryTest(unittest.TestCase):
@@ -240,6 +241,108 @@ class Sl4aManagerTest(unittest.TestCase):
         manager = sl4a_manager.create_sl4a_manager(adb)
         self.assertEqual(manager._get_all_ports_command(), command)
 
+    def test_start_sl4a_server_waits_for_port_on_device(self):
+        """Tests sl4a_manager.Sl4aManager.start_sl4a_server().
+
+        Tests that the new port is found with a single adb call waiting on
+        the device, which is told the ports already known.
+        """
+        adb = mock.Mock()
+        adb.is_root = lambda: True
+        adb.shell = mock.Mock(side_effect=['', 'port 67890'])
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        manager._sl4a_ports = {'12345'}
+        self.assertEqual(manager.start_sl4a_server(0), 67890)
+        self.assertEqual(adb.shell.call_count, 2)
+        self.assertIn('" 12345 "', adb.shell.call_args[0][0])
+        self.assertIn('67890', manager._sl4a_ports)
+        self.assertIn('find_port', manager.startup_timings)
+
+    def test_start_sl4a_server_wait_on_device_times_out(self):
+        """Tests sl4a_manager.Sl4aManager.start_sl4a_server().
+
+        Tests that an error is raised without polling if the device reports
+        that no new port opened in time.
+        """
+        adb = mock.Mock()
+        adb.is_root = lambda: True
+        adb.shell = mock.Mock(side_effect=['', 'timeout'])
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        manager._get_open_listening_port = mock.Mock()
+        with self.assertRaises(rpc_client.Sl4aConnectionError):
+            manager.start_sl4a_server(0)
+        self.assertFalse(manager._get_open_listening_port.called)
+
+    @mock.patch('time.sleep', return_value=None)
+    def test_start_sl4a_server_wait_on_device_adb_times_out(self, _):
+        """Tests sl4a_manager.Sl4aManager.start_sl4a_server().
+
+        Tests that the ports are polled from the host if adb times out while
+        the device waits, and that adb is given time for shells which only
+        sleep whole seconds.
+        """
+        adb = mock.Mock()
+        adb.is_root = lambda: True
+        adb.shell = mock.Mock(
+            side_effect=['', job.TimeoutError(job.Result())])
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        manager._get_open_listening_port = mock.Mock(
+            side_effect=[None, 67890])
+        self.assertEqual(manager.start_sl4a_server(0), 67890)
+        attempts = int(sl4a_manager.MAX_WAIT_ON_SERVER_SECONDS /
+                       sl4a_manager.ATTEMPT_INTERVAL)
+        self.assertGreater(adb.shell.call_args[1]['timeout'], attempts)
+
+    def test_get_all_ports_command_checks_root_once(self):
+        """Tests sl4a_manager.Sl4aManager._get_all_ports_command().
+
+        Tests that the root state is only checked for the first command.
+        """
+        adb = mock.Mock()
+        adb.is_root = mock.Mock(return_value=True)
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        self.assertEqual(manager._get_all_ports_command(),
+                         manager._get_all_ports_command())
+        self.assertEqual(adb.is_root.call_count, 1)
+
+    def test_get_adb_version_is_cached(self):
+        """Tests sl4a_manager.Sl4aManager.get_adb_version().
+
+        Tests that ADB is only asked for its version once.
+        """
+        adb = mock.Mock()
+        adb.get_version_number = mock.Mock(return_value=39)
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        self.assertEqual(manager.get_adb_version(), 39)
+        self.assertEqual(manager.get_adb_version(), 39)
+        self.assertEqual(adb.get_version_number.call_count, 1)
+
+    @mock.patch('acts.controllers.sl4a_lib.sl4a_session.Sl4aSession')
+    def test_create_session_preopens_connections(self, session_class):
+        """Tests sl4a_manager.Sl4aManager.create_session().
+
+        Tests that the session opens the requested connections, and that the
+        timings of the startup phases are kept.
+        """
+        adb = mock.Mock()
+        session_class.return_value.connection_timings = {'handshake': 0.1}
+
+        manager = sl4a_manager.create_sl4a_manager(adb)
+        manager._started = True
+        session = manager.create_session(preopen_connections=4)
+
+        session.rpc_client.open_connections.assert_called_once_with(4)
+        self.assertEqual(session_class.call_args[1]['get_adb_version_func'],
+                         manager.get_adb_version)
+        self.assertEqual(
+            set(manager.startup_timings),
+            {'start_service', 'handshake', 'preopen_connections'})
+
     def test_get_open_listening_port_no_port_found(self):
         """Tests sl4a_manager.Sl4aManager._get_open_listening_port().
 
@@ -17,6 +17,9 @@
 import sys
 import unittest
 
+from tests.controllers.sl4a_lib import clock_offset_test
+from tests.controllers.sl4a_lib import event_dispatcher_test
+from tests.controllers.sl4a_lib import event_stats_test
 from tests.controllers.sl4a_lib import rpc_client_test
 from tests.controllers.sl4a_lib import rpc_connection_test
 from tests.controllers.sl4a_lib import sl4a_manager_test
@@ -25,6 +28,10 @@ from tests.controllers.sl4a_lib import sl4a_session_test
 
 def compile_suite():
     test_classes_to_run = [
+        clock_offset_test.ClockOffsetTrackerTest,
+        event_dispatcher_test.EventDispatcherTest,
+        event_stats_test.HistogramTest,
+        event_stats_test.EventStatsTest,
         rpc_client_test.RpcClientTest,
         rpc_connection_test.RpcConnectionTest,
         sl4a_manager_test.Sl4aManagerFactoryTest,
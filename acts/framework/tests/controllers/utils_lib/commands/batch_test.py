@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import mock
+import unittest
+
+from acts.controllers.utils_lib.commands import batch
+from acts.controllers.utils_lib.commands import ip
+from acts.controllers.utils_lib.ssh import channel
+from acts.controllers.utils_lib.ssh import connection
+from acts.controllers.utils_lib.ssh import settings
+from acts.libs.proc import job
+
+
+class CommandBatchTest(unittest.TestCase):
+    """Tests for acts.controllers.utils_lib.commands.batch.CommandBatch."""
+
+    def setUp(self):
+        self.runner = channel.ChannelRunner(['sh'])
+        self.batch = batch.CommandBatch(self.runner)
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_execute_returns_result_per_step(self):
+        self.batch.add('echo out; echo err >&2')
+        self.batch.add('printf "{braces}\\n\\n"')
+        self.batch.add('exit 2', ignore_status=True)
+        results = self.batch.execute()
+        self.assertEqual(
+            [(r.stdout, r.stderr, r.exit_status) for r in results],
+            [('out', 'err', 0), ('{braces}', '', 0), ('', '', 2)])
+        self.assertEqual(results[1]._raw_stdout, b'{braces}\n\n')
+        self.assertEqual(results[2].command, 'exit 2')
+
+    def test_steps_run_in_separate_subshells(self):
+        self.batch.add('cd /; FOO=bar')
+        self.batch.add('echo "$FOO"; pwd')
+        self.assertNotEqual(self.batch.execute()[1].stdout, '/')
+
+    def test_execute_stops_at_failed_step(self):
+        calls = []
+        self.batch.add('echo first', on_result=calls.append)
+        self.batch.add('echo failed; exit 1', on_result=calls.append)
+        self.batch.add('echo never', on_result=calls.append)
+        with self.assertRaises(job.Error) as context:
+            self.batch.execute()
+        self.assertEqual(context.exception.result.stdout, 'failed')
+        self.assertEqual([result.stdout for result in calls],
+                         ['first', 'failed'])
+
+    def test_on_result_error_stops_execute(self):
+        def check(result):
+            raise ValueError(result.stdout)
+
+        self.batch.add('echo checked', on_result=check)
+        with self.assertRaisesRegex(ValueError, 'checked'):
+            self.batch.execute()
+
+    def test_runner_interface(self):
+        ip_cmd = ip.LinuxIpCommand(self.batch)
+        ip_cmd.flush_ipv4_addresses('wlan0')
+        ip_cmd.remove_ipv4_address('wlan0', '192.168.1.1/24',
+                                   ignore_status=True)
+        self.assertEqual(self.batch.commands, [
+            'ip -4 addr flush dev wlan0',
+            'ip addr del 192.168.1.1/24 dev wlan0'
+        ])
+
+    def test_dry_run_script(self):
+        self.batch.add('echo one')
+        self.batch.add('echo two', ignore_status=True)
+        script = self.batch.script()
+        self.assertIn('\necho one\n', script)
+        self.assertIn('\necho two\n', script)
+        self.assertEqual(script.count('exit 0'), 1)
+
+    def test_execute_empty_batch(self):
+        self.assertEqual(self.batch.execute(), [])
+
+    def create_local_ssh_connection(self):
+        """Creates an SshConnection running its commands in a local shell.
+
+        Only the ssh command is replaced, the remote command is formatted by
+        SshFormatter as usual.
+        """
+        ssh = connection.SshConnection(settings.SshSettings('host', 'user'))
+        ssh.setup_master_ssh = mock.Mock()
+        ssh._formatter.format_ssh_command = (
+            lambda command, *_: ['sh', '-c', command])
+        return ssh
+
+    def test_script_over_ssh_connection(self):
+        ssh = self.create_local_ssh_connection()
+        for steps in (['echo one'], ['echo one', 'exit 3']):
+            ssh_batch = batch.CommandBatch(ssh)
+            for step in steps:
+                ssh_batch.add(step)
+            result = ssh.run(ssh_batch.script(), ignore_status=True)
+            self.assertEqual(result.exit_status, 0)
+            self.assertEqual(result.stderr, '')
+
+    def test_execute_over_ssh_connection(self):
+        ssh_batch = batch.CommandBatch(self.create_local_ssh_connection())
+        ssh_batch.add('echo one')
+        ssh_batch.add('echo two >&2; exit 3', ignore_status=True)
+        results = ssh_batch.execute()
+        self.assertEqual(
+            [(r.stdout, r.stderr, r.exit_status) for r in results],
+            [('one', '', 0), ('', 'two', 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
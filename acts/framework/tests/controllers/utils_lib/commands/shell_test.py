@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from acts.controllers.utils_lib.commands import shell
+from acts.controllers.utils_lib.ssh import channel
+
+LOG_FILE = 'daemon.log'
+SUCCESS = 'Setup of interface done'
+FAILURE = 'Interface [a-z0-9]* failed'
+
+
+class FindLogMatchTest(unittest.TestCase):
+    """Tests for acts.controllers.utils_lib.commands.shell.find_log_match."""
+
+    def test_first_matching_pattern(self):
+        self.assertEqual(
+            shell.find_log_match([FAILURE, 'wlan0'], 'Interface wlan0 failed'),
+            (FAILURE, 'Interface wlan0 failed'))
+
+    def test_no_match(self):
+        self.assertIsNone(shell.find_log_match([FAILURE, SUCCESS], ''))
+        self.assertIsNone(
+            shell.find_log_match([FAILURE, SUCCESS], 'stray output'))
+
+
+class ShellCommandWaitForLogTest(unittest.TestCase):
+    """Tests for acts.controllers.utils_lib.commands.shell.wait_for_log."""
+
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.runner = channel.ChannelRunner(['sh'])
+        self.shell = shell.ShellCommand(self.runner, self.working_dir)
+
+    def tearDown(self):
+        self.runner.close()
+        shutil.rmtree(self.working_dir)
+
+    def start_daemon(self, command):
+        """Starts a background job writing to the log file."""
+        return int(
+            self.runner.run_async('cd %s; (%s) >> %s' %
+                                  (self.working_dir, command, LOG_FILE))
+            .stdout)
+
+    def test_match_in_existing_lines(self):
+        with open(os.path.join(self.working_dir, LOG_FILE), 'w') as log:
+            log.write('starting\nInterface wlan0 failed\n%s\n' % SUCCESS)
+        self.assertEqual(
+            self.shell.wait_for_log(LOG_FILE, [SUCCESS, FAILURE], timeout=5),
+            (FAILURE, 'Interface wlan0 failed'))
+
+    def test_match_as_lines_are_written(self):
+        pid = self.start_daemon('sleep 0.5; echo "%s"; sleep 2' % SUCCESS)
+        start_time = time.time()
+        match = self.shell.wait_for_log(
+            LOG_FILE, [FAILURE, SUCCESS], timeout=10, pid=pid)
+        self.assertEqual(match, (SUCCESS, SUCCESS))
+        self.assertLess(time.time() - start_time, 1.5)
+
+    def test_timeout(self):
+        start_time = time.time()
+        self.assertIsNone(
+            self.shell.wait_for_log(LOG_FILE, [SUCCESS], timeout=0.5))
+        self.assertLess(time.time() - start_time, 5)
+
+    def test_program_exit_ends_wait(self):
+        pid = self.start_daemon('echo starting; sleep 0.2')
+        start_time = time.time()
+        self.assertIsNone(
+            self.shell.wait_for_log(LOG_FILE, [SUCCESS], timeout=30, pid=pid))
+        self.assertLess(time.time() - start_time, 10)
+
+
+class ShellCommandWaitForLogPollTest(ShellCommandWaitForLogTest):
+    """Runs the wait_for_log tests on a target without GNU timeout."""
+
+    def setUp(self):
+        super(ShellCommandWaitForLogPollTest, self).setUp()
+        bin_dir = os.path.join(self.working_dir, 'bin')
+        os.mkdir(bin_dir)
+        timeout_path = os.path.join(bin_dir, 'timeout')
+        with open(timeout_path, 'w') as f:
+            f.write('#!/bin/sh\nexit 127\n')
+        os.chmod(timeout_path, 0o755)
+        # Each command runs in a subshell, so the PATH is set for the shell
+        # of the runner.
+        self.runner.close()
+        self.runner = channel.ChannelRunner(
+            ['env', 'PATH=%s:%s' % (bin_dir, os.environ['PATH']), 'sh'])
+        self.shell = shell.ShellCommand(self.runner, self.working_dir)
+
+    def test_uses_fallback(self):
+        self.assertNotEqual(self.runner.run('timeout 1 true',
+                                            ignore_status=True).exit_status, 0)
+
+    def test_match_as_lines_are_written(self):
+        pid = self.start_daemon('sleep 0.5; echo "%s"; sleep 5' % SUCCESS)
+        start_time = time.time()
+        match = self.shell.wait_for_log(
+            LOG_FILE, [FAILURE, SUCCESS], timeout=10, pid=pid)
+        self.assertEqual(match, (SUCCESS, SUCCESS))
+        self.assertLess(time.time() - start_time, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from acts.controllers.utils_lib.commands import shell
+from acts.controllers.utils_lib.ssh import channel
+from acts.libs.proc import job
+
+# A local shell stands in for the remote shell started over ssh.
+LOCAL_SHELL = ['sh']
+
+
+class ShellChannelTest(unittest.TestCase):
+    """Tests for acts.controllers.utils_lib.ssh.channel.ShellChannel."""
+
+    def setUp(self):
+        self.channel = channel.ShellChannel(LOCAL_SHELL)
+
+    def tearDown(self):
+        self.channel.close()
+
+    def test_run_returns_output_and_status(self):
+        result = self.channel.run('echo out; echo err >&2; exit 3')
+        self.assertEqual(result.stdout, 'out')
+        self.assertEqual(result.stderr, 'err')
+        self.assertEqual(result.exit_status, 3)
+
+    def test_run_keeps_output_without_newline(self):
+        result = self.channel.run('printf "no newline"')
+        self.assertEqual(result._raw_stdout, b'no newline')
+        self.assertEqual(result._raw_stderr, b'')
+        self.assertEqual(result.exit_status, 0)
+
+    def test_run_reuses_shell(self):
+        first = self.channel.run('echo $PPID').stdout
+        second = self.channel.run('echo $PPID').stdout
+        self.assertEqual(first, second)
+
+    def test_commands_do_not_share_state(self):
+        self.channel.run('cd /; FOO=bar')
+        result = self.channel.run('echo "$FOO"; pwd')
+        self.assertEqual(result.stdout, os.getcwd())
+
+    def test_run_with_env(self):
+        result = self.channel.run('echo $FOO', env={'FOO': 20})
+        self.assertEqual(result.stdout, '20')
+
+    def test_run_with_quotes_and_syntax_error(self):
+        result = self.channel.run('echo "it\'s"')
+        self.assertEqual(result.stdout, "it's")
+        result = self.channel.run('echo "unterminated')
+        self.assertNotEqual(result.exit_status, 0)
+        self.assertTrue(self.channel.is_alive)
+
+    def test_run_large_output(self):
+        result = self.channel.run('seq 1 100000')
+        self.assertEqual(result.stdout.splitlines()[-1], '100000')
+
+    def test_timeout_closes_channel(self):
+        with self.assertRaises(job.TimeoutError):
+            self.channel.run('sleep 10', timeout=0.2)
+        self.assertFalse(self.channel.is_alive)
+        with self.assertRaises(channel.ChannelSendError):
+            self.channel.run('true')
+
+    def test_shell_exit_closes_channel(self):
+        channel_shell = channel.ShellChannel(['sh', '-c', 'exit 0'])
+        with self.assertRaises(channel.ChannelClosedError):
+            channel_shell.run('true')
+
+
+class ChannelRunnerTest(unittest.TestCase):
+    """Tests for acts.controllers.utils_lib.ssh.channel.ChannelRunner."""
+
+    def setUp(self):
+        self.runner = channel.ChannelRunner(LOCAL_SHELL, max_channels=3)
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_run_raises_on_error_status(self):
+        with self.assertRaises(job.Error):
+            self.runner.run('exit 1')
+        self.assertEqual(
+            self.runner.run('exit 1', ignore_status=True).exit_status, 1)
+
+    def test_run_concurrently(self):
+        results = []
+
+        def run_sleep():
+            results.append(self.runner.run('sleep 0.5; echo done').stdout)
+
+        threads = [threading.Thread(target=run_sleep) for _ in range(3)]
+        start_time = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.time() - start_time, 1.4)
+        self.assertEqual(results, ['done'] * 3)
+        self.assertLessEqual(len(self.runner._idle_channels), 3)
+
+    def test_reconnects_after_shell_exit(self):
+        pid = self.runner.run('echo $PPID').stdout
+        with self.assertRaises(channel.ChannelClosedError):
+            self.runner.run('kill -9 $PPID', attempts=1)
+        self.assertNotEqual(self.runner.run('echo $PPID').stdout, pid)
+
+    def test_retries_unsent_command(self):
+        pid = self.runner.run('echo $PPID').stdout
+        # The command cannot be written to the idle channel.
+        self.runner._idle_channels[0]._proc.stdin.close()
+        with self.assertLogs(level='WARNING'):
+            self.assertNotEqual(self.runner.run('echo $PPID').stdout, pid)
+
+    def test_does_not_retry_sent_command(self):
+        with tempfile.NamedTemporaryFile() as runs:
+            with self.assertRaises(channel.ChannelClosedError):
+                self.runner.run('echo run >> %s; kill -9 $PPID' % runs.name)
+            self.assertEqual(runs.read(), b'run\n')
+
+    def test_run_async(self):
+        result = self.runner.run_async('sleep 0')
+        self.assertTrue(result.stdout.isdigit())
+
+    def test_shell_command_runner(self):
+        shell_command = shell.ShellCommand(self.runner, working_dir='/')
+        self.assertEqual(shell_command.run('pwd').stdout, '/')
+        self.assertTrue(shell_command.is_alive(os.getpid()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from acts import records
+from acts.libs.pcap import index
+from acts.libs.pcap import reader
+
+AP_MAC = '00:11:22:33:44:55'
+STA_MAC = '66:77:88:99:aa:bb'
+OTHER_MAC = 'cc:dd:ee:ff:00:11'
+
+# A radiotap header without any fields.
+RADIOTAP = struct.pack('<BBHI', 0, 0, 8, 0)
+
+
+def dot11_frame(kind, subtype, addr1, addr2=None, addr3=None):
+    """Returns a radiotap 802.11 frame with the given type and addresses."""
+    header = struct.pack('<BBH', (subtype << 4) | (kind << 2), 0, 0)
+    header += reader.mac_to_bytes(addr1)
+    for address in (addr2, addr3):
+        if address:
+            header += reader.mac_to_bytes(address)
+    return RADIOTAP + header + b'\x00' * 8
+
+
+def data_frame(source, destination):
+    return dot11_frame(reader.FRAME_TYPE_DATA, 0, destination, source, AP_MAC)
+
+
+def write_pcap(path, frames, magic=0xa1b2c3d4, byte_order='<'):
+    """Writes (timestamp in ns, data) frames to a classic pcap file."""
+    fraction_ns = 1 if magic == 0xa1b23c4d else 1000
+    with open(path, 'wb') as f:
+        f.write(
+            struct.pack(byte_order + 'IHHiIII', magic, 2, 4, 0, 0, 65535,
+                        reader.LINKTYPE_IEEE802_11_RADIOTAP))
+        for timestamp, data in frames:
+            seconds, nanoseconds = divmod(timestamp, 1000000000)
+            f.write(
+                struct.pack(byte_order + 'IIII', seconds,
+                            nanoseconds // fraction_ns, len(data), len(data)))
+            f.write(data)
+
+
+def pcapng_block(block_type, body):
+    body += b'\x00' * (-len(body) % 4)
+    length = len(body) + 12
+    return struct.pack('<II', block_type, length) + body + struct.pack(
+        '<I', length)
+
+
+def write_pcapng(path, frames, resolution=None):
+    """Writes (timestamp in ns, data) frames to a pcapng file."""
+    options = b''
+    units_per_second = 1000000
+    if resolution is not None:
+        options = struct.pack('<HHB3x', 9, 1, resolution) + b'\x00' * 4
+        units_per_second = 10**resolution
+    with open(path, 'wb') as f:
+        f.write(
+            pcapng_block(0x0A0D0D0A,
+                         struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1)))
+        f.write(
+            pcapng_block(1,
+                         struct.pack('<HHI', reader.LINKTYPE_ETHERNET, 0,
+                                     65535) + options))
+        for timestamp, data in frames:
+            units = timestamp * units_per_second // 1000000000
+            f.write(
+                pcapng_block(6,
+                             struct.pack('<IIIII', 0, units >> 32,
+                                         units & 0xffffffff, len(data),
+                                         len(data)) + data))
+        f.write(pcapng_block(3, struct.pack('<I', 14) + b'\x01' * 14))
+
+
+class PcapReaderTest(unittest.TestCase):
+    """Tests for acts.libs.pcap.reader.PcapReader."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'capture.pcap')
+        self.frames = [(1500000000123456000 + i * 1000000,
+                        data_frame(STA_MAC, AP_MAC) + bytes([i]) * i)
+                       for i in range(20)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_all(self):
+        with reader.PcapReader(self.path) as pcap:
+            return [(frame.timestamp, pcap.read(frame))
+                    for frame in pcap.frames()]
+
+    def test_read_pcap_formats(self):
+        for magic, byte_order in ((0xa1b2c3d4, '<'), (0xa1b2c3d4, '>'),
+                                  (0xa1b23c4d, '<')):
+            write_pcap(self.path, self.frames, magic, byte_order)
+            self.assertEqual(self.read_all(), self.frames)
+
+    def test_read_ignores_truncated_frame(self):
+        write_pcap(self.path, self.frames)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        self.assertEqual(self.read_all(), self.frames[:-1])
+
+    def test_read_pcapng(self):
+        frames = [(timestamp, b'\x02' * 14 + data)
+                  for timestamp, data in self.frames]
+        for resolution in (None, 9):
+            write_pcapng(self.path, frames, resolution)
+            read = self.read_all()
+            # The simple packet block has the timestamp of the frame before.
+            self.assertEqual(read[:-1], frames)
+            self.assertEqual(read[-1], (frames[-1][0], b'\x01' * 14))
+
+    def test_not_a_capture(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pcap file')
+        with self.assertRaises(reader.Error):
+            reader.PcapReader(self.path)
+
+    def test_frame_addresses(self):
+        link_type = reader.LINKTYPE_IEEE802_11_RADIOTAP
+        addresses = reader.frame_addresses(
+            data_frame(STA_MAC, AP_MAC), link_type)
+        self.assertEqual(addresses, [
+            reader.mac_to_bytes(AP_MAC),
+            reader.mac_to_bytes(STA_MAC),
+            reader.mac_to_bytes(AP_MAC)
+        ])
+        ack = dot11_frame(reader.FRAME_TYPE_CONTROL, 13, STA_MAC)
+        self.assertEqual(
+            reader.frame_addresses(ack, link_type),
+            [reader.mac_to_bytes(STA_MAC)])
+        self.assertEqual(
+            reader.frame_type(ack, link_type),
+            (reader.FRAME_TYPE_CONTROL, 13))
+
+
+class PcapIndexTest(unittest.TestCase):
+    """Tests for acts.libs.pcap.index."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'capture.pcap')
+        self.output = os.path.join(self.tmp_dir, 'output.pcap')
+        self.start = 1500000000 * 1000000000
+        self.frames = []
+        for i in range(100):
+            if i % 3 == 0:
+                data = dot11_frame(reader.FRAME_TYPE_MANAGEMENT, 8,
+                                   'ff:ff:ff:ff:ff:ff', AP_MAC, AP_MAC)
+            elif i % 3 == 1:
+                data = data_frame(STA_MAC, AP_MAC)
+            else:
+                data = data_frame(OTHER_MAC, AP_MAC)
+            self.frames.append((self.start + i * 100000000, data))
+        write_pcap(self.path, self.frames)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_output(self):
+        with reader.PcapReader(self.output) as pcap:
+            return [(frame.timestamp, pcap.read(frame))
+                    for frame in pcap.frames()]
+
+    def test_select_time_range(self):
+        pcap_index = index.PcapIndex.build(self.path)
+        self.assertEqual(len(pcap_index), 100)
+        selected = pcap_index.select(1500000001, 1500000002)
+        self.assertEqual(list(selected), list(range(10, 21)))
+        self.assertEqual(len(pcap_index.select()), 100)
+        self.assertEqual(len(pcap_index.select(end_time=1400000000)), 0)
+
+    def test_select_unsorted(self):
+        pcap_index = index.PcapIndex([3, 1, 2, 5], [0, 1, 2, 3], [1] * 4,
+                                     [1] * 4, [1] * 4)
+        self.assertEqual(list(pcap_index.select(2e-9, 3e-9)), [0, 2])
+
+    def test_for_capture_saves_index(self):
+        built = index.PcapIndex.for_capture(self.path)
+        self.assertTrue(os.path.exists(index.index_path(self.path)))
+        loaded = index.PcapIndex.load(index.index_path(self.path))
+        self.assertEqual(list(loaded.timestamps), list(built.timestamps))
+        self.assertEqual(list(loaded.offsets), list(built.offsets))
+
+    def test_extract_time_range(self):
+        count = index.extract(self.path, self.output, 1500000001.05,
+                              1500000002)
+        self.assertEqual(count, 10)
+        self.assertEqual(self.read_output(), self.frames[11:21])
+
+    def test_extract_by_address_and_type(self):
+        count = index.extract(self.path, self.output, addresses=[STA_MAC])
+        self.assertEqual(count, 33)
+        self.assertEqual(self.read_output(), self.frames[1::3])
+        count = index.extract(
+            self.path,
+            self.output,
+            frame_types=[(reader.FRAME_TYPE_MANAGEMENT, 8)])
+        self.assertEqual(self.read_output(), self.frames[::3])
+
+    def test_extract_from_several_files(self):
+        second_path = os.path.join(self.tmp_dir, 'capture2.pcap')
+        later = [(timestamp + 10 * 1000000000, data)
+                 for timestamp, data in self.frames]
+        write_pcap(second_path, later)
+        count = index.extract([self.path, second_path], self.output,
+                              1500000009.5, 1500000010.5)
+        self.assertEqual(count, 11)
+        self.assertEqual(self.read_output(), self.frames[95:] + later[:6])
+
+    def test_extract_nothing(self):
+        self.assertEqual(index.extract(self.path, self.output, 0, 1), 0)
+        self.assertEqual(self.read_output(), [])
+
+    def test_extract_test_frames(self):
+        record = records.TestResultRecord('test_connect')
+        record.begin_time = 1500000003000
+        record.end_time = 1500000004000
+        count = index.extract_test_frames(
+            self.path, self.output, record, margin=0.5,
+            addresses=[OTHER_MAC])
+        self.assertEqual(count, 7)
+        self.assertEqual(self.read_output(), self.frames[26:46:3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import unittest
+
+from acts.libs.pcap import index
+from acts.libs.pcap import stream
+
+# A little endian pcap global header for 802.11 radiotap frames.
+GLOBAL_HEADER = struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 127)
+
+
+def make_packet(index, size):
+    """Returns a pcap record of a packet of size bytes."""
+    return struct.pack('<IIII', index, 0, size, size) + bytes([index % 256
+                                                             ]) * size
+
+
+def read_packets(path):
+    """Returns the global header and the records of a pcap file."""
+    with open(path, 'rb') as pcap:
+        data = pcap.read()
+    records = []
+    offset = stream.PCAP_GLOBAL_HEADER_SIZE
+    while offset < len(data):
+        size, = struct.unpack_from('<I', data, offset + 8)
+        end = offset + stream.PCAP_RECORD_HEADER_SIZE + size
+        records.append(data[offset:end])
+        offset = end
+    return data[:stream.PCAP_GLOBAL_HEADER_SIZE], records
+
+
+class RotatingPcapWriterTest(unittest.TestCase):
+    """Tests for acts.libs.pcap.stream.RotatingPcapWriter."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.prefix = os.path.join(self.tmp_dir, 'test_2G.pcap')
+        self.packets = [make_packet(i, 50 + i % 7 * 30) for i in range(200)]
+        self.data = GLOBAL_HEADER + b''.join(self.packets)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_in_chunks(self, writer, chunk_size):
+        for index in range(0, len(self.data), chunk_size):
+            writer.write(self.data[index:index + chunk_size])
+        return writer.close()
+
+    def test_split_on_packet_boundaries(self):
+        for chunk_size in (1, 7, 100, 4096, len(self.data)):
+            shutil.rmtree(self.tmp_dir)
+            os.mkdir(self.tmp_dir)
+            writer = stream.RotatingPcapWriter(self.prefix, file_size=2000)
+            self.assertEqual(self.write_in_chunks(writer, chunk_size), 0)
+            records = []
+            for path in writer.files:
+                header, file_records = read_packets(path)
+                self.assertEqual(header, GLOBAL_HEADER)
+                self.assertLessEqual(os.path.getsize(path), 2000)
+                records.extend(file_records)
+            self.assertEqual(records, self.packets)
+            self.assertEqual(writer.files[0], self.prefix + '00')
+            self.assertEqual(writer.packets, len(self.packets))
+            self.assertEqual(writer.bytes_received, len(self.data))
+
+    def test_ring_buffer_keeps_last_files(self):
+        writer = stream.RotatingPcapWriter(
+            self.prefix, file_size=2000, max_files=3)
+        self.write_in_chunks(writer, 1000)
+        self.assertEqual(len(writer.files), 3)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         [os.path.basename(path) for path in writer.files])
+        self.assertGreater(writer.files_deleted, 0)
+        _, records = read_packets(writer.files[-1])
+        self.assertEqual(records[-1], self.packets[-1])
+
+    def test_index_while_writing(self):
+        writer = stream.RotatingPcapWriter(
+            self.prefix, file_size=2000, max_files=3, index=True)
+        self.write_in_chunks(writer, 333)
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)),
+            sorted([os.path.basename(path) for path in writer.files] + [
+                os.path.basename(index.index_path(path))
+                for path in writer.files
+            ]))
+        for path in writer.files:
+            saved = index.PcapIndex.load(index.index_path(path))
+            built = index.PcapIndex.build(path)
+            for field in ('timestamps', 'offsets', 'captured_lengths',
+                          'original_lengths', 'link_types'):
+                self.assertEqual(
+                    list(getattr(saved, field)), list(getattr(built, field)))
+
+    def test_truncated_packet(self):
+        writer = stream.RotatingPcapWriter(self.prefix)
+        writer.write(self.data[:-10])
+        self.assertEqual(writer.close(), len(self.packets[-1]) - 10)
+        self.assertEqual(writer.packets, len(self.packets) - 1)
+
+    def test_not_a_pcap_stream(self):
+        writer = stream.RotatingPcapWriter(self.prefix)
+        with self.assertRaises(stream.Error):
+            writer.write(b'x' * 100)
+
+
+class PcapStreamTest(unittest.TestCase):
+    """Tests for acts.libs.pcap.stream.PcapStream."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp_dir, 'source.pcap')
+        with open(self.source, 'wb') as pcap:
+            pcap.write(GLOBAL_HEADER +
+                       b''.join(make_packet(i, 100) for i in range(10)))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def start_stream(self, command):
+        process = subprocess.Popen(['sh', '-c', command],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        writer = stream.RotatingPcapWriter(
+            os.path.join(self.tmp_dir, 'out.pcap'))
+        return stream.PcapStream(process, writer)
+
+    def test_stream_to_files_with_stats(self):
+        pcap_stream = self.start_stream(
+            'echo "pid $$" >&2; echo "listening on mon0" >&2; cat %s; '
+            'echo "10 packets captured" >&2; '
+            'echo "12 packets received by filter" >&2; '
+            'echo "2 packets dropped by kernel" >&2' % self.source)
+        self.assertTrue(pcap_stream.wait_for_start(5))
+        self.assertTrue(pcap_stream.join(5))
+        self.assertIsNotNone(pcap_stream.remote_pid)
+        stats = pcap_stream.stats
+        self.assertEqual(stats['packets_written'], 10)
+        self.assertEqual(stats['bytes_received'],
+                         os.path.getsize(self.source))
+        self.assertEqual(stats['packets_dropped'], 2)
+        self.assertEqual(stats['packets_received'], 12)
+        with open(self.source, 'rb') as source, open(
+                pcap_stream.writer.files[0], 'rb') as output:
+            self.assertEqual(source.read(), output.read())
+
+    def test_process_exits_before_start(self):
+        pcap_stream = self.start_stream('echo "tcpdump: no such device" >&2')
+        self.assertFalse(pcap_stream.wait_for_start(5))
+        pcap_stream.close()
+        self.assertIsNone(pcap_stream.stats['packets_dropped'])
+
+    def test_join_timeout(self):
+        pcap_stream = self.start_stream('exec sleep 10')
+        self.assertFalse(pcap_stream.join(0.1))
+        pcap_stream.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
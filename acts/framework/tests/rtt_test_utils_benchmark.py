@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the RTT statistics on synthetic ranging results.
+
+Times rtt_test_utils.extract_stats on synthetic result sets of increasing
+size, and checks its summary statistics against the statistics module.
+
+Usage:
+    PYTHONPATH=. python3 tests/rtt_test_utils_benchmark.py
+"""
+
+import logging
+import random
+import statistics
+import unittest
+
+from acts.test_utils.wifi.rtt import rtt_const as rconsts
+from acts.test_utils.wifi.rtt import rtt_test_utils as rutils
+
+import benchmark_utils
+
+# The numbers of ranging results in the synthetic result sets.
+RESULT_SET_SIZES = [10, 100, 1000, 10000, 100000]
+
+RANGE_REFERENCE_MM = 5000
+RANGE_MARGIN_MM = 1000
+MIN_RSSI = -80
+REFERENCE_LCI = [1, 2, 3]
+REFERENCE_LCR = [4, 5]
+
+
+def generate_results(size, distance_type=int):
+    """Generates synthetic ranging results with timeouts and failures."""
+    results = []
+    for _ in range(size):
+        draw = random.random()
+        if draw < 0.05:
+            results.append(None)
+            continue
+        if draw < 0.1:
+            results.append({
+                rconsts.EVENT_CB_RANGING_KEY_STATUS:
+                rconsts.EVENT_CB_RANGING_STATUS_FAIL
+            })
+            continue
+        results.append({
+            rconsts.EVENT_CB_RANGING_KEY_STATUS:
+            rconsts.EVENT_CB_RANGING_STATUS_SUCCESS,
+            rconsts.EVENT_CB_RANGING_KEY_DISTANCE_MM:
+            distance_type(random.gauss(RANGE_REFERENCE_MM, 600)),
+            rconsts.EVENT_CB_RANGING_KEY_DISTANCE_STD_DEV_MM:
+            random.randint(0, 500),
+            rconsts.EVENT_CB_RANGING_KEY_RSSI:
+            random.randint(-90, 2),
+            rconsts.EVENT_CB_RANGING_KEY_NUM_ATTEMPTED_MEASUREMENTS:
+            random.randint(0, 8),
+            rconsts.EVENT_CB_RANGING_KEY_NUM_SUCCESSFUL_MEASUREMENTS:
+            random.randint(0, 8),
+            rconsts.EVENT_CB_RANGING_KEY_LCI:
+            REFERENCE_LCI if random.random() < 0.999 else [],
+            rconsts.EVENT_CB_RANGING_KEY_LCR:
+            REFERENCE_LCR,
+        })
+    return results
+
+
+class RttTestUtilsBenchmark(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def check_summary(self, stats):
+        """Checks the summary statistics against the extracted values."""
+        for name, values in (('distance', stats['distances']),
+                             ('rssi', stats['rssis'])):
+            self.assertAlmostEqual(stats['%s_mean' % name],
+                                   statistics.mean(values))
+            self.assertAlmostEqual(stats['%s_std_dev' % name],
+                                   statistics.stdev(values))
+        self.assertEqual(stats['num_invalid_rssi'],
+                         sum(not MIN_RSSI <= rssi <= 0
+                             for rssi in stats['rssis']))
+
+    def run_benchmark(self, distance_type):
+        for size in RESULT_SET_SIZES:
+            results = generate_results(size, distance_type)
+            stats, secs = benchmark_utils.timed(
+                rutils.extract_stats, results, RANGE_REFERENCE_MM,
+                RANGE_MARGIN_MM, MIN_RSSI, REFERENCE_LCI, REFERENCE_LCR)
+            logging.info('extract_stats %6d %s results: %.4fs', size,
+                         distance_type.__name__, secs)
+            self.assertEqual(stats['num_no_results'] + stats['num_results'],
+                             size)
+            self.check_summary(stats)
+
+    def testIntegerResults(self):
+        self.run_benchmark(int)
+
+    def testFloatResults(self):
+        self.run_benchmark(float)
+
+    def testNoSuccessfulResults(self):
+        results = [None, {
+            rconsts.EVENT_CB_RANGING_KEY_STATUS:
+            rconsts.EVENT_CB_RANGING_STATUS_FAIL
+        }]
+        stats = rutils.extract_stats(results, RANGE_REFERENCE_MM,
+                                     RANGE_MARGIN_MM, MIN_RSSI,
+                                     REFERENCE_LCI, REFERENCE_LCR)
+        self.assertEqual(stats['num_failures'], 1)
+        self.assertEqual(stats['num_no_results'], 1)
+        self.assertNotIn('distance_mean', stats)
+        self.assertFalse(stats['any_lci_mismatch'])
+
+
+if __name__ == '__main__':
+    benchmark_utils.main()
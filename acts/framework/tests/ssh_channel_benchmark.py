@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Benchmarks the shell channel runner against a process per command.
+
+Runs a sequence of small commands, like the ones used to control an access
+point, through a ChannelRunner and through a runner which starts a new
+process for each command and checks for a connection message in its output,
+as SshConnection.run does. Both use a local shell instead of ssh so that no
+sshd is needed; the per command cost of ssh itself is not included.
+
+Usage:
+    PYTHONPATH=. python3 tests/ssh_channel_benchmark.py
+"""
+
+import logging
+import re
+import threading
+import time
+import unittest
+import uuid
+
+from acts.controllers.utils_lib.commands import shell
+from acts.controllers.utils_lib.ssh import channel
+from acts.libs.proc import job
+
+import benchmark_utils
+
+# The numbers of commands to run.
+COMMAND_COUNTS = [10, 100, 500]
+
+COMMANDS = [
+    'cat /proc/loadavg', 'ls / | grep -c .',
+    'test -e /tmp', 'echo wlan0 | tr a-z A-Z'
+]
+
+
+class ProcessPerCommandRunner(object):
+    """Runs each command in a new local shell process, like SshConnection."""
+
+    def run(self, command, timeout=3600, ignore_status=False):
+        identifier = str(uuid.uuid4())
+        full_command = 'echo "CONNECTED: %s"; %s' % (identifier, command)
+        result = job.run(['sh', '-c', full_command],
+                         ignore_status=True,
+                         timeout=timeout)
+        output = result._raw_stdout
+        if not re.search(
+                b'^CONNECTED: %s\n' % identifier.encode(),
+                output,
+                flags=re.MULTILINE):
+            raise AssertionError('Missing connected message.')
+        result = job.Result(
+            command=command,
+            stdout=output[output.find(b'\n') + 1:],
+            stderr=result._raw_stderr,
+            exit_status=result.exit_status,
+            duration=result.duration)
+        if result.exit_status and not ignore_status:
+            raise job.Error(result)
+        return result
+
+
+def run_commands(runner, count):
+    """Runs count commands through a ShellCommand and returns the outputs."""
+    shell_command = shell.ShellCommand(runner)
+    return [
+        shell_command.run(COMMANDS[index % len(COMMANDS)]).stdout
+        for index in range(count)
+    ]
+
+
+class SshChannelBenchmark(unittest.TestCase):
+    def testSequentialCommands(self):
+        runner = channel.ChannelRunner(['sh'])
+        try:
+            for count in COMMAND_COUNTS:
+                expected, process_secs = benchmark_utils.timed(
+                    run_commands, ProcessPerCommandRunner(), count)
+                actual, channel_secs = benchmark_utils.timed(
+                    run_commands, runner, count)
+                logging.info('%4d commands: process per command %.3fs, '
+                             'channel %.3fs', count, process_secs,
+                             channel_secs)
+                # The load average changes between runs.
+                self.assertEqual(expected[1::4], actual[1::4])
+                self.assertEqual(expected[2::4], actual[2::4])
+                self.assertEqual(expected[3::4], actual[3::4])
+        finally:
+            runner.close()
+
+    def testConcurrentCommands(self):
+        runner = channel.ChannelRunner(['sh'], max_channels=4)
+        try:
+            threads = [
+                threading.Thread(target=run_commands, args=(runner, 100))
+                for _ in range(4)
+            ]
+            start = time.time()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            logging.info('4 x 100 commands over 4 channels: %.3fs',
+                         time.time() - start)
+        finally:
+            runner.close()
+
+
+if __name__ == '__main__':
+    benchmark_utils.main()
@@ -18,6 +18,7 @@ import collections
 import json
 import logging
 import math
+import numpy
 import os
 import re
 import statistics
@@ -29,6 +30,7 @@ from acts.metrics.loggers.blackbox import BlackboxMetricLogger
 from acts.test_decorators import test_tracker_info
 from acts.test_utils.wifi import wifi_power_test_utils as wputils
 from acts.test_utils.wifi import wifi_retail_ap as retail_ap
+from acts.test_utils.wifi import wifi_sweep_results as sweep_results
 from acts.test_utils.wifi import wifi_test_utils as wutils
 
 SHORT_SLEEP = 1
@@ -37,7 +39,6 @@ STATION_DUMP = "iw wlan0 station dump"
 SCAN = "wpa_cli scan"
 SCAN_RESULTS = "wpa_cli scan_results"
 SIGNAL_POLL = "wpa_cli signal_poll"
-CONST_3dB = 3.01029995664
 RSSI_ERROR_VAL = float("nan")
 
 
@@ -89,7 +90,7 @@ class WifiRssiTest(base_test.BaseTestClass):
     def teardown_test(self):
         self.iperf_server.stop()
 
-    def pass_fail_check_rssi_stability(self, postprocessed_results):
+    def pass_fail_check_rssi_stability(self, sweep_result):
         """Check the test result and decide if it passed or failed.
 
         Checks the RSSI test result and fails the test if the standard
@@ -97,39 +98,34 @@ class WifiRssiTest(base_test.BaseTestClass):
         config file.
 
         Args:
-            postprocessed_results: compiled arrays of RSSI measurements
+            sweep_result: SweepResult containing the RSSI measurements
         """
+        signal_poll_rssi_stdev = sweep_result.stdev("signal_poll_rssi")
+        chain_0_rssi_stdev = sweep_result.stdev("chain_0_rssi")
+        chain_1_rssi_stdev = sweep_result.stdev("chain_1_rssi")
         # Set Blackbox metric values
         self.signal_poll_rssi_stdev_metric.metric_value = max(
-            postprocessed_results["signal_poll_rssi"]["stdev"])
-        self.chain_0_rssi_stdev_metric.metric_value = max(
-            postprocessed_results["chain_0_rssi"]["stdev"])
-        self.chain_1_rssi_stdev_metric.metric_value = max(
-            postprocessed_results["chain_1_rssi"]["stdev"])
+            signal_poll_rssi_stdev)
+        self.chain_0_rssi_stdev_metric.metric_value = max(chain_0_rssi_stdev)
+        self.chain_1_rssi_stdev_metric.metric_value = max(chain_1_rssi_stdev)
         # Evaluate test pass/fail
-        test_failed = any([
-            stdev > self.test_params["stdev_tolerance"]
-            for stdev in postprocessed_results["signal_poll_rssi"]["stdev"]
-        ])
+        test_failed = bool(
+            (signal_poll_rssi_stdev > self.test_params["stdev_tolerance"]
+             ).any())
         test_message = (
             "RSSI stability {0}. Standard deviation was {1} dB "
             "(limit {2}), per chain standard deviation [{3}, {4}] dB".format(
-                "failed" * test_failed + "passed" * (not test_failed), [
-                    float("{:.2f}".format(x))
-                    for x in postprocessed_results["signal_poll_rssi"]["stdev"]
-                ], self.test_params["stdev_tolerance"], [
-                    float("{:.2f}".format(x))
-                    for x in postprocessed_results["chain_0_rssi"]["stdev"]
-                ], [
-                    float("{:.2f}".format(x))
-                    for x in postprocessed_results["chain_1_rssi"]["stdev"]
-                ]))
+                "failed" * test_failed + "passed" * (not test_failed),
+                signal_poll_rssi_stdev.round(2).tolist(),
+                self.test_params["stdev_tolerance"],
+                chain_0_rssi_stdev.round(2).tolist(),
+                chain_1_rssi_stdev.round(2).tolist()))
         if test_failed:
             asserts.fail(test_message)
         asserts.explicit_pass(test_message)
 
-    def pass_fail_check_rssi_accuracy(self, postprocessed_results,
-                                      rssi_under_test, absolute_accuracy):
+    def pass_fail_check_rssi_accuracy(self, sweep_result, rssi_under_test,
+                                      absolute_accuracy):
         """Check the test result and decide if it passed or failed.
 
         Checks the RSSI test result and compares and compute its deviation from
@@ -139,7 +135,7 @@ class WifiRssiTest(base_test.BaseTestClass):
         configuration file.
 
         Args:
-            postprocessed_results: compiled arrays of RSSI measurements
+            sweep_result: SweepResult containing the RSSI measurements
             rssi_under_test: list of RSSIs under test, i.e., can cause test to
             fail
             absolute_accuracy: boolean indicating whether to look at absolute
@@ -153,61 +149,51 @@ class WifiRssiTest(base_test.BaseTestClass):
         else:
             error_type = "centered"
 
-        for key, val in postprocessed_results.items():
+        for key in sweep_results.RSSI_KEYS:
             # Compute the error metrics ignoring invalid RSSI readings
             # If all readings invalid, set error to RSSI_ERROR_VAL
-            if "rssi" in key and "predicted" not in key:
-                filtered_error = [x for x in val["error"] if not math.isnan(x)]
-                if filtered_error:
-                    avg_shift = statistics.mean(filtered_error)
-                    if absolute_accuracy:
-                        avg_error = statistics.mean(
-                            [abs(x) for x in filtered_error])
-                    else:
-                        avg_error = statistics.mean(
-                            [abs(x - avg_shift) for x in filtered_error])
-                else:
-                    avg_error = RSSI_ERROR_VAL
-                    avg_shift = RSSI_ERROR_VAL
-                # Set Blackbox metric values
-                setattr(
-                    getattr(self, "{}_error_metric".format(key)),
-                    "metric_value", avg_error)
-                setattr(
-                    getattr(self, "{}_shift_metric".format(key)),
-                    "metric_value", avg_shift)
-                # Evaluate test pass/fail
-                rssi_failure = (avg_error > self.test_params["abs_tolerance"]
-                                ) or math.isnan(avg_error)
-                if rssi_failure and key in rssi_under_test:
-                    test_message = test_message + (
-                        "{} failed ({} error = {:.2f} dB, "
-                        "shift = {:.2f} dB)\n").format(key, error_type,
-                                                       avg_error, avg_shift)
-                    test_failed = True
-                elif rssi_failure:
-                    test_message = test_message + (
-                        "{} failed (ignored) ({} error = {:.2f} dB, "
-                        "shift = {:.2f} dB)\n").format(key, error_type,
-                                                       avg_error, avg_shift)
-                else:
-                    test_message = test_message + (
-                        "{} passed ({} error = {:.2f} dB, "
-                        "shift = {:.2f} dB)\n").format(key, error_type,
-                                                       avg_error, avg_shift)
+            avg_error, avg_shift = sweep_results.error_statistics(
+                sweep_results.rssi_error(sweep_result, key),
+                absolute_accuracy)
+            # Set Blackbox metric values
+            setattr(
+                getattr(self, "{}_error_metric".format(key)), "metric_value",
+                avg_error)
+            setattr(
+                getattr(self, "{}_shift_metric".format(key)), "metric_value",
+                avg_shift)
+            # Evaluate test pass/fail
+            rssi_failure = (avg_error > self.test_params["abs_tolerance"]
+                            ) or math.isnan(avg_error)
+            if rssi_failure and key in rssi_under_test:
+                test_message = test_message + (
+                    "{} failed ({} error = {:.2f} dB, "
+                    "shift = {:.2f} dB)\n").format(key, error_type, avg_error,
+                                                   avg_shift)
+                test_failed = True
+            elif rssi_failure:
+                test_message = test_message + (
+                    "{} failed (ignored) ({} error = {:.2f} dB, "
+                    "shift = {:.2f} dB)\n").format(key, error_type, avg_error,
+                                                   avg_shift)
+            else:
+                test_message = test_message + (
+                    "{} passed ({} error = {:.2f} dB, "
+                    "shift = {:.2f} dB)\n").format(key, error_type, avg_error,
+                                                   avg_shift)
         if test_failed:
             asserts.fail(test_message)
         asserts.explicit_pass(test_message)
 
     def post_process_rssi_sweep(self, rssi_result):
-        """Postprocesses and saves JSON formatted results.
+        """Postprocesses and saves JSON and columnar results.
 
         Args:
             rssi_result: dict containing attenuation, rssi and other meta
             data
         Returns:
-            postprocessed_results: compiled arrays of RSSI data used in
-            pass/fail check
+            sweep_result: SweepResult with the RSSI samples of each
+            attenuation step, used in plots and pass/fail checks
         """
         # Save output as text file
         results_file_path = "{}/{}.json".format(self.log_path,
@@ -215,89 +201,25 @@ class WifiRssiTest(base_test.BaseTestClass):
         with open(results_file_path, 'w') as results_file:
             json.dump(rssi_result, results_file, indent=4)
         # Compile results into arrays of RSSIs suitable for plotting
-        # yapf: disable
-        postprocessed_results = collections.OrderedDict(
-            [("signal_poll_rssi", {}),
-             ("signal_poll_avg_rssi", {}),
-             ("scan_rssi", {}),
-             ("chain_0_rssi", {}),
-             ("chain_1_rssi", {}),
-             ("total_attenuation", []),
-             ("predicted_rssi", [])])
-        # yapf: enable
-        for key, val in postprocessed_results.items():
-            if "scan_rssi" in key:
-                postprocessed_results[key]["data"] = [
-                    x for data_point in rssi_result["rssi_result"] for x in
-                    data_point[key][rssi_result["connected_bssid"]]["data"]
-                ]
-                postprocessed_results[key]["mean"] = [
-                    x[key][rssi_result["connected_bssid"]]["mean"]
-                    for x in rssi_result["rssi_result"]
-                ]
-                postprocessed_results[key]["stdev"] = [
-                    x[key][rssi_result["connected_bssid"]]["stdev"]
-                    for x in rssi_result["rssi_result"]
-                ]
-            elif "predicted_rssi" in key:
-                postprocessed_results["total_attenuation"] = [
-                    att + rssi_result["fixed_attenuation"] +
-                    rssi_result["dut_front_end_loss"]
-                    for att in rssi_result["attenuation"]
-                ]
-                postprocessed_results["predicted_rssi"] = [
-                    rssi_result["ap_tx_power"] - att
-                    for att in postprocessed_results["total_attenuation"]
-                ]
-            elif "rssi" in key:
-                postprocessed_results[key]["data"] = [
-                    x for data_point in rssi_result["rssi_result"]
-                    for x in data_point[key]["data"]
-                ]
-                postprocessed_results[key]["mean"] = [
-                    x[key]["mean"] for x in rssi_result["rssi_result"]
-                ]
-                postprocessed_results[key]["stdev"] = [
-                    x[key]["stdev"] for x in rssi_result["rssi_result"]
-                ]
-        # Compute RSSI errors
-        for key, val in postprocessed_results.items():
-            if "chain" in key:
-                postprocessed_results[key]["error"] = [
-                    postprocessed_results[key]["mean"][idx] + CONST_3dB -
-                    postprocessed_results["predicted_rssi"][idx]
-                    for idx in range(
-                        len(postprocessed_results["predicted_rssi"]))
-                ]
-            elif "rssi" in key and "predicted" not in key:
-                postprocessed_results[key]["error"] = [
-                    postprocessed_results[key]["mean"][idx] -
-                    postprocessed_results["predicted_rssi"][idx]
-                    for idx in range(
-                        len(postprocessed_results["predicted_rssi"]))
-                ]
-        return postprocessed_results
-
-    def plot_rssi_vs_attenuation(self, postprocessed_results):
+        sweep_result = sweep_results.SweepResult.from_rssi_result(rssi_result)
+        sweep_result.save("{}/{}.npz".format(self.log_path,
+                                             self.current_test_name))
+        return sweep_result
+
+    def plot_rssi_vs_attenuation(self, sweep_result):
         """Function to plot RSSI vs attenuation sweeps
 
         Args:
-            postprocessed_results: compiled arrays of RSSI data.
+            sweep_result: SweepResult containing the RSSI measurements
         """
-        data_sets = [[
-            postprocessed_results["total_attenuation"],
-            postprocessed_results["total_attenuation"],
-            postprocessed_results["total_attenuation"],
-            postprocessed_results["total_attenuation"],
-            postprocessed_results["total_attenuation"],
-            postprocessed_results["total_attenuation"]
-        ], [
-            postprocessed_results["signal_poll_rssi"]["mean"],
-            postprocessed_results["signal_poll_avg_rssi"]["mean"],
-            postprocessed_results["scan_rssi"]["mean"],
-            postprocessed_results["chain_0_rssi"]["mean"],
-            postprocessed_results["chain_1_rssi"]["mean"],
-            postprocessed_results["predicted_rssi"]
+        total_attenuation = sweep_result.total_attenuation
+        data_sets = [[total_attenuation] * 6, [
+            sweep_result.mean("signal_poll_rssi"),
+            sweep_result.mean("signal_poll_avg_rssi"),
+            sweep_result.mean("scan_rssi"),
+            sweep_result.mean("chain_0_rssi"),
+            sweep_result.mean("chain_1_rssi"),
+            sweep_results.predicted_rssi(sweep_result)
         ]]
         legends = [
             "Signal Poll RSSI", "Signal Poll AVG_RSSI", "Scan RSSI",
@@ -319,58 +241,34 @@ class WifiRssiTest(base_test.BaseTestClass):
             shaded_region=None,
             output_file_path=output_file_path)
 
-    def plot_rssi_vs_time(self, rssi_result, postprocessed_results,
-                          center_curves):
+    def plot_rssi_vs_time(self, sweep_result, center_curves):
         """Function to plot RSSI vs time.
 
         Args:
-            rssi_result: dict containing raw RSSI data
-            postprocessed_results: compiled arrays of RSSI data
+            sweep_result: SweepResult containing the RSSI measurements
             center_curvers: boolean indicating whether to shift curves to align
             them with predicted RSSIs
         """
         x_data = []
         y_data = []
         legends = []
-        # yapf: disable
-        rssi_time_series = collections.OrderedDict(
-            [("signal_poll_rssi", []),
-             ("signal_poll_avg_rssi", []),
-             ("scan_rssi", []),
-             ("chain_0_rssi", []),
-             ("chain_1_rssi", []),
-             ("predicted_rssi", [])])
-        # yapf: enable
+        rssi_time_series = collections.OrderedDict()
+        for key in sweep_results.RSSI_KEYS:
+            rssi_time_series[key] = sweep_result[key].ravel()
+            if center_curves:
+                avg_shift = sweep_results.error_statistics(
+                    sweep_results.rssi_error(sweep_result, key))[1]
+                if not math.isnan(avg_shift):
+                    rssi_time_series[key] = rssi_time_series[key] - avg_shift
+        rssi_time_series["predicted_rssi"] = numpy.repeat(
+            sweep_results.predicted_rssi(sweep_result),
+            sweep_result["signal_poll_rssi"].shape[1])
         for key, val in rssi_time_series.items():
-            if "predicted_rssi" in key:
-                rssi_time_series[key] = [
-                    x for x in postprocessed_results[key] for copies in range(
-                        len(rssi_result["rssi_result"][0]["signal_poll_rssi"][
-                            "data"]))
-                ]
-            elif "rssi" in key:
-                if center_curves:
-                    filtered_error = [
-                        x for x in postprocessed_results[key]["error"]
-                        if not math.isnan(x)
-                    ]
-                    if filtered_error:
-                        avg_shift = statistics.mean(filtered_error)
-                    else:
-                        avg_shift = 0
-                    rssi_time_series[key] = [
-                        x - avg_shift
-                        for x in postprocessed_results[key]["data"]
-                    ]
-                else:
-                    rssi_time_series[key] = postprocessed_results[key]["data"]
-            time = [
-                self.test_params["polling_frequency"] * x
-                for x in range(len(rssi_time_series[key]))
-            ]
-            if len(rssi_time_series[key]) > 0:
-                x_data.append(time)
-                y_data.append(rssi_time_series[key])
+            if len(val) > 0:
+                x_data.append(
+                    self.test_params["polling_frequency"] *
+                    numpy.arange(len(val)))
+                y_data.append(val)
                 legends.append(key)
         data_sets = [x_data, y_data]
         fig_property = {
@@ -654,11 +552,10 @@ class WifiRssiTest(base_test.BaseTestClass):
             self.test_params["rssi_vs_atten_scan_measurements"],
             [self.main_network[band]["BSSID"]],
             self.test_params["polling_frequency"], MED_SLEEP)
-        postprocessed_results = self.post_process_rssi_sweep(rssi_result)
-        self.plot_rssi_vs_attenuation(postprocessed_results)
+        sweep_result = self.post_process_rssi_sweep(rssi_result)
+        self.plot_rssi_vs_attenuation(sweep_result)
         self.pass_fail_check_rssi_accuracy(
-            postprocessed_results, self.test_params["rssi_vs_atten_metrics"],
-            1)
+            sweep_result, self.test_params["rssi_vs_atten_metrics"], 1)
 
     def _test_rssi_stability(self):
         """ Function that gets called for each test case of rssi_stability
@@ -680,9 +577,9 @@ class WifiRssiTest(base_test.BaseTestClass):
             self.iperf_traffic, connected_measurements, 0,
             [self.main_network[band]["BSSID"]],
             self.test_params["polling_frequency"], MED_SLEEP)
-        postprocessed_results = self.post_process_rssi_sweep(rssi_result)
-        self.plot_rssi_vs_time(rssi_result, postprocessed_results, 1)
-        self.pass_fail_check_rssi_stability(postprocessed_results)
+        sweep_result = self.post_process_rssi_sweep(rssi_result)
+        self.plot_rssi_vs_time(sweep_result, 1)
+        self.pass_fail_check_rssi_stability(sweep_result)
 
     def _test_rssi_tracking(self):
         """ Function that gets called for each test case of rssi_tracking
@@ -722,10 +619,10 @@ class WifiRssiTest(base_test.BaseTestClass):
             self.iperf_traffic, connected_measurements, 0,
             [self.main_network[band]["BSSID"]],
             self.test_params["polling_frequency"], 0)
-        postprocessed_results = self.post_process_rssi_sweep(rssi_result)
-        self.plot_rssi_vs_time(rssi_result, postprocessed_results, 1)
-        self.pass_fail_check_rssi_accuracy(postprocessed_results,
-                                           ["signal_poll_rssi"], 0)
+        sweep_result = self.post_process_rssi_sweep(rssi_result)
+        self.plot_rssi_vs_time(sweep_result, 1)
+        self.pass_fail_check_rssi_accuracy(sweep_result, ["signal_poll_rssi"],
+                                           0)
 
     @test_tracker_info(uuid='519689b8-0a3c-4fd9-9227-fd7962d0f1a0')
     def test_rssi_stability_ch1_VHT20_ActiveTraffic(self):
@@ -18,6 +18,7 @@ import collections
 import json
 import logging
 import math
+import numpy
 import os
 import time
 from acts import asserts
@@ -28,6 +29,7 @@ from acts.metrics.loggers.blackbox import BlackboxMetricLogger
 from acts.test_decorators import test_tracker_info
 from acts.test_utils.wifi import wifi_power_test_utils as wputils
 from acts.test_utils.wifi import wifi_retail_ap as retail_ap
+from acts.test_utils.wifi import wifi_sweep_results as sweep_results
 from acts.test_utils.wifi import wifi_test_utils as wutils
 
 
@@ -100,12 +102,9 @@ class WifiRvrTest(base_test.BaseTestClass):
         y_data = []
         legends = []
         for result in self.testclass_results:
-            total_attenuation = [
-                att + result["fixed_attenuation"]
-                for att in result["attenuation"]
-            ]
-            x_data.append(total_attenuation)
-            y_data.append(result["throughput_receive"])
+            sweep_result = sweep_results.SweepResult.from_dict(result)
+            x_data.append(sweep_result.total_attenuation)
+            y_data.append(sweep_result["throughput_receive"])
             legends.append(result["test_name"])
         x_label = 'Attenuation (dB)'
         y_label = 'Throughput (Mbps)'
@@ -141,20 +140,18 @@ class WifiRvrTest(base_test.BaseTestClass):
         except:
             asserts.fail("Test failed: Golden file not found")
 
-        failure_count = 0
-        for idx, current_throughput in enumerate(
-                rvr_result["throughput_receive"]):
-            current_att = rvr_result["attenuation"][idx] + rvr_result["fixed_attenuation"]
-            if (current_throughput < throughput_limits["lower_limit"][idx]
-                    or current_throughput >
-                    throughput_limits["upper_limit"][idx]):
-                failure_count = failure_count + 1
-                self.log.info(
-                    "Throughput at {}dB attenuation is beyond limits. "
-                    "Throughput is {} Mbps. Expected within [{}, {}] Mbps.".
-                    format(current_att, current_throughput,
-                           throughput_limits["lower_limit"][idx],
-                           throughput_limits["upper_limit"][idx]))
+        throughput = numpy.asarray(rvr_result["throughput_receive"])
+        lower_limit = numpy.asarray(throughput_limits["lower_limit"])
+        upper_limit = numpy.asarray(throughput_limits["upper_limit"])
+        failures = numpy.flatnonzero((throughput < lower_limit)
+                                     | (throughput > upper_limit))
+        for idx in failures:
+            self.log.info(
+                "Throughput at {}dB attenuation is beyond limits. "
+                "Throughput is {} Mbps. Expected within [{}, {}] Mbps.".format(
+                    throughput_limits["attenuation"][idx], throughput[idx],
+                    lower_limit[idx], upper_limit[idx]))
+        failure_count = len(failures)
         self.failure_count_metric.metric_value = failure_count
         if failure_count >= self.testclass_params["failure_count_tolerance"]:
             asserts.fail("Test failed. Found {} points outside limits.".format(
@@ -179,49 +176,23 @@ class WifiRvrTest(base_test.BaseTestClass):
         test_name = self.current_test_name
         golden_path = next(file_name for file_name in self.golden_files_list
                            if test_name in file_name)
-        with open(golden_path, 'r') as golden_file:
-            golden_results = json.load(golden_file)
-            golden_attenuation = [
-                att + golden_results["fixed_attenuation"]
-                for att in golden_results["attenuation"]
-            ]
-        attenuation = []
-        lower_limit = []
-        upper_limit = []
-        for idx, current_throughput in enumerate(
-                rvr_result["throughput_receive"]):
-            current_att = rvr_result["attenuation"][idx] + rvr_result["fixed_attenuation"]
-            att_distances = [
-                abs(current_att - golden_att)
-                for golden_att in golden_attenuation
-            ]
-            sorted_distances = sorted(
-                enumerate(att_distances), key=lambda x: x[1])
-            closest_indeces = [dist[0] for dist in sorted_distances[0:3]]
-            closest_throughputs = [
-                golden_results["throughput_receive"][index]
-                for index in closest_indeces
-            ]
-            closest_throughputs.sort()
-
-            attenuation.append(current_att)
-            lower_limit.append(
-                max(closest_throughputs[0] -
-                    max(self.testclass_params["abs_tolerance"],
-                        closest_throughputs[0] *
-                        self.testclass_params["pct_tolerance"] / 100), 0))
-            upper_limit.append(closest_throughputs[-1] + max(
-                self.testclass_params["abs_tolerance"], closest_throughputs[-1]
-                * self.testclass_params["pct_tolerance"] / 100))
+        golden_results = sweep_results.SweepResult.load(golden_path)
+        attenuation = sweep_results.SweepResult.from_dict(
+            rvr_result).total_attenuation
+        lower_limit, upper_limit = sweep_results.throughput_limits(
+            attenuation, golden_results.total_attenuation,
+            golden_results["throughput_receive"],
+            self.testclass_params["abs_tolerance"],
+            self.testclass_params["pct_tolerance"])
         throughput_limits = {
-            "attenuation": attenuation,
-            "lower_limit": lower_limit,
-            "upper_limit": upper_limit
+            "attenuation": attenuation.tolist(),
+            "lower_limit": lower_limit.tolist(),
+            "upper_limit": upper_limit.tolist()
         }
         return throughput_limits
 
     def process_test_results(self, rvr_result):
-        """Saves plots and JSON formatted results.
+        """Saves plots, JSON formatted and columnar results.
 
         Args:
             rvr_result: dict containing attenuation, throughput and other meta
@@ -233,15 +204,15 @@ class WifiRvrTest(base_test.BaseTestClass):
                                                 self.current_test_name)
         with open(results_file_path, 'w') as results_file:
             json.dump(rvr_result, results_file, indent=4)
+        sweep_result = sweep_results.SweepResult.from_dict(rvr_result)
+        sweep_result.save("{}/{}.npz".format(self.log_path,
+                                             self.current_test_name))
         # Plot and save
         legends = [self.current_test_name]
         x_label = 'Attenuation (dB)'
         y_label = 'Throughput (Mbps)'
-        total_attenuation = [
-            att + rvr_result["fixed_attenuation"]
-            for att in rvr_result["attenuation"]
-        ]
-        data_sets = [[total_attenuation], [rvr_result["throughput_receive"]]]
+        data_sets = [[sweep_result.total_attenuation],
+                     [sweep_result["throughput_receive"]]]
         fig_property = {
             "title": test_name,
             "x_label": x_label,
@@ -253,14 +224,9 @@ class WifiRvrTest(base_test.BaseTestClass):
             golden_path = next(file_name
                                for file_name in self.golden_files_list
                                if test_name in file_name)
-            with open(golden_path, 'r') as golden_file:
-                golden_results = json.load(golden_file)
+            golden_results = sweep_results.SweepResult.load(golden_path)
             legends.insert(0, "Golden Results")
-            golden_attenuation = [
-                att + golden_results["fixed_attenuation"]
-                for att in golden_results["attenuation"]
-            ]
-            data_sets[0].insert(0, golden_attenuation)
+            data_sets[0].insert(0, golden_results.total_attenuation)
             data_sets[1].insert(0, golden_results["throughput_receive"])
             throughput_limits = self.compute_throughput_limits(rvr_result)
             shaded_region = {
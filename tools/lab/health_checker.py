@@ -37,10 +37,17 @@ class HealthChecker(object):
                 field_to_compare: {
                     constant : a constant to compare to
                     compare : a string specifying a way to compare
+                    window : optional, a number of seconds the metric must
+                      be unhealthy for to be reported, see history
                 }
             }
         }
-
+        history: None, or a dict mapping metric names to the
+          time_series.TimeSeries of their responses, e.g. the history of a
+          runner.ContinuousRunner. When set, fields with a window are only
+          unhealthy if every sample of the window is, and metrics missing
+          from the responses given to get_unhealthy are not checked, since
+          not every metric is gathered each time.
 
     """
 
@@ -56,6 +63,9 @@ class HealthChecker(object):
     def __init__(self, config):
         self._config = config
         self._analyzers = []
+        # The window of each analyzer, in the same order, or None.
+        self._windows = []
+        self.history = None
         # Create comparators from config object
         for metric_name, metric_configs in self._config.items():
             # creates a constant_health_analyzer object for each field
@@ -65,6 +75,21 @@ class HealthChecker(object):
                 comparer = self.COMPARER_CONSTRUCTOR[compare_type](field_name,
                                                                    constant)
                 self._analyzers.append((metric_name, comparer))
+                self._windows.append(metric_configs[field_name].get('window'))
+
+    def _is_healthy_over_window(self, metric, analyzer, window):
+        """Checks whether a metric was unhealthy for a whole window.
+
+        Returns:
+          False if the history of the metric spans the window and every
+          sample in it is unhealthy, True otherwise.
+        """
+        series = self.history.get(metric)
+        if series is None or not series.covers(window):
+            return True
+        return any(
+            analyzer.is_healthy(response)
+            for _, response in series.window(window))
 
     def get_unhealthy(self, response_dict):
         """Calls comparators to check if metrics are healthy
@@ -79,10 +104,17 @@ class HealthChecker(object):
         """
         # loop through and check if healthy
         unhealthy_metrics = []
-        for (metric, analyzer) in self._analyzers:
+        for (metric, analyzer), window in zip(self._analyzers, self._windows):
+            if self.history is not None and metric not in response_dict:
+                continue
             try:
+                if window and self.history is not None:
+                    healthy = self._is_healthy_over_window(
+                        metric, analyzer, window)
+                else:
+                    healthy = analyzer.is_healthy(response_dict[metric])
                 # if not healthy, add to list so value can be reported
-                if not analyzer.is_healthy(response_dict[metric]):
+                if not healthy:
                     unhealthy_metrics.append(metric)
             # don't exit whole program if error in config file, just report
             except KeyError as e:
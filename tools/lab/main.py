@@ -21,11 +21,13 @@ from __future__ import print_function
 import argparse
 import json
 import os
+import signal
 import sys
 
 import health_checker
 from metrics.adb_hash_metric import AdbHashMetric
 from metrics.cpu_metric import CpuMetric
+from metrics.device_metric import DeviceMetric
 from metrics.disk_metric import DiskMetric
 from metrics.name_metric import NameMetric
 from metrics.network_metric import NetworkMetric
@@ -44,15 +46,20 @@ from metrics.version_metric import FastbootVersionMetric
 from metrics.version_metric import KernelVersionMetric
 from metrics.version_metric import PythonVersionMetric
 from metrics.zombie_metric import ZombieMetric
+from reporters.json_lines_reporter import JsonLinesReporter
 from reporters.json_reporter import JsonReporter
 from reporters.logger_reporter import LoggerReporter
+from runner import ContinuousRunner
 from runner import InstantRunner
 
 
 class RunnerFactory(object):
     _reporter_constructor = {
         'logger': lambda param, output: [LoggerReporter(param)],
-        'json': lambda param, output: [JsonReporter(param, output)]
+        'json': lambda param, output: [JsonReporter(param, output)],
+        'json_lines': lambda param, output: [
+            JsonLinesReporter(param, os.path.splitext(output)[0] + '.jsonl')
+        ]
     }
 
     _metric_constructor = {
@@ -61,6 +68,7 @@ class RunnerFactory(object):
         'uptime': lambda param: [UptimeMetric()],
         'verify_devices':
             lambda param: [VerifyMetric(), AdbHashMetric()],
+        'devices': lambda param: [DeviceMetric()],
         'ram': lambda param: [RamMetric()],
         'cpu': lambda param: [CpuMetric()],
         'network': lambda param: [NetworkMetric(param)],
@@ -68,6 +76,7 @@ class RunnerFactory(object):
         'all': lambda param: [AdbHashMetric(),
                               AdbVersionMetric(),
                               CpuMetric(),
+                              DeviceMetric(),
                               DiskMetric(),
                               FastbootVersionMetric(),
                               KernelVersionMetric(),
@@ -110,6 +119,11 @@ class RunnerFactory(object):
         # Get output file path, if specified
         # If not specified, default to 'output.json'
         output_file = arg_dict.pop('output', 'output.json')
+        # Run continuously instead of once, if specified
+        daemon = arg_dict.pop('daemon', None)
+        interval = arg_dict.pop('interval', ContinuousRunner.DEFAULT_INTERVAL)
+        history_size = arg_dict.pop('history',
+                                    ContinuousRunner.DEFAULT_HISTORY_SIZE)
 
         try:
             with open(config_file) as json_data:
@@ -135,6 +149,13 @@ class RunnerFactory(object):
             if val is not None:
                 metrics += cls._metric_constructor[key](val)
 
+        if daemon:
+            runner = ContinuousRunner(
+                metrics, reporters, interval=interval,
+                history_size=history_size)
+            # Let the health rules with a window look at the past samples.
+            checker.history = runner.history
+            return runner
         return InstantRunner(metrics, reporters)
 
 
@@ -187,10 +208,17 @@ def _argparse():
         help=('verify all devices connected are in \'device\' mode, '
               'environment variables set properly, '
               'and hash of directory is correct'))
+    parser.add_argument(
+        '-dv',
+        '--devices',
+        action='store_true',
+        default=None,
+        help=('display the state, USB id and processes of each device '
+              'attached, by serial'))
     parser.add_argument(
         '-r',
         '--reporter',
-        choices=['logger', 'json'],
+        choices=['logger', 'json', 'json_lines'],
         nargs='+',
         help='choose the reporting method needed')
     parser.add_argument(
@@ -232,6 +260,27 @@ def _argparse():
         metavar="<PATH>",
         help='Path to where output file will be written, if applicable,'
         ' defaults to `output.json`')
+    parser.add_argument(
+        '-D',
+        '--daemon',
+        action='store_true',
+        default=None,
+        help='Keep running, gathering each metric at its own interval. Use '
+        'with the json_lines reporter to keep a record of every sample')
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=ContinuousRunner.DEFAULT_INTERVAL,
+        metavar='<SECONDS>',
+        help='In daemon mode, the time between two samples of the metrics '
+        'which do not set their own interval, defaults to %(default)s')
+    parser.add_argument(
+        '--history',
+        type=int,
+        default=ContinuousRunner.DEFAULT_HISTORY_SIZE,
+        metavar='<SAMPLES>',
+        help='In daemon mode, the number of samples of each metric kept in '
+        'memory for the health rules with a window, defaults to %(default)s')
 
     return parser
 
@@ -244,7 +293,14 @@ def main():
         sys.exit(1)
 
     r = RunnerFactory().create(vars(parser.parse_args()))
-    r.run()
+    if isinstance(r, ContinuousRunner):
+        signal.signal(signal.SIGTERM, lambda signum, frame: r.stop())
+        try:
+            r.run()
+        except KeyboardInterrupt:
+            r.stop()
+    else:
+        r.run()
 
 
 if __name__ == '__main__':
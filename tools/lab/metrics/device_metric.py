@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from metrics.metric import Metric
+
+
+class DeviceMetric(Metric):
+    """Gathers the health of each device attached to the host, by serial."""
+    # Fields for response dictionary
+    DEVICES = 'devices'
+    NUM_UNHEALTHY = 'num_unhealthy'
+    # Fields for each device
+    STATE = 'state'
+    USB_ID = 'usb_id'
+    ZOMBIES = 'zombies'
+    PROCESSES = 'processes'
+    # States of healthy devices, from adb and fastboot.
+    HEALTHY_STATES = ('device', 'fastboot')
+
+    def gather_metric(self):
+        """Combines the inventory of the host into one entry per device.
+
+        Returns:
+            A dict with the following fields:
+              devices: a dict mapping the serial of every device listed by adb
+                or fastboot to a dict of its state, usb_id ('bus:device' as
+                in UsbMetric, or None if unknown), zombies (the number of
+                zombie processes given its serial) and processes (the number
+                of other processes given its serial).
+              num_unhealthy: the number of devices which are not in a
+                healthy state or have zombie processes.
+        """
+        inventory = self.get_inventory()
+        usb_ids = inventory.get_usb_ids()
+        processes = inventory.get_processes_by_serial()
+
+        devices = {}
+        for serial, state in (inventory.get_adb_devices() +
+                              inventory.get_fastboot_devices()):
+            serial_processes = processes.get(serial, [])
+            zombies = len([p for p in serial_processes if p.is_zombie])
+            devices[serial] = {
+                self.STATE: state,
+                self.USB_ID: usb_ids.get(serial),
+                self.ZOMBIES: zombies,
+                self.PROCESSES: len(serial_processes) - zombies
+            }
+
+        num_unhealthy = len([
+            device for device in devices.values()
+            if device[self.STATE] not in self.HEALTHY_STATES or
+            device[self.ZOMBIES]
+        ])
+        return {self.DEVICES: devices, self.NUM_UNHEALTHY: num_unhealthy}
@@ -14,6 +14,7 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from utils import device_inventory
 from utils import job
 from utils import shell
 
@@ -23,10 +24,31 @@ class Metric(object):
 
     Attributes:
         _shell: a shell.ShellCommand object
+        inventory: the device_inventory.DeviceInventory shared by the
+          metrics of a round, set by the runner before gather_metric is
+          called, or None.
+        TIMEOUT: the number of seconds a runner waits for gather_metric, or
+          None for the default timeout of the runner.
+        INTERVAL: the number of seconds between two samples of the metric
+          in continuous mode, or None for the default interval of the
+          runner.
     """
+    TIMEOUT = None
+    INTERVAL = None
 
-    def __init__(self, shell=shell.ShellCommand(job)):
+    def __init__(self, shell=shell.ShellCommand(job), inventory=None):
         self._shell = shell
+        self.inventory = inventory
+
+    def get_inventory(self):
+        """Returns the inventory of this round.
+
+        A metric gathered on its own, without a runner setting its inventory,
+        reads a new inventory with its shell.
+        """
+        if self.inventory is None:
+            return device_inventory.DeviceInventory(self._shell)
+        return self.inventory
 
     def gather_metric(self):
         """Gathers all values that this metric watches.
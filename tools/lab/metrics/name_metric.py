@@ -18,6 +18,8 @@ from metrics.metric import Metric
 
 
 class NameMetric(Metric):
+    # The hostname does not change while running.
+    INTERVAL = 3600
     COMMAND = 'hostname'
     # Fields for response dictionary
     NAME = 'name'
@@ -24,6 +24,9 @@ class ReadMetric(Metric):
     Attributes:
       NUM_RUNS: number of times hdparm is run
     """
+    # Runs hdparm for about 50 seconds, which loads the disk.
+    TIMEOUT = 120
+    INTERVAL = 3600
     NUM_RUNS = 3
     COMMAND = 'for i in {1..%s}; do hdparm -Tt /dev/sda; done'
     # Fields for response dictionary
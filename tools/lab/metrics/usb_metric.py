@@ -14,27 +14,28 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import io
+import errno
+import logging
 import os
+import select
 import subprocess
-import logging
-import sys
+import threading
+import time
 
 from metrics.metric import Metric
 from utils import job
-from utils import time_limit
-
-
-def _get_output(stdout):
-    if sys.version_info[0] == 2:
-        return iter(stdout.readline, '')
-    else:
-        return io.TextIOWrapper(stdout, encoding="utf-8")
+from utils import usbmon
 
 
 class UsbMetric(Metric):
     """Class to determine all USB Device traffic over a timeframe."""
-    USB_IO_COMMAND = 'cat /sys/kernel/debug/usb/usbmon/0u | grep -v \'S Ci\''
+    USB_IO_COMMAND = ['cat', '/sys/kernel/debug/usb/usbmon/0u']
+    # The binary interface of all busses, used when it exists since it is
+    # much cheaper to parse than the text one.
+    USBMON_DEVICE = '/dev/usbmon0'
+    READ_SIZE = 64 * 1024
+    # Seconds of traffic measured by gather_metric.
+    USAGE_TIME = 5
     USBMON_CHECK_COMMAND = 'grep usbmon /proc/modules'
     USBMON_INSTALL_COMMAND = 'modprobe usbmon'
     DEVICES = 'devices'
@@ -65,12 +66,77 @@ class UsbMetric(Metric):
             except job.Error as error:
                 raise job.Error('Cannot load usbmon: %s' % error.result.stderr)
 
-    def get_bytes(self, time=5):
+    def read_text(self, parser, duration):
+        """Feeds the usbmon text interface to a parser for a timeframe.
+
+        Since .../0u is a stream-file, it is read in chunks as they come
+        rather than line by line.
+        """
+        process = subprocess.Popen(
+            self.USB_IO_COMMAND,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+        # The stream never ends, so it is closed by killing the reader once
+        # the timeframe is over. A timer is used instead of a signal so that
+        # the metric can be gathered from any thread.
+        timer = threading.Timer(duration, process.kill)
+        timer.start()
+        try:
+            read = getattr(process.stdout, 'read1', process.stdout.read)
+            for chunk in iter(lambda: read(self.READ_SIZE), b''):
+                parser.feed(chunk)
+        finally:
+            timer.cancel()
+            process.kill()
+            process.wait()
+        parser.finish()
+
+    def read_binary(self, parser, duration):
+        """Feeds the usbmon binary interface to a parser for a timeframe.
+
+        Each read returns a single event, so events are read until none is
+        left before waiting for more, instead of waiting before every event.
+        """
+        end_time = time.time() + duration
+        fd = os.open(self.USBMON_DEVICE, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            while True:
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    parser.feed(os.read(fd, self.READ_SIZE))
+                except OSError as e:
+                    if e.errno != errno.EAGAIN:
+                        raise
+                    select.select([fd], [], [], remaining)
+        finally:
+            os.close(fd)
+        parser.finish()
+
+    def get_usage(self, time=5):
         """Gathers data about USB Busses in a given timeframe.
 
         When ran, must have super user privileges as well as having the module
-        'usbmon' installed. Since .../0u is a stream-file, we must read it in
-        as a stream in the off chance of reading in too much data to buffer.
+        'usbmon' installed.
+
+        Args:
+            time: The amount of time data will be gathered in seconds.
+
+        Returns:
+            A usbmon.UsbmonParser holding the bytes and URBs transferred by
+            each device in the timeframe.
+        """
+        if os.path.exists(self.USBMON_DEVICE):
+            parser = usbmon.BinaryParser()
+            self.read_binary(parser, time)
+        else:
+            parser = usbmon.TextParser()
+            self.read_text(parser, time)
+        return parser
+
+    def get_bytes(self, time=5):
+        """Gathers the bytes transferred by USB devices in a timeframe.
 
         Args:
             time: The amount of time data will be gathered in seconds.
@@ -79,30 +145,7 @@ class UsbMetric(Metric):
             A dictionary where the key is the device's bus and device number,
             and value is the amount of bytes transferred in the timeframe.
         """
-        bytes_sent = {}
-        with time_limit.TimeLimit(time):
-            # Lines matching 'S Ci' do not match output, and only 4 bytes/sec
-            process = subprocess.Popen(
-                self.USB_IO_COMMAND,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                shell=True)
-
-            for line in _get_output(process.stdout):
-                spl_line = line.split(' ')
-                # Example line                  spl_line[3]   " "[5]
-                # ffff88080bb00780 2452973093 C Ii:2:003:1 0:8 8 = 00000000
-
-                # Splits from whole line, into Ii:2:003:1, and then cuts it
-                # down to 2:003, this is for consistency as keys in dicts.
-                dev_id = ':'.join(spl_line[3].split(':')[1:3])
-                if dev_id in bytes_sent:
-                    # spl_line[5] is the number of bytes transferred from a
-                    # device, in the example line, spl_line[5] == 8
-                    bytes_sent[dev_id] += int(spl_line[5])
-                else:
-                    bytes_sent[dev_id] = int(spl_line[5])
-        return bytes_sent
+        return self.get_usage(time).get_bytes()
 
     def match_device_id(self):
         """ Matches a device's id with its name according to lsusb.
@@ -129,7 +172,11 @@ class UsbMetric(Metric):
                 devices[dev_id] = dev_name
         return devices
 
-    def gen_output(self, dev_name_dict, dev_byte_dict):
+    def gen_output(self,
+                   dev_name_dict,
+                   dev_byte_dict,
+                   dev_urb_dict=None,
+                   time=None):
         """ Combines all information about device for returning.
 
         Args:
@@ -137,16 +184,19 @@ class UsbMetric(Metric):
             0's stripped from bus, and value as the device's name.
             dev_byte_dict: A dictionary with the key as 'bus:device', leading
             0's stripped from bus, and value as the number of bytes transferred.
+            dev_urb_dict: A dictionary with the same keys, and value as the
+            number of URBs completed.
+            time: The timeframe in seconds, to compute rates with.
         Returns:
             List of populated Device objects.
         """
+        dev_urb_dict = dev_urb_dict or {}
         devices = []
         for dev in dev_name_dict:
-            if dev in dev_byte_dict:
-                devices.append(
-                    Device(dev, dev_byte_dict[dev], dev_name_dict[dev]))
-            else:
-                devices.append(Device(dev, 0, dev_name_dict[dev]))
+            devices.append(
+                Device(dev,
+                       dev_byte_dict.get(dev, 0), dev_name_dict[dev],
+                       dev_urb_dict.get(dev, 0), time))
         return devices
 
     def gather_metric(self):
@@ -159,11 +209,15 @@ class UsbMetric(Metric):
         """
         if self.is_privileged():
             self.check_usbmon()
-            dev_byte_dict = self.get_bytes()
+            usage = self.get_usage(self.USAGE_TIME)
             dev_name_dict = self.match_device_id()
-            return {
-                self.DEVICES: self.gen_output(dev_name_dict, dev_byte_dict)
-            }
+            devices = self.gen_output(dev_name_dict, usage.get_bytes(),
+                                      usage.get_urbs(), self.USAGE_TIME)
+            serials = dict((usb_id, serial) for serial, usb_id in
+                           self.get_inventory().get_usb_ids().items())
+            for device in devices:
+                device.serial = serials.get(device.dev_id)
+            return {self.DEVICES: devices}
         else:
             return {self.DEVICES: None}
 
@@ -177,15 +231,26 @@ class Device:
         dev_id: The device id, usuall in form BUS:DEVICE
         trans_bytes: The number of bytes transferred in timeframe.
         name: The device's name according to lsusb.
+        urbs: The number of URBs completed in timeframe.
+        byte_rate: Bytes transferred per second, None if the timeframe is
+          unknown.
+        urb_rate: URBs completed per second, None if the timeframe is
+          unknown.
+        serial: The device's serial, None if it has none or is unknown.
     """
 
-    def __init__(self, dev_id, trans_bytes, name):
+    def __init__(self, dev_id, trans_bytes, name, urbs=0, time=None):
         self.dev_id = dev_id
         self.trans_bytes = trans_bytes
         self.name = name
+        self.urbs = urbs
+        self.byte_rate = float(trans_bytes) / time if time else None
+        self.urb_rate = float(urbs) / time if time else None
+        self.serial = None
 
     def __eq__(self, other):
         return isinstance(other, Device) and \
                self.dev_id == other.dev_id and \
                self.trans_bytes == other.trans_bytes and \
-               self.name == other.name
+               self.name == other.name and \
+               self.urbs == other.urbs
@@ -19,7 +19,6 @@ from metrics.metric import Metric
 
 class VerifyMetric(Metric):
     """Gathers the information of connected devices via ADB"""
-    COMMAND = r"adb devices | sed '1d;$d'"
     UNAUTHORIZED = 'unauthorized'
     OFFLINE = 'offline'
     RECOVERY = 'recovery'
@@ -46,28 +45,17 @@ class VerifyMetric(Metric):
         question_list = list()
         device_list = list()
 
-        # Delete first and last line of output of adb.
-        output = self._shell.run(self.COMMAND).stdout
-
-        # Example Line, Device Serial Num TAB Phone Status
-        # 00bd977c7f504caf	offline
-        if output:
-            for line in output.split('\n'):
-                spl_line = line.split('\t')
-                # spl_line[0] is serial, [1] is status. See example line.
-                phone_sn = spl_line[0]
-                phone_state = spl_line[1]
-
-                if phone_state == 'device':
-                    device_list.append(phone_sn)
-                elif phone_state == 'unauthorized':
-                    unauth_list.append(phone_sn)
-                elif phone_state == 'recovery':
-                    recovery_list.append(phone_sn)
-                elif '?' in phone_state:
-                    question_list.append(phone_sn)
-                elif phone_state == 'offline':
-                    offline_list.append(phone_sn)
+        for phone_sn, phone_state in self.get_inventory().get_adb_devices():
+            if phone_state == 'device':
+                device_list.append(phone_sn)
+            elif phone_state == 'unauthorized':
+                unauth_list.append(phone_sn)
+            elif phone_state == 'recovery':
+                recovery_list.append(phone_sn)
+            elif '?' in phone_state:
+                question_list.append(phone_sn)
+            elif phone_state == 'offline':
+                offline_list.append(phone_sn)
 
         return {
             self.UNAUTHORIZED:
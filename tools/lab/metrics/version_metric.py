@@ -18,6 +18,8 @@ from metrics.metric import Metric
 
 
 class FastbootVersionMetric(Metric):
+    # The versions only change when the host is updated.
+    INTERVAL = 3600
 
     FASTBOOT_COMMAND = 'fastboot --version'
     FASTBOOT_VERSION = 'fastboot_version'
@@ -50,6 +52,8 @@ class FastbootVersionMetric(Metric):
 
 
 class AdbVersionMetric(Metric):
+    # The versions only change when the host is updated.
+    INTERVAL = 3600
 
     ADB_COMMAND = 'adb version'
     ADB_VERSION = 'adb_version'
@@ -80,6 +84,8 @@ class AdbVersionMetric(Metric):
 
 
 class PythonVersionMetric(Metric):
+    # The versions only change when the host is updated.
+    INTERVAL = 3600
 
     PYTHON_COMMAND = 'python -V 2>&1'
     PYTHON_VERSION = 'python_version'
@@ -101,6 +107,8 @@ class PythonVersionMetric(Metric):
 
 
 class KernelVersionMetric(Metric):
+    # The versions only change when the host is updated.
+    INTERVAL = 3600
 
     KERNEL_COMMAND = 'uname -r'
     KERNEL_RELEASE = 'kernel_release'
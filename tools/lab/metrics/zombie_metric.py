@@ -18,7 +18,6 @@ from metrics.metric import Metric
 
 
 class ZombieMetric(Metric):
-    COMMAND = 'ps -eo pid,stat,comm,args | awk \'$2~/^Z/ { print }\''
     ADB_ZOMBIES = 'adb_zombies'
     NUM_ADB_ZOMBIES = 'num_adb_zombies'
     FASTBOOT_ZOMBIES = 'fastboot_zombies'
@@ -37,33 +36,16 @@ class ZombieMetric(Metric):
             representing the number of entries in the respective list
         """
         adb_zombies, fastboot_zombies, other_zombies = [], [], []
-        result = self._shell.run(self.COMMAND).stdout
-        # Example stdout:
-        # 30797 Z+   adb <defunct> adb -s AHDLSERIAL0001
-        # 30798 Z+   adb <defunct> /usr/bin/adb
-
-        output = result.splitlines()
-        for ln in output:
-            # spl_ln looks like ['1xx', 'Z+', 'adb', '<defunct'>, ...]
-            spl_ln = ln.split()
-            pid, state, name = spl_ln[:3]
-
-            if '-s' in spl_ln:
-                # Finds the '-s' flag, the index after that is the serial.
-                sn_idx = spl_ln.index('-s')
-                if sn_idx + 1 >= len(spl_ln):
-                    sn = None
-                else:
-                    sn = spl_ln[sn_idx + 1]
-                zombie = sn
-            else:
-                zombie = None
-            if 'adb' in ln:
-                adb_zombies.append(zombie)
-            elif 'fastboot' in ln:
-                fastboot_zombies.append(zombie)
+        for process in self.get_inventory().get_processes():
+            if not process.is_zombie:
+                continue
+            command = '%s %s' % (process.name, process.args)
+            if 'adb' in command:
+                adb_zombies.append(process.serial)
+            elif 'fastboot' in command:
+                fastboot_zombies.append(process.serial)
             else:
-                other_zombies.append(pid)
+                other_zombies.append(process.pid)
 
         return {
             self.ADB_ZOMBIES: adb_zombies,
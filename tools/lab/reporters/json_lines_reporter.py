@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import time
+
+from reporters.json_reporter import AutoJsonEncoder
+from reporters.reporter import Reporter
+
+
+class JsonLinesReporter(Reporter):
+    """Reporter class that appends each report to a file as one JSON line.
+
+    Unlike JsonReporter, which overwrites its file, every report is added as
+    a compact record at the end of the file, so that the file holds the time
+    series of the metrics gathered by a runner.ContinuousRunner. Each line
+    is an object with the fields:
+      time: the time of the report in seconds since the epoch
+      metrics: the responses of the metrics gathered
+      unhealthy: the names of the unhealthy metrics
+
+    Attributes:
+      health_checker: a HealthChecker object
+      file_name: Path of file to append to.
+    """
+
+    def __init__(self, h_checker, file_name='output.jsonl'):
+        super(JsonLinesReporter, self).__init__(h_checker)
+        self.file_name = file_name
+
+    def report(self, metric_responses):
+        record = {
+            'time': time.time(),
+            'metrics': metric_responses,
+            'unhealthy': sorted(
+                set(self.health_checker.get_unhealthy(metric_responses)))
+        }
+        line = json.dumps(
+            record, cls=AutoJsonEncoder, separators=(',', ':'),
+            sort_keys=True)
+        with open(self.file_name, 'a') as outfile:
+            outfile.write(line + '\n')
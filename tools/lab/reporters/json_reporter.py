@@ -57,7 +57,11 @@ class AutoJsonEncoder(json.JSONEncoder):
             return {
                 'name': obj.name,
                 'trans_bytes': obj.trans_bytes,
-                'dev_id': obj.dev_id
+                'dev_id': obj.dev_id,
+                'serial': obj.serial,
+                'urbs': obj.urbs,
+                'byte_rate': obj.byte_rate,
+                'urb_rate': obj.urb_rate
             }
         else:
             return json.JSONEncoder.default(self, obj)
@@ -20,6 +20,10 @@ from reporters.reporter import Reporter
 
 
 class LoggerReporter(Reporter):
+    # The handler writing to the log file, added to the logger only once so
+    # that repeated reports do not write every line several times.
+    _handler = None
+
     def report(self, metric_responses):
         # Extra formatter options.
         extra = {
@@ -33,13 +37,16 @@ class LoggerReporter(Reporter):
         # Stop logger from print to stdout.
         logger.propagate = False
 
-        handler = logging.FileHandler('lab_health.log')
-        handler.setLevel(logging.INFO)
+        if LoggerReporter._handler is None:
+            handler = logging.FileHandler('lab_health.log')
+            handler.setLevel(logging.INFO)
 
-        formatter = logging.Formatter(
-            '%(asctime)s: %(metric_name)s (%(response_key)s %(response_val)s)')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+            formatter = logging.Formatter(
+                '%(asctime)s: %(metric_name)s '
+                '(%(response_key)s %(response_val)s)')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+            LoggerReporter._handler = handler
 
         logger = logging.LoggerAdapter(logger, extra)
         # add the handlers to the logger
@@ -13,7 +13,15 @@
 #   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
+import collections
+import heapq
+import logging
 import re
+import threading
+import time
+
+from utils import device_inventory
+from utils import time_series
 
 # Handles edge case of acronyms then another word, eg. CPUMetric -> CPU_Metric
 # or lower camel case, cpuMetric -> cpu_Metric.
@@ -22,7 +30,7 @@ first_cap_re = re.compile('(.)([A-Z][a-z]+)')
 all_cap_re = re.compile('([a-z0-9])([A-Z])')
 
 
-class Runner:
+class Runner(object):
     """Calls metrics and passes response to reporters.
 
     Attributes:
@@ -41,6 +49,31 @@ class Runner:
 
 
 class InstantRunner(Runner):
+    """Gathers all metrics concurrently, then passes them to reporters.
+
+    Every metric is gathered in its own thread, so a run takes about as long
+    as the slowest metric instead of the sum of all of them. Metrics that
+    fail or do not finish within their timeout are left out of the
+    responses.
+
+    Attributes:
+        timeout: the number of seconds to wait for a metric without a
+          TIMEOUT of its own.
+        timings: a dict mapping the name of each metric that finished to the
+          number of seconds gather_metric took.
+        errors: a dict mapping the name of each metric that failed or timed
+          out to a description of the error.
+    """
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(self, metric_list, reporter_list, timeout=DEFAULT_TIMEOUT):
+        super(InstantRunner, self).__init__(metric_list, reporter_list)
+        self.timeout = timeout
+        self.timings = {}
+        self.errors = {}
+        # The threads of the metrics that are being gathered, by name.
+        self._threads = {}
+
     def convert_to_snake(self, name):
         """Converts a CamelCaseName to snake_case_name
 
@@ -52,12 +85,170 @@ class InstantRunner(Runner):
         temp_str = first_cap_re.sub(r'\1_\2', name)
         return all_cap_re.sub(r'\1_\2', temp_str).lower()
 
+    def get_name(self, metric):
+        """Returns the name of a metric in the responses, e.g. 'usb'."""
+        # [:-7] removes the ending '_metric'.
+        return self.convert_to_snake(metric.__class__.__name__)[:-7]
+
+    def _gather(self, key_name, metric, responses, timings, errors):
+        """Gathers one metric, storing its response and timing.
+
+        The results are stored in dicts of the gather call that started the
+        metric, so a metric finishing after its timeout changes nothing.
+        """
+        start_time = time.time()
+        try:
+            responses[key_name] = metric.gather_metric()
+        except Exception as e:
+            logging.exception('Failed to gather %s', key_name)
+            errors[key_name] = repr(e)
+        timings[key_name] = time.time() - start_time
+
+    def gather(self, metrics):
+        """Gathers metrics concurrently.
+
+        A metric that is still being gathered from a previous call, because
+        it timed out, is not started again. The metrics started share a new
+        device inventory, so that the devices and processes of the host are
+        listed once for all of them.
+
+        Args:
+            metrics: a list of metric objects.
+
+        Returns:
+            A dict mapping the name of each metric gathered in time to its
+            response.
+        """
+        gathered = {}
+        timings = {}
+        errors = {}
+        threads = []
+        inventory = device_inventory.DeviceInventory()
+        start_time = time.time()
+        for metric in metrics:
+            key_name = self.get_name(metric)
+            previous = self._threads.get(key_name)
+            if previous and previous.is_alive():
+                self.errors[key_name] = 'Still running from a previous run'
+                continue
+            metric.inventory = inventory
+            thread = threading.Thread(
+                target=self._gather,
+                args=(key_name, metric, gathered, timings, errors))
+            # A metric that never returns must not keep the program running.
+            thread.daemon = True
+            thread.start()
+            self._threads[key_name] = thread
+            threads.append((key_name, metric, thread))
+
+        responses = {}
+        for key_name, metric, thread in threads:
+            timeout = metric.TIMEOUT or self.timeout
+            thread.join(max(start_time + timeout - time.time(), 0))
+            if thread.is_alive():
+                logging.error('%s did not finish within %s seconds', key_name,
+                              timeout)
+                self.errors[key_name] = 'Timed out after %s seconds' % timeout
+                continue
+            self.timings[key_name] = timings[key_name]
+            if key_name in errors:
+                self.errors[key_name] = errors[key_name]
+            elif key_name in gathered:
+                responses[key_name] = gathered[key_name]
+        logging.debug('Gathered metrics in %.2fs: %s',
+                      time.time() - start_time, self.timings)
+        return responses
+
     def run(self):
         """Calls all metrics, passes responses to reporters."""
-        responses = {}
-        for metric in self.metric_list:
-            # [:-7] removes the ending '_metric'.
-            key_name = self.convert_to_snake(metric.__class__.__name__)[:-7]
-            responses[key_name] = metric.gather_metric()
+        self.timings = {}
+        self.errors = {}
+        responses = self.gather(self.metric_list)
         for reporter in self.reporter_list:
             reporter.report(responses)
+
+
+class ContinuousRunner(InstantRunner):
+    """Gathers each metric at its own interval until stopped.
+
+    Each round gathers the metrics that are due, adds their responses to the
+    history and passes only those responses to the reporters, so that
+    reporters writing records append only the new samples. Between rounds
+    the runner sleeps until the next metric is due.
+
+    Attributes:
+        interval: the number of seconds between two samples of a metric
+          without an INTERVAL of its own.
+        history: a dict mapping the name of each metric to a
+          time_series.TimeSeries of its last responses.
+    """
+    DEFAULT_INTERVAL = 60
+    # A day of samples at the default interval.
+    DEFAULT_HISTORY_SIZE = 1440
+
+    def __init__(self,
+                 metric_list,
+                 reporter_list,
+                 interval=DEFAULT_INTERVAL,
+                 history_size=DEFAULT_HISTORY_SIZE,
+                 timeout=InstantRunner.DEFAULT_TIMEOUT):
+        super(ContinuousRunner, self).__init__(metric_list, reporter_list,
+                                               timeout)
+        self.interval = interval
+        self.history = collections.defaultdict(
+            lambda: time_series.TimeSeries(history_size))
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Makes run return after the current round."""
+        self._stop_event.set()
+
+    def run(self, rounds=None):
+        """Gathers metrics and passes responses to reporters until stopped.
+
+        Args:
+            rounds: the number of rounds to run, or None to run until stop is
+              called.
+        """
+        # The heap holds the time each metric is next due, and its index in
+        # the metric list to break ties.
+        schedule = [(time.time(), index)
+                    for index in range(len(self.metric_list))]
+        heapq.heapify(schedule)
+        while schedule and rounds != 0:
+            if self._stop_event.wait(max(schedule[0][0] - time.time(), 0)):
+                break
+            now = time.time()
+            due = []
+            while schedule and schedule[0][0] <= now:
+                due_time, index = heapq.heappop(schedule)
+                metric = self.metric_list[index]
+                interval = metric.INTERVAL or self.interval
+                # Samples missed while the host was busy are skipped.
+                next_time = due_time + interval
+                if next_time <= now:
+                    next_time = now + interval
+                heapq.heappush(schedule, (next_time, index))
+                due.append(metric)
+            self.run_round(due, now)
+            if rounds is not None:
+                rounds -= 1
+
+    def run_round(self, metrics, now=None):
+        """Gathers metrics once, adds them to the history and reports them.
+
+        Args:
+            metrics: the metric objects to gather.
+            now: the time of the samples, defaults to the current time.
+        """
+        if now is None:
+            now = time.time()
+        responses = self.gather(metrics)
+        for key_name, response in responses.items():
+            self.history[key_name].append(now, response)
+        for reporter in self.reporter_list:
+            # Reporters may add fields to the responses, which must not
+            # change the history.
+            reporter.report(
+                dict((key_name, dict(response))
+                     for key_name, response in responses.items()))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import unittest
+
+from tests import fake
+from utils.device_inventory import DeviceInventory
+
+
+class DeviceInventoryTest(unittest.TestCase):
+    def test_get_adb_devices(self):
+        fake_result = fake.FakeResult(stdout='List of devices attached\n'
+                                      '00serial01\toffline\n'
+                                      '0regan0\tdevice\n'
+                                      '\n')
+        inventory = DeviceInventory(
+            shell=fake.MockShellCommand(fake_result=fake_result))
+        self.assertEqual(inventory.get_adb_devices(),
+                         [('00serial01', 'offline'), ('0regan0', 'device')])
+
+    def test_get_fastboot_devices(self):
+        fake_result = fake.FakeResult(stdout='FA6BM0305019\tfastboot\n')
+        inventory = DeviceInventory(
+            shell=fake.MockShellCommand(fake_result=fake_result))
+        self.assertEqual(inventory.get_fastboot_devices(),
+                         [('FA6BM0305019', 'fastboot')])
+
+    def test_get_usb_ids(self):
+        fake_result = fake.FakeResult(
+            stdout='/sys/bus/usb/devices/3-4/busnum:3\n'
+            '/sys/bus/usb/devices/3-4/devnum:12\n'
+            '/sys/bus/usb/devices/3-4/serial:0regan0\n'
+            '/sys/bus/usb/devices/usb3/busnum:3\n'
+            '/sys/bus/usb/devices/usb3/devnum:1\n'
+            '/sys/bus/usb/devices/usb3/serial:0000:00:14.0\n'
+            '/sys/bus/usb/devices/3-5/busnum:3\n'
+            '/sys/bus/usb/devices/3-5/devnum:13\n')
+        inventory = DeviceInventory(
+            shell=fake.MockShellCommand(fake_result=fake_result))
+        self.assertEqual(inventory.get_usb_ids(), {
+            '0regan0': '3:012',
+            '0000:00:14.0': '3:001'
+        })
+
+    def test_get_processes(self):
+        fake_result = fake.FakeResult(
+            stdout='30797 Z+   86402 adb <defunct>\n'
+            '30798 Sl     120 adb adb -s 0regan0 shell\n'
+            '30799 S        5 fastboot\n')
+        inventory = DeviceInventory(
+            shell=fake.MockShellCommand(fake_result=fake_result))
+        processes = inventory.get_processes()
+
+        self.assertEqual([p.pid for p in processes],
+                         ['30797', '30798', '30799'])
+        self.assertEqual([p.is_zombie for p in processes],
+                         [True, False, False])
+        self.assertEqual([p.elapsed for p in processes], [86402, 120, 5])
+        self.assertEqual([p.serial for p in processes],
+                         [None, '0regan0', None])
+        self.assertEqual(processes[2].args, '')
+        self.assertEqual(
+            dict(inventory.get_processes_by_serial()),
+            {'0regan0': [processes[1]]})
+
+    def test_sources_are_read_once(self):
+        fake_result = fake.FakeResult(stdout='0regan0\tdevice')
+        fake_shell = fake.MockShellCommand(fake_result=[fake_result])
+        inventory = DeviceInventory(shell=fake_shell)
+        threads = [
+            threading.Thread(target=inventory.get_adb_devices)
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # The fake shell raises IndexError if it is run more than once.
+        self.assertEqual(inventory.get_adb_devices(), [('0regan0', 'device')])
+        self.assertEqual(fake_shell._counter, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
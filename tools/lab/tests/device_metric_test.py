@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from metrics.device_metric import DeviceMetric
+from tests import fake
+
+
+class DeviceMetricTest(unittest.TestCase):
+    def test_gather_metric(self):
+        fake_results = [
+            # The USB devices
+            fake.FakeResult(stdout='/sys/bus/usb/devices/3-4/busnum:3\n'
+                            '/sys/bus/usb/devices/3-4/devnum:12\n'
+                            '/sys/bus/usb/devices/3-4/serial:0regan0\n'),
+            # The processes
+            fake.FakeResult(stdout='1 Z+ 60 adb adb -s 00serial01\n'
+                            '2 S 60 adb adb -s 0regan0 logcat\n'
+                            '3 S 60 adb adb -s 0regan0 shell\n'),
+            # adb devices
+            fake.FakeResult(stdout='List of devices attached\n'
+                            '00serial01\toffline\n'
+                            '0regan0\tdevice\n'),
+            # fastboot devices
+            fake.FakeResult(stdout='FA6BM0305019\tfastboot\n'),
+        ]
+        fake_shell = fake.MockShellCommand(fake_result=fake_results)
+        metric = DeviceMetric(shell=fake_shell)
+
+        self.assertEqual(metric.gather_metric(), {
+            DeviceMetric.DEVICES: {
+                '00serial01': {
+                    DeviceMetric.STATE: 'offline',
+                    DeviceMetric.USB_ID: None,
+                    DeviceMetric.ZOMBIES: 1,
+                    DeviceMetric.PROCESSES: 0
+                },
+                '0regan0': {
+                    DeviceMetric.STATE: 'device',
+                    DeviceMetric.USB_ID: '3:012',
+                    DeviceMetric.ZOMBIES: 0,
+                    DeviceMetric.PROCESSES: 2
+                },
+                'FA6BM0305019': {
+                    DeviceMetric.STATE: 'fastboot',
+                    DeviceMetric.USB_ID: None,
+                    DeviceMetric.ZOMBIES: 0,
+                    DeviceMetric.PROCESSES: 0
+                }
+            },
+            DeviceMetric.NUM_UNHEALTHY: 1
+        })
+
+    def test_gather_metric_no_devices(self):
+        fake_result = fake.FakeResult(stdout='')
+        metric = DeviceMetric(
+            shell=fake.MockShellCommand(fake_result=fake_result))
+
+        self.assertEqual(metric.gather_metric(), {
+            DeviceMetric.DEVICES: {},
+            DeviceMetric.NUM_UNHEALTHY: 0
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
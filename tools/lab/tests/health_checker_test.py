@@ -22,6 +22,7 @@ import unittest
 from health_checker import HealthChecker
 from health.constant_health_analyzer import HealthyIfGreaterThanConstantNumber
 from health.constant_health_analyzer import HealthyIfLessThanConstantNumber
+from utils.time_series import TimeSeries
 
 
 class HealthCheckerTestCase(unittest.TestCase):
@@ -205,5 +206,44 @@ class HealthCheckerTestCase(unittest.TestCase):
             self.fail('get_unhealthy did not internally handle %s' % error)
 
 
+    def test_get_unhealthy_over_window(self):
+        fake_config = {
+            'usb': {
+                'bytes': {
+                    'compare': 'GREATER_THAN',
+                    'constant': 100,
+                    'window': 300
+                }
+            }
+        }
+        checker = HealthChecker(fake_config)
+        checker.history = {'usb': TimeSeries(100)}
+        series = checker.history['usb']
+        series.append(0, {'bytes': 500})
+        for timestamp in range(60, 360, 60):
+            series.append(timestamp, {'bytes': 10})
+            # Unhealthy samples for less than the window are not reported.
+            self.assertEqual(checker.get_unhealthy({'usb': {'bytes': 10}}),
+                             [])
+        series.append(360, {'bytes': 10})
+        self.assertEqual(
+            checker.get_unhealthy({'usb': {'bytes': 10}}), ['usb'])
+
+    def test_get_unhealthy_skips_metrics_not_gathered_with_history(self):
+        fake_config = {
+            'DiskMetric': {
+                'avail': {
+                    'compare': 'GREATER_THAN',
+                    'constant': 50
+                }
+            }
+        }
+        checker = HealthChecker(fake_config)
+        checker.history = {}
+        with mock.patch('logging.warning') as warning:
+            self.assertEqual(checker.get_unhealthy({}), [])
+            self.assertFalse(warning.called)
+
+
 if __name__ == '__main__':
     unittest.main()
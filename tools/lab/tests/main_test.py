@@ -23,6 +23,7 @@ from health_checker import HealthChecker
 from metrics.usb_metric import UsbMetric
 from metrics.verify_metric import VerifyMetric
 from metrics.adb_hash_metric import AdbHashMetric
+from metrics.device_metric import DeviceMetric
 from reporters.logger_reporter import LoggerReporter
 
 
@@ -59,6 +60,11 @@ class RunnerFactoryTestCase(unittest.TestCase):
         self.assertIsInstance(run.metric_list[1], AdbHashMetric)
         self.assertEquals(len(run.metric_list), 2)
 
+    def test_devices(self):
+        run = RunnerFactory.create({'reporter': None, 'devices': True})
+        self.assertIsInstance(run.metric_list[0], DeviceMetric)
+        self.assertEquals(len(run.metric_list), 1)
+
     def test_invalid_config_file(self):
         with self.assertRaises(SystemExit):
             RunnerFactory.create({
@@ -18,42 +18,33 @@ import unittest
 
 from metrics import process_time_metric
 from tests import fake
-import mock
 
 
 class ProcessTimeMetricTest(unittest.TestCase):
-    def test_get_adb_fastboot_pids_only_adb(self):
-        fake_pids = {'adb': ['123', '456', '789'], 'fastboot': []}
-        fake_shell = fake.MockShellCommand(fake_pids=fake_pids)
+    def test_gather_metric_only_adb_fastboot(self):
+        fake_result = fake.FakeResult(
+            stdout='123 S 232893 adb adb -s SN1 shell\n'
+            '456 S 232893 bash bash -c adb -s SN2 shell\n'
+            '789 S 232893 fastboot fastboot -s SN3 -w')
+        fake_shell = fake.MockShellCommand(fake_result=fake_result)
         metric_obj = process_time_metric.ProcessTimeMetric(shell=fake_shell)
-        self.assertEqual(metric_obj.get_adb_fastboot_pids(), fake_pids['adb'])
-
-    def test_get_adb_fastboot_pids_only_fastboot(self):
-        fake_pids = {'adb': [], 'fastboot': ['123', '456', '789']}
-        fake_shell = fake.MockShellCommand(fake_pids=fake_pids)
-
-        metric_obj = process_time_metric.ProcessTimeMetric(shell=fake_shell)
-        self.assertEqual(metric_obj.get_adb_fastboot_pids(),
-                         fake_pids['fastboot'])
-
-    def test_get_adb_fastboot_pids_both(self):
-        fake_pids = {
-            'adb': ['987', '654', '321'],
-            'fastboot': ['123', '456', '789']
+        expected_result = {
+            process_time_metric.ProcessTimeMetric.ADB_PROCESSES: ['SN1'],
+            process_time_metric.ProcessTimeMetric.NUM_ADB_PROCESSES:
+            1,
+            process_time_metric.ProcessTimeMetric.FASTBOOT_PROCESSES:
+            ['SN3'],
+            process_time_metric.ProcessTimeMetric.NUM_FASTBOOT_PROCESSES:
+            1
         }
-        fake_shell = fake.MockShellCommand(fake_pids=fake_pids)
-        metric_obj = process_time_metric.ProcessTimeMetric(shell=fake_shell)
-        self.assertEqual(metric_obj.get_adb_fastboot_pids(),
-                         fake_pids['adb'] + fake_pids['fastboot'])
+
+        self.assertEqual(metric_obj.gather_metric(), expected_result)
 
     def test_gather_metric_returns_only_older_times(self):
-        fake_result = [
-            fake.FakeResult(stdout='1234 other command'),
-            fake.FakeResult(stdout='232893 fastboot -s FA6BM0305019 -w')
-        ]
-        fake_pids = {'adb': ['123'], 'fastboot': ['456']}
-        fake_shell = fake.MockShellCommand(
-            fake_pids=fake_pids, fake_result=fake_result)
+        fake_result = fake.FakeResult(
+            stdout='123 S 1234 adb other command\n'
+            '456 S 232893 fastboot fastboot -s FA6BM0305019 -w')
+        fake_shell = fake.MockShellCommand(fake_result=fake_result)
         metric_obj = process_time_metric.ProcessTimeMetric(shell=fake_shell)
         expected_result = {
             process_time_metric.ProcessTimeMetric.ADB_PROCESSES: [],
@@ -68,15 +59,11 @@ class ProcessTimeMetricTest(unittest.TestCase):
         self.assertEqual(metric_obj.gather_metric(), expected_result)
 
     def test_gather_metric_returns_times_no_forkserver(self):
-        fake_result = [
-            fake.FakeResult(
-                stdout='198797 /usr/bin/adb -s FAKESN wait-for-device'),
-            fake.FakeResult(stdout='9999999 adb -s FAKESN2'),
-            fake.FakeResult(stdout='9999998 fork-server adb')
-        ]
-        fake_pids = {'adb': ['123', '456', '789'], 'fastboot': []}
-        fake_shell = fake.MockShellCommand(
-            fake_pids=fake_pids, fake_result=fake_result)
+        fake_result = fake.FakeResult(
+            stdout='123 S 198797 adb /usr/bin/adb -s FAKESN wait-for-device\n'
+            '456 S 9999999 adb adb -s FAKESN2\n'
+            '789 S 9999998 adb adb fork-server server')
+        fake_shell = fake.MockShellCommand(fake_result=fake_result)
         metric_obj = process_time_metric.ProcessTimeMetric(shell=fake_shell)
         expected_result = {
             process_time_metric.ProcessTimeMetric.ADB_PROCESSES:
@@ -90,6 +77,5 @@ class ProcessTimeMetricTest(unittest.TestCase):
 
         self.assertEqual(metric_obj.gather_metric(), expected_result)
 
-
 if __name__ == '__main__':
     unittest.main()
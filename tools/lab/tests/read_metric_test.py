@@ -17,6 +17,7 @@
 import unittest
 
 import mock
+from runner import InstantRunner
 from metrics import read_metric
 from tests import fake
 
@@ -72,6 +73,14 @@ class ReadMetricTest(unittest.TestCase):
         result = read_metric.ReadMetric().gather_metric()
         self.assertEquals(result, exp_res)
 
+    def test_timeout_covers_hdparm_runs(self):
+        # Each hdparm run takes about 18 seconds, longer than the default
+        # timeout of the runner for all the runs.
+        self.assertGreater(read_metric.ReadMetric.TIMEOUT,
+                           18 * read_metric.ReadMetric.NUM_RUNS)
+        self.assertGreater(read_metric.ReadMetric.TIMEOUT,
+                           InstantRunner.DEFAULT_TIMEOUT)
+
 
 if __name__ == '__main__':
     unittest.main()
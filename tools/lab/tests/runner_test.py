@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+#
+#   Copyright 2017 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import time
+import unittest
+
+from metrics.metric import Metric
+from runner import ContinuousRunner
+from runner import InstantRunner
+
+
+class SleepMetric(Metric):
+    def __init__(self, seconds):
+        super(SleepMetric, self).__init__()
+        self.seconds = seconds
+
+    def gather_metric(self):
+        time.sleep(self.seconds)
+        return {'slept': self.seconds}
+
+
+class OtherSleepMetric(SleepMetric):
+    pass
+
+
+class QuickTimeoutMetric(SleepMetric):
+    TIMEOUT = 0.1
+
+
+class CountMetric(Metric):
+    INTERVAL = .1
+
+    def __init__(self):
+        super(CountMetric, self).__init__()
+        self.count = 0
+
+    def gather_metric(self):
+        self.count += 1
+        return {'count': self.count}
+
+
+class SlowCountMetric(CountMetric):
+    INTERVAL = 10
+
+
+class FailingMetric(Metric):
+    def gather_metric(self):
+        raise ValueError('broken')
+
+
+class ListReporter(object):
+    def __init__(self):
+        self.reports = []
+
+    def report(self, responses):
+        self.reports.append(responses)
+
+
+class InstantRunnerTest(unittest.TestCase):
+    def test_metrics_run_concurrently(self):
+        reporter = ListReporter()
+        runner = InstantRunner([SleepMetric(.3), OtherSleepMetric(.3)],
+                               [reporter])
+        start_time = time.time()
+        runner.run()
+        self.assertLess(time.time() - start_time, .55)
+        self.assertEqual(reporter.reports, [{
+            'sleep': {'slept': .3},
+            'other_sleep': {'slept': .3}
+        }])
+        self.assertEqual(set(runner.timings), {'sleep', 'other_sleep'})
+        self.assertGreaterEqual(runner.timings['sleep'], .3)
+
+    def test_timed_out_metric_is_not_reported(self):
+        reporter = ListReporter()
+        runner = InstantRunner([SleepMetric(0), QuickTimeoutMetric(1)],
+                               [reporter])
+        start_time = time.time()
+        runner.run()
+        self.assertLess(time.time() - start_time, .5)
+        self.assertEqual(reporter.reports, [{'sleep': {'slept': 0}}])
+        self.assertIn('quick_timeout', runner.errors)
+
+    def test_runner_timeout(self):
+        runner = InstantRunner([SleepMetric(1)], [ListReporter()], timeout=.1)
+        runner.run()
+        self.assertEqual(list(runner.errors), ['sleep'])
+
+    def test_failed_metric_is_not_reported(self):
+        reporter = ListReporter()
+        runner = InstantRunner([SleepMetric(0), FailingMetric()], [reporter])
+        runner.run()
+        self.assertEqual(reporter.reports, [{'sleep': {'slept': 0}}])
+        self.assertIn('broken', runner.errors['failing'])
+
+    def test_timed_out_metric_does_not_change_later_runs(self):
+        runner = InstantRunner([QuickTimeoutMetric(.3)], [ListReporter()])
+        runner.run()
+        runner.metric_list = [SleepMetric(0)]
+        runner.run()
+        time.sleep(.4)
+        self.assertEqual(list(runner.timings), ['sleep'])
+        self.assertEqual(runner.errors, {})
+
+
+class ContinuousRunnerTest(unittest.TestCase):
+    def test_metrics_are_gathered_at_their_interval(self):
+        reporter = ListReporter()
+        runner = ContinuousRunner([CountMetric(), SlowCountMetric()],
+                                  [reporter])
+        start_time = time.time()
+        runner.run(rounds=3)
+        self.assertGreaterEqual(time.time() - start_time, .2)
+        self.assertEqual(reporter.reports, [{
+            'count': {'count': 1},
+            'slow_count': {'count': 1}
+        }, {
+            'count': {'count': 2}
+        }, {
+            'count': {'count': 3}
+        }])
+        self.assertEqual([sample[1] for sample in runner.history['count']],
+                         [{'count': 1}, {'count': 2}, {'count': 3}])
+
+    def test_history_is_bounded(self):
+        runner = ContinuousRunner([CountMetric()], [], history_size=2)
+        for _ in range(5):
+            runner.run_round(runner.metric_list)
+        self.assertEqual([sample[1] for sample in runner.history['count']],
+                         [{'count': 4}, {'count': 5}])
+
+    def test_reporters_do_not_change_history(self):
+        class MarkingReporter(object):
+            def report(self, responses):
+                responses['count']['is_healthy'] = True
+
+        runner = ContinuousRunner([CountMetric()], [MarkingReporter()])
+        runner.run_round(runner.metric_list)
+        self.assertEqual(runner.history['count'].latest()[1], {'count': 1})
+
+    def test_stop(self):
+        runner = ContinuousRunner([SlowCountMetric()], [])
+        runner.stop()
+        start_time = time.time()
+        runner.run()
+        self.assertLess(time.time() - start_time, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
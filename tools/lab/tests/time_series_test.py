@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from utils.time_series import TimeSeries
+
+
+class TimeSeriesTest(unittest.TestCase):
+    def test_oldest_samples_are_dropped(self):
+        series = TimeSeries(3)
+        for timestamp in range(5):
+            series.append(timestamp, timestamp * 10)
+        self.assertEqual(list(series), [(2, 20), (3, 30), (4, 40)])
+        self.assertEqual(series.latest(), (4, 40))
+
+    def test_window(self):
+        series = TimeSeries(10)
+        for timestamp in range(0, 100, 10):
+            series.append(timestamp, timestamp)
+        self.assertEqual(series.window(20), [(70, 70), (80, 80), (90, 90)])
+        self.assertTrue(series.covers(90))
+        self.assertFalse(series.covers(91))
+
+    def test_empty(self):
+        series = TimeSeries(3)
+        self.assertIsNone(series.latest())
+        self.assertEqual(series.window(10), [])
+        self.assertFalse(series.covers(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
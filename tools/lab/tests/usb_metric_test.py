@@ -15,11 +15,16 @@
 #   limitations under the License.
 
 from io import BytesIO
+import os
+import tempfile
+import time
 import unittest
 
 from tests import fake
+from tests import usbmon_test
 from metrics.usb_metric import Device
 from metrics.usb_metric import UsbMetric
+from utils import usbmon
 import mock
 
 
@@ -44,6 +49,44 @@ class UsbMetricTest(unittest.TestCase):
             mock_popen.return_value.stdout = BytesIO(b'')
             self.assertEquals(UsbMetric().get_bytes(0), {})
 
+    def test_get_usage_text(self):
+        with mock.patch('subprocess.Popen') as mock_popen, \
+                mock.patch('os.path.exists', return_value=False):
+            mock_popen.return_value.stdout = BytesIO(usbmon_test.TEXT_DUMP)
+            usage = UsbMetric().get_usage(0)
+        self.assertEqual(usage.get_bytes(), usbmon_test.EXPECTED_BYTES)
+        self.assertEqual(usage.get_urbs(), usbmon_test.EXPECTED_URBS)
+
+    def test_get_usage_binary(self):
+        with tempfile.NamedTemporaryFile() as dump:
+            dump.write(usbmon_test.BINARY_DUMP)
+            dump.flush()
+            metric = UsbMetric()
+            metric.USBMON_DEVICE = dump.name
+            usage = metric.get_usage(.01)
+        self.assertEqual(usage.get_bytes(), usbmon_test.EXPECTED_BYTES)
+        self.assertEqual(usage.get_urbs(), usbmon_test.EXPECTED_URBS)
+
+    def test_read_binary_waits_for_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            device = os.path.join(directory, 'usbmon0')
+            os.mkfifo(device)
+            # Keeps the fifo open, so that reads wait for events instead of
+            # returning the end of the file.
+            writer = os.open(device, os.O_RDWR)
+            try:
+                os.write(writer, usbmon_test.BINARY_DUMP)
+                metric = UsbMetric()
+                metric.USBMON_DEVICE = device
+                parser = usbmon.BinaryParser()
+                start_time = time.time()
+                metric.read_binary(parser, .1)
+            finally:
+                os.close(writer)
+        self.assertGreaterEqual(time.time() - start_time, .1)
+        self.assertEqual(parser.get_bytes(), usbmon_test.EXPECTED_BYTES)
+        self.assertEqual(parser.get_urbs(), usbmon_test.EXPECTED_URBS)
+
     def test_match_device_id(self):
         mock_lsusb = ('Bus 003 Device 047: ID 18d1:d00d Device 0\n'
                       'Bus 003 Device 001: ID 1d6b:0002 Device 1')
@@ -77,3 +120,17 @@ class UsbMetricTest(unittest.TestCase):
 
         self.assertTrue(dev_1 in act_out and dev_2 in act_out and
                         dev_3 in act_out)
+
+    def test_gen_output_rates(self):
+        dev_name_dict = {'1:001': 'Device 1', '1:002': 'Device 2'}
+        act_out = UsbMetric().gen_output(dev_name_dict, {'1:001': 500},
+                                         {'1:001': 10}, 5)
+        act_out.sort(key=lambda device: device.dev_id)
+
+        self.assertEqual(act_out, [
+            Device('1:001', 500, 'Device 1', 10),
+            Device('1:002', 0, 'Device 2', 0)
+        ])
+        self.assertEqual(act_out[0].byte_rate, 100)
+        self.assertEqual(act_out[0].urb_rate, 2)
+        self.assertEqual(act_out[1].byte_rate, 0)
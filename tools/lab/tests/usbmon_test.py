@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from utils import usbmon
+
+# Recorded from /sys/kernel/debug/usb/usbmon/0u with a phone on 3:012.
+TEXT_DUMP = b"""\
+ffff8801ed2a9b40 1593213813 S Ci:3:001:0 s a3 00 0000 0001 0004 4 <
+ffff8801ed2a9b40 1593213834 C Ci:3:001:0 0 4 = 00010000
+ffff8800a1d0e0c0 1593214010 S Co:3:012:0 s 21 22 0000 0000 0000 0
+ffff8800a1d0e0c0 1593214072 C Co:3:012:0 0 0
+ffff8800b0eb8b40 1593214530 S Bo:3:012:2 -115 24 = 434e584e 00000001 00100000
+ffff8800b0eb8b40 1593214588 C Bo:3:012:2 0 24 >
+ffff8800b0eb8780 1593214601 S Bi:3:012:1 -115 16384 <
+ffff8800b0eb8780 1593214920 C Bi:3:012:1 0 24 = 4f4b4159 00000000 00000000
+ffff88080bb00780 1593215093 C Ii:2:003:1 0:8 8 = 00000000
+"""
+
+
+def binary_event(event_type, xfer_type, epnum, busnum, devnum, length,
+                 data=b''):
+    """Returns a usbmon binary event as read from /dev/usbmonN."""
+    return usbmon.BINARY_HEADER.pack(0, event_type, xfer_type, epnum, devnum,
+                                     busnum, 0, 0, 0, 0, 0, length,
+                                     len(data), b'\0' * 8) + data
+
+
+BINARY_DUMP = b''.join([
+    binary_event(b'S', 2, 0x80, 3, 1, 4),
+    binary_event(b'C', 2, 0x80, 3, 1, 4, b'\x00\x01\x00\x00'),
+    binary_event(b'S', 2, 0x00, 3, 12, 0, b'\x21\x22' + b'\0' * 6),
+    binary_event(b'C', 2, 0x00, 3, 12, 0),
+    binary_event(b'S', 3, 0x02, 3, 12, 24, b'CNXN' + b'\0' * 20),
+    binary_event(b'C', 3, 0x02, 3, 12, 24),
+    binary_event(b'S', 3, 0x81, 3, 12, 16384),
+    binary_event(b'C', 3, 0x81, 3, 12, 24, b'OKAY' + b'\0' * 20),
+    binary_event(b'C', 1, 0x81, 2, 3, 8, b'\0' * 8),
+])
+
+EXPECTED_BYTES = {'3:001': 4, '3:012': 16456, '2:003': 8}
+EXPECTED_URBS = {'3:001': 1, '3:012': 3, '2:003': 1}
+
+
+def feed_in_chunks(parser, dump, chunk_size):
+    for offset in range(0, len(dump), chunk_size):
+        parser.feed(dump[offset:offset + chunk_size])
+    parser.finish()
+    return parser
+
+
+class TextParserTest(unittest.TestCase):
+    def test_counts(self):
+        parser = feed_in_chunks(usbmon.TextParser(), TEXT_DUMP, len(TEXT_DUMP))
+        self.assertEqual(parser.get_bytes(), EXPECTED_BYTES)
+        self.assertEqual(parser.get_urbs(), EXPECTED_URBS)
+
+    def test_lines_split_across_chunks(self):
+        for chunk_size in (1, 7, 100):
+            parser = feed_in_chunks(usbmon.TextParser(), TEXT_DUMP,
+                                    chunk_size)
+            self.assertEqual(parser.get_bytes(), EXPECTED_BYTES)
+            self.assertEqual(parser.get_urbs(), EXPECTED_URBS)
+
+    def test_last_line_without_newline(self):
+        parser = feed_in_chunks(usbmon.TextParser(),
+                                b'x x C Ii:2:003:1 0:8 8 = x', 100)
+        self.assertEqual(parser.get_bytes(), {'2:003': 8})
+
+    def test_empty(self):
+        parser = feed_in_chunks(usbmon.TextParser(), b'', 1)
+        self.assertEqual(parser.get_bytes(), {})
+        self.assertEqual(parser.get_urbs(), {})
+
+
+class BinaryParserTest(unittest.TestCase):
+    def test_counts(self):
+        parser = feed_in_chunks(usbmon.BinaryParser(), BINARY_DUMP,
+                                len(BINARY_DUMP))
+        self.assertEqual(parser.get_bytes(), EXPECTED_BYTES)
+        self.assertEqual(parser.get_urbs(), EXPECTED_URBS)
+
+    def test_events_split_across_chunks(self):
+        for chunk_size in (1, 13, usbmon.BINARY_HEADER.size + 2):
+            parser = feed_in_chunks(usbmon.BinaryParser(), BINARY_DUMP,
+                                    chunk_size)
+            self.assertEqual(parser.get_bytes(), EXPECTED_BYTES)
+            self.assertEqual(parser.get_urbs(), EXPECTED_URBS)
+
+    def test_one_event_per_read(self):
+        parser = usbmon.BinaryParser()
+        parser.feed(binary_event(b'S', 3, 0x02, 3, 12, 24, b'\0' * 24))
+        parser.feed(binary_event(b'C', 3, 0x02, 3, 12, 24))
+        self.assertEqual(parser.get_bytes(), {'3:012': 48})
+        self.assertEqual(parser.get_urbs(), {'3:012': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
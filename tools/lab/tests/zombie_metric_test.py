@@ -24,7 +24,7 @@ class ZombieMetricTest(unittest.TestCase):
     """Class for testing ZombieMetric."""
 
     def test_gather_metric_oob(self):
-        stdout_string = '30888 Z+ adb -s'
+        stdout_string = '30888 Z+ 60 adb adb -s'
         FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
         fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
         metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
@@ -40,7 +40,7 @@ class ZombieMetricTest(unittest.TestCase):
         self.assertEqual(expected_result, metric_obj.gather_metric())
 
     def test_gather_metric_no_serial(self):
-        stdout_string = '30888 Z+ adb <defunct>'
+        stdout_string = '30888 Z+ 60 adb <defunct>'
         FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
         fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
         metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
@@ -56,8 +56,8 @@ class ZombieMetricTest(unittest.TestCase):
         self.assertEqual(expected_result, metric_obj.gather_metric())
 
     def test_gather_metric_with_serial(self):
-        stdout_string = ('12345 Z+ fastboot -s M4RKY_M4RK\n'
-                         '99999 Z+ adb -s OR3G4N0\n')
+        stdout_string = ('12345 Z+ 60 fastboot fastboot -s M4RKY_M4RK\n'
+                         '99999 Z+ 60 adb adb -s OR3G4N0\n')
         FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
         fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
         metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
@@ -73,7 +73,7 @@ class ZombieMetricTest(unittest.TestCase):
         self.assertEquals(metric_obj.gather_metric(), expected_result)
 
     def test_gather_metric_adb_fastboot_no_s(self):
-        stdout_string = ('12345 Z+ fastboot\n' '99999 Z+ adb\n')
+        stdout_string = ('12345 Z+ 60 fastboot\n' '99999 Z+ 60 adb\n')
         FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
         fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
         metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
@@ -89,7 +89,7 @@ class ZombieMetricTest(unittest.TestCase):
         self.assertEquals(metric_obj.gather_metric(), expected_result)
 
     def test_gather_metric_no_adb_fastboot(self):
-        stdout_string = '12345 Z+ otters'
+        stdout_string = '12345 Z+ 60 otters'
         FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
         fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
         metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
@@ -102,5 +102,16 @@ class ZombieMetricTest(unittest.TestCase):
         self.assertEquals(metric_obj_res[metric_obj.OTHER_ZOMBIES], exp_pid)
 
 
+    def test_gather_metric_ignores_running_processes(self):
+        stdout_string = ('12345 Sl 60 adb adb -s OR3G4N0\n'
+                         '99999 Z+ 60 adb adb -s OR3G4N0\n')
+        FAKE_RESULT = fake.FakeResult(stdout=stdout_string)
+        fake_shell = fake.MockShellCommand(fake_result=FAKE_RESULT)
+        metric_obj = zombie_metric.ZombieMetric(shell=fake_shell)
+        metric_obj_res = metric_obj.gather_metric()
+
+        self.assertEqual(metric_obj_res[metric_obj.ADB_ZOMBIES], ['OR3G4N0'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import os
+import threading
+
+from utils import job
+from utils import shell
+
+
+class Process(object):
+    """A process running on the host, as listed by ps.
+
+    Attributes:
+        pid: the pid, a string.
+        state: the process state codes, e.g. 'Z+' for a zombie.
+        elapsed: the number of seconds since the process started.
+        name: the name of the executable, e.g. 'adb'.
+        args: the command line of the process.
+        serial: the serial given to the process with '-s', or None.
+    """
+
+    def __init__(self, pid, state, elapsed, name, args):
+        self.pid = pid
+        self.state = state
+        self.elapsed = elapsed
+        self.name = name
+        self.args = args
+        self.serial = None
+        spl_args = args.split()
+        if '-s' in spl_args:
+            # The index after the '-s' flag is the serial.
+            sn_idx = spl_args.index('-s')
+            if sn_idx + 1 < len(spl_args):
+                self.serial = spl_args[sn_idx + 1]
+
+    @property
+    def is_zombie(self):
+        return self.state.startswith('Z')
+
+
+class DeviceInventory(object):
+    """The Android devices of the host, and the processes that use them.
+
+    Each source is read with a single command the first time it is used, and
+    then shared by every metric using the same inventory. The runner creates
+    one inventory per round, so the cost of listing devices and processes is
+    paid once per round however many metrics need them. An inventory may be
+    used by several threads at once.
+    """
+    ADB_DEVICES_COMMAND = 'adb devices'
+    FASTBOOT_DEVICES_COMMAND = 'fastboot devices'
+    USB_DEVICES_COMMAND = ('grep -H . /sys/bus/usb/devices/*/serial '
+                           '/sys/bus/usb/devices/*/busnum '
+                           '/sys/bus/usb/devices/*/devnum')
+    PROCESSES_COMMAND = 'ps -eo pid=,stat=,etimes=,comm=,args='
+
+    def __init__(self, shell=shell.ShellCommand(job)):
+        self._shell = shell
+        self._sources = {}
+        self._locks = collections.defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
+
+    def _get(self, name, read):
+        """Returns the value of a source, reading it on first use."""
+        with self._locks_lock:
+            lock = self._locks[name]
+        with lock:
+            if name not in self._sources:
+                self._sources[name] = read()
+            return self._sources[name]
+
+    def _read_device_list(self, command):
+        """Returns the (serial, state) pairs listed by adb or fastboot."""
+        result = self._shell.run(command, ignore_status=True)
+        # Example output, the header and blank lines are only printed by adb:
+        # List of devices attached
+        # 00bd977c7f504caf	offline
+        devices = []
+        for line in result.stdout.splitlines():
+            spl_line = line.split()
+            if len(spl_line) < 2 or line.startswith('List of devices'):
+                continue
+            devices.append((spl_line[0], spl_line[1]))
+        return devices
+
+    def get_adb_devices(self):
+        """Returns the (serial, state) pairs listed by 'adb devices'."""
+        return self._get(
+            'adb', lambda: self._read_device_list(self.ADB_DEVICES_COMMAND))
+
+    def get_fastboot_devices(self):
+        """Returns the (serial, state) pairs listed by 'fastboot devices'."""
+        return self._get('fastboot', lambda: self._read_device_list(
+            self.FASTBOOT_DEVICES_COMMAND))
+
+    def _read_usb_ids(self):
+        result = self._shell.run(self.USB_DEVICES_COMMAND, ignore_status=True)
+        # Example output:
+        # /sys/bus/usb/devices/3-4/serial:00bd977c7f504caf
+        # /sys/bus/usb/devices/3-4/busnum:3
+        # /sys/bus/usb/devices/3-4/devnum:12
+        usb_devices = collections.defaultdict(dict)
+        for line in result.stdout.splitlines():
+            path, _, value = line.partition(':')
+            usb_path, field = os.path.split(path)
+            usb_devices[usb_path][field] = value.strip()
+        usb_ids = {}
+        for fields in usb_devices.values():
+            if 'serial' in fields and 'busnum' in fields and \
+                    'devnum' in fields:
+                # Same format as usbmon and UsbMetric, e.g. 3:012.
+                usb_ids[fields['serial']] = '%d:%03d' % (int(
+                    fields['busnum']), int(fields['devnum']))
+        return usb_ids
+
+    def get_usb_ids(self):
+        """Returns a dict mapping serials to the 'bus:device' of the device.
+
+        Every USB device with a serial is included, whether adb or fastboot
+        can talk to it or not.
+        """
+        return self._get('usb', self._read_usb_ids)
+
+    def _read_processes(self):
+        result = self._shell.run(self.PROCESSES_COMMAND)
+        # Example output:
+        # 30797 Z+   86402 adb <defunct>
+        # 30798 Sl     120 adb adb -s 00bd977c7f504caf shell
+        processes = []
+        for line in result.stdout.splitlines():
+            spl_line = line.split(None, 4)
+            if len(spl_line) < 4:
+                continue
+            args = spl_line[4] if len(spl_line) > 4 else ''
+            processes.append(
+                Process(spl_line[0], spl_line[1], int(spl_line[2]),
+                        spl_line[3], args))
+        return processes
+
+    def get_processes(self):
+        """Returns a list of Process objects for every process on the host."""
+        return self._get('processes', self._read_processes)
+
+    def get_processes_by_serial(self):
+        """Returns a dict mapping serials to the processes given them."""
+        processes = collections.defaultdict(list)
+        for process in self.get_processes():
+            if process.serial is not None:
+                processes[process.serial].append(process)
+        return processes
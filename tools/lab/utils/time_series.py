@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+
+
+class TimeSeries(object):
+    """A bounded series of timestamped samples, oldest first.
+
+    Once the series holds max_samples samples, appending a sample drops the
+    oldest one, so the memory used stays the same however long it runs.
+    """
+
+    def __init__(self, max_samples):
+        self._samples = collections.deque(maxlen=max_samples)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def __iter__(self):
+        return iter(self._samples)
+
+    def append(self, timestamp, value):
+        """Adds a sample, timestamps must not decrease."""
+        self._samples.append((timestamp, value))
+
+    def latest(self):
+        """Returns the last (timestamp, value) sample, or None if empty."""
+        return self._samples[-1] if self._samples else None
+
+    def covers(self, seconds):
+        """Returns whether the samples span at least the given duration."""
+        return bool(self._samples) and (
+            self._samples[-1][0] - self._samples[0][0] >= seconds)
+
+    def window(self, seconds):
+        """Returns the samples of the last seconds before the latest sample.
+
+        Args:
+            seconds: the length of the window.
+
+        Returns:
+            A list of (timestamp, value) samples, oldest first.
+        """
+        if not self._samples:
+            return []
+        start = self._samples[-1][0] - seconds
+        samples = []
+        for sample in reversed(self._samples):
+            if sample[0] < start:
+                break
+            samples.append(sample)
+        samples.reverse()
+        return samples
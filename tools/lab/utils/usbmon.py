@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+#
+#   Copyright 2018 - The Android Open Source Project
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""Parsers counting the traffic of each USB device in usbmon output.
+
+The parsers are fed chunks of data as they are read, which need not end on
+an event boundary, so that recorded dumps and live streams are read the same
+way. See Documentation/usb/usbmon.txt in the kernel for both formats.
+"""
+import struct
+
+# struct mon_bin_hdr, as returned by read() on /dev/usbmonN.
+BINARY_HEADER = struct.Struct('=QcBBBHbbqiiII8s')
+
+# Transfer type of control transfers in mon_bin_hdr.xfer_type.
+XFER_TYPE_CONTROL = 2
+# Direction bit of mon_bin_hdr.epnum.
+ENDPOINT_DIR_IN = 0x80
+
+EVENT_SUBMISSION = b'S'
+EVENT_CALLBACK = b'C'
+
+
+class UsbmonParser(object):
+    """Counts the bytes and URBs transferred by each device.
+
+    Submissions of control IN transfers are not counted, their length is the
+    size of the buffer given and not data transferred. A URB is counted when
+    it completes.
+    """
+
+    def __init__(self):
+        # Maps a device key to a list of [bytes, urbs].
+        self._counts = {}
+
+    def _add(self, key, length, event_type):
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0, 0]
+        counts[0] += length
+        if event_type == EVENT_CALLBACK:
+            counts[1] += 1
+
+    def _get_dev_id(self, key):
+        """Returns the 'bus:device' id of a device key, as in usbmon text."""
+        raise NotImplementedError()
+
+    def feed(self, data):
+        """Parses the next chunk of usbmon output."""
+        raise NotImplementedError()
+
+    def finish(self):
+        """Parses any event left at the end of the output."""
+
+    def get_bytes(self):
+        """Returns a dict mapping 'bus:device' to the bytes transferred."""
+        return dict((self._get_dev_id(key), counts[0])
+                    for key, counts in self._counts.items())
+
+    def get_urbs(self):
+        """Returns a dict mapping 'bus:device' to the URBs completed."""
+        return dict((self._get_dev_id(key), counts[1])
+                    for key, counts in self._counts.items())
+
+
+class TextParser(UsbmonParser):
+    """Parses the text interface, e.g. /sys/kernel/debug/usb/usbmon/0u.
+
+    Example lines:
+        ffff88080bb00780 2452973093 C Ii:2:003:1 0:8 8 = 00000000
+        ffff8800b0eb8b40 3575914555 S Co:1:002:0 s 23 03 0004 0001 0000 0
+    """
+
+    def __init__(self):
+        super(TextParser, self).__init__()
+        self._partial_line = b''
+
+    def _get_dev_id(self, key):
+        return key.decode('ascii')
+
+    def _parse_lines(self, lines):
+        counts = self._counts
+        for line in lines:
+            fields = line.split(b' ', 6)
+            if len(fields) < 6:
+                continue
+            event_type = fields[2]
+            address = fields[3]
+            if event_type == EVENT_SUBMISSION and address[:2] == b'Ci':
+                continue
+            length = fields[5]
+            if fields[4] == b's':
+                # Control submissions have a setup packet of 5 fields before
+                # the data length.
+                fields = line.split(b' ', 11)
+                if len(fields) < 11:
+                    continue
+                length = fields[10]
+            # The address is Ii:2:003:1, the device is 2:003.
+            key = address[3:address.rindex(b':')]
+            entry = counts.get(key)
+            if entry is None:
+                entry = counts[key] = [0, 0]
+            entry[0] += int(length)
+            if event_type == EVENT_CALLBACK:
+                entry[1] += 1
+
+    def feed(self, data):
+        lines = data.split(b'\n')
+        lines[0] = self._partial_line + lines[0]
+        self._partial_line = lines.pop()
+        self._parse_lines(lines)
+
+    def finish(self):
+        if self._partial_line:
+            self._parse_lines([self._partial_line])
+            self._partial_line = b''
+
+
+class BinaryParser(UsbmonParser):
+    """Parses the binary interface read from /dev/usbmonN.
+
+    Every event is a mon_bin_hdr followed by len_cap bytes of data, which are
+    skipped.
+    """
+
+    def __init__(self):
+        super(BinaryParser, self).__init__()
+        self._partial_header = b''
+        self._data_left = 0
+
+    def _get_dev_id(self, key):
+        return '%d:%03d' % key
+
+    def feed(self, data):
+        offset = min(self._data_left, len(data))
+        self._data_left -= offset
+        if self._partial_header:
+            data = self._partial_header + data[offset:]
+            offset = 0
+        end = len(data)
+        header_size = BINARY_HEADER.size
+        while offset + header_size <= end:
+            (_, event_type, xfer_type, epnum, devnum, busnum, _, _, _, _, _,
+             len_urb, len_cap, _) = BINARY_HEADER.unpack_from(data, offset)
+            offset += header_size + len_cap
+            if not (event_type == EVENT_SUBMISSION and
+                    xfer_type == XFER_TYPE_CONTROL and
+                    epnum & ENDPOINT_DIR_IN):
+                self._add((busnum, devnum), len_urb, event_type)
+        if offset > end:
+            self._data_left = offset - end
+            self._partial_header = b''
+        else:
+            self._partial_header = data[offset:]